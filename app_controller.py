@@ -8,8 +8,6 @@ import subprocess
 import sys
 from urllib.parse import urlparse, parse_qs
 import threading
-import json
-from decimal import Decimal
 
 # Viste, Dialoghi e Utility
 from views.auth_view import AuthView
@@ -30,8 +28,10 @@ from dialogs.conto_condiviso_dialog import ContoCondivisoDialog
 from dialogs.spesa_fissa_dialog import SpesaFissaDialog
 from utils.localization import LocalizationManager
 from utils.styles import LoadingOverlay
-from utils.email_sender import send_email
+from utils.email_sender import send_email, DIMENSIONE_MASSIMA_ALLEGATO
 from utils.async_task import AsyncTask
+from utils.contesto_inserimento import GestoreContestoInserimento
+from utils.indice_ticker import IndiceTicker
 from db.gestione_db import (
     ottieni_prima_famiglia_utente, ottieni_ruolo_utente, check_e_paga_rate_scadute,
     check_e_processa_spese_fisse, get_user_count, crea_famiglia_e_admin,
@@ -39,8 +39,10 @@ from db.gestione_db import (
     ottieni_versione_db, crea_invito, ottieni_invito_per_token,
     ottieni_utenti_senza_famiglia, ensure_family_key, trigger_budget_history_update,
     is_server_automation_enabled, aggiorna_ultimo_accesso,
-    ottieni_backup_completo_famiglia
+    scrivi_backup_famiglia, precarica_configurazioni, ottieni_carte_utente
 )
+from db.strumentazione_query import richiesta_query
+from db.addebiti_carte import sincronizza_giorni_addebito
 
 from utils.logger import setup_logger
 
@@ -49,15 +51,6 @@ logger = setup_logger("AppController")
 MAX_RECENT_FILES = 5
 VERSION = "0.53.02"
 
-class BackupEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, (datetime.datetime, datetime.date)):
-            return obj.isoformat()
-        if isinstance(obj, Decimal):
-            return float(obj)
-        return super().default(obj)
-
-
 class AppController:
     def __init__(self, page: ft.Page):
         self.page = page
@@ -71,6 +64,13 @@ class AppController:
         
         # Overlay di caricamento globale
         self.loading_overlay = LoadingOverlay()
+
+        # Contesto precompilato del dialogo transazioni (conti, matrice FOP, categorie)
+        self.contesto_inserimento = GestoreContestoInserimento()
+
+        # Asset posseduti dall'utente per l'autocomplete ticker: solo in memoria e
+        # solo per questa sessione (l'indice condiviso su disco ha solo dati pubblici)
+        self.indice_ticker_sessione = IndiceTicker(None)
         
         # Inizializza tutti i dialoghi e le viste
         self._init_dialogs_and_views()
@@ -311,6 +311,9 @@ class AppController:
 
     def _carica_dashboard(self):
         self.page.views.clear()
+
+        # Configurazioni globali, di famiglia e utente in un solo giro (feature flag, onboarding...)
+        precarica_configurazioni(self.get_family_id(), self.get_user_id())
         
         # RE-CREATE DASHBOARD VIEW TO ENSURE FRESH STATE (Fixes data leakage)
         # Re-inizializza la vista e tutte le tab per garantire che non ci siano dati residui
@@ -347,6 +350,12 @@ class AppController:
             else:
                 # Server Automation Active -> Skip ALL local heavy checks
                 logger.info("Server Automation Active: Skipping local Fixed Expenses and Loan checks.")
+                # Il job server legge il giorno di addebito carte in chiaro: lo teniamo allineato
+                # in background (decrittare le carte non deve ritardare la dashboard)
+                AsyncTask(
+                    target=lambda: sincronizza_giorni_addebito(ottieni_carte_utente(id_utente, master_key_b64)),
+                    error_callback=lambda e: logger.warning(f"Sincronizzazione giorni addebito carte fallita: {e}")
+                ).start()
             
 
         self.update_all_views(is_initial_load=True)
@@ -403,47 +412,25 @@ class AppController:
         # ... (rest of the file)
         """Aggiorna i prezzi degli asset nel portafoglio in background."""
         from utils.async_task import AsyncTask
-        from utils.yfinance_manager import ottieni_prezzi_multipli
-        from db.gestione_db import ottieni_dettagli_conti_utente, ottieni_portafoglio, aggiorna_prezzo_manuale_asset
+        from db.gestione_db import sincronizza_prezzi_portafoglio
         
         utente_id = self.get_user_id()
         master_key_b64 = self.page.session.get("master_key")
         
         if not utente_id:
             return
+        indice_sessione = self.indice_ticker_sessione
         
         def _sync_prezzi():
             try:
-                # Ottieni tutti i conti di investimento
-                conti_utente = ottieni_dettagli_conti_utente(utente_id, master_key_b64=master_key_b64)
-                conti_investimento = [c for c in conti_utente if c['tipo'] == 'Investimento']
-                
-                # Raccogli tutti i ticker unici
-                tutti_asset = []
-                for conto in conti_investimento:
-                    portafoglio = ottieni_portafoglio(conto['id_conto'], master_key_b64=master_key_b64)
-                    tutti_asset.extend(portafoglio)
-                
-                if not tutti_asset:
-                    return 0
-                
-                # Ottieni prezzi per tutti i ticker
-                tickers = list(set([
-                    asset['ticker'] for asset in tutti_asset 
-                    if asset.get('ticker') and asset['ticker'] != "[ENCRYPTED]" and not CryptoManager.is_encrypted(asset['ticker'])
-                ]))
-                logger.info(f"Aggiornamento automatico prezzi per {len(tickers)} ticker...")
-                prezzi = ottieni_prezzi_multipli(tickers)
-                
-                # Aggiorna i prezzi nel database
-                aggiornati = 0
-                for asset in tutti_asset:
-                    ticker = asset['ticker']
-                    if ticker in prezzi and prezzi[ticker] is not None:
-                        aggiorna_prezzo_manuale_asset(asset['id_asset'], prezzi[ticker])
-                        aggiornati += 1
-                
-                return aggiornati
+                # Una query per gli asset, un fetch parallelo per ticker distinto, un UPDATE in blocco
+                esito = sincronizza_prezzi_portafoglio(id_utente=utente_id, master_key_b64=master_key_b64)
+                # Gli asset posseduti alimentano l'indice della sessione (non quello condiviso)
+                indice_sessione.aggiungi_simboli(
+                    {'ticker': asset['ticker'], 'nome': asset.get('nome_asset')} for asset in esito['asset']
+                )
+                logger.info(f"Aggiornamento automatico prezzi per {esito['ticker']} ticker completato.")
+                return esito['aggiornati']
             except Exception as e:
                 logger.error(f"Errore aggiornamento prezzi in background: {e}")
                 return 0
@@ -575,27 +562,37 @@ class AppController:
 
         def task_backup():
             try:
-                data = ottieni_backup_completo_famiglia(id_famiglia, master_key_b64, id_utente)
-                if not data:
+                backup_file, info = scrivi_backup_famiglia(id_famiglia, master_key_b64, id_utente)
+                if not backup_file:
                     return False, "Errore durante la generazione dei dati di backup."
 
-                # Converti in JSON
-                json_str = json.dumps(data, indent=4, cls=BackupEncoder)
-                json_bytes = json_str.encode('utf-8')
+                # Il backup è già serializzato (JSON Lines gzip) su file temporaneo:
+                # lo si carica in memoria per l'allegato solo se entra nel limite
+                with backup_file:
+                    backup_file.seek(0, os.SEEK_END)
+                    dimensione = backup_file.tell()
+                    if dimensione > DIMENSIONE_MASSIMA_ALLEGATO:
+                        return False, (f"Backup troppo grande per l'invio via email "
+                                       f"({dimensione // (1024 * 1024)} MB, massimo "
+                                       f"{DIMENSIONE_MASSIMA_ALLEGATO // (1024 * 1024)} MB).")
+                    backup_file.seek(0)
+                    backup_bytes = backup_file.read()
                 
                 # Invia email
-                nome_famiglia = data['tabelle']['Famiglie'][0]['nome_famiglia']
+                nome_famiglia = info['nome_famiglia']
                 subject = f"Backup Dati Famiglia: {nome_famiglia}"
                 body = f"""
                 <h2>Backup Dati BudgetAmico</h2>
                 <p>In allegato trovi il backup completo richiesto per la famiglia <b>{nome_famiglia}</b>.</p>
                 <p>Data generazione: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}</p>
+                <p>Formato: JSON Lines compresso (gzip), una riga per record.</p>
                 <hr>
                 <p style='font-size: 12px; color: #666;'>Questo file contiene dati sensibili. Conservalo in un luogo sicuro.</p>
                 """
                 
-                filename = f"Backup_BudgetAmico_{nome_famiglia}_{datetime.date.today()}.json"
-                success, error = send_email(email_dest, subject, body, attachment_bytes=json_bytes, attachment_name=filename)
+                filename = f"Backup_BudgetAmico_{nome_famiglia}_{datetime.date.today()}.jsonl.gz"
+                # Invio sincrono (siamo già nel thread del task): l'allegato non passa dalla coda
+                success, error = send_email(email_dest, subject, body, attachment_bytes=backup_bytes, attachment_name=filename)
                 
                 return success, error
             except Exception as ex:
@@ -792,6 +789,9 @@ class AppController:
                 display_name = utente['username']
             
             self.page.session.set("nome_visualizzato", display_name)
+
+            # Prepara in background il contesto del dialogo transazioni
+            self.contesto_inserimento.prepara(id_famiglia, id_utente, utente.get("master_key"))
             
             # --- Auto-Update History Snapshot & Credit Card Settlement on Login ---
             # SKIP if Server Automation is active
@@ -942,6 +942,8 @@ class AppController:
             logger.info("User logged out", extra={'id_utente': id_utente, 'id_famiglia': self.get_family_id()})
         else:
             logger.info("User logged out (no active session)")
+        self.contesto_inserimento.reset()
+        self.indice_ticker_sessione = IndiceTicker(None)
         self.page.session.clear()
         self.page.go("/")
 
@@ -1057,9 +1059,10 @@ class AppController:
 
     def update_all_views(self, is_initial_load=False, target_tab=None):
         if self.dashboard_view:
-            self.dashboard_view.update_all_tabs_data(is_initial_load)
-            if target_tab and hasattr(self.dashboard_view, 'navigate_to_tab'):
-                self.dashboard_view.navigate_to_tab(target_tab)
+            with richiesta_query(f"update_all_views:{target_tab or 'attiva'}"):
+                self.dashboard_view.update_all_tabs_data(is_initial_load)
+                if target_tab and hasattr(self.dashboard_view, 'navigate_to_tab'):
+                    self.dashboard_view.navigate_to_tab(target_tab)
         
         if not is_initial_load:
             # Se siamo in fase di onboarding, riapriamo il dialogo per lo step successivo
@@ -4,9 +4,6 @@
 -- Questo script crea indici per le chiavi esterne che non ne hanno uno,
 -- risolvendo i warning "unindexed_foreign_keys" del linter di Supabase.
 
--- Appartenenza_Famiglia
-CREATE INDEX IF NOT EXISTS idx_appartenenza_famiglia_id_famiglia ON public.Appartenenza_Famiglia(id_famiglia);
-
 -- Budget_Storico
 CREATE INDEX IF NOT EXISTS idx_budget_storico_lookup ON public.Budget_Storico(id_famiglia, anno, mese);
 
@@ -20,12 +17,6 @@ CREATE INDEX IF NOT EXISTS idx_carte_id_conto_riferimento_condiviso ON public.Ca
 CREATE INDEX IF NOT EXISTS idx_carte_id_conto_riferimento ON public.Carte(id_conto_riferimento);
 CREATE INDEX IF NOT EXISTS idx_carte_id_utente ON public.Carte(id_utente);
 
--- Conti
-CREATE INDEX IF NOT EXISTS idx_conti_id_utente ON public.Conti(id_utente);
-
--- ContiCondivisi
-CREATE INDEX IF NOT EXISTS idx_conticondivisi_id_famiglia ON public.ContiCondivisi(id_famiglia);
-
 -- Immobili
 CREATE INDEX IF NOT EXISTS idx_immobili_id_famiglia ON public.Immobili(id_famiglia);
 CREATE INDEX IF NOT EXISTS idx_immobili_id_prestito_collegato ON public.Immobili(id_prestito_collegato);
@@ -36,9 +27,6 @@ CREATE INDEX IF NOT EXISTS idx_inviti_id_famiglia ON public.Inviti(id_famiglia);
 -- Obiettivi_Risparmio
 CREATE INDEX IF NOT EXISTS idx_obiettivi_risparmio_id_famiglia ON public.Obiettivi_Risparmio(id_famiglia);
 
--- PartecipazioneContoCondiviso
-CREATE INDEX IF NOT EXISTS idx_partecipazione_id_utente ON public.PartecipazioneContoCondiviso(id_utente);
-
 -- Prestiti
 CREATE INDEX IF NOT EXISTS idx_prestiti_id_categoria_pagamento ON public.Prestiti(id_categoria_pagamento_default);
 CREATE INDEX IF NOT EXISTS idx_prestiti_id_conto_condiviso_pagamento ON public.Prestiti(id_conto_condiviso_pagamento_default);
@@ -71,14 +59,10 @@ CREATE INDEX IF NOT EXISTS idx_spesefisse_id_sottocategoria ON public.SpeseFisse
 CREATE INDEX IF NOT EXISTS idx_storico_asset_id_conto ON public.Storico_Asset(id_conto);
 
 -- Transazioni
-CREATE INDEX IF NOT EXISTS idx_transazioni_id_carta ON public.Transazioni(id_carta);
-CREATE INDEX IF NOT EXISTS idx_transazioni_id_conto ON public.Transazioni(id_conto);
 CREATE INDEX IF NOT EXISTS idx_transazioni_id_sottocategoria ON public.Transazioni(id_sottocategoria);
 CREATE INDEX IF NOT EXISTS idx_transazioni_data ON public.Transazioni(data);
 
 -- TransazioniCondivise
-CREATE INDEX IF NOT EXISTS idx_transazionicondivise_id_carta ON public.TransazioniCondivise(id_carta);
-CREATE INDEX IF NOT EXISTS idx_transazionicondivise_id_conto_condiviso ON public.TransazioniCondivise(id_conto_condiviso);
 CREATE INDEX IF NOT EXISTS idx_transazionicondivise_id_sottocategoria ON public.TransazioniCondivise(id_sottocategoria);
 CREATE INDEX IF NOT EXISTS idx_transazionicondivise_id_utente_autore ON public.TransazioniCondivise(id_utente_autore);
 CREATE INDEX IF NOT EXISTS idx_transazionicondivise_data ON public.TransazioniCondivise(data);
@@ -87,3 +71,15 @@ CREATE INDEX IF NOT EXISTS idx_transazionicondivise_data ON public.TransazioniCo
 CREATE INDEX IF NOT EXISTS idx_utenti_id_conto_condiviso_default ON public.Utenti(id_conto_condiviso_default);
 CREATE INDEX IF NOT EXISTS idx_utenti_id_conto_default ON public.Utenti(id_conto_default);
 CREATE INDEX IF NOT EXISTS idx_utenti_id_carta_default ON public.Utenti(id_carta_default);
+
+-- ============================================================================
+-- INDICI COVERING PER LE QUERY CALDE (schema v37, vedi db/indici_consigliati.py)
+-- ============================================================================
+CREATE INDEX IF NOT EXISTS idx_transazioni_conto_data ON public.Transazioni(id_conto, data) INCLUDE (importo, id_sottocategoria);
+CREATE INDEX IF NOT EXISTS idx_transazionicondivise_conto_data ON public.TransazioniCondivise(id_conto_condiviso, data) INCLUDE (importo, id_sottocategoria);
+CREATE INDEX IF NOT EXISTS idx_transazioni_carta_data ON public.Transazioni(id_carta, data) INCLUDE (importo) WHERE id_carta IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_transazionicondivise_carta_data ON public.TransazioniCondivise(id_carta, data) INCLUDE (importo) WHERE id_carta IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_appartenenza_famiglia_famiglia_utente ON public.Appartenenza_Famiglia(id_famiglia, id_utente);
+CREATE INDEX IF NOT EXISTS idx_conti_utente ON public.Conti(id_utente) INCLUDE (tipo, nascosto, rettifica_saldo);
+CREATE INDEX IF NOT EXISTS idx_conticondivisi_famiglia ON public.ContiCondivisi(id_famiglia) INCLUDE (tipo, tipo_condivisione);
+CREATE INDEX IF NOT EXISTS idx_partecipazione_utente_conto ON public.PartecipazioneContoCondiviso(id_utente, id_conto_condiviso);
@@ -0,0 +1,190 @@
+"""
+Addebito automatico del saldo delle carte di credito.
+
+Il vecchio giro (utils/card_processing, per utente) sommava per ogni carta
+l'intera storia del conto contabile, cercava i duplicati con un LIKE sulla
+descrizione (che è cifrata, quindi non trovava mai nulla) e creava i due
+movimenti in due transazioni separate. Qui:
+- il saldo dei conti contabili viene da Catalogo_Periodi (righe mensili con il
+  totale, mantenute dai trigger), per tutte le carte in scadenza in una query;
+- Addebiti_Carte è il registro degli addebiti con chiave unica (carta, anno,
+  mese): la riga è inserita nella stessa transazione dei due movimenti e un
+  conflitto significa "già addebitata", anche con più job concorrenti;
+- il giorno di addebito pianificato è in chiaro su Carte (come per SpeseFisse
+  e Prestiti), così il job server trova con una query le carte in scadenza di
+  tutti gli utenti.
+Le carte idonee restano quelle del vecchio giro: all'accesso dell'utente si
+addebitano tutte le sue carte di credito attive e configurate; il job server,
+che agisce senza l'utente, solo quelle con addebito_automatico.
+"""
+import calendar
+import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from db.supabase_manager import get_db_connection
+from db.crypto_helpers import get_server_family_key
+from db.catalogo_periodi import AMBITO_CONTO, saldi_da_catalogo
+from db.gestione_transazioni import aggiungi_transazione
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Saldi più piccoli (in valore assoluto) non vengono addebitati
+_SOGLIA_SALDO = 0.01
+
+_SQL_CARTE_IN_SCADENZA = """
+    SELECT DISTINCT ON (C.id_carta)
+           C.id_carta, C.id_utente, C.nome_carta, C.id_conto_contabile, C.id_conto_riferimento,
+           AF.id_famiglia
+    FROM Carte C
+    LEFT JOIN Appartenenza_Famiglia AF ON AF.id_utente = C.id_utente
+    LEFT JOIN Famiglie F ON F.id_famiglia = AF.id_famiglia
+    WHERE C.attiva = TRUE AND C.tipo_carta = 'credito'
+      AND C.giorno_addebito_pianificato = ANY(%s)
+      AND C.id_conto_contabile IS NOT NULL AND C.id_conto_riferimento IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM Addebiti_Carte A
+          WHERE A.id_carta = C.id_carta AND A.anno = %s AND A.mese = %s
+      )
+      AND {filtro}
+    ORDER BY C.id_carta, AF.id_famiglia
+"""
+_FILTRO_UTENTE = "C.id_utente = %s"
+_FILTRO_SERVER = ("C.addebito_automatico = TRUE "
+                  "AND F.server_encrypted_key IS NOT NULL AND F.server_encrypted_key != ''")
+
+
+def giorni_in_scadenza(oggi: datetime.date) -> List[int]:
+    """Giorni di addebito da processare oggi: l'ultimo del mese raccoglie anche i giorni che il mese non ha."""
+    ultimo = calendar.monthrange(oggi.year, oggi.month)[1]
+    if oggi.day == ultimo:
+        return list(range(oggi.day, 32))
+    return [oggi.day]
+
+
+def giorno_pianificato(giorno_addebito) -> Optional[int]:
+    """Giorno di addebito in chiaro per Carte.giorno_addebito_pianificato (None se assente o non valido)."""
+    try:
+        giorno = int(giorno_addebito)
+    except (TypeError, ValueError):
+        return None
+    return giorno if 1 <= giorno <= 31 else None
+
+
+def sincronizza_giorni_addebito(carte: Iterable[Dict[str, Any]]) -> int:
+    """
+    Allinea Carte.giorno_addebito_pianificato al giorno decriptato delle carte
+    (come restituite da ottieni_carte_utente) in un solo UPDATE. Serve per le
+    carte create prima che la colonna esistesse.
+    """
+    righe = []
+    for c in carte:
+        giorno = giorno_pianificato(c.get('giorno_addebito'))
+        if c.get('giorno_addebito_pianificato') != giorno:
+            righe.append((c['id_carta'], giorno))
+    if not righe:
+        return 0
+    try:
+        with get_db_connection() as con:
+            cur = con.cursor()
+            valori = ", ".join(["(%s::INTEGER, %s::INTEGER)"] * len(righe))
+            cur.execute(f"""
+                UPDATE Carte SET giorno_addebito_pianificato = V.giorno
+                FROM (VALUES {valori}) AS V(id_carta, giorno)
+                WHERE Carte.id_carta = V.id_carta
+            """, tuple(v for riga in righe for v in riga))
+            con.commit()
+        return len(righe)
+    except Exception as e:
+        print(f"[ERRORE] Errore sincronizzazione giorni addebito carte: {e}")
+        return 0
+
+
+def _carte_in_scadenza(cur, oggi: datetime.date, id_utente=None) -> List[Dict[str, Any]]:
+    params = [giorni_in_scadenza(oggi), oggi.year, oggi.month]
+    if id_utente is not None:
+        query = _SQL_CARTE_IN_SCADENZA.format(filtro=_FILTRO_UTENTE)
+        params.append(id_utente)
+    else:
+        query = _SQL_CARTE_IN_SCADENZA.format(filtro=_FILTRO_SERVER)
+    cur.execute(query, tuple(params))
+    return cur.fetchall()
+
+
+def _registra_addebito(cur, carta: Dict[str, Any], oggi: datetime.date, importo: float, chiave_b64) -> bool:
+    """Registro e i due movimenti nella transazione del chiamante; False se la carta era già addebitata."""
+    cur.execute("""
+        INSERT INTO Addebiti_Carte (id_carta, anno, mese, data_addebito, importo)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (id_carta, anno, mese) DO NOTHING
+        RETURNING id_addebito
+    """, (carta['id_carta'], oggi.year, oggi.month, oggi.strftime('%Y-%m-%d'), importo))
+    row = cur.fetchone()
+    if not row:
+        return False
+
+    data = oggi.strftime('%Y-%m-%d')
+    # Uscita dal conto di riferimento, entrata sul conto contabile della carta
+    id_trans_conto = aggiungi_transazione(
+        id_conto=carta['id_conto_riferimento'], data=data,
+        descrizione=f"Saldo Carta {carta['nome_carta']} - {oggi.strftime('%B %Y')}",
+        importo=-importo, cursor=cur, master_key_b64=chiave_b64)
+    id_trans_carta = aggiungi_transazione(
+        id_conto=carta['id_conto_contabile'], data=data,
+        descrizione="Addebito Saldo da C/C",
+        importo=importo, cursor=cur, master_key_b64=chiave_b64, id_carta=carta['id_carta'])
+    cur.execute("""
+        UPDATE Addebiti_Carte SET id_transazione_conto = %s, id_transazione_carta = %s
+        WHERE id_addebito = %s
+    """, (id_trans_conto, id_trans_carta, row['id_addebito']))
+    return True
+
+
+def esegui_addebiti_carte(oggi: Optional[datetime.date] = None, id_utente=None, master_key_b64=None) -> int:
+    """
+    Addebita il saldo delle carte di credito in scadenza oggi.
+    Con id_utente (e la sua master key) solo le carte dell'utente; senza, tutte
+    le carte con addebito_automatico delle famiglie con automazione server,
+    cifrando con la chiave famiglia del server. Ogni carta è una transazione a sé.
+    Restituisce il numero di carte addebitate.
+    """
+    oggi = oggi or datetime.date.today()
+    if id_utente is not None and not master_key_b64:
+        return 0
+    eseguiti = 0
+    try:
+        with get_db_connection() as con:
+            cur = con.cursor()
+            carte = _carte_in_scadenza(cur, oggi, id_utente)
+            if not carte:
+                return 0
+            saldi = saldi_da_catalogo(cur, AMBITO_CONTO, {c['id_conto_contabile'] for c in carte})
+            chiavi_famiglia = {}
+
+            for carta in carte:
+                saldo = saldi.get(carta['id_conto_contabile'], 0.0)
+                if saldo >= -_SOGLIA_SALDO:
+                    continue
+                if id_utente is not None:
+                    chiave = master_key_b64
+                else:
+                    id_famiglia = carta['id_famiglia']
+                    if id_famiglia not in chiavi_famiglia:
+                        chiavi_famiglia[id_famiglia] = get_server_family_key(id_famiglia)
+                    chiave = chiavi_famiglia[id_famiglia]
+                    if not chiave:
+                        continue
+                try:
+                    if _registra_addebito(cur, carta, oggi, round(abs(saldo), 2), chiave):
+                        con.commit()
+                        eseguiti += 1
+                        logger.info(f"Addebitato saldo carta {carta['id_carta']}: {abs(saldo):.2f}")
+                    else:
+                        con.rollback()
+                except Exception as e:
+                    con.rollback()
+                    print(f"[ERRORE] Addebito carta {carta['nome_carta']} fallito: {e}")
+        return eseguiti
+    except Exception as e:
+        print(f"[ERRORE] Errore addebiti carte: {e}")
+        return eseguiti
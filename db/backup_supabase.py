@@ -1,9 +1,15 @@
 
 import os
 import sys
+import glob
+import gzip
+import hashlib
+import argparse
 import datetime
 import json
 import decimal
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add parent directory to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -12,7 +18,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 try:
-    from db.supabase_manager import get_db_connection
+    from db.supabase_manager import get_db_connection, iter_query_chunks
 except ImportError:
     print("Error: Could not import get_db_connection from db.supabase_manager")
     sys.exit(1)
@@ -20,6 +26,19 @@ except ImportError:
 BACKUP_DIR = os.path.join(os.path.dirname(__file__), '..', 'backups')
 os.makedirs(BACKUP_DIR, exist_ok=True)
 
+MANIFEST_NAME = "manifest.json"
+DEFAULT_WORKERS = 4
+DEFAULT_CHUNK_SIZE = 2000
+
+# Colonne usate (in ordine di preferenza) per individuare le righe modificate
+# nei backup incrementali. Le tabelle senza nessuna di queste colonne vengono
+# sempre salvate per intero.
+COLONNE_INCREMENTALI = ('data_aggiornamento', 'updated_at', 'timestamp')
+
+# Identificativo restituito da pg_export_snapshot() (es. 00000003-0000001B-1)
+_RE_SNAPSHOT = re.compile(r"[0-9A-Fa-f]+-[0-9A-Fa-f]+(-[0-9]+)?")
+
+
 def json_serializer(obj):
     if isinstance(obj, (datetime.date, datetime.datetime)):
         return obj.isoformat()
@@ -27,47 +46,219 @@ def json_serializer(obj):
         return float(obj)
     return str(obj)
 
-def backup_supabase():
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _ultimo_manifest():
+    """Ritorna il manifest dell'ultimo backup completato (o None)."""
+    manifests = sorted(glob.glob(os.path.join(BACKUP_DIR, "supabase_backup_*", MANIFEST_NAME)))
+    for path in reversed(manifests):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get("completato"):
+                return manifest
+        except Exception as e:
+            print(f"  ⚠️ Manifest non leggibile {path}: {e}")
+    return None
+
+
+def _elenco_tabelle(conn):
+    """Ritorna {tabella: colonna_incrementale_o_None} per le tabelle dello schema public (nello snapshot di conn)."""
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT t.table_name, c.column_name
+        FROM information_schema.tables t
+        LEFT JOIN information_schema.columns c
+               ON c.table_schema = t.table_schema
+              AND c.table_name = t.table_name
+              AND c.column_name = ANY(%s)
+        WHERE t.table_schema = 'public'
+          AND t.table_type = 'BASE TABLE'
+        ORDER BY t.table_name
+    """, (list(COLONNE_INCREMENTALI),))
+    tabelle = {}
+    for row in cur.fetchall():
+        nome, colonna = row['table_name'], row['column_name']
+        attuale = tabelle.get(nome)
+        if colonna and (attuale is None or COLONNE_INCREMENTALI.index(colonna) < COLONNE_INCREMENTALI.index(attuale)):
+            tabelle[nome] = colonna
+        else:
+            tabelle.setdefault(nome, None)
+    return tabelle
+
+
+def _inizia_snapshot(conn, snapshot=None):
+    """
+    Chiude la transazione corrente della connessione e ne apre una REPEATABLE
+    READ; con `snapshot` (da pg_export_snapshot) vede esattamente quei dati.
+    """
+    conn.commit()
+    cur = conn.cursor()
+    cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+    if snapshot:
+        # SET TRANSACTION SNAPSHOT non accetta parametri: l'id è validato
+        if not _RE_SNAPSHOT.fullmatch(snapshot):
+            raise ValueError(f"Snapshot non valido: {snapshot!r}")
+        cur.execute(f"SET TRANSACTION SNAPSHOT '{snapshot}'")
+
+
+def _scrivi_tabella(conn, table, colonna_inc, since, dest_dir, chunk_size):
+    """Salva una tabella in {dest_dir}/{table}.jsonl.gz leggendo tramite cursore server-side."""
+    path = os.path.join(dest_dir, f"{table}.jsonl.gz")
+    incrementale = bool(colonna_inc and since)
+    query = f'SELECT * FROM "{table}"'
+    params = None
+    if incrementale:
+        query += f' WHERE "{colonna_inc}" > %s'
+        params = (since,)
+
+    rows = 0
+    with gzip.open(path, 'wt', encoding='utf-8') as out:
+        for chunk in iter_query_chunks(conn, query, params, chunk_size):
+            for row in chunk:
+                out.write(json.dumps(row, default=json_serializer))
+                out.write("\n")
+            rows += len(chunk)
+
+    return {
+        "file": os.path.basename(path),
+        "rows": rows,
+        "sha256": _sha256_file(path),
+        "mode": "incremental" if incrementale else "full",
+        "since": since if incrementale else None,
+        "incremental_column": colonna_inc,
+    }
+
+
+def _dump_tabella(table, colonna_inc, since, dest_dir, chunk_size, snapshot):
+    """
+    Dump di una tabella su una connessione propria del worker, nello snapshot
+    esportato dalla transazione di coordinamento: tutti i file descrivono lo
+    stesso istante del database.
+    """
+    with get_db_connection(condivisa=False) as conn:
+        _inizia_snapshot(conn, snapshot)
+        return _scrivi_tabella(conn, table, colonna_inc, since, dest_dir, chunk_size)
+
+
+def _esegui_backup(coordinatore, dest_dir, workers, incremental, chunk_size):
+    """
+    La transazione del coordinatore resta aperta per tutto il backup: i worker
+    si agganciano al suo snapshot esportato. Se l'esportazione non è possibile
+    le tabelle vengono salvate in sequenza sulla connessione del coordinatore,
+    sempre in un unico snapshot.
+    """
+    _inizia_snapshot(coordinatore)
+    cur = coordinatore.cursor()
+    try:
+        cur.execute("SELECT pg_export_snapshot() AS snapshot")
+        snapshot = cur.fetchone()['snapshot']
+    except Exception as e:
+        print(f"  ⚠️ Snapshot non esportabile ({e}): dump in sequenza.")
+        coordinatore.rollback()
+        _inizia_snapshot(coordinatore)
+        cur = coordinatore.cursor()
+        snapshot = None
+
+    # Istante di riferimento lato DB: il prossimo incrementale riparte da qui
+    cur.execute("SELECT now() AS istante")
+    inizio_db = cur.fetchone()['istante']
+
+    since = None
+    if incremental:
+        precedente = _ultimo_manifest()
+        if precedente:
+            since = precedente.get("started_at_db")
+            print(f"Incremental backup since {since} (base: {precedente.get('directory')})")
+        else:
+            print("No previous manifest found: running a full backup.")
+
+    tabelle = _elenco_tabelle(coordinatore)
+    print(f"Found {len(tabelle)} tables: {', '.join(tabelle)}")
+
+    manifest = {
+        "directory": os.path.basename(dest_dir),
+        "snapshot": snapshot,
+        "started_at_db": inizio_db.isoformat() if hasattr(inizio_db, 'isoformat') else str(inizio_db),
+        "incremental": since is not None,
+        "base_since": since,
+        "workers": workers,
+        "tables": {},
+        "completato": False,
+    }
+
+    errori = {}
+
+    def _registra(table, info):
+        manifest["tables"][table] = info
+        print(f"  {table}: {info['rows']} records ({info['mode']})")
+
+    if snapshot is None:
+        manifest["workers"] = 1
+        for table, colonna in tabelle.items():
+            try:
+                _registra(table, _scrivi_tabella(coordinatore, table, colonna, since, dest_dir, chunk_size))
+            except Exception as e:
+                # Un errore abortisce la transazione: non ha senso proseguire nello stesso snapshot
+                errori[table] = str(e)
+                print(f"  ❌ {table}: {e}")
+                break
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {
+                pool.submit(_dump_tabella, table, colonna, since, dest_dir, chunk_size, snapshot): table
+                for table, colonna in tabelle.items()
+            }
+            for future in as_completed(futures):
+                table = futures[future]
+                try:
+                    _registra(table, future.result())
+                except Exception as e:
+                    errori[table] = str(e)
+                    print(f"  ❌ {table}: {e}")
+
+    manifest["errors"] = errori
+    manifest["completato"] = not errori
+    manifest["finished_at"] = datetime.datetime.now().isoformat()
+    with open(os.path.join(dest_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+
+    if errori:
+        print(f"\n❌ Backup completed with errors on {len(errori)} tables.")
+        return None
+
+    print(f"\nBackup completed successfully!")
+    print(f"Files saved to: {dest_dir}")
+    return dest_dir
+
+
+def backup_supabase(workers=DEFAULT_WORKERS, incremental=False, chunk_size=DEFAULT_CHUNK_SIZE):
     print("Starting Supabase Backup...")
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = os.path.join(BACKUP_DIR, f"supabase_backup_{timestamp}.json")
-    
-    full_backup = {}
-    
-    try:
-        conn_ctx = get_db_connection()
-        with conn_ctx as conn:
-            cur = conn.cursor()
-            
-            # Get list of tables (public schema)
-            cur.execute("""
-                SELECT table_name 
-                FROM information_schema.tables 
-                WHERE table_schema = 'public' 
-                  AND table_type = 'BASE TABLE'
-            """)
-            tables = [row['table_name'] for row in cur.fetchall()]
-            
-            print(f"Found {len(tables)} tables: {', '.join(tables)}")
-            
-            for table in tables:
-                print(f"  Backing up {table}...")
-                cur.execute(f"SELECT * FROM {table}")
-                rows = cur.fetchall()
-                full_backup[table] = rows
-                print(f"    - {len(rows)} records")
-            
-        # Write to file
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(full_backup, f, default=json_serializer, indent=4)
-            
-        print(f"\nBackup completed successfully!")
-        print(f"File saved to: {filename}")
-        return filename
+    dest_dir = os.path.join(BACKUP_DIR, f"supabase_backup_{timestamp}")
+    os.makedirs(dest_dir, exist_ok=True)
 
+    try:
+        with get_db_connection(condivisa=False) as coordinatore:
+            return _esegui_backup(coordinatore, dest_dir, workers, incremental, chunk_size)
     except Exception as e:
         print(f"\n❌ Backup Failed: {e}")
         return None
 
+
 if __name__ == "__main__":
-    backup_supabase()
+    parser = argparse.ArgumentParser(description="Backup del database Supabase (una tabella per file, gzip).")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Connessioni parallele (default: %(default)s)")
+    parser.add_argument("--incremental", action="store_true", help="Salva solo le righe modificate dall'ultimo backup completato")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Righe lette per FETCH (default: %(default)s)")
+    args = parser.parse_args()
+
+    result = backup_supabase(workers=args.workers, incremental=args.incremental, chunk_size=args.chunk_size)
+    sys.exit(0 if result else 1)
@@ -0,0 +1,237 @@
+"""
+Catalogo dei periodi attivi: (ambito, id_ambito, anno, mese, num_transazioni, totale).
+
+I selettori del mese (Personale, Famiglia, Budget, conti, carte) calcolavano i
+mesi disponibili con SELECT DISTINCT EXTRACT(...) su tutte le transazioni:
+una scansione completa che nessun indice può servire per via dell'espressione.
+Qui ogni conto, conto condiviso e carta ha una riga per mese con il numero di
+transazioni, mantenuta da trigger a livello di statement su Transazioni e
+TransazioniCondivise (inserimenti, modifiche, cancellazioni anche a cascata):
+nessun percorso di scrittura deve ricordarsi di aggiornarla. Le modifiche che
+non toccano data, importo, conto o carta non cambiano il catalogo. Le righe
+toccate che scendono a zero vengono rimosse, quindi le letture sono scansioni
+della sola chiave primaria. La famiglia non ha righe proprie: i suoi mesi si ricavano dai
+conti dei membri e dai conti condivisi, così i cambi di appartenenza non
+richiedono manutenzione.
+
+Ogni riga porta anche la somma degli importi del mese (NUMERIC, esatta anche
+dopo molti incrementi): il totale speso di una carta in un mese è una lettura
+per chiave, il saldo di un conto è la somma delle sue poche righe mensili.
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from db.supabase_manager import get_db_connection
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+AMBITO_CONTO = "conto"
+AMBITO_CONTO_CONDIVISO = "conto_condiviso"
+AMBITO_CARTA = "carta"
+
+# Righe di una tabella di transizione come variazioni del catalogo: conto (o
+# conto condiviso) e carta, con segno +1 per le righe nuove e -1 per le vecchie
+_SQL_VARIAZIONI = """
+    SELECT '{ambito}' AS ambito, r.{colonna} AS id_ambito, CAST(r.data AS DATE) AS giorno,
+           {segno} AS num, {segno} * CAST(r.importo AS NUMERIC) AS importo
+    FROM {righe} r WHERE r.{colonna} IS NOT NULL
+    UNION ALL
+    SELECT 'carta', r.id_carta, CAST(r.data AS DATE), {segno}, {segno} * CAST(r.importo AS NUMERIC)
+    FROM {righe} r WHERE r.id_carta IS NOT NULL
+"""
+
+# Sull'UPDATE contano solo le righe in cui cambia una colonna letta dal catalogo
+# (i trigger con tabelle di transizione non ammettono "UPDATE OF colonne": il
+# filtro è qui, così le modifiche a descrizione o categoria non toccano il catalogo)
+_SQL_RIGHE_CAMBIATE = """
+    (SELECT {lato}.* FROM nuove n JOIN vecchie o ON o.{chiave} = n.{chiave}
+     WHERE (o.data, o.importo, o.{colonna}, o.id_carta) IS DISTINCT FROM (n.data, n.importo, n.{colonna}, n.id_carta))
+"""
+
+# Funzione trigger: applica le variazioni e rimuove le sole righe del catalogo,
+# tra quelle toccate dallo statement, scese a zero transazioni
+_SQL_FUNZIONE_TRIGGER = """
+    CREATE OR REPLACE FUNCTION {funzione}() RETURNS TRIGGER AS $$
+    DECLARE
+        vuote_ambito TEXT[];
+        vuote_id INTEGER[];
+        vuote_anno INTEGER[];
+        vuote_mese INTEGER[];
+    BEGIN
+        WITH toccate AS (
+            INSERT INTO Catalogo_Periodi (ambito, id_ambito, anno, mese, num_transazioni, totale)
+            SELECT v.ambito, v.id_ambito,
+                   EXTRACT(YEAR FROM v.giorno)::INTEGER, EXTRACT(MONTH FROM v.giorno)::INTEGER,
+                   SUM(v.num), COALESCE(SUM(v.importo), 0)
+            FROM ({variazioni}) v
+            WHERE v.giorno IS NOT NULL
+            GROUP BY 1, 2, 3, 4
+            ON CONFLICT (ambito, id_ambito, anno, mese)
+            DO UPDATE SET num_transazioni = Catalogo_Periodi.num_transazioni + EXCLUDED.num_transazioni,
+                          totale = Catalogo_Periodi.totale + EXCLUDED.totale
+            RETURNING ambito, id_ambito, anno, mese, num_transazioni
+        )
+        SELECT array_agg(ambito), array_agg(id_ambito), array_agg(anno), array_agg(mese)
+        INTO vuote_ambito, vuote_id, vuote_anno, vuote_mese
+        FROM toccate WHERE num_transazioni <= 0;
+
+        IF vuote_ambito IS NOT NULL THEN
+            DELETE FROM Catalogo_Periodi P
+            USING unnest(vuote_ambito, vuote_id, vuote_anno, vuote_mese) AS z(ambito, id_ambito, anno, mese)
+            WHERE P.ambito = z.ambito AND P.id_ambito = z.id_ambito
+              AND P.anno = z.anno AND P.mese = z.mese AND P.num_transazioni <= 0;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+# (tabella, funzione, chiave primaria, colonna del conto, ambito del conto)
+_TABELLE_CATALOGATE = (
+    ("Transazioni", "catalogo_periodi_transazioni", "id_transazione", "id_conto", AMBITO_CONTO),
+    ("TransazioniCondivise", "catalogo_periodi_condivise", "id_transazione_condivisa",
+     "id_conto_condiviso", AMBITO_CONTO_CONDIVISO),
+)
+
+# (suffisso, evento, tabelle di transizione): un trigger per evento
+_TRIGGER = (
+    ("ins", "INSERT", "NEW TABLE AS nuove"),
+    ("upd", "UPDATE", "OLD TABLE AS vecchie NEW TABLE AS nuove"),
+    ("del", "DELETE", "OLD TABLE AS vecchie"),
+)
+# Trigger e funzione della versione precedente (una funzione con il segno come argomento)
+_TRIGGER_PRECEDENTI = ("ins", "upd_a", "upd_b", "del")
+
+
+def _variazioni(evento: str, chiave: str, colonna: str, ambito: str) -> str:
+    parti = []
+    if evento in ("INSERT", "UPDATE"):
+        righe = "nuove" if evento == "INSERT" else _SQL_RIGHE_CAMBIATE.format(lato="n", chiave=chiave, colonna=colonna)
+        parti.append(_SQL_VARIAZIONI.format(ambito=ambito, colonna=colonna, righe=righe, segno=1))
+    if evento in ("DELETE", "UPDATE"):
+        righe = "vecchie" if evento == "DELETE" else _SQL_RIGHE_CAMBIATE.format(lato="o", chiave=chiave, colonna=colonna)
+        parti.append(_SQL_VARIAZIONI.format(ambito=ambito, colonna=colonna, righe=righe, segno=-1))
+    return "\n    UNION ALL\n".join(parti)
+
+
+_SQL_MESI_FAMIGLIA = """
+    SELECT P.anno, P.mese
+    FROM Catalogo_Periodi P
+    JOIN Conti C ON C.id_conto = P.id_ambito
+    JOIN Appartenenza_Famiglia AF ON AF.id_utente = C.id_utente
+    WHERE P.ambito = 'conto' AND AF.id_famiglia = %s
+    UNION
+    SELECT P.anno, P.mese
+    FROM Catalogo_Periodi P
+    JOIN ContiCondivisi CC ON CC.id_conto_condiviso = P.id_ambito
+    WHERE P.ambito = 'conto_condiviso' AND CC.id_famiglia = %s
+    ORDER BY anno DESC, mese DESC
+"""
+
+
+def installa_trigger_catalogo(cur) -> None:
+    """(Ri)crea funzioni e trigger che mantengono Catalogo_Periodi."""
+    for tabella, funzione, chiave, colonna, ambito in _TABELLE_CATALOGATE:
+        for suffisso in _TRIGGER_PRECEDENTI:
+            cur.execute(f"DROP TRIGGER IF EXISTS trg_{funzione}_{suffisso} ON {tabella}")
+        cur.execute(f"DROP FUNCTION IF EXISTS {funzione}()")
+        for suffisso, evento, transizioni in _TRIGGER:
+            nome = f"{funzione}_{suffisso}"
+            cur.execute(_SQL_FUNZIONE_TRIGGER.format(
+                funzione=nome, variazioni=_variazioni(evento, chiave, colonna, ambito)))
+            cur.execute(f"DROP TRIGGER IF EXISTS trg_{nome} ON {tabella}")
+            cur.execute(f"""
+                CREATE TRIGGER trg_{nome} AFTER {evento} ON {tabella}
+                REFERENCING {transizioni}
+                FOR EACH STATEMENT EXECUTE FUNCTION {nome}()
+            """)
+
+
+def ricostruisci_catalogo_periodi(cur) -> None:
+    """
+    Ricostruzione completa set-based (migrazione e riallineamento), nella
+    transazione del chiamante.
+    """
+    cur.execute("DELETE FROM Catalogo_Periodi")
+    cur.execute("""
+        INSERT INTO Catalogo_Periodi (ambito, id_ambito, anno, mese, num_transazioni, totale)
+        SELECT ambito, id_ambito, EXTRACT(YEAR FROM giorno)::INTEGER, EXTRACT(MONTH FROM giorno)::INTEGER,
+               COUNT(*), COALESCE(SUM(importo), 0)
+        FROM (
+            SELECT 'conto' AS ambito, id_conto AS id_ambito, CAST(data AS DATE) AS giorno,
+                   CAST(importo AS NUMERIC) AS importo
+            FROM Transazioni WHERE id_conto IS NOT NULL
+            UNION ALL
+            SELECT 'carta', id_carta, CAST(data AS DATE), CAST(importo AS NUMERIC)
+            FROM Transazioni WHERE id_carta IS NOT NULL
+            UNION ALL
+            SELECT 'conto_condiviso', id_conto_condiviso, CAST(data AS DATE), CAST(importo AS NUMERIC)
+            FROM TransazioniCondivise WHERE id_conto_condiviso IS NOT NULL
+            UNION ALL
+            SELECT 'carta', id_carta, CAST(data AS DATE), CAST(importo AS NUMERIC)
+            FROM TransazioniCondivise WHERE id_carta IS NOT NULL
+        ) V
+        WHERE giorno IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def riallinea_catalogo_periodi() -> bool:
+    """Job di riallineamento: ricostruisce il catalogo dalle transazioni e committa."""
+    try:
+        with get_db_connection() as con:
+            cur = con.cursor()
+            ricostruisci_catalogo_periodi(cur)
+            con.commit()
+        return True
+    except Exception as e:
+        logger.error(f"Errore riallineamento catalogo periodi: {e}")
+        return False
+
+
+def ottieni_mesi_ambito(ambito: str, id_ambito) -> List[Tuple[int, int]]:
+    """(anno, mese) con transazioni per un conto, conto condiviso o carta, dal più recente."""
+    with get_db_connection() as con:
+        cur = con.cursor()
+        cur.execute("""
+            SELECT anno, mese FROM Catalogo_Periodi
+            WHERE ambito = %s AND id_ambito = %s
+            ORDER BY anno DESC, mese DESC
+        """, (ambito, int(id_ambito)))
+        return [(int(row['anno']), int(row['mese'])) for row in cur.fetchall()]
+
+
+def ottieni_mesi_famiglia(id_famiglia) -> List[Dict[str, int]]:
+    """[{'anno', 'mese'}] con transazioni personali dei membri o condivise, dal più recente."""
+    with get_db_connection() as con:
+        cur = con.cursor()
+        cur.execute(_SQL_MESI_FAMIGLIA, (id_famiglia, id_famiglia))
+        return [{'anno': int(row['anno']), 'mese': int(row['mese'])} for row in cur.fetchall()]
+
+
+def ottieni_totale_periodo(ambito: str, id_ambito, anno: int, mese: int) -> float:
+    """Somma degli importi di un conto, conto condiviso o carta nel mese (0.0 se nessuna transazione)."""
+    with get_db_connection() as con:
+        cur = con.cursor()
+        cur.execute("""
+            SELECT totale FROM Catalogo_Periodi
+            WHERE ambito = %s AND id_ambito = %s AND anno = %s AND mese = %s
+        """, (ambito, int(id_ambito), int(anno), int(mese)))
+        row = cur.fetchone()
+        return float(row['totale']) if row else 0.0
+
+
+def saldi_da_catalogo(cur, ambito: str, ids: Iterable[int]) -> Dict[int, float]:
+    """{id_ambito: somma di tutti gli importi} per più conti in una query, nella transazione del chiamante."""
+    ids = [int(i) for i in ids]
+    if not ids:
+        return {}
+    cur.execute("""
+        SELECT id_ambito, SUM(totale) AS saldo FROM Catalogo_Periodi
+        WHERE ambito = %s AND id_ambito = ANY(%s)
+        GROUP BY id_ambito
+    """, (ambito, ids))
+    saldi = {i: 0.0 for i in ids}
+    for row in cur.fetchall():
+        saldi[int(row['id_ambito'])] = float(row['saldo'] or 0)
+    return saldi
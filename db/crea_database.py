@@ -14,8 +14,8 @@ if not os.path.exists(APP_DATA_DIR):
 DB_FILE = os.path.join(APP_DATA_DIR, 'budget_amico.db')
 
 # --- SCHEMA DATABASE ---
-# Versione 30: Crittografia Selettiva (Plaintext) e Tipi Numerici
-SCHEMA_VERSION = 30
+# Versione 40: Trigger di Catalogo_Periodi separati per evento (UPDATE solo se cambiano data, importo, conto o carta)
+SCHEMA_VERSION = 40
 
 TABLES = {
     "Utenti": """
@@ -130,6 +130,8 @@ TABLES = {
             importo REAL NOT NULL
         );
         CREATE INDEX IF NOT EXISTS idx_transazioni_data ON Transazioni(data);
+        CREATE INDEX IF NOT EXISTS idx_transazioni_conto_data ON Transazioni(id_conto, data) INCLUDE (importo, id_sottocategoria);
+        CREATE INDEX IF NOT EXISTS idx_transazioni_carta_data ON Transazioni(id_carta, data) INCLUDE (importo) WHERE id_carta IS NOT NULL;
     """,
     "TransazioniCondivise": """
         CREATE TABLE TransazioniCondivise (
@@ -144,6 +146,8 @@ TABLES = {
             importo_nascosto BOOLEAN DEFAULT FALSE
         );
         CREATE INDEX IF NOT EXISTS idx_transazionicondivise_data ON TransazioniCondivise(data);
+        CREATE INDEX IF NOT EXISTS idx_transazionicondivise_conto_data ON TransazioniCondivise(id_conto_condiviso, data) INCLUDE (importo, id_sottocategoria);
+        CREATE INDEX IF NOT EXISTS idx_transazionicondivise_carta_data ON TransazioniCondivise(id_carta, data) INCLUDE (importo) WHERE id_carta IS NOT NULL;
     """,
     "Budget": """
         CREATE TABLE Budget (
@@ -187,7 +191,14 @@ TABLES = {
             id_conto_condiviso_pagamento_default INTEGER REFERENCES ContiCondivisi(id_conto_condiviso) ON DELETE SET NULL,
             id_categoria_pagamento_default INTEGER REFERENCES Categorie(id_categoria) ON DELETE SET NULL,
             id_sottocategoria_pagamento_default INTEGER REFERENCES Sottocategorie(id_sottocategoria) ON DELETE SET NULL,
-            addebito_automatico BOOLEAN DEFAULT FALSE
+            addebito_automatico BOOLEAN DEFAULT FALSE,
+            piano_rate_totali INTEGER DEFAULT 0,
+            piano_rate_pagate INTEGER DEFAULT 0,
+            piano_residuo NUMERIC DEFAULT 0,
+            piano_capitale_residuo NUMERIC DEFAULT 0,
+            piano_interessi_residui NUMERIC DEFAULT 0,
+            piano_prossima_rata NUMERIC,
+            piano_prossima_scadenza TEXT
         );
     """,
     "StoricoPagamentiRate": """
@@ -262,6 +273,13 @@ TABLES = {
             UNIQUE(id_famiglia, chiave)
         );
     """,
+    "Versioni_Configurazioni": """
+        CREATE TABLE Versioni_Configurazioni (
+            ambito TEXT PRIMARY KEY,
+            versione BIGINT NOT NULL DEFAULT 0,
+            aggiornato_il TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """,
     "QuoteImmobili": """
         CREATE TABLE QuoteImmobili (
             id_quota SERIAL PRIMARY KEY,
@@ -314,8 +332,11 @@ TABLES = {
             data_creazione TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             attiva BOOLEAN DEFAULT TRUE,
             icona TEXT,
-            colore TEXT
+            colore TEXT,
+            giorno_addebito_pianificato INTEGER
         );
+        CREATE INDEX IF NOT EXISTS idx_carte_addebito_pianificato ON Carte(giorno_addebito_pianificato)
+            WHERE attiva = TRUE AND tipo_carta = 'credito' AND addebito_automatico = TRUE;
     """,
     "StoricoMassimaliCarte": """
         CREATE TABLE StoricoMassimaliCarte (
@@ -356,13 +377,90 @@ TABLES = {
             livello TEXT NOT NULL CHECK(livello IN ('DEBUG','INFO','WARNING','ERROR','CRITICAL')),
             componente TEXT NOT NULL,
             messaggio TEXT NOT NULL,
-            dettagli TEXT,
+            dettagli JSONB,
             id_utente INTEGER REFERENCES Utenti(id_utente) ON DELETE SET NULL,
             id_famiglia INTEGER REFERENCES Famiglie(id_famiglia) ON DELETE SET NULL
         );
-        CREATE INDEX IF NOT EXISTS idx_log_timestamp ON Log_Sistema(timestamp DESC);
-        CREATE INDEX IF NOT EXISTS idx_log_livello ON Log_Sistema(livello);
-        CREATE INDEX IF NOT EXISTS idx_log_componente ON Log_Sistema(componente);
+        CREATE INDEX IF NOT EXISTS idx_log_ts_id ON Log_Sistema(timestamp DESC, id_log DESC);
+        CREATE INDEX IF NOT EXISTS idx_log_livello_ts_id ON Log_Sistema(livello, timestamp DESC, id_log DESC);
+        CREATE INDEX IF NOT EXISTS idx_log_componente_ts_id ON Log_Sistema(componente, timestamp DESC, id_log DESC);
+        CREATE INDEX IF NOT EXISTS idx_log_famiglia_ts_id ON Log_Sistema(id_famiglia, timestamp DESC, id_log DESC);
+    """,
+    "Log_Sistema_Orario": """
+        CREATE TABLE Log_Sistema_Orario (
+            ora TIMESTAMP NOT NULL,
+            livello TEXT NOT NULL,
+            componente TEXT NOT NULL,
+            conteggio INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (ora, livello, componente)
+        );
+    """,
+    "Statistiche_Accessi": """
+        CREATE TABLE Statistiche_Accessi (
+            ora TIMESTAMP NOT NULL,
+            id_utente INTEGER NOT NULL REFERENCES Utenti(id_utente) ON DELETE CASCADE,
+            accessi INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (ora, id_utente)
+        );
+        CREATE INDEX IF NOT EXISTS idx_statistiche_accessi_utente ON Statistiche_Accessi(id_utente, ora DESC);
+    """,
+    "Directory_Famiglie": """
+        CREATE TABLE Directory_Famiglie (
+            id_famiglia INTEGER PRIMARY KEY REFERENCES Famiglie(id_famiglia) ON DELETE CASCADE,
+            nome_enc_server TEXT,
+            codice_bindex TEXT,
+            num_membri INTEGER NOT NULL DEFAULT 0,
+            ultima_attivita TIMESTAMP,
+            dimensione_byte BIGINT NOT NULL DEFAULT 0,
+            aggiornato_il TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_directory_famiglie_codice ON Directory_Famiglie(codice_bindex);
+        CREATE INDEX IF NOT EXISTS idx_directory_famiglie_membri ON Directory_Famiglie(num_membri, id_famiglia);
+        CREATE INDEX IF NOT EXISTS idx_directory_famiglie_attivita ON Directory_Famiglie(ultima_attivita, id_famiglia);
+        CREATE INDEX IF NOT EXISTS idx_directory_famiglie_dimensione ON Directory_Famiglie(dimensione_byte, id_famiglia);
+    """,
+    "Catalogo_Periodi": """
+        CREATE TABLE Catalogo_Periodi (
+            ambito TEXT NOT NULL,
+            id_ambito INTEGER NOT NULL,
+            anno INTEGER NOT NULL,
+            mese INTEGER NOT NULL,
+            num_transazioni INTEGER NOT NULL DEFAULT 0,
+            totale NUMERIC NOT NULL DEFAULT 0,
+            PRIMARY KEY (ambito, id_ambito, anno, mese)
+        );
+    """,
+    "Addebiti_Carte": """
+        CREATE TABLE Addebiti_Carte (
+            id_addebito INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_carta INTEGER NOT NULL REFERENCES Carte(id_carta) ON DELETE CASCADE,
+            anno INTEGER NOT NULL,
+            mese INTEGER NOT NULL,
+            data_addebito TEXT NOT NULL,
+            importo REAL NOT NULL,
+            id_transazione_conto INTEGER,
+            id_transazione_carta INTEGER,
+            eseguito_il TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(id_carta, anno, mese)
+        );
+    """,
+    "Outbox_Email": """
+        CREATE TABLE Outbox_Email (
+            id_email INTEGER PRIMARY KEY AUTOINCREMENT,
+            destinatario TEXT NOT NULL,
+            oggetto TEXT NOT NULL,
+            corpo TEXT,
+            allegato TEXT,
+            nome_allegato TEXT,
+            stato TEXT NOT NULL DEFAULT 'in_coda' CHECK(stato IN ('in_coda','in_invio','inviata','fallita')),
+            tentativi INTEGER NOT NULL DEFAULT 0,
+            prossimo_tentativo TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            ultimo_errore TEXT,
+            creato_il TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            inviato_il TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_outbox_email_pronte ON Outbox_Email(prossimo_tentativo)
+        WHERE stato IN ('in_coda', 'in_invio');
     """,
     "Config_Logger": """
         CREATE TABLE Config_Logger (
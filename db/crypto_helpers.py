@@ -369,6 +369,37 @@ def _decrypt_if_key(encrypted_data, master_key, crypto=None, silent=False):
     return decrypted
 
 
+class _DecrittatoreMultiChiave:
+    """
+    Decritta valori provando più chiavi (es. chiave famiglia e master key, per
+    dati creati in epoche diverse). Per ogni sorgente (es. ('conto', 12)) ricorda
+    la chiave che ha funzionato e la prova per prima sui valori successivi.
+    """
+
+    def __init__(self, keys, crypto=None):
+        self._keys = [k for k in keys if k]
+        self._crypto = crypto or CryptoManager()
+        self._chiave_per_sorgente = {}
+
+    def decritta(self, valore, sorgente=None):
+        if not isinstance(valore, str) or not CryptoManager.is_encrypted(valore):
+            return valore  # In chiaro (o vuoto): nessuna chiave da provare
+        indice_noto = self._chiave_per_sorgente.get(sorgente)
+        ordine = range(len(self._keys))
+        if indice_noto is not None:
+            ordine = [indice_noto] + [i for i in ordine if i != indice_noto]
+        for i in ordine:
+            try:
+                res = _decrypt_if_key(valore, self._keys[i], self._crypto, silent=True)
+            except Exception:
+                continue
+            if res != "[ENCRYPTED]":
+                if sorgente is not None:
+                    self._chiave_per_sorgente[sorgente] = i
+                return res
+        return "[ENCRYPTED]"
+
+
 # Singleton CryptoManager instance
 crypto = CryptoManager()
 
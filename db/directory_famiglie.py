@@ -0,0 +1,256 @@
+"""
+Directory delle famiglie per il pannello admin: proiezione precalcolata.
+
+Il nome di una famiglia è cifrato con la sua chiave famiglia: elencarle tutte
+significava sbloccare una chiave per famiglia (chiave server o, in mancanza,
+master key di backup di un membro) ad ogni apertura del pannello: ora lo si fa
+una volta, in popola_nomi_da_chiave_server. La tabella
+Directory_Famiglie tiene invece, per ogni famiglia, il nome cifrato con la
+chiave di sistema e i valori mostrati dall'admin (membri, ultima attività,
+spazio occupato), aggiornati da chi modifica la famiglia: creazione,
+rinomina, cambi di appartenenza, accessi dei membri. Il pannello la legge con
+una sola query paginata e ordinabile; si decriptano solo le righe della pagina.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import base64
+
+from db.supabase_manager import get_db_connection
+from cryptography.fernet import Fernet
+
+from db.crypto_helpers import (
+    _decrypt_if_key, compute_blind_index, decrypt_system_data, encrypt_system_data,
+    get_system_fernet_key,
+)
+from utils.crypto_manager import CryptoManager
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Colonne ordinabili lato server (il nome è cifrato e non è ordinabile in SQL)
+_ORDINAMENTI_FAMIGLIE = {
+    'id_famiglia': "D.id_famiglia",
+    'num_membri': "D.num_membri",
+    'ultima_attivita': "D.ultima_attivita",
+    'dimensione_byte': "D.dimensione_byte",
+}
+
+# Valori calcolati per un insieme di famiglie (id_famiglia = ANY(%s)) o per tutte
+_SQL_VALORI_FAMIGLIE = """
+    SELECT F.id_famiglia,
+           COALESCE(M.num_membri, 0) AS num_membri,
+           M.ultima_attivita,
+           COALESCE(TP.byte, 0) + COALESCE(TC.byte, 0) AS dimensione_byte
+    FROM Famiglie F
+    LEFT JOIN (
+        SELECT AF.id_famiglia, COUNT(*) AS num_membri, MAX(U.ultimo_accesso) AS ultima_attivita
+        FROM Appartenenza_Famiglia AF
+        JOIN Utenti U ON U.id_utente = AF.id_utente
+        GROUP BY AF.id_famiglia
+    ) M ON M.id_famiglia = F.id_famiglia
+    LEFT JOIN (
+        SELECT AF.id_famiglia, SUM(pg_column_size(T.*)) AS byte
+        FROM Appartenenza_Famiglia AF
+        JOIN Conti C ON C.id_utente = AF.id_utente
+        JOIN Transazioni T ON T.id_conto = C.id_conto
+        GROUP BY AF.id_famiglia
+    ) TP ON TP.id_famiglia = F.id_famiglia
+    LEFT JOIN (
+        SELECT CC.id_famiglia, SUM(pg_column_size(TC.*)) AS byte
+        FROM ContiCondivisi CC
+        JOIN TransazioniCondivise TC ON TC.id_conto_condiviso = CC.id_conto_condiviso
+        GROUP BY CC.id_famiglia
+    ) TC ON TC.id_famiglia = F.id_famiglia
+"""
+
+_SQL_UPSERT_VALORI = f"""
+    INSERT INTO Directory_Famiglie (id_famiglia, num_membri, ultima_attivita, dimensione_byte, aggiornato_il)
+    SELECT V.id_famiglia, V.num_membri, V.ultima_attivita, V.dimensione_byte, CURRENT_TIMESTAMP
+    FROM ({_SQL_VALORI_FAMIGLIE}) V
+    {{filtro}}
+    ON CONFLICT (id_famiglia) DO UPDATE SET
+        num_membri = EXCLUDED.num_membri,
+        ultima_attivita = EXCLUDED.ultima_attivita,
+        dimensione_byte = EXCLUDED.dimensione_byte,
+        aggiornato_il = EXCLUDED.aggiornato_il
+"""
+
+
+def aggiorna_directory_famiglie(cur, ids_famiglia: Iterable[int]) -> None:
+    """
+    Ricalcola membri, ultima attività e spazio delle famiglie indicate, nella
+    transazione del chiamante (da chiamare prima del commit).
+    """
+    ids = sorted({int(i) for i in ids_famiglia if i is not None})
+    if not ids:
+        return
+    cur.execute(_SQL_UPSERT_VALORI.format(filtro="WHERE V.id_famiglia = ANY(%s)"), (ids,))
+
+
+def aggiorna_nome_directory(cur, id_famiglia: int, nome_famiglia: Optional[str],
+                            codice_famiglia: Optional[str] = None) -> None:
+    """
+    Salva nome e codice in chiaro della famiglia cifrati con la chiave di sistema
+    (quelli non noti, None, lasciano il valore già presente).
+    """
+    cur.execute("""
+        INSERT INTO Directory_Famiglie (id_famiglia, nome_enc_server, codice_bindex, aggiornato_il)
+        VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (id_famiglia) DO UPDATE SET
+            nome_enc_server = COALESCE(EXCLUDED.nome_enc_server, Directory_Famiglie.nome_enc_server),
+            codice_bindex = COALESCE(EXCLUDED.codice_bindex, Directory_Famiglie.codice_bindex),
+            aggiornato_il = EXCLUDED.aggiornato_il
+    """, (id_famiglia, encrypt_system_data(nome_famiglia) if nome_famiglia else None,
+          compute_blind_index(codice_famiglia) if codice_famiglia else None))
+
+
+def segna_attivita_utente(cur, id_utente: int) -> None:
+    """Porta a 'adesso' l'ultima attività delle famiglie dell'utente."""
+    cur.execute("""
+        UPDATE Directory_Famiglie SET ultima_attivita = CURRENT_TIMESTAMP
+        WHERE id_famiglia IN (SELECT id_famiglia FROM Appartenenza_Famiglia WHERE id_utente = %s)
+    """, (id_utente,))
+
+
+def ricalcola_directory_famiglie(cur) -> None:
+    """
+    Ricalcolo completo set-based (migrazione e pulsante "Aggiorna" del pannello):
+    lo spazio occupato cambia con le transazioni e non viene tenuto al centesimo.
+    """
+    cur.execute(_SQL_UPSERT_VALORI.format(filtro=""))
+
+
+def _chiave_da_backup_membro(cur, id_famiglia: int, crypto: CryptoManager) -> Optional[bytes]:
+    """
+    Chiave famiglia tramite un membro con backup server della master key (come
+    faceva get_all_families): encrypted_master_key_backup è il base64 del token
+    Fernet della master key cifrata con la chiave di sistema; con la master key
+    si decifra chiave_famiglia_criptata.
+    """
+    cur.execute("""
+        SELECT U.encrypted_master_key_backup, AF.chiave_famiglia_criptata
+        FROM Appartenenza_Famiglia AF
+        JOIN Utenti U ON U.id_utente = AF.id_utente
+        WHERE AF.id_famiglia = %s
+          AND U.encrypted_master_key_backup IS NOT NULL
+          AND AF.chiave_famiglia_criptata IS NOT NULL
+        LIMIT 1
+    """, (id_famiglia,))
+    membro = cur.fetchone()
+    chiave_sistema = get_system_fernet_key()
+    if not membro or not chiave_sistema:
+        return None
+    try:
+        token = base64.urlsafe_b64decode(membro['encrypted_master_key_backup'])
+        master_key = Fernet(chiave_sistema).decrypt(token)
+        fk_b64 = crypto.decrypt_data(membro['chiave_famiglia_criptata'], master_key, silent=True)
+    except Exception:
+        return None
+    if not fk_b64 or fk_b64 == "[ENCRYPTED]":
+        return None
+    return fk_b64.encode() if isinstance(fk_b64, str) else fk_b64
+
+
+def popola_nomi_da_chiave_server(cur) -> int:
+    """
+    Riempie nome e codice mancanti delle famiglie. La chiave famiglia si ottiene
+    dalla chiave server (automazione cloud attiva) o, in mancanza, dal backup
+    server della master key di un membro. Le famiglie senza nessuna delle due
+    restano senza nome finché un membro non la rinomina. Ritorna quante righe ha scritto.
+    """
+    cur.execute("""
+        SELECT F.id_famiglia, F.nome_famiglia, F.server_encrypted_key, F.codice_famiglia_enc
+        FROM Famiglie F
+        JOIN Directory_Famiglie D ON D.id_famiglia = F.id_famiglia
+        WHERE D.nome_enc_server IS NULL OR D.codice_bindex IS NULL
+    """)
+    crypto = CryptoManager()
+    scritte = 0
+    for row in cur.fetchall():
+        nome = row.get('nome_famiglia')
+        if nome and CryptoManager.is_encrypted(nome):
+            family_key = None
+            if row.get('server_encrypted_key'):
+                try:
+                    fk_b64 = decrypt_system_data(row['server_encrypted_key'])
+                    # La chiave famiglia è una chiave Fernet urlsafe: si passa così com'è
+                    family_key = fk_b64.encode() if fk_b64 else None
+                except Exception:
+                    family_key = None
+            if not family_key:
+                family_key = _chiave_da_backup_membro(cur, row['id_famiglia'], crypto)
+            nome = _decrypt_if_key(nome, family_key, crypto, silent=True) if family_key else None
+            if nome and (nome == "[ENCRYPTED]" or CryptoManager.is_encrypted(nome)):
+                nome = None
+        codice = decrypt_system_data(row.get('codice_famiglia_enc')) if row.get('codice_famiglia_enc') else None
+        aggiorna_nome_directory(cur, row['id_famiglia'], nome or None, codice)
+        scritte += 1
+    return scritte
+
+
+def ottieni_directory_famiglie(pagina: int = 1, per_pagina: int = 50, ordina_per: str = 'id_famiglia',
+                               discendente: bool = False,
+                               cerca: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Una pagina della directory famiglie, ordinata lato server.
+
+    Args:
+        pagina: Pagina richiesta (da 1). per_pagina=None restituisce tutte le righe.
+        ordina_per: Una delle chiavi di _ORDINAMENTI_FAMIGLIE (altrimenti id_famiglia).
+        cerca: ID famiglia o codice famiglia esatto (FAM-XXXXXX).
+
+    Returns:
+        (righe, totale) con righe {id_famiglia, nome_famiglia, codice_famiglia, num_membri,
+        ultima_attivita, dimensione_byte, cloud_enabled}.
+    """
+    colonna = _ORDINAMENTI_FAMIGLIE.get(ordina_per, _ORDINAMENTI_FAMIGLIE['id_famiglia'])
+    direzione = "DESC NULLS LAST" if discendente else "ASC NULLS FIRST"
+
+    filtro, params = "", []
+    testo = (cerca or "").strip()
+    if testo:
+        if testo.isdigit():
+            filtro = "WHERE D.id_famiglia = %s"
+            params.append(int(testo))
+        else:
+            filtro = "WHERE D.codice_bindex = %s"
+            params.append(compute_blind_index(testo))
+
+    limite = ""
+    if per_pagina:
+        limite = "LIMIT %s OFFSET %s"
+        params.extend([int(per_pagina), (max(int(pagina), 1) - 1) * int(per_pagina)])
+
+    try:
+        with get_db_connection() as con:
+            cur = con.cursor()
+            cur.execute(f"""
+                SELECT D.id_famiglia, D.nome_enc_server, D.num_membri, D.ultima_attivita,
+                       D.dimensione_byte, F.codice_famiglia_enc,
+                       (F.server_encrypted_key IS NOT NULL AND F.server_encrypted_key <> '') AS cloud_enabled,
+                       COUNT(*) OVER () AS totale
+                FROM Directory_Famiglie D
+                JOIN Famiglie F ON F.id_famiglia = D.id_famiglia
+                {filtro}
+                ORDER BY {colonna} {direzione}, D.id_famiglia
+                {limite}
+            """, tuple(params))
+            righe = cur.fetchall()
+    except Exception as e:
+        logger.error(f"Errore lettura directory famiglie: {e}")
+        return [], 0
+
+    totale = righe[0]['totale'] if righe else 0
+    return [
+        {
+            'id_famiglia': r['id_famiglia'],
+            'nome_famiglia': (decrypt_system_data(r['nome_enc_server']) if r.get('nome_enc_server') else None)
+                             or "[ENCRYPTED]",
+            'codice_famiglia': decrypt_system_data(r.get('codice_famiglia_enc')) or "-",
+            'num_membri': r['num_membri'] or 0,
+            'ultima_attivita': r.get('ultima_attivita'),
+            'dimensione_byte': int(r.get('dimensione_byte') or 0),
+            'cloud_enabled': bool(r.get('cloud_enabled')),
+        }
+        for r in righe
+    ], totale
@@ -0,0 +1,155 @@
+"""
+Directory dei membri di famiglia: dati anagrafici decriptati una sola volta.
+
+username_enc, nome_enc_server, cognome_enc_server ed email_enc sono cifrati con
+la chiave di sistema; ogni decrypt_system_data istanzia un CryptoManager, quindi
+decriptarli per ogni riga di transazione è lo spreco principale nelle liste di
+famiglia. Qui i dati vengono decriptati una volta per membro, indicizzati per
+id_utente e tenuti in memoria per famiglia (TTL + invalidazione esplicita sugli
+aggiornamenti di profilo e appartenenza). Le query possono quindi restituire solo
+id_utente e risolvere il nome dalla directory.
+"""
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from db.supabase_manager import get_db_connection
+from db.crypto_helpers import decrypt_system_data
+from utils.crypto_manager import CryptoManager
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_DIRECTORY_TTL_SECONDS = 600
+
+# {id_famiglia: {"timestamp": float, "membri": {id_utente: voce}}}
+_directory_cache: Dict[int, Dict[str, Any]] = {}
+_directory_lock = threading.Lock()
+
+
+def _decripta_in_chiaro(valore: Optional[str]) -> Optional[str]:
+    """decrypt_system_data che non restituisce mai un blob ancora cifrato."""
+    testo = decrypt_system_data(valore) if valore else None
+    if testo and CryptoManager.is_encrypted(testo):
+        return None
+    return testo
+
+
+def _costruisci_voce(row: Dict[str, Any], ruolo: Optional[str], membro: bool) -> Dict[str, Any]:
+    nome = _decripta_in_chiaro(row.get('nome_enc_server'))
+    cognome = _decripta_in_chiaro(row.get('cognome_enc_server'))
+    username = _decripta_in_chiaro(row.get('username_enc')) or row.get('username')
+    email = _decripta_in_chiaro(row.get('email_enc')) or row.get('email')
+    if nome or cognome:
+        nome_visualizzato = f"{nome or ''} {cognome or ''}".strip()
+    else:
+        nome_visualizzato = username or "Sconosciuto"
+    return {
+        'id_utente': row['id_utente'],
+        'username': username,
+        'email': email,
+        'nome': nome,
+        'cognome': cognome,
+        'nome_visualizzato': nome_visualizzato,
+        'ruolo': ruolo,
+        'membro': membro,
+    }
+
+
+def _carica_directory(id_famiglia: int) -> Dict[int, Dict[str, Any]]:
+    with get_db_connection() as con:
+        cur = con.cursor()
+        cur.execute("""
+            SELECT U.id_utente, U.username, U.email, U.username_enc, U.email_enc,
+                   U.nome_enc_server, U.cognome_enc_server, AF.ruolo
+            FROM Utenti U
+            JOIN Appartenenza_Famiglia AF ON U.id_utente = AF.id_utente
+            WHERE AF.id_famiglia = %s
+        """, (id_famiglia,))
+        righe = cur.fetchall()
+    return {row['id_utente']: _costruisci_voce(row, row.get('ruolo'), True) for row in righe}
+
+
+def ottieni_directory_famiglia(id_famiglia) -> Dict[int, Dict[str, Any]]:
+    """
+    Ritorna {id_utente: voce} per i membri attuali della famiglia.
+    Ogni voce contiene: id_utente, username, email, nome, cognome,
+    nome_visualizzato, ruolo, membro. Il dizionario è condiviso: non modificarlo.
+    """
+    try:
+        id_famiglia = int(id_famiglia)
+    except (TypeError, ValueError):
+        return {}
+
+    now = time.monotonic()
+    with _directory_lock:
+        entry = _directory_cache.get(id_famiglia)
+        if entry and now - entry['timestamp'] < _DIRECTORY_TTL_SECONDS:
+            return entry['membri']
+
+    try:
+        membri = _carica_directory(id_famiglia)
+    except Exception as e:
+        logger.error(f"Errore caricamento directory membri famiglia {id_famiglia}: {e}")
+        return {}
+
+    with _directory_lock:
+        _directory_cache[id_famiglia] = {'timestamp': now, 'membri': membri}
+    return membri
+
+
+def risolvi_utenti(id_famiglia, ids_utente: Iterable[Optional[int]]) -> Dict[int, Dict[str, Any]]:
+    """
+    Come ottieni_directory_famiglia, ma garantisce la presenza degli id richiesti:
+    gli ex membri (es. autori di transazioni condivise rimossi dalla famiglia)
+    vengono letti con una sola query e aggiunti alla directory con membro=False.
+    """
+    directory = ottieni_directory_famiglia(id_famiglia)
+    mancanti = {i for i in ids_utente if i is not None and i not in directory}
+    if not mancanti:
+        return directory
+
+    try:
+        with get_db_connection() as con:
+            cur = con.cursor()
+            cur.execute("""
+                SELECT U.id_utente, U.username, U.email, U.username_enc, U.email_enc,
+                       U.nome_enc_server, U.cognome_enc_server
+                FROM Utenti U
+                WHERE U.id_utente = ANY(%s)
+            """, (list(mancanti),))
+            extra = {row['id_utente']: _costruisci_voce(row, None, False) for row in cur.fetchall()}
+    except Exception as e:
+        logger.error(f"Errore risoluzione utenti {sorted(mancanti)}: {e}")
+        return directory
+
+    # Nuovo dizionario (mai mutare quello condiviso, altri thread potrebbero iterarlo)
+    estesa = {**directory, **extra}
+    with _directory_lock:
+        entry = _directory_cache.get(int(id_famiglia))
+        if entry is not None and entry['membri'] is directory:
+            entry['membri'] = estesa
+    return estesa
+
+
+def invalida_directory_membri(id_famiglia=None, id_utente=None) -> None:
+    """
+    Invalida la directory di una famiglia, oppure di tutte le famiglie in cui
+    compare id_utente (aggiornamenti di profilo). Senza argomenti svuota tutto.
+    """
+    with _directory_lock:
+        if id_famiglia is None and id_utente is None:
+            _directory_cache.clear()
+            return
+        if id_famiglia is not None:
+            try:
+                _directory_cache.pop(int(id_famiglia), None)
+            except (TypeError, ValueError):
+                pass
+        if id_utente is not None:
+            try:
+                id_utente = int(id_utente)
+            except (TypeError, ValueError):
+                return
+            for fid in [f for f, e in _directory_cache.items() if id_utente in e['membri']]:
+                del _directory_cache[fid]
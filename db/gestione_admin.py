@@ -29,6 +29,12 @@ from db.crypto_helpers import (
 # Importazioni da altri moduli
 from db.gestione_config import get_configurazione, save_system_config
 from db.gestione_utenti import verifica_login, imposta_password_temporanea
+from db.directory_membri import invalida_directory_membri
+from db.gestione_conti import invalida_catalogo_conti
+from db.directory_famiglie import (
+    aggiorna_directory_famiglie, segna_attivita_utente, ricalcola_directory_famiglie,
+    popola_nomi_da_chiave_server, ottieni_directory_famiglie,
+)
 
 def ottieni_versione_db():
     """Legge la versione dello schema dalla tabella InfoDB del database."""
@@ -61,14 +67,37 @@ def get_user_count():
         return -1
 
 
+# Granularità dell'ultima attività delle famiglie (Directory_Famiglie)
+_INTERVALLO_ATTIVITA_FAMIGLIE_MIN = 10
+
+
 def aggiorna_ultimo_accesso(id_utente: int) -> bool:
-    """Aggiorna il timestamp di ultimo accesso/attività dell'utente."""
+    """
+    Aggiorna il timestamp di ultimo accesso/attività dell'utente e incrementa
+    il contatore orario in Statistiche_Accessi (rollup usato dal pannello admin).
+    """
     if not id_utente:
         return False
     try:
         with get_db_connection() as con:
             cur = con.cursor()
-            cur.execute("UPDATE Utenti SET ultimo_accesso = CURRENT_TIMESTAMP WHERE id_utente = %s", (id_utente,))
+            # Il valore precedente dice se l'attività delle famiglie va aggiornata:
+            # al più una volta ogni _INTERVALLO_ATTIVITA_FAMIGLIE_MIN, non a ogni cambio pagina
+            cur.execute("""
+                UPDATE Utenti U SET ultimo_accesso = CURRENT_TIMESTAMP
+                FROM (SELECT ultimo_accesso FROM Utenti WHERE id_utente = %s FOR UPDATE) P
+                WHERE U.id_utente = %s
+                RETURNING (P.ultimo_accesso IS NULL
+                           OR P.ultimo_accesso < CURRENT_TIMESTAMP - make_interval(mins => %s)) AS segna_famiglie
+            """, (id_utente, id_utente, _INTERVALLO_ATTIVITA_FAMIGLIE_MIN))
+            riga = cur.fetchone()
+            cur.execute("""
+                INSERT INTO Statistiche_Accessi (ora, id_utente, accessi)
+                VALUES (date_trunc('hour', CURRENT_TIMESTAMP), %s, 1)
+                ON CONFLICT (ora, id_utente) DO UPDATE SET accessi = Statistiche_Accessi.accessi + 1
+            """, (id_utente,))
+            if riga and riga['segna_famiglie']:
+                segna_attivita_utente(cur, id_utente)
             con.commit()
             return True
     except Exception as e:
@@ -76,9 +105,18 @@ def aggiorna_ultimo_accesso(id_utente: int) -> bool:
         return False
 
 
+# Finestre temporali delle statistiche accessi (chiave -> ore; None = da sempre)
+_FINESTRE_ACCESSI = [
+    ('24h', 24), ('48h', 48), ('72h', 72),
+    ('7d', 24 * 7), ('30d', 24 * 30), ('1y', 24 * 365),
+    ('sempre', None),
+]
+
+
 def ottieni_statistiche_accessi() -> Dict[str, Any]:
     """
-    Calcola le statistiche degli accessi basandoci sui log di sistema.
+    Calcola le statistiche degli accessi dal rollup orario Statistiche_Accessi
+    (una sola query aggregata per tutte le finestre temporali).
     Restituisce: { 
         'attivi_ora': int, 
         'lista_attivi': [str],
@@ -91,83 +129,45 @@ def ottieni_statistiche_accessi() -> Dict[str, Any]:
         'sempre': {'unici': int, 'totali': int}
     }
     """
-    stats = {
-        'attivi_ora': 0, 
-        'lista_attivi': [],
-        '24h': {'unici': 0, 'totali': 0},
-        '48h': {'unici': 0, 'totali': 0},
-        '72h': {'unici': 0, 'totali': 0},
-        '7d':  {'unici': 0, 'totali': 0},
-        '30d': {'unici': 0, 'totali': 0},
-        '1y':  {'unici': 0, 'totali': 0},
-        'sempre': {'unici': 0, 'totali': 0}
-    }
+    stats = {'attivi_ora': 0, 'lista_attivi': []}
+    for chiave, _ in _FINESTRE_ACCESSI:
+        stats[chiave] = {'unici': 0, 'totali': 0}
     try:
-        from db.gestione_db import decrypt_system_data
         with get_db_connection() as con:
             cur = con.cursor()
             
-            # 1. Attivi ora (qualsiasi attività negli ultimi 15 minuti) + Recupero nomi
-            # Usiamo la nuova colonna ultimo_accesso per maggiore precisione
+            # 1. Attivi ora (qualsiasi attività negli ultimi 15 minuti): conteggio + primi 5 nomi
             cur.execute("""
-                SELECT id_utente, username as user_plain, username_enc as user_enc
+                SELECT id_utente, username as user_plain, username_enc as user_enc,
+                       COUNT(*) OVER () as totale
                 FROM Utenti
                 WHERE ultimo_accesso > CURRENT_TIMESTAMP - INTERVAL '15 minutes'
+                ORDER BY ultimo_accesso DESC
+                LIMIT 5
             """)
             
             attivi_nomi = []
             for row in cur.fetchall():
+                stats['attivi_ora'] = row['totale']
                 name = row['user_plain']
                 if not name and row['user_enc']:
                     name = decrypt_system_data(row['user_enc'])
-                
-                if name:
-                    attivi_nomi.append(name)
-                else:
-                    attivi_nomi.append(f"User #{row['id_utente']}")
-
-            stats['attivi_ora'] = len(attivi_nomi)
-            stats['lista_attivi'] = attivi_nomi[:5]
+                attivi_nomi.append(name or f"User #{row['id_utente']}")
+            stats['lista_attivi'] = attivi_nomi
             
-            # Funzione helper per le query dei periodi
-            def get_period_stats(hours=None, all_time=False):
-                if all_time:
-                    cur.execute("""
-                        SELECT COUNT(DISTINCT id_utente) as unici, COUNT(*) as totali
-                        FROM Log_Sistema 
-                        WHERE (messaggio LIKE 'LOGIN RIUSCITO%' OR messaggio LIKE '[NAV]%')
-                    """)
-                else:
-                    cur.execute("""
-                        SELECT COUNT(DISTINCT id_utente) as unici, COUNT(*) as totali
-                        FROM Log_Sistema 
-                        WHERE (messaggio LIKE 'LOGIN RIUSCITO%' OR messaggio LIKE '[NAV]%') 
-                        AND timestamp > CURRENT_TIMESTAMP - (INTERVAL '1 hour' * %s)
-                    """, (hours,))
-                res = cur.fetchone()
-                
-                # fallback unici dalla colonna ultimo_accesso per periodi recenti (se i log sono disattivati)
-                if not all_time and (hours and hours <= 72):
-                    cur.execute("""
-                        SELECT COUNT(*) as unici_from_table
-                        FROM Utenti
-                        WHERE ultimo_accesso > CURRENT_TIMESTAMP - (INTERVAL '1 hour' * %s)
-                    """, (hours,))
-                    res_alt = cur.fetchone()
-                    unici_db = res_alt['unici_from_table'] or 0
-                    if unici_db > (res['unici'] or 0):
-                        return {'unici': unici_db, 'totali': max(res['totali'] or 0, unici_db)}
-
-                return {'unici': res['unici'] or 0, 'totali': res['totali'] or 0}
-
-            # 2. Accessi varie finestre temporali
-            stats['24h'] = get_period_stats(24)
-            stats['48h'] = get_period_stats(48)
-            stats['72h'] = get_period_stats(72)
-            stats['7d'] = get_period_stats(24 * 7)
-            stats['30d'] = get_period_stats(24 * 30)
-            stats['1y'] = get_period_stats(24 * 365)
-            stats['sempre'] = get_period_stats(all_time=True)
+            # 2. Accessi per tutte le finestre temporali in una sola scansione del rollup
+            select_parts = []
+            for chiave, ore in _FINESTRE_ACCESSI:
+                cond = "TRUE" if ore is None else f"ora > date_trunc('hour', CURRENT_TIMESTAMP) - INTERVAL '{int(ore)} hours'"
+                select_parts.append(f"COUNT(DISTINCT id_utente) FILTER (WHERE {cond}) AS \"unici_{chiave}\"")
+                select_parts.append(f"COALESCE(SUM(accessi) FILTER (WHERE {cond}), 0) AS \"totali_{chiave}\"")
+            cur.execute(f"SELECT {', '.join(select_parts)} FROM Statistiche_Accessi")
+            res = cur.fetchone() or {}
+            for chiave, _ in _FINESTRE_ACCESSI:
+                stats[chiave] = {
+                    'unici': int(res.get(f'unici_{chiave}') or 0),
+                    'totali': int(res.get(f'totali_{chiave}') or 0)
+                }
             
         return stats
     except Exception as e:
@@ -175,27 +175,72 @@ def ottieni_statistiche_accessi() -> Dict[str, Any]:
         return stats
 
 
-def get_all_users() -> List[Dict[str, Any]]:
-    """Recupera la lista di tutti gli utenti."""
+# Ordinamenti eseguibili lato SQL (i campi anagrafici sono cifrati e si ordinano in memoria)
+_ORDINAMENTI_UTENTI = {
+    'id_utente': 'u.id_utente',
+    'sospeso': 'COALESCE(u.sospeso, FALSE)',
+    'ultimo_accesso': 'u.ultimo_accesso',
+    'accessi_30d': 'accessi_30d',
+}
+# Campi cifrati: ordinati dopo la decrittazione, nella stessa funzione
+_ORDINAMENTI_IN_MEMORIA = ('username', 'email', 'nome', 'cognome', 'codice_utente')
+
+
+def get_all_users(ordina_per: str = 'id_utente', discendente: bool = False,
+                  attivi_ultimi_giorni: Optional[int] = None,
+                  inattivi_da_giorni: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Recupera la lista di tutti gli utenti, con ultimo accesso e accessi degli ultimi 30 giorni
+    (dal rollup Statistiche_Accessi) nella stessa query.
+
+    Args:
+        ordina_per: 'id_utente', 'sospeso', 'algo', 'ultimo_accesso' o 'accessi_30d' (ordinamento SQL);
+                    'username', 'email', 'nome', 'cognome' o 'codice_utente' (cifrati, ordinati
+                    dopo la decrittazione).
+        discendente: Ordine decrescente.
+        attivi_ultimi_giorni: Solo utenti con accessi negli ultimi N giorni.
+        inattivi_da_giorni: Solo utenti senza accessi da almeno N giorni.
+    """
     try:
         with get_db_connection() as con:
             cur = con.cursor()
-            # USE ENCRYPTED SHADOW COLUMNS
+            where = []
+            params = []
+            if attivi_ultimi_giorni:
+                where.append("u.ultimo_accesso > CURRENT_TIMESTAMP - (INTERVAL '1 day' * %s)")
+                params.append(int(attivi_ultimi_giorni))
+            if inattivi_da_giorni:
+                where.append("(u.ultimo_accesso IS NULL OR u.ultimo_accesso <= CURRENT_TIMESTAMP - (INTERVAL '1 day' * %s))")
+                params.append(int(inattivi_da_giorni))
+            sql_where = ("WHERE " + " AND ".join(where)) if where else ""
+            ordine = _ORDINAMENTI_UTENTI.get(ordina_per, 'u.id_utente')
+            direzione = "DESC NULLS LAST" if discendente else "ASC NULLS FIRST"
+
             # USE ENCRYPTED SHADOW COLUMNS and JOIN for Families
-            cur.execute("""
+            cur.execute(f"""
                 SELECT u.id_utente, u.username_enc, u.email_enc, u.nome_enc_server, u.cognome_enc_server, u.sospeso,
-                       u.password_algo, u.codice_utente_enc,
-                       string_agg(f.codice_famiglia_enc, '|') as codici_famiglie_enc
+                       u.password_algo, u.codice_utente_enc, u.ultimo_accesso,
+                       string_agg(f.codice_famiglia_enc, '|') as codici_famiglie_enc,
+                       COALESCE(MAX(sa.accessi_30d), 0) as accessi_30d
                 FROM Utenti u
                 LEFT JOIN Appartenenza_Famiglia af ON u.id_utente = af.id_utente
                 LEFT JOIN Famiglie f ON af.id_famiglia = f.id_famiglia
+                LEFT JOIN (
+                    SELECT id_utente, SUM(accessi) as accessi_30d
+                    FROM Statistiche_Accessi
+                    WHERE ora > CURRENT_TIMESTAMP - INTERVAL '30 days'
+                    GROUP BY id_utente
+                ) sa ON sa.id_utente = u.id_utente
+                {sql_where}
                 GROUP BY u.id_utente, u.password_algo, u.codice_utente_enc
-                ORDER BY u.id_utente
-            """)
+                ORDER BY {ordine} {direzione}, u.id_utente
+            """, tuple(params))
             rows = []
             for row in cur.fetchall():
                 d = {}
                 d['id_utente'] = row['id_utente']
+                d['ultimo_accesso'] = row.get('ultimo_accesso')
+                d['accessi_30d'] = int(row.get('accessi_30d') or 0)
                 
                 # Decrittazione Codici Famiglia
                 codici_lista = []
@@ -217,6 +262,9 @@ def get_all_users() -> List[Dict[str, Any]]:
                 d['nome'] = decrypt_system_data(row.get('nome_enc_server')) or row.get('nome_enc_server', '-')
                 d['cognome'] = decrypt_system_data(row.get('cognome_enc_server')) or row.get('cognome_enc_server', '-')
                 rows.append(d)
+            if ordina_per in _ORDINAMENTI_IN_MEMORIA:
+                # Ordinamento stabile: a parità di valore resta l'ordine per id_utente
+                rows.sort(key=lambda d: d.get(ordina_per) or '', reverse=discendente)
             return rows
     except Exception as e:
         logger.error(f"Errore get_all_users: {e}")
@@ -230,7 +278,8 @@ def delete_user(user_id: int) -> tuple[bool, str]:
             cur = con.cursor()
             
             # 1. Rimuovi appartenenza famiglie e partecipazioni conti condivisi
-            cur.execute("DELETE FROM Appartenenza_Famiglia WHERE id_utente = %s", (user_id,))
+            cur.execute("DELETE FROM Appartenenza_Famiglia WHERE id_utente = %s RETURNING id_famiglia", (user_id,))
+            famiglie_utente = [r['id_famiglia'] for r in cur.fetchall()]
             cur.execute("DELETE FROM PartecipazioneContoCondiviso WHERE id_utente = %s", (user_id,))
             
             # 2. Elimina transazioni condivise di cui è autore
@@ -270,9 +319,12 @@ def delete_user(user_id: int) -> tuple[bool, str]:
 
             # 8. Infine elimina l'utente
             cur.execute("DELETE FROM Utenti WHERE id_utente = %s", (user_id,))
+            aggiorna_directory_famiglie(cur, famiglie_utente)
             
             con.commit()
-            return True, "Utente eliminato con successo."
+        invalida_directory_membri(id_utente=user_id)
+        invalida_catalogo_conti()
+        return True, "Utente eliminato con successo."
     except Exception as e:
         logger.error(f"Errore delete_user {user_id}: {e}")
         return False, str(e)
@@ -307,139 +359,40 @@ def elimina_account_utente(id_utente: str, password_raw: str) -> tuple[bool, str
         return False, f"Errore durante l'eliminazione dell'account: {e}"
 
 def get_all_families() -> List[Dict[str, Any]]:
-    """Recupera la lista di tutte le famiglie, tentando di decriptare il nome."""
+    """
+    Recupera la lista di tutte le famiglie dalla directory precalcolata
+    (nessuna chiave famiglia viene sbloccata). Per il pannello admin usare
+    ottieni_pagina_famiglie, paginata e ordinata lato server.
+    """
+    righe, _ = ottieni_directory_famiglie(per_pagina=None)
+    return righe
+
+
+def ottieni_pagina_famiglie(pagina: int = 1, per_pagina: int = 50, ordina_per: str = 'id_famiglia',
+                            discendente: bool = False, cerca: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Pagina della panoramica famiglie per il pannello admin: (righe, totale).
+    ordina_per: id_famiglia, num_membri, ultima_attivita o dimensione_byte;
+    cerca accetta l'ID o il codice famiglia esatto.
+    """
+    return ottieni_directory_famiglie(pagina, per_pagina, ordina_per, discendente, cerca)
+
+
+def aggiorna_statistiche_famiglie() -> bool:
+    """
+    Ricalcola membri, ultima attività e spazio occupato di tutte le famiglie e
+    recupera nomi e codici ancora mancanti nella directory.
+    """
     try:
         with get_db_connection() as con:
             cur = con.cursor()
-            cur.execute("""
-                SELECT f.id_famiglia, f.nome_famiglia, f.server_encrypted_key, f.codice_famiglia_enc,
-                       COUNT(af.id_utente) as num_membri
-                FROM Famiglie f
-                LEFT JOIN Appartenenza_Famiglia af ON f.id_famiglia = af.id_famiglia
-                GROUP BY f.id_famiglia, f.nome_famiglia, f.server_encrypted_key, f.codice_famiglia_enc
-                ORDER BY f.id_famiglia
-            """)
-            families = cur.fetchall()
-            
-            rows = []
-            crypto = CryptoManager()
-            
-            for row in families:
-                d = {}
-                d['id_famiglia'] = row['id_famiglia']
-                d['num_membri'] = row['num_membri']
-                d['codice_famiglia'] = decrypt_system_data(row.get('codice_famiglia_enc')) or "-"
-                encrypted_name = row['nome_famiglia']
-                srv_key_enc = row.get('server_encrypted_key')
-                
-                nome_decrypted = encrypted_name
-                family_key = None
-                
-                # METODO 1: Uso chiave server diretta (Automazione attiva)
-                if srv_key_enc:
-                    try:
-                         family_key_b64 = decrypt_system_data(srv_key_enc)
-                         if family_key_b64:
-                             if isinstance(family_key_b64, str):
-                                 family_key = family_key_b64.encode()
-                             else:
-                                 family_key = family_key_b64
-                    except Exception:
-                        pass
-
-                # METODO 2: Fallback tramite utenti della famiglia (Recovery/Backup Key)
-                if not family_key:
-                    try:
-                        # Cerchiamo un utente di questa famiglia che abbia il backup server della master key
-                        cur.execute("""
-                            SELECT u.encrypted_master_key_backup, af.chiave_famiglia_criptata 
-                            FROM Appartenenza_Famiglia af
-                            JOIN Utenti u ON af.id_utente = u.id_utente
-                            WHERE af.id_famiglia = %s AND u.encrypted_master_key_backup IS NOT NULL
-                            LIMIT 1
-                        """, (row['id_famiglia'],))
-                        user_row = cur.fetchone()
-                        
-                        if user_row:
-                            # 1. Decrypt User Master Key using System Key
-                            user_mk_backup_enc = user_row['encrypted_master_key_backup']
-                            # encrypted_master_key_backup è cifrata con Fernet(SystemKey)
-                            # Quindi usiamo decrypt_system_data ma attenzione:
-                            # In crea_utente: encrypted_mk_backup = crypto.encrypt_master_key(master_key, srv_fernet_key)
-                            # encrypt_master_key usa Fernet.
-                            # Quindi decrypt_system_data (che usa Fernet(SYSTEM_FERNET_KEY)) dovrebbe funzionare se srv_fernet_key == SYSTEM_FERNET_KEY.
-                            # Verifichiamo _get_system_keys: Sì, è la stessa chiave.
-                            
-                            user_mk_bytes = None
-                            try:
-                                # decrypt_system_data ritorna stringa, ma qui ci aspettiamo bytes (la master key raw) oppure stringa b64?
-                                # crypto.encrypt_master_key ritorna bytes. decrypt_system_data fa .decode().
-                                # Quindi otteniamo la stringa b64 della chiave o i bytes raw?
-                                # Fernet.encrypt ritorna bytes. decrypt_system_data fa .decode() -> Ritorna stringa.
-                                # Ma encrypt_master_key potrebbe ritornare i bytes del contenuto cifrato.
-                                # Vediamo crea_utente: encrypted_mk_backup_b64 = base64.urlsafe_b64encode(encrypted_mk_backup).decode()
-                                # Quindi nel DB c'è B64(Fernet(MK)). 
-                                # decrypt_system_data fa: Fernet.decrypt(value.encode()).decode()
-                                # Se passiamo la stringa B64 dal DB, decrypt_system_data fallirà perché si aspetta Token Fernet (gAAAA...), non B64(Token).
-                                # WAIT. encrypted_mk_backup è IL token fernet (bytes).
-                                # encrypted_mk_backup_b64 è il base64 di tale token.
-                                # decrypt_system_data si aspetta una stringa che sia un token Fernet valido.
-                                # Se nel DB ho salvato B64(Token), devo prima fare b64decode per ottenere il Token stringa?
-                                # Fernet token è url-safe base64 per definizione.
-                                # Se ho fatto base64.urlsafe_b64encode su un token fernet, ho fatto doppio encoding?
-                                # crypto.encrypt_master_key(master_key, key) -> f.encrypt(data) -> ritorna bytes (il token).
-                                # base64.urlsafe_b64encode(...) -> bytes.
-                                # .decode() -> stringa.
-                                # QUINDI nel DB c'è B64(Token).
-                                # decrypt_system_data prende stringa, fa .encode() -> bytes. E lo passa a decrypt().
-                                # decrypt() vuole il Token bytes.
-                                # Se passo B64(Token), non è un Token valido.
-                                
-                                # FIX: Dobbiamo decodificare il B64 esterno per ottenere il Token Fernet.
-                                token_fernet_b64 = user_row['encrypted_master_key_backup']
-                                token_fernet_bytes = base64.urlsafe_b64decode(token_fernet_b64)
-                                # Ora token_fernet_bytes è il token fernet vero e proprio.
-                                # Usiamo la chiave di sistema per decifrarlo.
-                                from cryptography.fernet import Fernet
-                                cipher = Fernet(SYSTEM_FERNET_KEY)
-                                user_mk_bytes = cipher.decrypt(token_fernet_bytes)
-                                # Ora user_mk_bytes è la Master Key dell'utente (bytes).
-                                
-                                # 2. Decrypt Family Key using User Master Key
-                                fk_encrypted_b64 = user_row['chiave_famiglia_criptata']
-                                # decrypt_data vuole: encrypted_data (str o bytes), key (bytes)
-                                try:
-                                    # decrypt_data gestisce input b64
-                                    family_key_b64 = crypto.decrypt_data(fk_encrypted_b64, user_mk_bytes)
-                                    if family_key_b64:
-                                         family_key = family_key_b64.encode() if isinstance(family_key_b64, str) else family_key_b64
-                                except:
-                                    pass
-                            except Exception as e_inner:
-                                # logger.warning(f"Decryption fallback failed step 1: {e_inner}")
-                                pass
-                    except Exception as e_outer:
-                        # logger.warning(f"Decryption fallback failed: {e_outer}")
-                        pass
-                
-                # Se abbiamo la chiave famiglia (da Metodo 1 o 2), decriptiamo il nome
-                if family_key:
-                    try:
-                        nome_decrypted = crypto.decrypt_data(encrypted_name, family_key, silent=True)
-                    except:
-                        pass
-                
-                d['nome_famiglia'] = nome_decrypted
-                d['cloud_enabled'] = bool(row.get('server_encrypted_key'))
-                rows.append(d)
-                
-            return rows
-    except Exception as e:
-        logger.error(f"Errore get_all_families: {e}")
-        return []
+            ricalcola_directory_famiglie(cur)
+            popola_nomi_da_chiave_server(cur)
+            con.commit()
+            return True
     except Exception as e:
-        logger.error(f"Errore get_all_families: {e}")
-        return []
+        logger.error(f"Errore aggiornamento directory famiglie: {e}")
+        return False
 
 
 def get_family_summary(id_famiglia):
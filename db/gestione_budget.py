@@ -2,7 +2,7 @@
 Funzioni budget: limiti, storico, analisi mensile/annuale
 Modulo estratto da gestione_db.py — Refactoring v0.51
 """
-from db.supabase_manager import get_db_connection
+from db.supabase_manager import get_db_connection, unita_di_lavoro
 from utils.logger import setup_logger
 from utils.crypto_manager import CryptoManager
 from typing import List, Dict, Any, Optional, Tuple, Union
@@ -27,6 +27,7 @@ from db.crypto_helpers import (
 
 # Importazioni da altri moduli per evitare NameError
 from db.gestione_config import get_configurazione, set_configurazione
+from db.catalogo_periodi import ottieni_mesi_famiglia
 
 
 def get_impostazioni_budget_famiglia(id_famiglia: str, anno: int = None, mese: int = None) -> Dict[str, Union[float, str]]:
@@ -255,6 +256,36 @@ def ottieni_impostazioni_budget_storico(id_famiglia: str, anno: int, mese: int)
         'risparmio_valore': float(get_configurazione(f"{chiave_base}_risparmio_valore", id_famiglia) or 0)
     }
 
+# Spese personali dei membri della famiglia nel periodo, per sottocategoria (giroconti esclusi)
+# (parametri: id_famiglia, inizio, fine)
+_SQL_SPESE_PERSONALI_SOTTOCATEGORIA = """
+    SELECT T.id_sottocategoria, SUM(T.importo) as totale
+    FROM Transazioni T
+    JOIN Conti C ON T.id_conto = C.id_conto
+    JOIN Appartenenza_Famiglia AF ON C.id_utente = AF.id_utente
+    WHERE AF.id_famiglia = %s
+      AND T.data BETWEEN %s AND %s
+      AND T.importo < 0
+      AND T.id_sottocategoria IS NOT NULL
+    GROUP BY T.id_sottocategoria
+"""
+
+
+# Spese dei conti condivisi della famiglia nel periodo, per sottocategoria (giroconti esclusi)
+# (parametri: id_famiglia, inizio, fine)
+_SQL_SPESE_CONDIVISE_SOTTOCATEGORIA = """
+    SELECT TC.id_sottocategoria, SUM(TC.importo) as totale
+    FROM TransazioniCondivise TC
+    JOIN ContiCondivisi CC ON TC.id_conto_condiviso = CC.id_conto_condiviso
+    WHERE CC.id_famiglia = %s
+      AND TC.data BETWEEN %s AND %s
+      AND TC.importo < 0
+      AND TC.id_sottocategoria IS NOT NULL
+    GROUP BY TC.id_sottocategoria
+"""
+
+
+@unita_di_lavoro()
 def ottieni_dati_analisi_mensile(id_famiglia: str, anno: int, mese: int, master_key_b64: str, id_utente: str) -> Optional[Dict[str, Any]]:
     """
     Recupera i dati completi per l'analisi mensile del budget.
@@ -289,31 +320,12 @@ def ottieni_dati_analisi_mensile(id_famiglia: str, anno: int, mese: int, master_
             
             # Query UNICA per spese personali raggruppate per sottocategoria
             # Esclude i giroconti (transazioni senza sottocategoria)
-            cur.execute("""
-                SELECT T.id_sottocategoria, SUM(T.importo) as totale
-                FROM Transazioni T
-                JOIN Conti C ON T.id_conto = C.id_conto
-                JOIN Appartenenza_Famiglia AF ON C.id_utente = AF.id_utente
-                WHERE AF.id_famiglia = %s
-                  AND T.data BETWEEN %s AND %s
-                  AND T.importo < 0
-                  AND T.id_sottocategoria IS NOT NULL
-                GROUP BY T.id_sottocategoria
-            """, (id_famiglia, data_inizio, data_fine))
+            cur.execute(_SQL_SPESE_PERSONALI_SOTTOCATEGORIA, (id_famiglia, data_inizio, data_fine))
             spese_personali = {row['id_sottocategoria']: abs(row['totale']) for row in cur.fetchall()}
 
             # Query UNICA per spese condivise raggruppate per sottocategoria
             # Esclude i giroconti (transazioni senza sottocategoria)
-            cur.execute("""
-                SELECT TC.id_sottocategoria, SUM(TC.importo) as totale
-                FROM TransazioniCondivise TC
-                JOIN ContiCondivisi CC ON TC.id_conto_condiviso = CC.id_conto_condiviso
-                WHERE CC.id_famiglia = %s
-                  AND TC.data BETWEEN %s AND %s
-                  AND TC.importo < 0
-                  AND TC.id_sottocategoria IS NOT NULL
-                GROUP BY TC.id_sottocategoria
-            """, (id_famiglia, data_inizio, data_fine))
+            cur.execute(_SQL_SPESE_CONDIVISE_SOTTOCATEGORIA, (id_famiglia, data_inizio, data_fine))
             spese_condivise = {row['id_sottocategoria']: abs(row['totale']) for row in cur.fetchall()}
 
             # Uniamo le spese
@@ -393,6 +405,7 @@ def ottieni_dati_analisi_mensile(id_famiglia: str, anno: int, mese: int, master_
         return None
 
 
+@unita_di_lavoro()
 def ottieni_dati_analisi_annuale(id_famiglia: str, anno: int, master_key_b64: str, id_utente: str, include_prev_year: bool = True) -> Optional[Dict[str, Any]]:
     """
     Recupera i dati completi per l'analisi annuale.
@@ -824,6 +837,28 @@ def ottieni_riepilogo_budget_mensile(id_famiglia, anno, mese, master_key_b64=Non
         return {}
 
 
+# Colonne di Budget_Storico scritte dagli upsert multi-riga (una tupla per riga)
+_COLONNE_STORICO = "(id_famiglia, id_sottocategoria, nome_sottocategoria, anno, mese, importo_limite, importo_speso)"
+_STORICO_SOVRASCRIVI = ("DO UPDATE SET importo_limite = EXCLUDED.importo_limite, "
+                        "importo_speso = EXCLUDED.importo_speso, nome_sottocategoria = EXCLUDED.nome_sottocategoria")
+_STORICO_SOLO_LIMITE = "DO UPDATE SET importo_limite = EXCLUDED.importo_limite"
+_STORICO_SE_MANCANTE = "DO NOTHING"
+# Righe per INSERT multi-riga: 7 parametri a riga, ben sotto il limite di pg8000
+_RIGHE_PER_UPSERT_STORICO = 1000
+
+
+def _upsert_budget_storico(cur, righe, su_conflitto):
+    """Scrive le righe di Budget_Storico con un INSERT multi-riga per blocco."""
+    for i in range(0, len(righe), _RIGHE_PER_UPSERT_STORICO):
+        blocco = righe[i:i + _RIGHE_PER_UPSERT_STORICO]
+        valori = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(blocco))
+        cur.execute(f"""
+            INSERT INTO Budget_Storico {_COLONNE_STORICO}
+            VALUES {valori}
+            ON CONFLICT (id_famiglia, id_sottocategoria, anno, mese) {su_conflitto}
+        """, tuple(v for riga in blocco for v in riga))
+
+
 def salva_budget_mese_corrente(id_famiglia, anno, mese, master_key_b64=None, id_utente=None):
     try:
         riepilogo_corrente = ottieni_riepilogo_budget_mensile(id_famiglia, anno, mese, master_key_b64, id_utente)
@@ -858,12 +893,8 @@ def salva_budget_mese_corrente(id_famiglia, anno, mese, master_key_b64=None, id_
                         anno, mese, enc_limite, enc_speso
                     ))
             
-            cur.executemany("""
-                            INSERT INTO Budget_Storico (id_famiglia, id_sottocategoria, nome_sottocategoria, anno, mese,
-                                                        importo_limite, importo_speso)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s) ON CONFLICT(id_famiglia, id_sottocategoria, anno, mese) DO
-                            UPDATE SET importo_limite = excluded.importo_limite, importo_speso = excluded.importo_speso, nome_sottocategoria = excluded.nome_sottocategoria
-                            """, dati_da_salvare)
+            _upsert_budget_storico(cur, dati_da_salvare, _STORICO_SOVRASCRIVI)
+            con.commit()
             return True
     except Exception as e:
         print(f"[ERRORE] Errore generico durante la storicizzazione del budget: {e}")
@@ -891,163 +922,133 @@ def _get_famiglia_and_utente_from_conto(id_conto):
         print(f"[ERRORE] _get_famiglia_and_utente_from_conto: {e}")
         return None, None
 
-def trigger_budget_history_update(id_famiglia, data_riferimento, master_key_b64=None, id_utente=None, cursor=None, forced_family_key_b64=None):
+def storicizza_budget_mancante(id_famiglia, master_key_b64=None, id_utente=None, dry_run=False):
     """
-    Sincronizza lo storico budget per il mese indicato.
-    Se non viene passato un cursore, calcola anche le spese reali del mese.
-    Se viene passato un cursore (transazione atomica), si limita a sincronizzare i limiti.
+    Motore set-based della storicizzazione retroattiva.
+
+    Per tutti i mesi passati con transazioni e senza righe in Budget_Storico
+    calcola in memoria, per ogni sottocategoria della famiglia, limite (quello
+    corrente in Budget, già cifrato) e speso del mese, con una query per le
+    sottocategorie e una per le spese di tutti i mesi. Le righe vengono scritte
+    con un upsert multi-riga e un solo commit; le righe già presenti non
+    vengono mai toccate.
+
+    Args:
+        dry_run: Se True non scrive nulla e restituisce solo il diff.
+
+    Returns:
+        {'mesi': [(anno, mese) mancanti], 'mesi_presenti': int, 'righe': [{anno, mese,
+        id_sottocategoria, importo_speso, ha_budget}]} oppure None in caso di errore.
     """
-    if not id_famiglia or not data_riferimento:
-        return False
-        
+    oggi = datetime.date.today()
     try:
-        # Normalizzazione data
-        if not hasattr(data_riferimento, 'year'):
-            data_riferimento = parse_date(str(data_riferimento))
-        
-        anno = data_riferimento.year
-        mese = data_riferimento.month
-        
-        if cursor:
-            # Sincronizzazione veloce dei limiti (senza ricalcolare spese)
-            return _sync_budget_limits_only(id_famiglia, anno, mese, master_key_b64, id_utente, cursor, forced_family_key_b64)
-        else:
-            # Sincronizzazione completa (limiti + spese reali)
-            return salva_budget_mese_corrente(id_famiglia, anno, mese, master_key_b64, id_utente)
-            
-    except Exception as e:
-        print(f"[WARN] trigger_budget_history_update failed: {e}")
-        return False
+        passati = {(p['anno'], p['mese']) for p in ottieni_mesi_famiglia(id_famiglia)
+                   if (p['anno'], p['mese']) < (oggi.year, oggi.month)}
 
-def _sync_budget_limits_only(id_famiglia, anno, mese, master_key_b64=None, id_utente=None, cursor=None, forced_family_key_b64=None):
-    """Helper interno per aggiornare solo i limiti nello storico senza ricalcolare le spese."""
-    try:
-        crypto, master_key = _get_crypto_and_key(master_key_b64)
-        family_key = None
-        if forced_family_key_b64:
-            family_key = base64.b64decode(forced_family_key_b64)
-        elif master_key and id_utente:
-            family_key = _get_family_key_for_user(id_famiglia, id_utente, master_key, crypto)
-        
-        if not family_key:
-            return False
+        with get_db_connection() as con:
+            cur = con.cursor()
+            cur.execute("SELECT DISTINCT anno, mese FROM Budget_Storico WHERE id_famiglia = %s", (id_famiglia,))
+            presenti = {(int(r['anno']), int(r['mese'])) for r in cur.fetchall()}
+            mancanti = sorted(passati - presenti)
+            report = {'mesi': mancanti, 'mesi_presenti': len(passati & presenti), 'righe': []}
+            if not mancanti:
+                return report
 
-        # Fetch budget correnti
-        cursor.execute("""
-            SELECT B.id_sottocategoria, B.importo_limite, S.nome_sottocategoria 
-            FROM Budget B
-            JOIN Sottocategorie S ON B.id_sottocategoria = S.id_sottocategoria
-            WHERE B.id_famiglia = %s AND B.periodo = 'Mensile'
-        """, (id_famiglia,))
-        rows = cursor.fetchall()
-        
-        zero_enc = _encrypt_if_key("0.0", family_key, crypto)
-        
-        for row in rows:
-            nome_enc = _encrypt_if_key(row['nome_sottocategoria'], family_key, crypto)
-            cursor.execute("""
-                INSERT INTO Budget_Storico (id_famiglia, id_sottocategoria, anno, mese, importo_limite, nome_sottocategoria, importo_speso)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (id_famiglia, id_sottocategoria, anno, mese)
-                DO UPDATE SET importo_limite = EXCLUDED.importo_limite
-            """, (id_famiglia, row['id_sottocategoria'], anno, mese, row['importo_limite'], nome_enc, zero_enc))
-        return True
-    except Exception as e:
-        print(f"[ERROR] _sync_budget_limits_only: {e}")
-        return False
+            cur.execute("""
+                SELECT S.id_sottocategoria, S.nome_sottocategoria, B.importo_limite
+                FROM Categorie C
+                JOIN Sottocategorie S ON C.id_categoria = S.id_categoria
+                LEFT JOIN Budget B ON S.id_sottocategoria = B.id_sottocategoria
+                    AND B.id_famiglia = C.id_famiglia
+                    AND B.periodo = 'Mensile'
+                WHERE C.id_famiglia = %s
+            """, (id_famiglia,))
+            sottocategorie = cur.fetchall()
 
+            anno_fine, mese_fine = mancanti[-1]
+            ultimo_giorno = (datetime.date(anno_fine, mese_fine, 1) + relativedelta(months=1) - relativedelta(days=1)).day
+            data_inizio = f"{mancanti[0][0]}-{mancanti[0][1]:02d}-01"
+            data_fine = f"{anno_fine}-{mese_fine:02d}-{ultimo_giorno}"
+            cur.execute("""
+                SELECT anno, mese, id_sottocategoria, SUM(importo) AS spesa_totale
+                FROM (
+                    SELECT CAST(EXTRACT(YEAR FROM CAST(T.data AS DATE)) AS INTEGER) AS anno,
+                           CAST(EXTRACT(MONTH FROM CAST(T.data AS DATE)) AS INTEGER) AS mese,
+                           T.id_sottocategoria, T.importo
+                    FROM Transazioni T
+                    JOIN Conti CO ON T.id_conto = CO.id_conto
+                    JOIN Appartenenza_Famiglia AF ON CO.id_utente = AF.id_utente
+                    WHERE AF.id_famiglia = %s AND T.data BETWEEN %s AND %s
+                      AND T.id_sottocategoria IS NOT NULL
+                    UNION ALL
+                    SELECT CAST(EXTRACT(YEAR FROM CAST(TC.data AS DATE)) AS INTEGER),
+                           CAST(EXTRACT(MONTH FROM CAST(TC.data AS DATE)) AS INTEGER),
+                           TC.id_sottocategoria, TC.importo
+                    FROM TransazioniCondivise TC
+                    JOIN ContiCondivisi CC ON TC.id_conto_condiviso = CC.id_conto_condiviso
+                    WHERE CC.id_famiglia = %s AND TC.data BETWEEN %s AND %s
+                      AND TC.id_sottocategoria IS NOT NULL
+                ) AS U
+                GROUP BY anno, mese, id_sottocategoria
+            """, (id_famiglia, data_inizio, data_fine, id_famiglia, data_inizio, data_fine))
+            spese = {(int(r['anno']), int(r['mese']), r['id_sottocategoria']): float(r['spesa_totale'] or 0)
+                     for r in cur.fetchall()}
+
+            for anno, mese in mancanti:
+                for sub in sottocategorie:
+                    report['righe'].append({
+                        'anno': anno, 'mese': mese, 'id_sottocategoria': sub['id_sottocategoria'],
+                        'importo_speso': abs(spese.get((anno, mese, sub['id_sottocategoria']), 0.0)),
+                        'ha_budget': sub['importo_limite'] is not None,
+                    })
+            if dry_run:
+                return report
+
+            crypto, master_key = _get_crypto_and_key(master_key_b64)
+            family_key = None
+            if master_key and id_utente:
+                family_key = _get_family_key_for_user(id_famiglia, id_utente, master_key, crypto)
+            key_to_use = family_key if family_key else master_key
+            zero_enc = _encrypt_if_key("0.0", key_to_use, crypto)
+
+            # Nome e limite restano cifrati come in Sottocategorie e Budget: si cifra solo lo speso
+            sub_per_id = {sub['id_sottocategoria']: sub for sub in sottocategorie}
+            righe = []
+            for r in report['righe']:
+                sub = sub_per_id[r['id_sottocategoria']]
+                speso = r['importo_speso']
+                righe.append((
+                    id_famiglia, r['id_sottocategoria'], sub['nome_sottocategoria'], r['anno'], r['mese'],
+                    sub['importo_limite'] if sub['importo_limite'] is not None else '0.0',
+                    _encrypt_if_key(str(speso), key_to_use, crypto) if speso else zero_enc,
+                ))
+            _upsert_budget_storico(cur, righe, _STORICO_SE_MANCANTE)
+            con.commit()
+            return report
+    except Exception as e:
+        print(f"[ERRORE] Errore durante la storicizzazione budget in blocco: {e}")
+        return None
 
 
-def storicizza_budget_retroattivo(id_famiglia, master_key_b64=None):
+def storicizza_budget_retroattivo(id_famiglia, master_key_b64=None, id_utente=None):
     """
     Storicizza automaticamente i budget per tutti i mesi passati con transazioni.
     Usa i limiti correnti dalla tabella Budget come baseline per i mesi storici.
     Questa funzione dovrebbe essere chiamata una sola volta per popolare Budget_Storico.
     """
-    try:
-        oggi = datetime.date.today()
-        
-        # Ottieni tutti i mesi con transazioni
-        periodi = ottieni_anni_mesi_storicizzati(id_famiglia)
-        if not periodi:
-            print("Nessun periodo storico trovato.")
-            return True
-        
-        mesi_storicizzati = 0
-        mesi_saltati = 0
-        
-        with get_db_connection() as con:
-            cur = con.cursor()
-            
-            for periodo in periodi:
-                anno = periodo['anno']
-                mese = periodo['mese']
-                
-                # Salta il mese corrente (verrà storicizzato normalmente)
-                if anno == oggi.year and mese == oggi.month:
-                    continue
-                
-                # Salta i mesi futuri
-                if anno > oggi.year or (anno == oggi.year and mese > oggi.month):
-                    continue
-                
-                # Controlla se il mese è già storicizzato
-                cur.execute("""
-                    SELECT COUNT(*) as count FROM Budget_Storico 
-                    WHERE id_famiglia = %s AND anno = %s AND mese = %s
-                """, (id_famiglia, anno, mese))
-                
-                if cur.fetchone()['count'] > 0:
-                    mesi_saltati += 1
-                    continue
-                
-                # Storicizza il mese usando i limiti correnti
-                if salva_budget_mese_corrente(id_famiglia, anno, mese, master_key_b64):
-                    mesi_storicizzati += 1
-                    print(f"  Storicizzato {anno}-{mese:02d}")
-                else:
-                    print(f"  Errore storicizzando {anno}-{mese:02d}")
-        
-        print(f"\nStoricizzazione retroattiva completata:")
-        print(f"  - Mesi storicizzati: {mesi_storicizzati}")
-        print(f"  - Mesi già presenti: {mesi_saltati}")
-        return True
-        
-    except Exception as e:
-        print(f"Errore durante la storicizzazione retroattiva: {e}")
+    report = storicizza_budget_mancante(id_famiglia, master_key_b64, id_utente)
+    if report is None:
         return False
-
+    print(f"\nStoricizzazione retroattiva completata:")
+    print(f"  - Mesi storicizzati: {len(report['mesi'])}")
+    print(f"  - Mesi già presenti: {report['mesi_presenti']}")
+    return True
 
 
 def ottieni_anni_mesi_storicizzati(id_famiglia):
+    # Mesi con transazioni personali dei membri o condivise, dal catalogo dei periodi
     try:
-        with get_db_connection() as con:
-            # con.row_factory = sqlite3.Row # Removed for Supabase
-            cur = con.cursor()
-            # Query aggiornata per leggere i mesi da TUTTE le transazioni (personali e condivise)
-            cur.execute("""
-                SELECT DISTINCT anno, mese FROM (
-                    -- Mesi da transazioni personali
-                    SELECT
-                        CAST(EXTRACT(YEAR FROM CAST(T.data AS DATE)) AS INTEGER) as anno,
-                        CAST(EXTRACT(MONTH FROM CAST(T.data AS DATE)) AS INTEGER) as mese
-                    FROM Transazioni T
-                    JOIN Conti C ON T.id_conto = C.id_conto
-                    JOIN Appartenenza_Famiglia AF ON C.id_utente = AF.id_utente
-                    WHERE AF.id_famiglia = %s
-
-                    UNION
-
-                    -- Mesi da transazioni condivise
-                    SELECT
-                        CAST(EXTRACT(YEAR FROM CAST(TC.data AS DATE)) AS INTEGER) as anno,
-                        CAST(EXTRACT(MONTH FROM CAST(TC.data AS DATE)) AS INTEGER) as mese
-                    FROM TransazioniCondivise TC
-                    JOIN ContiCondivisi CC ON TC.id_conto_condiviso = CC.id_conto_condiviso
-                    WHERE CC.id_famiglia = %s
-                ) ORDER BY anno DESC, mese DESC
-            """, (id_famiglia, id_famiglia))
-            return [dict(row) for row in cur.fetchall()]
+        return ottieni_mesi_famiglia(id_famiglia)
     except Exception as e:
         print(f"[ERRORE] Errore generico durante il recupero periodi storici: {e}")
         return []
@@ -1165,6 +1166,11 @@ def trigger_budget_history_update(id_famiglia, data_riferimento, master_key_b64=
     Se forced_family_key_b64 è fornito, viene usato direttamente senza tentare la decifratura 
     (utile per le chiamate dal background_service che hanno già la chiave decifrata).
     """
+    if not id_famiglia or not data_riferimento:
+        return False
+    # Normalizzazione data (le transazioni passano la data come stringa)
+    if not hasattr(data_riferimento, 'year'):
+        data_riferimento = parse_date(str(data_riferimento))
     anno = data_riferimento.year
     mese = data_riferimento.month
     
@@ -1197,28 +1203,14 @@ def trigger_budget_history_update(id_famiglia, data_riferimento, master_key_b64=
         # Prepare encrypted zero for new rows
         zero_enc = _encrypt_if_key("0.0", family_key, crypto)
         
-        for row in rows:
-            # Encrypt name
-            nome_enc = _encrypt_if_key(row['nome_sottocategoria'], family_key, crypto)
-            limit_val = row['importo_limite'] # Already encrypted in Budget table
-            
-            # Upsert
-            # ON CONFLICT: Update ONLY LIMIT. Preserve existing imported_speso and names.
-            sql_upsert = """
-            INSERT INTO Budget_Storico (id_famiglia, id_sottocategoria, anno, mese, importo_limite, nome_sottocategoria, importo_speso)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (id_famiglia, id_sottocategoria, anno, mese)
-            DO UPDATE SET importo_limite = EXCLUDED.importo_limite;
-            """
-            cur.execute(sql_upsert, (
-                id_famiglia, 
-                row['id_sottocategoria'], 
-                anno, 
-                mese, 
-                limit_val, 
-                nome_enc, 
-                zero_enc
-            ))
+        # Upsert multi-riga. ON CONFLICT: Update ONLY LIMIT (importo_limite già cifrato in Budget).
+        # Preserve existing importo_speso and names.
+        righe = [
+            (id_famiglia, row['id_sottocategoria'], _encrypt_if_key(row['nome_sottocategoria'], family_key, crypto),
+             anno, mese, row['importo_limite'], zero_enc)
+            for row in rows
+        ]
+        _upsert_budget_storico(cur, righe, _STORICO_SOLO_LIMITE)
 
     if cursor:
         try:
@@ -18,11 +18,15 @@ from db.crypto_helpers import (
     compute_blind_index, encrypt_system_data, decrypt_system_data,
     generate_unique_code,
     SERVER_SECRET_KEY,
-    crypto as _crypto_instance
+    crypto as _crypto_instance,
+    _get_family_key_for_user, _DecrittatoreMultiChiave
 )
 
 # Importazioni da altri moduli per evitare NameError
-from db.gestione_conti import aggiungi_conto
+from db.gestione_conti import aggiungi_conto, invalida_catalogo_conti
+from db.gestione_famiglie import ottieni_prima_famiglia_utente
+from db.catalogo_periodi import AMBITO_CARTA, ottieni_mesi_ambito, ottieni_totale_periodo
+from db.addebiti_carte import giorno_pianificato
 
 
 
@@ -73,14 +77,14 @@ def aggiungi_carta(id_utente, nome_carta, tipo_carta, circuito,
                     id_conto_riferimento_condiviso, id_conto_contabile_condiviso,
                     massimale_encrypted, giorno_addebito_encrypted, spesa_tenuta_encrypted, 
                     soglia_azzeramento_encrypted, giorno_addebito_tenuta_encrypted, addebito_automatico,
-                    icona, colore
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    icona, colore, giorno_addebito_pianificato
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                 RETURNING id_carta
             """, (id_utente, nome_carta, tipo_carta, circuito, 
                   id_conto_riferimento, id_conto_contabile,
                   id_conto_riferimento_condiviso, id_conto_contabile_condiviso,
                   massimale_enc, giorno_addebito_enc, spesa_tenuta_enc, soglia_azzeramento_enc, giorno_addebito_tenuta_enc, addebito_automatico,
-                  icona, colore))
+                  icona, colore, giorno_pianificato(giorno_addebito)))
             
             row = cur.fetchone()
             id_carta = row.get('id_carta') if row else None
@@ -93,7 +97,8 @@ def aggiungi_carta(id_utente, nome_carta, tipo_carta, circuito,
                 """, (id_carta, data_validita, massimale_enc))
 
             con.commit()
-            return True
+        invalida_catalogo_conti()
+        return True
     except Exception as e:
         print(f"[ERRORE] Errore aggiunta carta: {e}")
         return False
@@ -216,6 +221,9 @@ def modifica_carta(id_carta, nome_carta=None, tipo_carta=None, circuito=None,
             if giorno_addebito is not None:
                 updates.append("giorno_addebito_encrypted = %s")
                 params.append(_encrypt_if_key(str(giorno_addebito), master_key, crypto))
+                # In chiaro per il job di addebito (db.addebiti_carte)
+                updates.append("giorno_addebito_pianificato = %s")
+                params.append(giorno_pianificato(giorno_addebito))
             if spesa_tenuta is not None:
                 updates.append("spesa_tenuta_encrypted = %s")
                 params.append(_encrypt_if_key(str(spesa_tenuta), master_key, crypto))
@@ -249,7 +257,8 @@ def modifica_carta(id_carta, nome_carta=None, tipo_carta=None, circuito=None,
                  """, (id_carta, data_validita, massimale_enc_new))
             
             con.commit()
-            return True
+        invalida_catalogo_conti()
+        return True
             
     except Exception as e:
         print(f"[ERRORE] Errore modifica carta: {e}")
@@ -285,7 +294,8 @@ def elimina_carta(id_carta, soft_delete=True):
                 
                 
             con.commit()
-            return True
+        invalida_catalogo_conti()
+        return True
     except Exception as e:
         print(f"[ERRORE] Errore eliminazione carta: {e}")
         return False
@@ -317,29 +327,9 @@ def ottieni_ids_conti_tecnici_carte(id_utente):
 
 
 def calcola_totale_speso_carta(id_carta: int, mese: int, anno: int) -> float:
+    """Totale speso con la carta nel mese (personali e condivise), dal Catalogo_Periodi."""
     try:
-        with get_db_connection() as conn:
-            start_date = f'{anno}-{mese:02d}-01'
-            if mese == 12:
-                end_date = f'{anno+1}-01-01'
-            else:
-                end_date = f'{anno}-{mese+1:02d}-01'
-            
-            cur = conn.cursor()
-            
-            # 1. Personal Transactions
-            q1 = "SELECT SUM(importo) as totale FROM Transazioni WHERE id_carta = %s AND data >= %s AND data < %s"
-            cur.execute(q1, (id_carta, start_date, end_date))
-            res1 = cur.fetchone()
-            val1 = float(res1.get('totale') or 0.0)
-            
-            # 2. Shared Transactions
-            q2 = "SELECT SUM(importo) as totale FROM TransazioniCondivise WHERE id_carta = %s AND data >= %s AND data < %s"
-            cur.execute(q2, (id_carta, start_date, end_date))
-            res2 = cur.fetchone()
-            val2 = float(res2.get('totale') or 0.0)
-            
-            return abs(val1 + val2)
+        return abs(ottieni_totale_periodo(AMBITO_CARTA, id_carta, anno, mese))
     except Exception as e:
         print(f'Error calc speso carta: {e}')
         return 0.0
@@ -364,80 +354,64 @@ def ottieni_transazioni_carta(id_carta, mese, anno, master_key_b64=None, id_uten
              if id_famiglia:
                  family_key = _get_family_key_for_user(id_famiglia, id_utente, master_key, crypto)
 
+        # Personali: master key poi family key; condivise: il contrario. Per ogni
+        # conto si ricorda la chiave che ha funzionato, così ogni riga costa una
+        # sola decifratura invece di un tentativo fallito seguito dal fallback.
+        decrittatore_personali = _DecrittatoreMultiChiave([master_key, family_key], crypto)
+        decrittatore_condivise = _DecrittatoreMultiChiave([family_key, master_key], crypto)
+        nomi_categorie = {}
+
+        def _nome_categoria(valore):
+            if not family_key or not valore:
+                return valore
+            if valore not in nomi_categorie:
+                nomi_categorie[valore] = _decrypt_if_key(valore, family_key, crypto, silent=True)
+            return nomi_categorie[valore]
+
         transazioni = []
 
         with get_db_connection() as con:
             cur = con.cursor()
-            
-            # 1. Transazioni Personali
             cur.execute("""
                 SELECT 
                     T.id_transazione, T.data, T.descrizione, T.importo, 
-                    S.nome_sottocategoria, C.nome_categoria
+                    S.nome_sottocategoria, C.nome_categoria,
+                    NULL AS autore, 'Personale' AS tipo, T.id_conto AS id_conto
                 FROM Transazioni T
                 LEFT JOIN Sottocategorie S ON T.id_sottocategoria = S.id_sottocategoria
                 LEFT JOIN Categorie C ON S.id_categoria = C.id_categoria
                 WHERE T.id_carta = %s 
                   AND T.data >= %s AND T.data <= %s
-                ORDER BY T.data DESC
-            """, (id_carta, start_date, end_date))
-            
-            rows_p = cur.fetchall()
-            for r in rows_p:
-                t = dict(r)
-                t['tipo'] = 'Personale'
-                
-                # Decrypt description - Try Master Key then Family Key fallback
-                desc = _decrypt_if_key(t['descrizione'], master_key, crypto, silent=True)
-                if desc == "[ENCRYPTED]" and family_key:
-                    res = _decrypt_if_key(t['descrizione'], family_key, crypto, silent=True)
-                    if res != "[ENCRYPTED]":
-                        desc = res
-                t['descrizione'] = desc
-                
-                if family_key:
-                    t['nome_sottocategoria'] = _decrypt_if_key(t['nome_sottocategoria'], family_key, crypto, silent=True)
-                    t['nome_categoria'] = _decrypt_if_key(t['nome_categoria'], family_key, crypto, silent=True)
-                
-                transazioni.append(t)
-
-            # 2. Transazioni Condivise
-            cur.execute("""
+                UNION ALL
                 SELECT 
-                    TC.id_transazione_condivisa as id_transazione, TC.data, TC.descrizione, TC.importo, 
+                    TC.id_transazione_condivisa, TC.data, TC.descrizione, TC.importo, 
                     S.nome_sottocategoria, C.nome_categoria,
-                    U.username as autore
+                    U.username, 'Condivisa', TC.id_conto_condiviso
                 FROM TransazioniCondivise TC
                 LEFT JOIN Sottocategorie S ON TC.id_sottocategoria = S.id_sottocategoria
                 LEFT JOIN Categorie C ON S.id_categoria = C.id_categoria
                 LEFT JOIN Utenti U ON TC.id_utente_autore = U.id_utente
                 WHERE TC.id_carta = %s
                   AND TC.data >= %s AND TC.data <= %s
-                ORDER BY TC.data DESC
-            """, (id_carta, start_date, end_date))
-            
-            rows_c = cur.fetchall()
-            for r in rows_c:
+                ORDER BY data DESC
+            """, (id_carta, start_date.isoformat(), end_date.isoformat(),
+                  id_carta, start_date.isoformat(), end_date.isoformat()))
+
+            for r in cur.fetchall():
                 t = dict(r)
-                t['tipo'] = 'Condivisa'
-                
-                # Decrypt description - Try Family Key then Master Key fallback
-                desc = t['descrizione']
-                if family_key:
-                    desc = _decrypt_if_key(desc, family_key, crypto, silent=True)
-                
-                if (desc == "[ENCRYPTED]" or desc == t['descrizione']) and master_key:
-                     res = _decrypt_if_key(t['descrizione'], master_key, crypto, silent=True)
-                     if res != "[ENCRYPTED]":
-                         desc = res
-                t['descrizione'] = desc
-
-                if family_key:
-                    t['nome_sottocategoria'] = _decrypt_if_key(t['nome_sottocategoria'], family_key, crypto, silent=True)
-                    t['nome_categoria'] = _decrypt_if_key(t['nome_categoria'], family_key, crypto, silent=True)
+                id_conto = t.pop('id_conto')
+                if t['tipo'] == 'Personale':
+                    t.pop('autore')
+                    decrittatore = decrittatore_personali
+                else:
+                    decrittatore = decrittatore_condivise
+                if master_key or family_key:
+                    t['descrizione'] = decrittatore.decritta(t['descrizione'], id_conto)
+
+                t['nome_sottocategoria'] = _nome_categoria(t['nome_sottocategoria'])
+                t['nome_categoria'] = _nome_categoria(t['nome_categoria'])
                 transazioni.append(t)
-                
-        transazioni.sort(key=lambda x: x['data'], reverse=True)
+
         return transazioni
 
     except Exception as e:
@@ -447,34 +421,11 @@ def ottieni_transazioni_carta(id_carta, mese, anno, master_key_b64=None, id_uten
 
 def ottieni_mesi_disponibili_carta(id_carta):
     """
-    Restituisce una lista di tuple (anno, mese) distinte in cui sono presenti transazioni per la carta.
-    Ordinata dalla più recente.
+    Restituisce una lista di tuple (anno, mese) distinte in cui sono presenti transazioni
+    (personali o condivise) per la carta. Ordinata dalla più recente.
     """
     try:
-        mesi = set()
-        with get_db_connection() as con:
-            cur = con.cursor()
-            
-            # Personali
-            cur.execute("""
-                SELECT DISTINCT EXTRACT(YEAR FROM data::date) as anno, EXTRACT(MONTH FROM data::date) as mese
-                FROM Transazioni
-                WHERE id_carta = %s
-            """, (id_carta,))
-            for row in cur.fetchall():
-                mesi.add((int(row['anno']), int(row['mese'])))
-                
-            # Condivise
-            cur.execute("""
-                SELECT DISTINCT EXTRACT(YEAR FROM data::date) as anno, EXTRACT(MONTH FROM data::date) as mese
-                FROM TransazioniCondivise
-                WHERE id_carta = %s
-            """, (id_carta,))
-            for row in cur.fetchall():
-                mesi.add((int(row['anno']), int(row['mese'])))
-        
-        lista_mesi = sorted(list(mesi), key=lambda x: (x[0], x[1]), reverse=True)
-        return lista_mesi
+        return ottieni_mesi_ambito(AMBITO_CARTA, id_carta)
     except Exception as e:
         print(f"[ERRORE] Errore recupero mesi carta: {e}")
         return []
@@ -11,6 +11,7 @@ import os
 
 logger = setup_logger(__name__)
 from utils.cache_manager import cache_manager
+from utils.contesto_inserimento import invalida_contesti_inserimento
 
 from db.crypto_helpers import (
     _encrypt_if_key, _decrypt_if_key, 
@@ -45,7 +46,9 @@ def aggiungi_categoria(id_famiglia, nome_categoria):
                 (id_famiglia, nome_categoria))
             result = cur.fetchone()['id_categoria']
             # Invalida la cache delle categorie
+            con.commit()
             cache_manager.invalidate("categories", id_famiglia)
+            invalida_contesti_inserimento(id_famiglia)
             return result
     except Exception as e:
         print(f"[ERRORE] Errore aggiunta categoria: {e}")
@@ -72,7 +75,9 @@ def modifica_categoria(id_categoria, nome_categoria):
             result = cur.rowcount > 0
             if result:
                 # Invalida la cache delle categorie
+                con.commit()
                 cache_manager.invalidate("categories", id_famiglia)
+                invalida_contesti_inserimento(id_famiglia)
             return result
     except Exception as e:
         print(f"[ERRORE] Errore modifica categoria: {e}")
@@ -99,7 +104,9 @@ def elimina_categoria(id_categoria):
             cur.execute("DELETE FROM Categorie WHERE id_categoria = %s", (id_categoria,))
             result = cur.rowcount > 0
             if result and id_famiglia:
+                con.commit()
                 cache_manager.invalidate("categories", id_famiglia)
+                invalida_contesti_inserimento(id_famiglia)
             return result
     except Exception as e:
         print(f"[ERRORE] Errore eliminazione categoria: {e}")
@@ -134,7 +141,9 @@ def aggiungi_sottocategoria(id_categoria, nome_sottocategoria):
                 (id_categoria, nome_sottocategoria))
             result = cur.fetchone()['id_sottocategoria']
             # Invalida la cache delle categorie (include sottocategorie)
+            con.commit()
             cache_manager.invalidate("categories", id_famiglia)
+            invalida_contesti_inserimento(id_famiglia)
             return result
     except Exception as e:
         print(f"[ERRORE] Errore aggiunta sottocategoria: {e}")
@@ -160,7 +169,9 @@ def modifica_sottocategoria(id_sottocategoria, nome_sottocategoria):
                         (nome_sottocategoria, id_sottocategoria))
             result = cur.rowcount > 0
             if result:
+                con.commit()
                 cache_manager.invalidate("categories", id_famiglia)
+                invalida_contesti_inserimento(id_famiglia)
             return result
     except Exception as e:
         print(f"[ERRORE] Errore modifica sottocategoria: {e}")
@@ -183,7 +194,9 @@ def elimina_sottocategoria(id_sottocategoria):
             cur.execute("DELETE FROM Sottocategorie WHERE id_sottocategoria = %s", (id_sottocategoria,))
             result = cur.rowcount > 0
             if result and id_famiglia:
+                con.commit()
                 cache_manager.invalidate("categories", id_famiglia)
+                invalida_contesti_inserimento(id_famiglia)
             return result
     except Exception as e:
         print(f"[ERRORE] Errore eliminazione sottocategoria: {e}")
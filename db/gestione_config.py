@@ -9,7 +9,7 @@ from typing import List, Dict, Any, Optional, Tuple, Union
 import datetime
 import os
 
-from utils.cache_manager import cache_manager
+from utils.contesto_inserimento import CHIAVI_CONFIG_CONTESTO, invalida_contesti_inserimento
 import json
 
 logger = setup_logger(__name__)
@@ -22,64 +22,55 @@ from db.crypto_helpers import (
     SERVER_SECRET_KEY,
     crypto as _crypto_instance
 )
+from db.snapshot_configurazioni import (
+    CHIAVI_SENSIBILI, ambito_configurazione, fuori_snapshot, ottieni_snapshot,
+    precarica_configurazioni, registra_modifica, invalida_snapshot,
+)
 
 # --- Funzioni Configurazioni ---
+def _leggi_configurazione_diretta(query_chiave: str, query_id_famiglia: Optional[str]) -> Optional[str]:
+    """Lettura di una singola chiave dal DB (chiavi monouso escluse dagli snapshot)."""
+    with get_db_connection() as con:
+        cur = con.cursor()
+        if query_id_famiglia is None:
+            cur.execute("SELECT valore FROM Configurazioni WHERE chiave = %s AND id_famiglia IS NULL", (query_chiave,))
+        else:
+            cur.execute("SELECT valore FROM Configurazioni WHERE chiave = %s AND id_famiglia = %s", (query_chiave, query_id_famiglia))
+        res = cur.fetchone()
+        return res['valore'] if res else None
+
+
 def get_configurazione(chiave: str, id_famiglia: Optional[str] = None, master_key_b64: Optional[str] = None, id_utente: Optional[str] = None) -> Optional[str]:
     """
-    Recupera il valore di una configurazione usando la cache in-memory.
+    Recupera il valore di una configurazione dallo snapshot in memoria del suo
+    ambito (utente se id_utente, altrimenti famiglia o globale).
     """
     try:
-        def fetch_from_db():
-            # Se id_utente è fornito, usiamo una chiave prefissata e id_famiglia NULL
+        if fuori_snapshot(chiave):
             query_chiave = f"user:{id_utente}:{chiave}" if id_utente else chiave
-            query_id_famiglia = None if id_utente else id_famiglia
-            
-            with get_db_connection() as con:
-                cur = con.cursor()
-                if query_id_famiglia is None:
-                    cur.execute("SELECT valore FROM Configurazioni WHERE chiave = %s AND id_famiglia IS NULL", (query_chiave,))
-                else:
-                    cur.execute("SELECT valore FROM Configurazioni WHERE chiave = %s AND id_famiglia = %s", (query_chiave, query_id_famiglia))
-                
-                res = cur.fetchone()
-                if not res:
-                    return None
-                
-                valore = res['valore']
-                # ... (rest of decryption logic remains same)
-                sensitive_keys = ['smtp_server', 'smtp_port', 'smtp_user', 'smtp_password', 'smtp_from_email', 'smtp_sender']
-                
-                if query_chiave in sensitive_keys:
-                    try:
-                        decrypted = decrypt_system_data(valore)
-                        if decrypted:
-                            valore = decrypted
-                    except Exception as e:
-                        logger.warning(f"Failed to system-decrypt {query_chiave}: {e}")
-                return valore
-
-        # Usa get_or_compute per cache in-memory (TTL 10 minuti)
-        cache_key = f"db_config:{id_utente}:{id_famiglia}:{chiave}" if id_utente else f"db_config:{id_famiglia}:{chiave}"
-        return cache_manager.get_or_compute(
-            key=cache_key,
-            compute_fn=fetch_from_db,
-            id_famiglia=id_famiglia,
-            ttl_seconds=600
-        )
+            return _leggi_configurazione_diretta(query_chiave, None if id_utente else id_famiglia)
+        return ottieni_snapshot(ambito_configurazione(id_famiglia, id_utente)).get(chiave)
     except Exception as e:
         logger.error(f"Errore recupero configurazione {chiave}: {e}")
         return None
 
+
+def get_configurazioni(chiavi: List[str], id_famiglia: Optional[str] = None, id_utente: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """Più chiavi dello stesso ambito con una sola lettura dello snapshot."""
+    snapshot = ottieni_snapshot(ambito_configurazione(id_famiglia, id_utente))
+    return {chiave: snapshot.get(chiave) for chiave in chiavi}
+
+
 def set_configurazione(chiave: str, valore: str, id_famiglia: Optional[str] = None, master_key_b64: Optional[str] = None, id_utente: Optional[str] = None) -> bool:
     """
-    Imposta o aggiorna una configurazione e invalida la cache.
+    Imposta o aggiorna una configurazione e incrementa la versione del suo
+    ambito, così gli snapshot (anche di altri processi) vengono ricaricati.
     """
     try:
         # Encrypt sensitive config values
         encrypted_valore = valore
-        sensitive_keys = ['smtp_server', 'smtp_port', 'smtp_user', 'smtp_password', 'smtp_from_email', 'smtp_sender']
         
-        if chiave in sensitive_keys and SERVER_SECRET_KEY:
+        if chiave in CHIAVI_SENSIBILI and SERVER_SECRET_KEY:
             try:
                 encrypted_valore = encrypt_system_data(valore)
             except Exception as e:
@@ -88,6 +79,7 @@ def set_configurazione(chiave: str, valore: str, id_famiglia: Optional[str] = No
         # Se id_utente è fornito, usiamo una chiave prefissata e id_famiglia NULL
         query_chiave = f"user:{id_utente}:{chiave}" if id_utente else chiave
         query_id_famiglia = None if id_utente else id_famiglia
+        ambito = ambito_configurazione(id_famiglia, id_utente)
         
         with get_db_connection() as con:
             cur = con.cursor()
@@ -105,18 +97,17 @@ def set_configurazione(chiave: str, valore: str, id_famiglia: Optional[str] = No
                     ON CONFLICT (chiave, id_famiglia) 
                     DO UPDATE SET valore = EXCLUDED.valore
                 """, (query_chiave, encrypted_valore, query_id_famiglia))
+            if not fuori_snapshot(chiave):
+                registra_modifica(cur, ambito)
             con.commit()
             
-            # Invalida cache
-            cache_key = f"db_config:{id_utente}:{id_famiglia}:{chiave}" if id_utente else f"db_config:{id_famiglia}:{chiave}"
-            cache_manager.invalidate(cache_key, query_id_famiglia)
+            invalida_snapshot(ambito)
+            if chiave in CHIAVI_CONFIG_CONTESTO:
+                invalida_contesti_inserimento()
             return True
     except Exception as e:
         logger.error(f"Errore salvataggio configurazione {chiave}: {e}")
         return False
-    except Exception as e:
-        logger.error(f"Errore salvataggio configurazione {chiave}: {e}")
-        return False
 
 # --- Gestione Ordinamento FOP ---
 def ottieni_ordinamento_conti_carte(id_famiglia: str) -> Optional[dict]:
@@ -152,12 +143,14 @@ def get_smtp_config(id_famiglia: Optional[str] = None, master_key_b64: Optional[
         Un dizionario contenente 'server', 'port', 'user', 'password', 'provider'.
     """
     logger.debug(f"get_smtp_config called with id_famiglia={id_famiglia}, id_utente={id_utente}, master_key_present={bool(master_key_b64)}")
+    valori = get_configurazioni(['smtp_server', 'smtp_port', 'smtp_user', 'smtp_password', 'smtp_sender'],
+                                id_famiglia, id_utente)
     return {
-        'server': get_configurazione('smtp_server', id_famiglia, master_key_b64, id_utente),
-        'port': get_configurazione('smtp_port', id_famiglia, master_key_b64, id_utente),
-        'user': get_configurazione('smtp_user', id_famiglia, master_key_b64, id_utente),
-        'password': get_configurazione('smtp_password', id_famiglia, master_key_b64, id_utente),
-        'sender': get_configurazione('smtp_sender', id_famiglia, master_key_b64, id_utente),
+        'server': valori['smtp_server'],
+        'port': valori['smtp_port'],
+        'user': valori['smtp_user'],
+        'password': valori['smtp_password'],
+        'sender': valori['smtp_sender'],
         'provider': get_configurazione('smtp_provider', id_famiglia)  # provider is not sensitive
     }
 
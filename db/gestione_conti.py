@@ -26,8 +26,11 @@ from db.crypto_helpers import (
 
 # Importazioni da altri moduli per evitare NameError
 from db.gestione_famiglie import ottieni_prima_famiglia_utente, _get_family_key_for_user
+from db.directory_membri import ottieni_directory_famiglia
+from utils.contesto_inserimento import invalida_contesti_inserimento
 from db.gestione_transazioni import aggiungi_transazione
 from db.crypto_helpers import valida_iban_semplice
+from db.catalogo_periodi import AMBITO_CONTO, AMBITO_CONTO_CONDIVISO, ottieni_mesi_ambito
 
 
 # --- Funzioni Conti ---
@@ -110,7 +113,10 @@ def imposta_conto_default_utente(id_utente, id_conto_personale=None, id_conto_co
                     "UPDATE Utenti SET id_conto_default = NULL, id_conto_condiviso_default = NULL, id_carta_default = NULL WHERE id_utente = %s",
                     (id_utente,))
 
-            return cur.rowcount > 0
+            esito = cur.rowcount > 0
+            con.commit()
+            invalida_contesti_inserimento(id_utente=id_utente)
+            return esito
     except Exception as e:
         print(f"[ERRORE] Errore durante l'impostazione del conto di default: {e}")
         return False
@@ -173,10 +179,11 @@ def aggiungi_conto(id_utente, nome_conto, tipo_conto, iban=None, valore_manuale=
                 (id_utente, encrypted_nome, tipo_conto, encrypted_iban, valore_manuale, borsa_default, encrypted_config, icona, colore))
             id_nuovo_conto = cur.fetchone()['id_conto']
             con.commit()
-            # Invalida cache
-            cache_manager.invalidate(f"user_accounts_basic:{id_utente}")
-            cache_manager.invalidate(f"user_accounts_details:{id_utente}")
-            return id_nuovo_conto, "Conto creato con successo"
+        # Invalida cache a transazione chiusa
+        cache_manager.invalidate(f"user_accounts_basic:{id_utente}")
+        cache_manager.invalidate(f"user_accounts_details:{id_utente}")
+        invalida_catalogo_conti()
+        return id_nuovo_conto, "Conto creato con successo"
     except Exception as e:
         print(f"[ERRORE] Errore generico: {e}")
         return None, f"Errore generico: {e}"
@@ -246,7 +253,7 @@ def ottieni_dettagli_conti_utente(id_utente, master_key_b64=None):
                                                  FROM Asset A
                                                  WHERE A.id_conto = C.id_conto) AS TEXT)
                                        ELSE CAST((SELECT COALESCE(SUM(T.importo), 0.0) FROM Transazioni T WHERE T.id_conto = C.id_conto) +
-                                            COALESCE(CAST(NULLIF(CAST(C.rettifica_saldo AS TEXT), '') AS NUMERIC), 0.0) AS TEXT)
+                                            COALESCE(C.rettifica_saldo, 0.0) AS TEXT)
                                        END AS saldo_calcolato
                             FROM Conti C
                             WHERE C.id_utente = %s AND (C.nascosto = FALSE OR C.nascosto IS NULL)
@@ -346,10 +353,11 @@ def modifica_conto(id_conto, id_utente, nome_conto, tipo_conto, iban=None, valor
             rows_affected = cur.rowcount
 
             con.commit()
-            if rows_affected > 0:
-                cache_manager.invalidate(f"user_accounts_basic:{id_utente}")
-                cache_manager.invalidate(f"user_accounts_details:{id_utente}")
-            return rows_affected > 0, "Conto modificato con successo"
+        if rows_affected > 0:
+            cache_manager.invalidate(f"user_accounts_basic:{id_utente}")
+            cache_manager.invalidate(f"user_accounts_details:{id_utente}")
+            invalida_catalogo_conti()
+        return rows_affected > 0, "Conto modificato con successo"
     except Exception as e:
         print(f"[ERRORE] Errore generico: {e}")
         return False, f"Errore generico: {e}"
@@ -563,15 +571,22 @@ def elimina_conto(id_conto, id_utente):
             # Se ci sono transazioni ma saldo = 0, NASCONDI il conto invece di bloccare
             if num_transazioni > 0:
                 cur.execute("UPDATE Conti SET nascosto = TRUE WHERE id_conto = %s AND id_utente = %s", (id_conto, id_utente))
-                return "NASCOSTO"
-
-            # Se non ci sono transazioni, elimina veramente
-            cur.execute("DELETE FROM Conti WHERE id_conto = %s AND id_utente = %s", (id_conto, id_utente))
-            result = cur.rowcount > 0
-            if result:
-                cache_manager.invalidate(f"user_accounts_basic:{id_utente}")
-                cache_manager.invalidate(f"user_accounts_details:{id_utente}")
-            return result
+                con.commit()
+                result = "NASCOSTO"
+            else:
+                # Se non ci sono transazioni, elimina veramente
+                cur.execute("DELETE FROM Conti WHERE id_conto = %s AND id_utente = %s", (id_conto, id_utente))
+                result = cur.rowcount > 0
+                if result:
+                    con.commit()
+        # Cache invalidate a transazione chiusa
+        if result == "NASCOSTO":
+            invalida_catalogo_conti()
+        elif result:
+            cache_manager.invalidate(f"user_accounts_basic:{id_utente}")
+            cache_manager.invalidate(f"user_accounts_details:{id_utente}")
+            invalida_catalogo_conti()
+        return result
     except Exception as e:
         error_message = f"Errore generico durante l'eliminazione del conto: {e}"
         print(f"[ERRORE] {error_message}")
@@ -877,7 +892,8 @@ def crea_conto_condiviso(id_famiglia, nome_conto, tipo_conto, tipo_condivisione,
                         (id_nuovo_conto_condiviso, uid))
 
             con.commit()
-            return id_nuovo_conto_condiviso
+        invalida_catalogo_conti(id_famiglia)
+        return id_nuovo_conto_condiviso
     except Exception as e:
         print(f"[ERRORE] Errore generico durante la creazione conto condiviso: {e}")
         return None
@@ -959,7 +975,8 @@ def modifica_conto_condiviso(id_conto_condiviso, nome_conto, tipo=None, tipo_con
 
             con.commit() # Explicit commit needed context context autocommits? yes context usually commits except if error.
                          # DbContext usually handles commit on exit.
-            return True
+        invalida_catalogo_conti()
+        return True
     except Exception as e:
         print(f"[ERRORE] Errore generico durante la modifica conto condiviso: {e}")
         return False
@@ -971,8 +988,10 @@ def elimina_conto_condiviso(id_conto_condiviso):
             cur = con.cursor()
             # cur.execute("PRAGMA foreign_keys = ON;") # Removed for Supabase Supabase
             cur.execute("DELETE FROM ContiCondivisi WHERE id_conto_condiviso = %s", (id_conto_condiviso,))
+            eliminato = cur.rowcount > 0
             con.commit()
-            return cur.rowcount > 0
+        invalida_catalogo_conti()
+        return eliminato
     except Exception as e:
         print(f"[ERRORE] Errore generico durante l'eliminazione conto condiviso: {e}")
         return None
@@ -993,7 +1012,7 @@ def ottieni_conti_condivisi_utente(id_utente, master_key_b64=None):
                                CC.icona,
                                CC.colore,
                                1                             AS is_condiviso,
-                               COALESCE(SUM(T.importo), 0.0) + COALESCE(CAST(NULLIF(CAST(CC.rettifica_saldo AS TEXT), '') AS NUMERIC), 0.0) AS saldo_calcolato
+                               COALESCE(SUM(T.importo), 0.0) + COALESCE(CC.rettifica_saldo, 0.0) AS saldo_calcolato
                         FROM ContiCondivisi CC
                                  LEFT JOIN PartecipazioneContoCondiviso PCC
                                            ON CC.id_conto_condiviso = PCC.id_conto_condiviso
@@ -1054,34 +1073,11 @@ def ottieni_utenti_famiglia(id_famiglia):
     id_famiglia = _valida_id_int(id_famiglia)
     if not id_famiglia: return []
     try:
-        with get_db_connection() as con:
-            # con.row_factory = sqlite3.Row # Removed for Supabase
-            cur = con.cursor()
-            cur.execute("""
-                        SELECT U.id_utente, 
-                               U.username,
-                               U.nome_enc_server,
-                               U.cognome_enc_server
-                        FROM Utenti U
-                                 JOIN Appartenenza_Famiglia AF ON U.id_utente = AF.id_utente
-                        WHERE AF.id_famiglia = %s
-                        """, (id_famiglia,))
-            
-            results = []
-            for row in cur.fetchall():
-                 n = decrypt_system_data(row.get('nome_enc_server'))
-                 c = decrypt_system_data(row.get('cognome_enc_server'))
-                 
-                 display = row['username']
-                 if n or c:
-                     display = f"{n or ''} {c or ''}".strip()
-                 
-                 results.append({
-                     'id_utente': row['id_utente'],
-                     'nome_visualizzato': display
-                 })
-                 
-            return sorted(results, key=lambda x: x['nome_visualizzato'])
+        results = [
+            {'id_utente': m['id_utente'], 'nome_visualizzato': m['nome_visualizzato']}
+            for m in ottieni_directory_famiglia(id_famiglia).values()
+        ]
+        return sorted(results, key=lambda x: x['nome_visualizzato'])
 
     except Exception as e:
         print(f"[ERRORE] Errore recupero utenti famiglia: {e}")
@@ -1107,132 +1103,164 @@ def ottieni_tutti_i_conti_utente(id_utente, master_key_b64=None):
     return risultato_unificato
 
 
+# Catalogo conti famiglia (per utente richiedente): in memoria, invalidato dalle scritture
+_CATALOGO_CONTI_KEY = "accounts_catalog"
+_CATALOGO_CONTI_TTL = 600
+
+# Conti personali, carte, conti condivisi e salvadanai della famiglia in una sola query.
+# fonte: P = conto personale, K = carta, S = conto condiviso, PB = salvadanaio
+_SQL_CATALOGO_CONTI = """
+    SELECT 'P' AS fonte, C.id_conto AS id, C.nome_conto AS nome, C.tipo, C.config_speciale,
+           C.icona, C.colore, C.id_utente AS id_owner,
+           CAST(NULL AS INTEGER) AS id_conto_contabile, CAST(NULL AS INTEGER) AS id_conto_contabile_condiviso
+    FROM Conti C
+    JOIN Appartenenza_Famiglia AF ON AF.id_utente = C.id_utente
+    WHERE AF.id_famiglia = %s AND (C.nascosto = FALSE OR C.nascosto IS NULL)
+    UNION ALL
+    SELECT 'K', K.id_carta, K.nome_carta, NULL, NULL,
+           K.icona, K.colore, K.id_utente,
+           K.id_conto_contabile, K.id_conto_contabile_condiviso
+    FROM Carte K
+    JOIN Appartenenza_Famiglia AF ON AF.id_utente = K.id_utente
+    WHERE AF.id_famiglia = %s
+    UNION ALL
+    SELECT 'S', CC.id_conto_condiviso, CC.nome_conto, CC.tipo, CC.config_speciale,
+           CC.icona, CC.colore, NULL, NULL, NULL
+    FROM ContiCondivisi CC
+    WHERE CC.id_famiglia = %s
+    UNION ALL
+    SELECT 'PB', S.id_salvadanaio, S.nome, NULL, NULL,
+           NULL, NULL, NULL, NULL, NULL
+    FROM Salvadanai S
+    WHERE S.id_famiglia = %s
+    ORDER BY 1, 2
+"""
+
+
+def invalida_catalogo_conti(id_famiglia=None):
+    """Invalida il catalogo conti di una famiglia (tutti gli utenti) o, senza argomenti, di tutte le famiglie."""
+    if id_famiglia:
+        cache_manager.invalidate_pattern(f"family_{id_famiglia}:{_CATALOGO_CONTI_KEY}:")
+    else:
+        cache_manager.invalidate_pattern(f":{_CATALOGO_CONTI_KEY}:")
+    invalida_contesti_inserimento(id_famiglia)
+
+
+def _carica_catalogo_conti(id_famiglia, id_utente_richiedente, master_key_b64=None):
+    crypto, master_key = _get_crypto_and_key(master_key_b64)
+    family_key = None
+    if master_key:
+        family_key = _get_family_key_for_user(id_famiglia, id_utente_richiedente, master_key, crypto)
+
+    def ancora_criptato(val):
+        return val == "[ENCRYPTED]" or (isinstance(val, str) and CryptoManager.is_encrypted(val))
+
+    def decripta(val, proprio):
+        # Conti propri: prima master_key (chiave con cui sono di solito cifrati), poi family_key.
+        # Conti altrui/condivisi: solo family_key.
+        if val is None:
+            return None
+        if proprio and master_key:
+            dec = _decrypt_if_key(val, master_key, crypto, silent=True)
+            if not ancora_criptato(dec) or not family_key:
+                return dec
+        return _decrypt_if_key(val, family_key, crypto, silent=True)
+
+    with get_db_connection() as con:
+        cur = con.cursor()
+        cur.execute(_SQL_CATALOGO_CONTI, (id_famiglia, id_famiglia, id_famiglia, id_famiglia))
+        righe = cur.fetchall()
+
+    directory = ottieni_directory_famiglia(id_famiglia)
+    personali, condivisi, salvadanai = [], [], []
+    for row in righe:
+        fonte = row['fonte']
+        if fonte in ('P', 'K'):
+            uid = row['id_owner']
+            proprio = uid == id_utente_richiedente
+            voce = directory.get(uid)
+            nome_owner = voce['nome_visualizzato'] if voce else "Sconosciuto"
+            if fonte == 'P':
+                config = decripta(row['config_speciale'], proprio)
+                personali.append({
+                    'id_conto': row['id'],
+                    'nome_conto': decripta(row['nome'], proprio),
+                    'tipo': decripta(row['tipo'], proprio),
+                    'config_speciale': None if ancora_criptato(config) else config,
+                    'icona': row['icona'],
+                    'colore': row['colore'],
+                    'is_condiviso': False,
+                    'id_utente_owner': uid,
+                    'nome_owner': nome_owner,
+                })
+            else:
+                id_acc = row['id_conto_contabile'] or row['id_conto_contabile_condiviso']
+                flag = 'S' if row['id_conto_contabile_condiviso'] else 'P'
+                personali.append({
+                    'id_conto': f"CARD_{row['id']}_{id_acc}_{flag}",
+                    'nome_conto': decripta(row['nome'], proprio),
+                    'tipo': 'Carta',
+                    'id_utente_owner': uid,
+                    'nome_owner': nome_owner,
+                    'is_condiviso': False,
+                    'icona': row['icona'],
+                    'colore': row['colore'],
+                })
+        elif fonte == 'S':
+            condivisi.append({
+                'id_conto': row['id'],
+                'nome_conto': decripta(row['nome'], False),
+                'tipo': decripta(row['tipo'], False),
+                'config_speciale': decripta(row['config_speciale'], False),
+                'icona': row['icona'],
+                'colore': row['colore'],
+                'is_condiviso': True,
+                'id_utente_owner': None,
+                'nome_owner': "Condiviso",
+            })
+        else:
+            salvadanai.append({
+                'id_conto': f"PB_{row['id']}",
+                'nome_conto': decripta(row['nome'], False),
+                'tipo': 'Salvadanaio',
+                'id_utente_owner': None,
+                'nome_owner': "Famiglia",
+                'is_condiviso': True,
+            })
+
+    # Stesso ordine di sempre: per membro (conti, poi carte), poi condivisi, poi salvadanai
+    personali.sort(key=lambda c: (c['nome_owner'], c['id_utente_owner'], c['tipo'] == 'Carta'))
+    return personali + condivisi + salvadanai
+
+
 def ottieni_tutti_i_conti_famiglia(id_famiglia, id_utente_richiedente, master_key_b64=None):
     """
     Restituisce TUTTI i conti di TUTTI i membri della famiglia, inclusi quelli condivisi e salvadanai.
     Utile per la visibilità globale 'Altri Familiari'.
+
+    Il risultato proviene dal catalogo conti in memoria (una query set-based per famiglia e
+    utente richiedente), invalidato da invalida_catalogo_conti alla modifica di conti, carte,
+    conti condivisi, salvadanai o membri. Restituisce copie: i chiamanti possono modificarle.
     """
     try:
-        # 1. Recupera tutti i membri della famiglia
-        utenti = ottieni_utenti_famiglia(id_famiglia)
-        
-        # Crypto context
-        crypto, master_key = _get_crypto_and_key(master_key_b64)
-        family_key = None
-        if master_key:
-            family_key = _get_family_key_for_user(id_famiglia, id_utente_richiedente, master_key, crypto)
-        
-        risultato = []
-        
-        with get_db_connection() as con:
-            cur = con.cursor()
-            
-            for u in utenti:
-                uid = u['id_utente']
-                # Conti Personali di questo utente
-                cur.execute("""
-                    SELECT id_conto, nome_conto, tipo, config_speciale, icona, colore
-                    FROM Conti 
-                    WHERE id_utente = %s AND (nascosto = FALSE OR nascosto IS NULL)
-                """, (uid,))
-                
-                for row in cur.fetchall():
-                    r = dict(row)
-                    r['is_condiviso'] = False
-                    r['id_utente_owner'] = uid
-                    r['nome_owner'] = u['nome_visualizzato']
-                    
-                    # Decrypt nome_conto, tipo and config_speciale
-                    # 1. Try family_key (most common for shared context)
-                    dec_nome = _decrypt_if_key(r['nome_conto'], family_key, crypto, silent=True)
-                    dec_tipo = _decrypt_if_key(r['tipo'], family_key, crypto, silent=True)
-                    dec_config = _decrypt_if_key(r['config_speciale'], family_key, crypto, silent=True)
-                    
-                    # 2. Fallback to master_key if it's the owner's account and first attempt failed/skipped
-                    if uid == id_utente_richiedente and master_key:
-                        # Se è ancora criptato o ha fallito, prova master_key
-                        if dec_nome == "[ENCRYPTED]" or (isinstance(dec_nome, str) and CryptoManager.is_encrypted(dec_nome)):
-                            dec_nome = _decrypt_if_key(r['nome_conto'], master_key, crypto, silent=True)
-                        if dec_tipo == "[ENCRYPTED]" or (isinstance(dec_tipo, str) and CryptoManager.is_encrypted(dec_tipo)):
-                            dec_tipo = _decrypt_if_key(r['tipo'], master_key, crypto, silent=True)
-                        if dec_config == "[ENCRYPTED]" or (isinstance(dec_config, str) and CryptoManager.is_encrypted(dec_config)):
-                            dec_config = _decrypt_if_key(r['config_speciale'], master_key, crypto, silent=True)
-                    
-                    r['nome_conto'] = dec_nome
-                    r['tipo'] = dec_tipo
-                    if dec_config and CryptoManager.is_encrypted(dec_config):
-                         r['config_speciale'] = None
-                    else:
-                         r['config_speciale'] = dec_config
-                    risultato.append(r)
-                    
-                # Carte di questo utente
-                cur.execute("SELECT id_carta, nome_carta, id_conto_contabile, id_conto_contabile_condiviso, icona, colore FROM Carte WHERE id_utente = %s", (uid,))
-                for row in cur.fetchall():
-                    dec_nome = _decrypt_if_key(row['nome_carta'], family_key, crypto, silent=True)
-                    if (dec_nome == "[ENCRYPTED]" or (isinstance(dec_nome, str) and CryptoManager.is_encrypted(dec_nome))) and uid == id_utente_richiedente and master_key:
-                        dec_nome = _decrypt_if_key(row['nome_carta'], master_key, crypto, silent=True)
-                    
-                    id_acc = row['id_conto_contabile'] or row['id_conto_contabile_condiviso']
-                    flag = 'S' if row['id_conto_contabile_condiviso'] else 'P'
-                        
-                    risultato.append({
-                        'id_conto': f"CARD_{row['id_carta']}_{id_acc}_{flag}",
-                        'nome_conto': dec_nome,
-                        'tipo': 'Carta',
-                        'id_utente_owner': uid,
-                        'nome_owner': u['nome_visualizzato'],
-                        'is_condiviso': False,
-                        'icona': row.get('icona'),
-                        'colore': row.get('colore')
-                    })
-
-            # 3. Conti Condivisi della famiglia
-            cur.execute("SELECT id_conto_condiviso as id_conto, nome_conto, tipo, config_speciale, icona, colore FROM ContiCondivisi WHERE id_famiglia = %s", (id_famiglia,))
-            for row in cur.fetchall():
-                r = dict(row)
-                r['is_condiviso'] = True
-                r['nome_conto'] = _decrypt_if_key(r['nome_conto'], family_key, crypto, silent=True)
-                r['tipo'] = _decrypt_if_key(r['tipo'], family_key, crypto, silent=True)
-                r['config_speciale'] = _decrypt_if_key(r['config_speciale'], family_key, crypto, silent=True)
-                r['id_utente_owner'] = None
-                r['nome_owner'] = "Condiviso"
-                risultato.append(r)
-                
-            # 4. Salvadanai della famiglia
-            cur.execute("SELECT id_salvadanaio, nome FROM Salvadanai WHERE id_famiglia = %s", (id_famiglia,))
-            for row in cur.fetchall():
-                 risultato.append({
-                     'id_conto': f"PB_{row['id_salvadanaio']}",
-                     'nome_conto': _decrypt_if_key(row['nome'], family_key, crypto, silent=True),
-                     'tipo': 'Salvadanaio',
-                     'id_utente_owner': None,
-                     'nome_owner': "Famiglia",
-                     'is_condiviso': True
-                 })
-
-        return risultato
+        catalogo = cache_manager.get_or_compute(
+            key=f"{_CATALOGO_CONTI_KEY}:{id_utente_richiedente}:{'mk' if master_key_b64 else 'nokey'}",
+            compute_fn=lambda: _carica_catalogo_conti(id_famiglia, id_utente_richiedente, master_key_b64),
+            id_famiglia=id_famiglia,
+            ttl_seconds=_CATALOGO_CONTI_TTL
+        )
+        return [dict(c) for c in catalogo]
     except Exception as e:
         print(f"[ERRORE] ottieni_tutti_i_conti_famiglia: {e}")
         return []
-        print(f"[ERRORE] Errore generico durante il recupero di tutti i conti famiglia: {e}")
-        return []
 
 def ottieni_mesi_disponibili_conto(id_conto: str) -> List[Tuple[int, int]]:
     """
     Restituisce una lista di tuple (anno, mese) per i quali esistono transazioni
-    per il conto specificato.
+    per il conto specificato (dal catalogo dei periodi).
     """
     try:
-        with get_db_connection() as con:
-            cur = con.cursor()
-            cur.execute("""
-                SELECT DISTINCT EXTRACT(YEAR FROM data::date) as anno, EXTRACT(MONTH FROM data::date) as mese
-                FROM Transazioni
-                WHERE id_conto = %s
-                ORDER BY anno DESC, mese DESC
-            """, (id_conto,))
-            return [(int(row['anno']), int(row['mese'])) for row in cur.fetchall()]
+        return ottieni_mesi_ambito(AMBITO_CONTO, id_conto)
     except Exception as e:
         logger.error(f"Errore ottieni_mesi_disponibili_conto: {e}")
         return []
@@ -1311,15 +1339,7 @@ def ottieni_mesi_disponibili_conto_condiviso(id_conto_condiviso: str) -> List[Tu
     Restituisce (anno, mese) per i quali esistono transazioni condivise.
     """
     try:
-        with get_db_connection() as con:
-            cur = con.cursor()
-            cur.execute("""
-                SELECT DISTINCT EXTRACT(YEAR FROM data::date) as anno, EXTRACT(MONTH FROM data::date) as mese
-                FROM TransazioniCondivise
-                WHERE id_conto_condiviso = %s
-                ORDER BY anno DESC, mese DESC
-            """, (id_conto_condiviso,))
-            return [(int(row['anno']), int(row['mese'])) for row in cur.fetchall()]
+        return ottieni_mesi_ambito(AMBITO_CONTO_CONDIVISO, id_conto_condiviso)
     except Exception as e:
         logger.error(f"Errore ottieni_mesi_disponibili_conto_condiviso: {e}")
         return []
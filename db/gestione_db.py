@@ -2,8 +2,11 @@
 gestione_db.py — Re-export Facade (v0.51 Refactoring)
 
 Questo file mantiene la compatibilità con tutto il codice che importa da db.gestione_db.
-Il codice sorgente effettivo è in _gestione_db_monolith.py, ed è stato organizzato
-logicamente nei seguenti moduli tematici nella directory db/:
+I nomi vengono risolti su richiesta (PEP 562, __getattr__ di modulo) tramite il
+registro _REGISTRO_MODULI: importare la facciata non carica nessun modulo tematico,
+e ciascun modulo viene importato solo al primo accesso a uno dei suoi nomi.
+Il monolite _gestione_db_monolith.py viene caricato solo per i nomi che nessun
+modulo tematico fornisce. Moduli tematici nella directory db/:
 
   crypto_helpers.py       — Crittografia, system keys, funzioni condivise
   gestione_admin.py       — Admin, sicurezza, statistiche
@@ -31,35 +34,179 @@ MIGRAZIONE PROGRESSIVA:
     from db.gestione_db import ottieni_budget_famiglia
 """
 
-# Re-export completo dal monolite per compatibilità legacy (verrà rimosso gradualmente).
-from db._gestione_db_monolith import *  # noqa: F401, F403
+import importlib
 
-# OVERRIDE MASSIVO: Usa le versioni rifattorizzate (v0.51) dei moduli tematici.
-# L'ordine garantisce che le funzioni nei nuovi moduli sovrascrivano quelle nel monolito.
-from db.crypto_helpers import *
-from db.gestione_admin import *
-from db.gestione_config import *
-from db.gestione_budget import *
-from db.gestione_utenti import *
-from db.gestione_famiglie import *
-from db.gestione_categorie import *
-from db.gestione_conti import *
-from db.gestione_inviti import *
-from db.gestione_transazioni import *
-from db.gestione_patrimonio import *
-from db.gestione_investimenti import *
-from db.gestione_giroconti import *
-from db.gestione_export import *
-from db.gestione_spese_fisse import *
-from db.gestione_carte import *
-from db.gestione_obiettivi import *
-from db.gestione_contatti import *
+# Registro nome -> modulo. Riproduce la precedenza dei vecchi "from ... import *":
+# se più moduli esportano lo stesso nome vince l'ultimo dell'elenco storico
+# (crypto_helpers, admin, config, budget, utenti, famiglie, categorie, conti, inviti,
+# transazioni, patrimonio, investimenti, giroconti, export, spese_fisse, carte,
+# obiettivi, contatti). Aggiungendo una funzione pubblica a un modulo tematico va
+# aggiunta anche qui: tests/test_gestione_db_facade.py verifica l'allineamento.
+_REGISTRO_MODULI = {
+    "db.crypto_helpers": (
+        "_decrypt_if_key", "_encrypt_if_key", "_get_crypto_and_key", "_get_family_key_for_user",
+        "_get_key_for_transaction", "crypto", "disable_server_automation",
+        "enable_server_automation", "get_hash_salt", "get_server_family_key",
+        "get_system_fernet_key", "invalidate_config_cache", "is_server_automation_enabled",
+        "mimetypes", "parent_dir", "script_dir", "setup_database", "shutil", "sys", "threading",
+    ),
+    "db.gestione_admin": (
+        "aggiorna_statistiche_famiglie", "aggiorna_ultimo_accesso",
+        "check_registration_availability", "delete_family", "delete_user",
+        "elimina_account_utente", "generate_email_verification_code", "generate_token",
+        "get_all_families", "get_all_users", "get_database_statistics",
+        "get_password_complexity_config", "get_user_count", "ottieni_directory_famiglie",
+        "ottieni_pagina_famiglie", "ottieni_statistiche_accessi",
+        "popola_nomi_da_chiave_server", "reset_user_password", "ricalcola_directory_famiglie",
+        "save_password_complexity_config", "segna_attivita_utente", "toggle_user_suspension",
+        "verify_admin_password", "verify_email_code",
+    ),
+    "db.gestione_config": (
+        "CHIAVI_CONFIG_CONTESTO", "CHIAVI_SENSIBILI", "CONTROLLABLE_FEATURES",
+        "ambito_configurazione", "fuori_snapshot", "get_configurazioni",
+        "get_disabled_features", "get_smtp_config", "get_user_onboarding_preference",
+        "invalida_snapshot", "is_onboarding_completed", "ottieni_ordinamento_conti_carte",
+        "ottieni_snapshot", "precarica_configurazioni", "registra_modifica",
+        "salva_ordinamento_conti_carte", "save_smtp_config", "save_system_config",
+        "set_disabled_features", "set_onboarding_completed", "set_user_onboarding_preference",
+    ),
+    "db.gestione_budget": (
+        "calcola_entrate_mensili_famiglia", "get_configurazione",
+        "get_impostazioni_budget_famiglia", "imposta_budget", "ottieni_anni_mesi_storicizzati",
+        "ottieni_budget_famiglia", "ottieni_dati_analisi_annuale",
+        "ottieni_dati_analisi_mensile", "ottieni_impostazioni_budget_storico",
+        "ottieni_mesi_famiglia", "ottieni_periodi_budget_disponibili",
+        "ottieni_riepilogo_budget_mensile", "ottieni_storico_budget_per_export",
+        "ottieni_totale_budget_allocato", "ottieni_totale_budget_storico",
+        "salva_budget_mese_corrente", "salva_impostazioni_budget_storico", "set_configurazione",
+        "set_impostazioni_budget_famiglia", "storicizza_budget_mancante",
+        "storicizza_budget_retroattivo", "unita_di_lavoro",
+    ),
+    "db.gestione_utenti": (
+        "accetta_invito", "aggiorna_profilo_utente", "cambia_password",
+        "cambia_password_e_username", "cerca_utente_per_username", "crea_utente_invitato",
+        "esporta_dati_famiglia", "hash_password", "hashlib", "imposta_password_temporanea",
+        "ottieni_dettagli_utente", "ottieni_utente_da_email", "ottieni_utenti_senza_famiglia",
+        "registra_utente", "trova_utente_per_email", "verifica_login", "verify_password_hash",
+    ),
+    "db.gestione_famiglie": (
+        "aggiorna_directory_famiglie", "aggiorna_nome_directory", "aggiungi_categorie_iniziali",
+        "aggiungi_utente_a_famiglia", "crea_famiglia_e_admin", "ensure_family_key",
+        "get_family_summary", "invalida_directory_membri", "modifica_ruolo_utente",
+        "ottieni_dettagli_famiglia", "ottieni_membri_famiglia", "ottieni_ruolo_utente",
+        "ottieni_totali_famiglia", "rimuovi_utente_da_famiglia", "rinomina_famiglia",
+    ),
+    "db.gestione_categorie": (
+        "aggiungi_categoria", "aggiungi_sottocategoria", "elimina_categoria",
+        "elimina_sottocategoria", "modifica_categoria", "modifica_sottocategoria",
+        "ottieni_categorie", "ottieni_categorie_e_sottocategorie", "ottieni_sottocategorie",
+    ),
+    "db.gestione_conti": (
+        "AMBITO_CONTO", "AMBITO_CONTO_CONDIVISO", "admin_imposta_saldo_conto_condiviso",
+        "admin_imposta_saldo_conto_corrente", "aggiorna_saldo_iniziale_conto",
+        "aggiungi_saldo_iniziale", "controlla_ripristini_satispay", "crea_conto_condiviso",
+        "elimina_conto", "elimina_conto_condiviso", "esegui_ripristino_satispay",
+        "imposta_conto_default_utente", "invalida_contesti_inserimento", "modifica_conto",
+        "modifica_conto_condiviso", "ottieni_conti", "ottieni_conti_condivisi_famiglia",
+        "ottieni_conti_condivisi_utente", "ottieni_conti_utente",
+        "ottieni_conto_default_utente", "ottieni_dettagli_conti_utente",
+        "ottieni_dettagli_conto", "ottieni_dettagli_conto_condiviso",
+        "ottieni_directory_famiglia", "ottieni_mesi_disponibili_conto",
+        "ottieni_mesi_disponibili_conto_condiviso", "ottieni_saldo_iniziale_conto",
+        "ottieni_transazioni_conto_condiviso_mese", "ottieni_transazioni_conto_mese",
+        "ottieni_tutti_i_conti_famiglia", "ottieni_tutti_i_conti_utente",
+        "ottieni_utenti_famiglia", "valida_iban_semplice",
+    ),
+    "db.gestione_inviti": (
+        "crea_invito", "ottieni_invito_per_token", "secrets", "string",
+    ),
+    "db.gestione_transazioni": (
+        "elimina_transazione", "elimina_transazione_condivisa", "modifica_transazione",
+        "modifica_transazione_condivisa", "ottieni_riepilogo_patrimonio_famiglia_aggregato",
+        "ottieni_riepilogo_patrimonio_utente", "ottieni_transazioni_condivise_famiglia",
+        "ottieni_transazioni_condivise_utente", "ottieni_transazioni_utente",
+        "trigger_budget_history_update",
+    ),
+    "db.gestione_patrimonio": (
+        "aggiorna_stato_rata_piano", "aggiorna_valore_fondo_pensione", "aggiungi_immobile",
+        "aggiungi_prestito", "aggiungi_rata_piano_ammortamento", "check_e_paga_rate_scadute",
+        "effettua_pagamento_rata", "elimina_immobile", "elimina_piano_ammortamento",
+        "elimina_prestito", "esegui_operazione_fondo_pensione", "gestisci_quote_immobile",
+        "gestisci_quote_prestito", "modifica_immobile", "modifica_prestito",
+        "ottieni_immobili_famiglia", "ottieni_piano_ammortamento", "ottieni_prestiti_famiglia",
+        "ottieni_quote_immobile", "ottieni_quote_prestito", "parse_date",
+        "salva_piano_ammortamento",
+    ),
+    "db.gestione_investimenti": (
+        "aggiorna_prezzi_asset", "aggiorna_prezzo_asset", "aggiorna_prezzo_manuale_asset",
+        "aggiorna_storico_asset_se_necessario", "aggiungi_investimento", "aggiungi_transazione",
+        "aggiungi_transazione_condivisa", "check_e_processa_spese_fisse", "compra_asset",
+        "elimina_asset", "elimina_investimento", "modifica_asset_dettagli",
+        "modifica_investimento", "ottieni_asset_conti", "ottieni_asset_conto",
+        "ottieni_asset_da_sincronizzare", "ottieni_dettaglio_asset", "ottieni_investimenti",
+        "ottieni_portafoglio", "ottieni_storico_asset_globale", "salva_storico_asset_globale",
+        "sincronizza_prezzi_portafoglio", "ultimo_aggiornamento_storico", "vendi_asset",
+    ),
+    "db.gestione_giroconti": (
+        "esegui_giroconto",
+    ),
+    "db.gestione_export": (
+        "Decimal", "gzip", "iter_query_chunks", "itera_backup_famiglia",
+        "itera_transazioni_famiglia_per_export", "leggi_backup_famiglia",
+        "ottieni_backup_completo_famiglia", "ottieni_dati_immobili_famiglia_per_export",
+        "ottieni_dati_prestiti_famiglia_per_export",
+        "ottieni_dati_spese_fisse_famiglia_per_export", "ottieni_dettaglio_portafogli_famiglia",
+        "ottieni_riepilogo_conti_famiglia", "ottieni_transazioni_famiglia_per_export",
+        "ottieni_versione_db", "relativedelta", "risolvi_utenti", "scrivi_backup_famiglia",
+        "tempfile",
+    ),
+    "db.gestione_spese_fisse": (
+        "aggiungi_spesa_fissa", "elimina_spesa_fissa", "modifica_spesa_fissa",
+        "modifica_stato_spesa_fissa", "ottieni_spese_fisse_famiglia",
+    ),
+    "db.gestione_carte": (
+        "AMBITO_CARTA", "aggiungi_carta", "aggiungi_conto", "calcola_totale_speso_carta",
+        "elimina_carta", "giorno_pianificato", "modifica_carta", "ottieni_carte_utente",
+        "ottieni_ids_conti_tecnici_carte", "ottieni_mesi_ambito",
+        "ottieni_mesi_disponibili_carta", "ottieni_totale_periodo", "ottieni_transazioni_carta",
+    ),
+    "db.gestione_obiettivi": (
+        "admin_rettifica_salvadanaio", "aggiorna_obiettivo", "cache_manager",
+        "collega_salvadanaio_obiettivo", "crea_obiettivo", "crea_salvadanaio",
+        "elimina_obiettivo", "elimina_salvadanaio", "esegui_giroconto_salvadanaio",
+        "invalida_catalogo_conti", "json", "ottieni_obiettivi", "ottieni_salvadanai_conto",
+        "ottieni_salvadanai_obiettivi", "ottieni_salvadanai_obiettivo",
+        "ottieni_tutti_salvadanai_famiglia", "scollega_salvadanaio_obiettivo",
+    ),
+    "db.gestione_contatti": (
+        "Any", "CryptoManager", "Dict", "List", "Optional", "SERVER_SECRET_KEY", "Tuple",
+        "Union", "base64", "compute_blind_index", "crea_contatto", "datetime",
+        "decrypt_system_data", "elimina_contatto", "encrypt_system_data",
+        "generate_unique_code", "get_db_connection", "logger", "modifica_contatto", "os",
+        "ottieni_contatti_utente", "ottieni_prima_famiglia_utente", "setup_logger",
+    ),
+}
 
-# Esportazioni esplicite per i test (compatibilità legacy dei mock)
-from db.crypto_helpers import (
-    _decrypt_if_key,
-    _encrypt_if_key,
-    _get_crypto_and_key,
-    _get_family_key_for_user,
-    _get_key_for_transaction
-)
+_MODULO_PER_NOME = {nome: modulo for modulo, nomi in _REGISTRO_MODULI.items() for nome in nomi}
+
+# Fallback per i nomi legacy non ancora portati nei moduli tematici.
+_MODULO_MONOLITE = "db._gestione_db_monolith"
+
+
+def __getattr__(nome):
+    modulo = _MODULO_PER_NOME.get(nome)
+    if modulo is None:
+        if nome.startswith("__"):
+            raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+        modulo = _MODULO_MONOLITE
+    try:
+        valore = getattr(importlib.import_module(modulo), nome)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}") from None
+    # Cache nel namespace: gli accessi successivi non passano più da __getattr__
+    globals()[nome] = valore
+    return valore
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULO_PER_NOME))
@@ -2,7 +2,7 @@
 Funzioni export: backup, esportazioni dati famiglia
 Modulo estratto da gestione_db.py — Refactoring v0.51
 """
-from db.supabase_manager import get_db_connection
+from db.supabase_manager import get_db_connection, iter_query_chunks
 from utils.logger import setup_logger
 from utils.crypto_manager import CryptoManager
 from typing import List, Dict, Any, Optional, Tuple, Union
@@ -12,6 +12,9 @@ import os
 logger = setup_logger(__name__)
 import json
 import base64
+import gzip
+import tempfile
+from decimal import Decimal
 from dateutil.relativedelta import relativedelta
 
 from db.crypto_helpers import (
@@ -25,10 +28,19 @@ from db.crypto_helpers import (
 )
 
 from db.gestione_admin import ottieni_versione_db
+from db.directory_membri import risolvi_utenti
 
 
 
 # --- Funzioni Export ---
+_EXPORT_CHUNK_SIZE = 500
+
+
+def _nome_membro(directory, id_utente, default="Sconosciuto"):
+    """Nome visualizzato di un utente dalla directory membri (decriptato una volta sola)."""
+    voce = directory.get(id_utente)
+    return voce['nome_visualizzato'] if voce else default
+
 def ottieni_riepilogo_conti_famiglia(id_famiglia, master_key_b64=None, id_utente=None):
     try:
         # Decryption setup
@@ -46,7 +58,7 @@ def ottieni_riepilogo_conti_famiglia(id_famiglia, master_key_b64=None, id_utente
             # COALESCE returns type of first non-null arg. 0.0 is double.
             # Check if fields are correct.
             query_personali = """
-                        SELECT U.nome_enc_server, U.cognome_enc_server, U.username,
+                        SELECT C.id_utente,
                                C.nome_conto,
                                C.tipo,
                                C.iban,
@@ -58,11 +70,10 @@ def ottieni_riepilogo_conti_famiglia(id_famiglia, master_key_b64=None, id_utente
                                              WHERE A.id_conto = C.id_conto)
                                    ELSE (SELECT COALESCE(SUM(T.importo), 0.0)
                                          FROM Transazioni T
-                                         WHERE T.id_conto = C.id_conto) + COALESCE(CAST(NULLIF(CAST(C.rettifica_saldo AS TEXT), '') AS NUMERIC), 0.0)
+                                         WHERE T.id_conto = C.id_conto) + COALESCE(C.rettifica_saldo, 0.0)
                                    END                                          AS saldo_calcolato
                         FROM Conti C
-                                 JOIN Utenti U ON C.id_utente = U.id_utente
-                                 JOIN Appartenenza_Famiglia AF ON U.id_utente = AF.id_utente
+                                 JOIN Appartenenza_Famiglia AF ON C.id_utente = AF.id_utente
                         WHERE AF.id_famiglia = %s
                           AND (C.nascosto IS NOT TRUE)
             """
@@ -70,7 +81,7 @@ def ottieni_riepilogo_conti_famiglia(id_famiglia, master_key_b64=None, id_utente
             # --- Shared Accounts ---
             # Fixed missing 'iban' in ContiCondivisi by selecting NULL
             query_condivisi = """
-                        SELECT 'Condiviso' as nome_enc_server, NULL as cognome_enc_server, 'Condiviso' as username,
+                        SELECT NULL as id_utente,
                                CC.nome_conto,
                                CC.tipo,
                                NULL as iban,
@@ -81,7 +92,7 @@ def ottieni_riepilogo_conti_famiglia(id_famiglia, master_key_b64=None, id_utente
                                              WHERE 0=1) -- Shared Asset support missing in current schema
                                    ELSE (SELECT COALESCE(SUM(TC.importo), 0.0)
                                          FROM TransazioniCondivise TC
-                                         WHERE TC.id_conto_condiviso = CC.id_conto_condiviso) + COALESCE(CAST(NULLIF(CAST(CC.rettifica_saldo AS TEXT), '') AS NUMERIC), 0.0)
+                                         WHERE TC.id_conto_condiviso = CC.id_conto_condiviso) + COALESCE(CC.rettifica_saldo, 0.0)
                                    END                                          AS saldo_calcolato
                         FROM ContiCondivisi CC
                         WHERE CC.id_famiglia = %s
@@ -95,19 +106,13 @@ def ottieni_riepilogo_conti_famiglia(id_famiglia, master_key_b64=None, id_utente
             condivisi = [dict(row) for row in cur.fetchall()]
             
             results = personali + condivisi
+            directory = risolvi_utenti(id_famiglia, {row['id_utente'] for row in personali})
             
             # Decrypt and Format
             for row in results:
-                # Decrypt Member Name
-                if row.get('username') == 'Condiviso':
-                     row['membro'] = "Condiviso"
-                else:
-                    n = decrypt_system_data(row.get('nome_enc_server'))
-                    c = decrypt_system_data(row.get('cognome_enc_server'))
-                    if n or c:
-                        row['membro'] = f"{n or ''} {c or ''}".strip()
-                    else:
-                        row['membro'] = row.get('username', 'Sconosciuto')
+                # Member Name (conti condivisi senza id_utente)
+                id_membro = row.pop('id_utente', None)
+                row['membro'] = _nome_membro(directory, id_membro) if id_membro is not None else "Condiviso"
                 
                 # Decrypt Account Name
                 if row.get('nome_conto'):
@@ -124,11 +129,6 @@ def ottieni_riepilogo_conti_famiglia(id_famiglia, master_key_b64=None, id_utente
                          decrypted_iban = _decrypt_if_key(row['iban'], master_key, crypto, silent=True)
                      row['iban'] = decrypted_iban or row['iban']
 
-                # Clean up encrypted/internal fields
-                row.pop('nome_enc_server', None)
-                row.pop('cognome_enc_server', None)
-                row.pop('username', None)
-            
             # Sort by Member, Type, Account Name
             results.sort(key=lambda x: (x.get('membro', ''), x.get('tipo', ''), x.get('nome_conto', '')))
             
@@ -150,7 +150,7 @@ def ottieni_dettaglio_portafogli_famiglia(id_famiglia, master_key_b64=None, id_u
             cur = con.cursor()
             # Removed Shared Investments UNION as Asset table does not support Shared Accounts yet (missing id_conto_condiviso)
             query = """
-                        SELECT U.nome_enc_server, U.cognome_enc_server, U.username,
+                        SELECT C.id_utente,
                                C.nome_conto,
                                A.ticker,
                                A.nome_asset,
@@ -162,27 +162,19 @@ def ottieni_dettaglio_portafogli_famiglia(id_famiglia, master_key_b64=None, id_u
                                ((A.quantita * A.prezzo_attuale_manuale) - (A.quantita * A.costo_iniziale_unitario)) AS profitto
                         FROM Conti C
                                  JOIN Asset A ON C.id_conto = A.id_conto
-                                 JOIN Utenti U ON C.id_utente = U.id_utente
-                                 JOIN Appartenenza_Famiglia AF ON U.id_utente = AF.id_utente
+                                 JOIN Appartenenza_Famiglia AF ON C.id_utente = AF.id_utente
                         WHERE AF.id_famiglia = %s
                           AND C.tipo = 'Investimento'
                           
-                        ORDER BY username, nome_conto, ticker
+                        ORDER BY C.id_utente, nome_conto, ticker
             """
             cur.execute(query, (id_famiglia,))
             
             results = [dict(row) for row in cur.fetchall()]
+            directory = risolvi_utenti(id_famiglia, {row['id_utente'] for row in results})
             for row in results:
-                # Decrypt Member
-                if row.get('username') == 'Condiviso':
-                    row['membro'] = "Condiviso"
-                else:
-                    n = decrypt_system_data(row.get('nome_enc_server'))
-                    c = decrypt_system_data(row.get('cognome_enc_server'))
-                    if n or c:
-                        row['membro'] = f"{n or ''} {c or ''}".strip()
-                    else:
-                        row['membro'] = row.get('username', 'Sconosciuto')
+                # Member (dalla directory)
+                row['membro'] = _nome_membro(directory, row.pop('id_utente', None))
                 
                 # Decrypt Account/Ticker/Asset
                 for field in ['nome_conto', 'ticker', 'nome_asset']:
@@ -193,11 +185,6 @@ def ottieni_dettaglio_portafogli_famiglia(id_famiglia, master_key_b64=None, id_u
                         if (not decrypted or decrypted == "[ENCRYPTED]" or decrypted == val) and family_key != master_key:
                             decrypted = _decrypt_if_key(val, master_key, crypto, silent=True)
                         row[field] = decrypted or val
-                
-                # Clean up encrypted/internal fields
-                row.pop('nome_enc_server', None)
-                row.pop('cognome_enc_server', None)
-                row.pop('username', None)
             
             return results
 
@@ -208,126 +195,113 @@ def ottieni_dettaglio_portafogli_famiglia(id_famiglia, master_key_b64=None, id_u
 
 
 
-def ottieni_transazioni_famiglia_per_export(id_famiglia, data_inizio, data_fine, master_key_b64=None, id_utente=None, filtra_utente_id=None):
-    try:
-        # Decryption setup
-        crypto, master_key = _get_crypto_and_key(master_key_b64)
-        family_key = None
-        if master_key and id_utente:
-            family_key = _get_family_key_for_user(id_famiglia, id_utente, master_key, crypto)
+def _elabora_riga_transazione_export(row, family_key, master_key, crypto, directory):
+    """Decripta e normalizza una riga di transazione per l'export. Ritorna None se da escludere."""
+    # Member (transazioni condivise senza id_utente)
+    id_membro = row.pop('id_utente', None)
+    row['membro'] = _nome_membro(directory, id_membro) if id_membro is not None else "Condiviso"
 
-        with get_db_connection() as con:
-            cur = con.cursor()
+    # Decrypt Fields (Account, Description, Category)
+    for field in ['nome_conto', 'descrizione', 'nome_categoria']:
+        val = row.get(field)
+        if val:
+            # Try Family Key
+            decrypted = _decrypt_if_key(val, family_key, crypto, silent=True)
             
-            # --- Personal Transactions ---
-            # Transazioni joins Sottocategorie joins Categorie
-            # If filtra_utente_id is set, restrict to that user only
-            sql_filtro_utente = ""
-            params_personali = [id_famiglia, data_inizio, data_fine]
+            # If failed (ENCRYPTED or None), and we have a different Master Key, try that
+            if (not decrypted or decrypted == "[ENCRYPTED]") and family_key != master_key:
+                 decrypted = _decrypt_if_key(val, master_key, crypto, silent=True)
             
-            if filtra_utente_id:
-                sql_filtro_utente = "AND U.id_utente = %s"
-                params_personali.append(filtra_utente_id)
+            # If still failed, keep original val (or handle below)
+            if decrypted and decrypted != "[ENCRYPTED]":
+                row[field] = decrypted
+            else:
+                row[field] = val # Revert to raw if decryption failed completely
+
+    # USER REQ: Eliminate 'Saldo iniziale'
+    if str(row.get('descrizione', '')).lower() == "saldo iniziale":
+        return None
+
+    # USER REQ: Rename encrypted giroconti
+    desc = row.get('descrizione', '')
+    if isinstance(desc, str):
+        if desc.startswith('gAAAA') or desc == "[ENCRYPTED]":
+            row['descrizione'] = "Giroconto (Criptato)"
+
+    return row
+
+
+def itera_transazioni_famiglia_per_export(id_famiglia, data_inizio, data_fine, master_key_b64=None, id_utente=None,
+                                          filtra_utente_id=None, chunk_size=_EXPORT_CHUNK_SIZE):
+    """
+    Generatore delle transazioni (personali + condivise) della famiglia per l'export,
+    già decriptate e ordinate per data crescente. Legge a blocchi tramite cursore
+    server-side, quindi la memoria non dipende dall'ampiezza del periodo.
+    """
+    # Decryption setup
+    crypto, master_key = _get_crypto_and_key(master_key_b64)
+    family_key = None
+    if master_key and id_utente:
+        family_key = _get_family_key_for_user(id_famiglia, id_utente, master_key, crypto)
+
+    # If filtra_utente_id is set, restrict to that user only
+    sql_filtro_utente = ""
+    params = [id_famiglia, data_inizio, data_fine]
+    if filtra_utente_id:
+        sql_filtro_utente = "AND C.id_utente = %s"
+        params.append(filtra_utente_id)
+    params.extend([id_famiglia, data_inizio, data_fine])
+
+    # Personal (Transazioni -> Sottocategorie -> Categorie) + Shared, ordinate lato DB
+    query = f"""
+                SELECT T.data,
+                       C.id_utente,
+                       C.nome_conto,
+                       T.descrizione,
+                       Cat.nome_categoria,
+                       T.importo
+                FROM Transazioni T
+                         JOIN Conti C ON T.id_conto = C.id_conto
+                         JOIN Appartenenza_Famiglia AF ON C.id_utente = AF.id_utente
+                         LEFT JOIN Sottocategorie S ON T.id_sottocategoria = S.id_sottocategoria
+                         LEFT JOIN Categorie Cat ON S.id_categoria = Cat.id_categoria
+                WHERE AF.id_famiglia = %s
+                  AND T.data BETWEEN %s AND %s
+                  AND C.tipo != 'Fondo Pensione'
+                  {sql_filtro_utente}
+                UNION ALL
+                SELECT TC.data,
+                       NULL as id_utente,
+                       CC.nome_conto,
+                       TC.descrizione,
+                       Cat.nome_categoria,
+                       TC.importo
+                FROM TransazioniCondivise TC
+                         JOIN ContiCondivisi CC ON TC.id_conto_condiviso = CC.id_conto_condiviso
+                         LEFT JOIN Sottocategorie S ON TC.id_sottocategoria = S.id_sottocategoria
+                         LEFT JOIN Categorie Cat ON S.id_categoria = Cat.id_categoria
+                WHERE CC.id_famiglia = %s
+                  AND TC.data BETWEEN %s AND %s
+                ORDER BY data ASC
+    """
+
+    # Le transazioni personali sono solo di membri attuali: basta la directory della famiglia
+    directory = risolvi_utenti(id_famiglia, ())
+
+    with get_db_connection() as con:
+        for chunk in iter_query_chunks(con, query, tuple(params), chunk_size):
+            for row in chunk:
+                row = _elabora_riga_transazione_export(dict(row), family_key, master_key, crypto, directory)
+                if row is not None:
+                    yield row
 
-            query_personali = f"""
-                        SELECT T.data,
-                               U.nome_enc_server, U.cognome_enc_server, U.username,
-                               C.nome_conto,
-                               T.descrizione,
-                               Cat.nome_categoria,
-                               T.importo
-                        FROM Transazioni T
-                                 JOIN Conti C ON T.id_conto = C.id_conto
-                                 JOIN Utenti U ON C.id_utente = U.id_utente
-                                 JOIN Appartenenza_Famiglia AF ON U.id_utente = AF.id_utente
-                                 LEFT JOIN Sottocategorie S ON T.id_sottocategoria = S.id_sottocategoria
-                                 LEFT JOIN Categorie Cat ON S.id_categoria = Cat.id_categoria
-                        WHERE AF.id_famiglia = %s
-                          AND T.data BETWEEN %s AND %s
-                          AND C.tipo != 'Fondo Pensione'
-                          {sql_filtro_utente}
-            """
-            
-            # --- Shared Transactions ---
-            query_condivise = """
-                        SELECT TC.data,
-                               'Condiviso' as nome_enc_server, NULL as cognome_enc_server, 'Condiviso' as username,
-                               CC.nome_conto,
-                               TC.descrizione,
-                               Cat.nome_categoria,
-                               TC.importo
-                        FROM TransazioniCondivise TC
-                                 JOIN ContiCondivisi CC ON TC.id_conto_condiviso = CC.id_conto_condiviso
-                                 LEFT JOIN Sottocategorie S ON TC.id_sottocategoria = S.id_sottocategoria
-                                 LEFT JOIN Categorie Cat ON S.id_categoria = Cat.id_categoria
-                        WHERE CC.id_famiglia = %s
-                          AND TC.data BETWEEN %s AND %s
-            """
-            
-            # Exec Personal
-            cur.execute(query_personali, tuple(params_personali))
-            personali = [dict(row) for row in cur.fetchall()]
-            
-            # Exec Shared
-            cur.execute(query_condivise, (id_famiglia, data_inizio, data_fine))
-            condivise = [dict(row) for row in cur.fetchall()]
-            
-            # Combine
-            results = personali + condivise
-            
-            # Decrypt loop & Filter
-            final_results = []
-            for row in results:
-                # Decrypt Member
-                if row.get('username') == 'Condiviso':
-                     row['membro'] = "Condiviso"
-                else:
-                    n = decrypt_system_data(row.get('nome_enc_server'))
-                    c = decrypt_system_data(row.get('cognome_enc_server'))
-                    if n or c:
-                        row['membro'] = f"{n or ''} {c or ''}".strip()
-                    else:
-                        row['membro'] = row.get('username', 'Sconosciuto')
-
-                # Decrypt Fields (Account, Description, Category)
-                for field in ['nome_conto', 'descrizione', 'nome_categoria']:
-                    val = row.get(field)
-                    if val:
-                        # Try Family Key
-                        decrypted = _decrypt_if_key(val, family_key, crypto, silent=True)
-                        
-                        # If failed (ENCRYPTED or None), and we have a different Master Key, try that
-                        if (not decrypted or decrypted == "[ENCRYPTED]") and family_key != master_key:
-                             decrypted = _decrypt_if_key(val, master_key, crypto, silent=True)
-                        
-                        # If still failed, keep original val (or handle below)
-                        if decrypted and decrypted != "[ENCRYPTED]":
-                            row[field] = decrypted
-                        else:
-                            row[field] = val # Revert to raw if decryption failed completely
-
-                # USER REQ: Eliminate 'Saldo iniziale'
-                if str(row.get('descrizione', '')).lower() == "saldo iniziale":
-                    continue
-
-                # USER REQ: Rename encrypted giroconti
-                desc = row.get('descrizione', '')
-                if isinstance(desc, str):
-                    if desc.startswith('gAAAA') or desc == "[ENCRYPTED]":
-                        row['descrizione'] = "Giroconto (Criptato)"
-
-                # Clean up encrypted/internal fields
-                row.pop('nome_enc_server', None)
-                row.pop('cognome_enc_server', None)
-                row.pop('username', None)
-                
-                final_results.append(row)
-            
-            # USER REQ: Sort Oldest to Newest (Ascending)
-            final_results.sort(key=lambda x: x['data'], reverse=False)
-            
-            return final_results
 
+def ottieni_transazioni_famiglia_per_export(id_famiglia, data_inizio, data_fine, master_key_b64=None, id_utente=None, filtra_utente_id=None):
+    try:
+        # USER REQ: Sort Oldest to Newest (Ascending) - ordinamento fatto lato DB
+        return list(itera_transazioni_famiglia_per_export(
+            id_famiglia, data_inizio, data_fine, master_key_b64, id_utente, filtra_utente_id
+        ))
     except Exception as e:
         print(f"[ERRORE] Errore generico durante il recupero transazioni famiglia per export: {e}")
         return []
@@ -345,27 +319,22 @@ def ottieni_dati_immobili_famiglia_per_export(id_famiglia, master_key_b64=None,
             query = """
                 SELECT I.nome as nome_immobile, I.via || ', ' || I.citta as indirizzo, I.valore_attuale, 
                        P.importo_residuo as mutuo_residuo, I.nuda_proprieta,
-                       QI.id_utente, U.nome_enc_server, U.cognome_enc_server, U.username,
+                       QI.id_utente,
                        QI.percentuale
                 FROM Immobili I
                 LEFT JOIN Prestiti P ON I.id_prestito_collegato = P.id_prestito
                 LEFT JOIN QuoteImmobili QI ON I.id_immobile = QI.id_immobile
-                LEFT JOIN Utenti U ON QI.id_utente = U.id_utente
                 WHERE I.id_famiglia = %s
                 ORDER BY I.nome
             """
             cur.execute(query, (id_famiglia,))
             
             results = [dict(row) for row in cur.fetchall()]
+            directory = risolvi_utenti(id_famiglia, {row['id_utente'] for row in results})
             for row in results:
-                # Decrypt Member
-                if row.get('username'):
-                    n = decrypt_system_data(row.get('nome_enc_server'))
-                    c = decrypt_system_data(row.get('cognome_enc_server'))
-                    if n or c:
-                        row['comproprietario'] = f"{n or ''} {c or ''}".strip()
-                    else:
-                        row['comproprietario'] = row.get('username', 'Sconosciuto')
+                # Member (dalla directory)
+                if row.get('id_utente') is not None:
+                    row['comproprietario'] = _nome_membro(directory, row['id_utente'])
                 else:
                     row['comproprietario'] = "Nessuno/Non assegnato"
                     
@@ -377,9 +346,6 @@ def ottieni_dati_immobili_famiglia_per_export(id_famiglia, master_key_b64=None,
                         row[field] = decrypted or val
                 
                 # Clean up
-                row.pop('nome_enc_server', None)
-                row.pop('cognome_enc_server', None)
-                row.pop('username', None)
                 row.pop('id_utente', None)
                         
             return results
@@ -399,26 +365,21 @@ def ottieni_dati_prestiti_famiglia_per_export(id_famiglia, master_key_b64=None,
             # Fixed 'data_scadenza' missing
             query = """
                 SELECT P.nome, P.importo_finanziato as importo_totale, P.importo_residuo as importo_rimanente, P.data_inizio,
-                       QP.id_utente, U.nome_enc_server, U.cognome_enc_server, U.username,
+                       QP.id_utente,
                        QP.percentuale
                 FROM Prestiti P
                 LEFT JOIN QuotePrestiti QP ON P.id_prestito = QP.id_prestito
-                LEFT JOIN Utenti U ON QP.id_utente = U.id_utente
                 WHERE P.id_famiglia = %s
                 ORDER BY P.nome
             """
             cur.execute(query, (id_famiglia,))
             
             results = [dict(row) for row in cur.fetchall()]
+            directory = risolvi_utenti(id_famiglia, {row['id_utente'] for row in results})
             for row in results:
-                 # Decrypt Member
-                if row.get('username'):
-                    n = decrypt_system_data(row.get('nome_enc_server'))
-                    c = decrypt_system_data(row.get('cognome_enc_server'))
-                    if n or c:
-                        row['intestatario'] = f"{n or ''} {c or ''}".strip()
-                    else:
-                        row['intestatario'] = row.get('username', 'Sconosciuto')
+                # Member (dalla directory)
+                if row.get('id_utente') is not None:
+                    row['intestatario'] = _nome_membro(directory, row['id_utente'])
                 else:
                     row['intestatario'] = "Nessuno/Non assegnato"
                 
@@ -428,9 +389,6 @@ def ottieni_dati_prestiti_famiglia_per_export(id_famiglia, master_key_b64=None,
                      row['nome'] = decrypted or row['nome']
                 
                 # Clean up
-                row.pop('nome_enc_server', None)
-                row.pop('cognome_enc_server', None)
-                row.pop('username', None)
                 row.pop('id_utente', None)
             
             return results
@@ -450,13 +408,12 @@ def ottieni_dati_spese_fisse_famiglia_per_export(id_famiglia, master_key_b64=Non
             # SpeseFisse uses 'id_conto_personale_addebito' and 'id_conto_condiviso_addebito'
             query = """
                 SELECT SF.nome, SF.importo, SF.giorno_addebito, SF.attiva, SF.addebito_automatico,
-                       SF.id_conto_personale_addebito, C.nome_conto as nome_conto_personale, U.nome_enc_server, U.cognome_enc_server, U.username,
+                       SF.id_conto_personale_addebito, C.nome_conto as nome_conto_personale, C.id_utente,
                        SF.id_conto_condiviso_addebito, CC.nome_conto as nome_conto_condiviso,
                        Cat.nome_categoria,
                        SC.nome_sottocategoria
                 FROM SpeseFisse SF
                 LEFT JOIN Conti C ON SF.id_conto_personale_addebito = C.id_conto
-                LEFT JOIN Utenti U ON C.id_utente = U.id_utente
                 LEFT JOIN ContiCondivisi CC ON SF.id_conto_condiviso_addebito = CC.id_conto_condiviso
                 LEFT JOIN Categorie Cat ON SF.id_categoria = Cat.id_categoria
                 LEFT JOIN Sottocategorie SC ON SF.id_sottocategoria = SC.id_sottocategoria
@@ -466,21 +423,8 @@ def ottieni_dati_spese_fisse_famiglia_per_export(id_famiglia, master_key_b64=Non
             cur.execute(query, (id_famiglia,))
             
             results = [dict(row) for row in cur.fetchall()]
+            directory = risolvi_utenti(id_famiglia, {row['id_utente'] for row in results})
             for row in results:
-                # Resolve Account Name and Owner
-                if row.get('id_conto_personale_addebito'):
-                     # Personal Account
-                    # Decrypt Member
-                    n = decrypt_system_data(row.get('nome_enc_server'))
-                    c = decrypt_system_data(row.get('cognome_enc_server'))
-                    if n or c:
-                        row['conto_addebito'] = f"{row.get('nome_conto_personale')} ({n or ''} {c or ''})".strip()
-                    else:
-                        row['conto_addebito'] = f"{row.get('nome_conto_personale')} ({row.get('username', '?')})"
-                else:
-                    # Shared Account
-                    row['conto_addebito'] = f"{row.get('nome_conto_condiviso')} (Condiviso)"
-                
                 # Decrypt Expense Name
                 if row.get('nome'):
                      decrypted = _decrypt_if_key(row['nome'], family_key, crypto, silent=True)
@@ -495,10 +439,9 @@ def ottieni_dati_spese_fisse_famiglia_per_export(id_famiglia, master_key_b64=Non
                         decrypted_conto = _decrypt_if_key(conto_name, master_key, crypto, silent=True)
                     conto_name = decrypted_conto or conto_name
                 
+                # Account Name and Owner
                 if row.get('id_conto_personale_addebito'):
-                     n = decrypt_system_data(row.get('nome_enc_server'))
-                     c = decrypt_system_data(row.get('cognome_enc_server'))
-                     owner = f"{n or ''} {c or ''}".strip() or row.get('username')
+                     owner = _nome_membro(directory, row.get('id_utente'), default='?')
                      row['conto_addebito'] = f"{conto_name} ({owner})"
                 else:
                     row['conto_addebito'] = f"{conto_name} (Condiviso)"
@@ -509,9 +452,7 @@ def ottieni_dati_spese_fisse_famiglia_per_export(id_famiglia, master_key_b64=Non
                      row['nome_categoria'] = decrypted or row['nome_categoria']
                 
                 # Clean up
-                row.pop('nome_enc_server', None)
-                row.pop('cognome_enc_server', None)
-                row.pop('username', None)
+                row.pop('id_utente', None)
                 row.pop('id_conto_personale_addebito', None)
                 row.pop('id_conto_condiviso_addebito', None)
                 row.pop('nome_conto_personale', None)
@@ -522,167 +463,245 @@ def ottieni_dati_spese_fisse_famiglia_per_export(id_famiglia, master_key_b64=Non
         print(f"[ERRORE] Errore export spese fisse: {e}")
         return []
 
+# --- Backup completo (streaming) ---
+_BACKUP_CHUNK_SIZE = 500
+
+_SQL_UTENTI_FAMIGLIA = "SELECT id_utente FROM Appartenenza_Famiglia WHERE id_famiglia = %s"
+_SQL_CONTI_FAMIGLIA = f"SELECT id_conto FROM Conti WHERE id_utente IN ({_SQL_UTENTI_FAMIGLIA})"
+_SQL_PRESTITI_FAMIGLIA = "SELECT id_prestito FROM Prestiti WHERE id_famiglia = %s"
+
+
+def _backup_json_default(obj):
+    """Serializzatore JSON per i tipi restituiti dal DB (date, Decimal, bytes)."""
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(obj)).decode('ascii')
+    raise TypeError(f"Tipo non serializzabile: {type(obj).__name__}")
+
+
+def _tabelle_backup_famiglia(id_famiglia, family_key, crypto):
+    """
+    Definisce le tabelle del backup completo come (nome, query, parametri, trasformazione).
+    Le relazioni sono risolte con subquery, così nessuna lista di ID viene materializzata.
+    """
+    def dec(val):
+        return _decrypt_if_key(val, family_key, crypto, silent=True) if family_key else val
+
+    def t_famiglia(row):
+        if family_key:
+            row['nome_famiglia'] = dec(row.get('nome_famiglia')) or row['nome_famiglia']
+        return row
+
+    def t_utente(u):
+        if u.get('username_enc'): u['username'] = decrypt_system_data(u['username_enc']) or u['username']
+        if u.get('email_enc'): u['email'] = decrypt_system_data(u['email_enc']) or u['email']
+        if u.get('nome_enc_server'): u['nome'] = decrypt_system_data(u['nome_enc_server']) or u['nome']
+        if u.get('cognome_enc_server'): u['cognome'] = decrypt_system_data(u['cognome_enc_server']) or u['cognome']
+        return u
+
+    def t_campi_encrypted(campi):
+        def _t(row):
+            if family_key:
+                for f in campi:
+                    if row.get(f): row[f.replace('_encrypted', '')] = dec(row[f])
+            return row
+        return _t
+
+    def t_campi(campi):
+        def _t(row):
+            if family_key:
+                for f in campi:
+                    row[f] = dec(row[f])
+            return row
+        return _t
+
+    fam = (id_famiglia,)
+    return [
+        ("Famiglie", "SELECT * FROM Famiglie WHERE id_famiglia = %s", fam, t_famiglia),
+        ("Appartenenza_Famiglia", "SELECT * FROM Appartenenza_Famiglia WHERE id_famiglia = %s", fam, None),
+        ("Utenti", f"SELECT * FROM Utenti WHERE id_utente IN ({_SQL_UTENTI_FAMIGLIA})", fam, t_utente),
+        ("Conti", f"SELECT * FROM Conti WHERE id_utente IN ({_SQL_UTENTI_FAMIGLIA})", fam, None),
+        ("Carte", f"SELECT * FROM Carte WHERE id_utente IN ({_SQL_UTENTI_FAMIGLIA})", fam,
+         t_campi_encrypted(['massimale_encrypted', 'giorno_addebito_encrypted', 'spesa_tenuta_encrypted',
+                            'soglia_azzeramento_encrypted', 'giorno_addebito_tenuta_encrypted'])),
+        ("ContiCondivisi", "SELECT * FROM ContiCondivisi WHERE id_famiglia = %s", fam, None),
+        ("Asset", f"SELECT * FROM Asset WHERE id_conto IN ({_SQL_CONTI_FAMIGLIA})", fam, None),
+        ("Storico_Asset", f"SELECT * FROM Storico_Asset WHERE id_conto IN ({_SQL_CONTI_FAMIGLIA})", fam, None),
+        ("Transazioni", f"SELECT * FROM Transazioni WHERE id_conto IN ({_SQL_CONTI_FAMIGLIA})", fam, None),
+        ("TransazioniCondivise", "SELECT * FROM TransazioniCondivise WHERE id_conto_condiviso IN (SELECT id_conto_condiviso FROM ContiCondivisi WHERE id_famiglia = %s)", fam, None),
+        ("Prestiti", "SELECT * FROM Prestiti WHERE id_famiglia = %s", fam, None),
+        ("PianoAmmortamento", f"SELECT * FROM PianoAmmortamento WHERE id_prestito IN ({_SQL_PRESTITI_FAMIGLIA})", fam, None),
+        ("StoricoPagamentiRate", f"SELECT * FROM StoricoPagamentiRate WHERE id_prestito IN ({_SQL_PRESTITI_FAMIGLIA})", fam, None),
+        ("QuotePrestiti", f"SELECT * FROM QuotePrestiti WHERE id_prestito IN ({_SQL_PRESTITI_FAMIGLIA})", fam, None),
+        ("Immobili", "SELECT * FROM Immobili WHERE id_famiglia = %s", fam, None),
+        ("QuoteImmobili", "SELECT * FROM QuoteImmobili WHERE id_immobile IN (SELECT id_immobile FROM Immobili WHERE id_famiglia = %s)", fam, None),
+        ("SpeseFisse", "SELECT * FROM SpeseFisse WHERE id_famiglia = %s", fam, None),
+        ("Categorie", "SELECT * FROM Categorie WHERE id_famiglia = %s", fam, None),
+        ("Sottocategorie", "SELECT * FROM Sottocategorie WHERE id_categoria IN (SELECT id_categoria FROM Categorie WHERE id_famiglia = %s)", fam, None),
+        ("Budget", "SELECT * FROM Budget WHERE id_famiglia = %s", fam, t_campi(['importo_limite'])),
+        ("Budget_Storico", "SELECT * FROM Budget_Storico WHERE id_famiglia = %s", fam, t_campi(['importo_limite', 'importo_speso'])),
+        ("Salvadanai", "SELECT * FROM Salvadanai WHERE id_famiglia = %s", fam, t_campi(['importo_assegnato'])),
+        ("Obiettivi_Risparmio", "SELECT * FROM Obiettivi_Risparmio WHERE id_famiglia = %s", fam, t_campi(['importo_obiettivo'])),
+        ("Contatti", f"SELECT * FROM Contatti WHERE id_famiglia = %s OR id_utente IN ({_SQL_UTENTI_FAMIGLIA})", (id_famiglia, id_famiglia),
+         t_campi_encrypted(['nome_encrypted', 'cognome_encrypted', 'societa_encrypted', 'iban_encrypted',
+                            'email_encrypted', 'telefono_encrypted'])),
+        ("Configurazioni", "SELECT * FROM Configurazioni WHERE id_famiglia = %s", fam, None),
+    ]
+
+
+def _nomi_tabelle_backup(id_famiglia):
+    """Nomi delle tabelle del backup, nell'ordine in cui vengono esportate."""
+    return [tabella for tabella, _, _, _ in _tabelle_backup_famiglia(id_famiglia, None, None)]
+
+
+def itera_backup_famiglia(id_famiglia, master_key_b64=None, id_utente=None, chunk_size=_BACKUP_CHUNK_SIZE):
+    """
+    Generatore del backup completo della famiglia: produce tuple (tabella, riga) leggendo
+    ogni tabella a blocchi tramite cursore server-side. La memoria occupata è limitata
+    a chunk_size righe indipendentemente dalla dimensione della famiglia.
+    Non produce nulla se la famiglia non esiste.
+    """
+    crypto, master_key = _get_crypto_and_key(master_key_b64)
+    family_key = None
+    if master_key and id_utente:
+        family_key = _get_family_key_for_user(id_famiglia, id_utente, master_key, crypto)
+
+    with get_db_connection() as con:
+        for tabella, query, params, trasforma in _tabelle_backup_famiglia(id_famiglia, family_key, crypto):
+            trovate = False
+            for chunk in iter_query_chunks(con, query, params, chunk_size):
+                for row in chunk:
+                    trovate = True
+                    row = dict(row)
+                    yield tabella, (trasforma(row) if trasforma else row)
+            if tabella == "Famiglie" and not trovate:
+                return
+
+
+def scrivi_backup_famiglia(id_famiglia, master_key_b64=None, id_utente=None, chunk_size=_BACKUP_CHUNK_SIZE):
+    """
+    Scrive il backup completo della famiglia in formato JSON Lines compresso (gzip)
+    su un file temporaneo spooled (in RAM fino a 8 MB, poi su disco).
+    Ogni riga è {"tabella": ..., "riga": {...}}; la prima contiene i metadati,
+    con l'elenco di tutte le tabelle esportate (anche quelle senza righe).
+    Si rilegge con leggi_backup_famiglia().
+
+    Returns:
+        (file, info) con il file riposizionato all'inizio e info = {nome_famiglia, righe},
+        oppure (None, None) se la famiglia non esiste o in caso di errore.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024, mode='w+b')
+    info = {"nome_famiglia": None, "righe": {}}
+    try:
+        with gzip.GzipFile(fileobj=spool, mode='wb') as gz:
+            metadata = {
+                "id_famiglia": id_famiglia,
+                "data_backup": datetime.datetime.now().isoformat(),
+                "versione_db": ottieni_versione_db(),
+                "formato": "jsonl",
+                "tabelle": _nomi_tabelle_backup(id_famiglia)
+            }
+            gz.write((json.dumps({"metadata": metadata}) + "\n").encode('utf-8'))
+            for tabella, row in itera_backup_famiglia(id_famiglia, master_key_b64, id_utente, chunk_size):
+                if tabella == "Famiglie":
+                    info["nome_famiglia"] = row.get('nome_famiglia')
+                info["righe"][tabella] = info["righe"].get(tabella, 0) + 1
+                line = json.dumps({"tabella": tabella, "riga": row}, default=_backup_json_default, ensure_ascii=False)
+                gz.write((line + "\n").encode('utf-8'))
+
+        if not info["righe"].get("Famiglie"):
+            spool.close()
+            return None, None
+        spool.seek(0)
+        return spool, info
+    except Exception as e:
+        print(f"[ERRORE] Backup dati (streaming) fallito: {e}")
+        import traceback
+        traceback.print_exc()
+        spool.close()
+        return None, None
+
+
 def ottieni_backup_completo_famiglia(id_famiglia, master_key_b64=None, id_utente=None):
     """
     Raccoglie TUTTI i dati della famiglia (e dei suoi membri) per un backup completo.
     Decripta i dati sensibili se viene fornita la master_key.
+    Per famiglie grandi preferire scrivi_backup_famiglia(), che non materializza il dict.
     """
     try:
-        crypto, master_key = _get_crypto_and_key(master_key_b64)
-        family_key = None
-        if master_key and id_utente:
-            family_key = _get_family_key_for_user(id_famiglia, id_utente, master_key, crypto)
-
         backup = {
             "metadata": {
                 "id_famiglia": id_famiglia,
                 "data_backup": datetime.datetime.now().isoformat(),
                 "versione_db": ottieni_versione_db()
             },
-            "tabelle": {}
+            # Tutte le tabelle, anche vuote: nel backup compaiono come []
+            "tabelle": {tabella: [] for tabella in _nomi_tabelle_backup(id_famiglia)}
         }
+        for tabella, row in itera_backup_famiglia(id_famiglia, master_key_b64, id_utente):
+            backup["tabelle"][tabella].append(row)
 
-        with get_db_connection() as con:
-            cur = con.cursor()
-
-            # 1. Famiglia
-            cur.execute("SELECT * FROM Famiglie WHERE id_famiglia = %s", (id_famiglia,))
-            fam = cur.fetchone()
-            if not fam: return None
-            fam_dict = dict(fam)
-            if family_key:
-                decrypted_nome = _decrypt_if_key(fam_dict.get('nome_famiglia'), family_key, crypto, silent=True)
-                fam_dict['nome_famiglia'] = decrypted_nome or fam_dict['nome_famiglia']
-            backup["tabelle"]["Famiglie"] = [fam_dict]
-
-            # 2. Membri
-            cur.execute("SELECT * FROM Appartenenza_Famiglia WHERE id_famiglia = %s", (id_famiglia,))
-            membri = [dict(row) for row in cur.fetchall()]
-            backup["tabelle"]["Appartenenza_Famiglia"] = membri
-            id_utenti = [m['id_utente'] for m in membri]
-
-            # 3. Utenti
-            if id_utenti:
-                cur.execute("SELECT * FROM Utenti WHERE id_utente = ANY(%s)", (id_utenti,))
-                utenti = [dict(row) for row in cur.fetchall()]
-                for u in utenti:
-                    if u.get('username_enc'): u['username'] = decrypt_system_data(u['username_enc']) or u['username']
-                    if u.get('email_enc'): u['email'] = decrypt_system_data(u['email_enc']) or u['email']
-                    if u.get('nome_enc_server'): u['nome'] = decrypt_system_data(u['nome_enc_server']) or u['nome']
-                    if u.get('cognome_enc_server'): u['cognome'] = decrypt_system_data(u['cognome_enc_server']) or u['cognome']
-                backup["tabelle"]["Utenti"] = utenti
-
-            # 4. Conti & Carte
-            if id_utenti:
-                cur.execute("SELECT * FROM Conti WHERE id_utente = ANY(%s)", (id_utenti,))
-                backup["tabelle"]["Conti"] = [dict(row) for row in cur.fetchall()]
-                
-                cur.execute("SELECT * FROM Carte WHERE id_utente = ANY(%s)", (id_utenti,))
-                carte = [dict(row) for row in cur.fetchall()]
-                for c in carte:
-                    if family_key:
-                        for f in ['massimale_encrypted', 'giorno_addebito_encrypted', 'spesa_tenuta_encrypted', 'soglia_azzeramento_encrypted', 'giorno_addebito_tenuta_encrypted']:
-                            if c.get(f): c[f.replace('_encrypted', '')] = _decrypt_if_key(c[f], family_key, crypto, silent=True)
-                backup["tabelle"]["Carte"] = carte
-
-            cur.execute("SELECT * FROM ContiCondivisi WHERE id_famiglia = %s", (id_famiglia,))
-            backup["tabelle"]["ContiCondivisi"] = [dict(row) for row in cur.fetchall()]
-
-            # 5. Asset & Storico
-            if id_utenti:
-                cur.execute("SELECT * FROM Asset WHERE id_conto IN (SELECT id_conto FROM Conti WHERE id_utente = ANY(%s))", (id_utenti,))
-                backup["tabelle"]["Asset"] = [dict(row) for row in cur.fetchall()]
-                cur.execute("SELECT * FROM Storico_Asset WHERE id_conto IN (SELECT id_conto FROM Conti WHERE id_utente = ANY(%s))", (id_utenti,))
-                backup["tabelle"]["Storico_Asset"] = [dict(row) for row in cur.fetchall()]
-
-            # 6. Transazioni
-            if id_utenti:
-                cur.execute("SELECT * FROM Transazioni WHERE id_conto IN (SELECT id_conto FROM Conti WHERE id_utente = ANY(%s))", (id_utenti,))
-                backup["tabelle"]["Transazioni"] = [dict(row) for row in cur.fetchall()]
-
-            cur.execute("SELECT * FROM TransazioniCondivise WHERE id_conto_condiviso IN (SELECT id_conto_condiviso FROM ContiCondivisi WHERE id_famiglia = %s)", (id_famiglia,))
-            backup["tabelle"]["TransazioniCondivise"] = [dict(row) for row in cur.fetchall()]
-
-            # 7. Prestiti & Ammortamento
-            cur.execute("SELECT * FROM Prestiti WHERE id_famiglia = %s", (id_famiglia,))
-            prestiti = [dict(row) for row in cur.fetchall()]
-            backup["tabelle"]["Prestiti"] = prestiti
-            id_prestiti = [p['id_prestito'] for p in prestiti]
-            if id_prestiti:
-                cur.execute("SELECT * FROM PianoAmmortamento WHERE id_prestito = ANY(%s)", (id_prestiti,))
-                backup["tabelle"]["PianoAmmortamento"] = [dict(row) for row in cur.fetchall()]
-                cur.execute("SELECT * FROM StoricoPagamentiRate WHERE id_prestito = ANY(%s)", (id_prestiti,))
-                backup["tabelle"]["StoricoPagamentiRate"] = [dict(row) for row in cur.fetchall()]
-                cur.execute("SELECT * FROM QuotePrestiti WHERE id_prestito = ANY(%s)", (id_prestiti,))
-                backup["tabelle"]["QuotePrestiti"] = [dict(row) for row in cur.fetchall()]
-
-            # 8. Immobili
-            cur.execute("SELECT * FROM Immobili WHERE id_famiglia = %s", (id_famiglia,))
-            immobili = [dict(row) for row in cur.fetchall()]
-            backup["tabelle"]["Immobili"] = immobili
-            id_immobili = [i['id_immobile'] for i in immobili]
-            if id_immobili:
-                cur.execute("SELECT * FROM QuoteImmobili WHERE id_immobile = ANY(%s)", (id_immobili,))
-                backup["tabelle"]["QuoteImmobili"] = [dict(row) for row in cur.fetchall()]
-
-            # 9. Spese Fisse
-            cur.execute("SELECT * FROM SpeseFisse WHERE id_famiglia = %s", (id_famiglia,))
-            backup["tabelle"]["SpeseFisse"] = [dict(row) for row in cur.fetchall()]
-
-            # 1 category and subcategories
-            cur.execute("SELECT * FROM Categorie WHERE id_famiglia = %s", (id_famiglia,))
-            cats = [dict(row) for row in cur.fetchall()]
-            backup["tabelle"]["Categorie"] = cats
-            id_cats = [c['id_categoria'] for c in cats]
-            if id_cats:
-                cur.execute("SELECT * FROM Sottocategorie WHERE id_categoria = ANY(%s)", (id_cats,))
-                backup["tabelle"]["Sottocategorie"] = [dict(row) for row in cur.fetchall()]
-
-            # 10. Budget & Storico
-            cur.execute("SELECT * FROM Budget WHERE id_famiglia = %s", (id_famiglia,))
-            budgets = [dict(row) for row in cur.fetchall()]
-            for b in budgets:
-                if family_key: b['importo_limite'] = _decrypt_if_key(b['importo_limite'], family_key, crypto, silent=True)
-            backup["tabelle"]["Budget"] = budgets
-
-            cur.execute("SELECT * FROM Budget_Storico WHERE id_famiglia = %s", (id_famiglia,))
-            b_storico = [dict(row) for row in cur.fetchall()]
-            for bs in b_storico:
-                if family_key:
-                    bs['importo_limite'] = _decrypt_if_key(bs['importo_limite'], family_key, crypto, silent=True)
-                    bs['importo_speso'] = _decrypt_if_key(bs['importo_speso'], family_key, crypto, silent=True)
-            backup["tabelle"]["Budget_Storico"] = b_storico
-
-            # 11. Salvadanai & Obiettivi
-            cur.execute("SELECT * FROM Salvadanai WHERE id_famiglia = %s", (id_famiglia,))
-            salvadanai = [dict(row) for row in cur.fetchall()]
-            for s in salvadanai:
-                if family_key: s['importo_assegnato'] = _decrypt_if_key(s['importo_assegnato'], family_key, crypto, silent=True)
-            backup["tabelle"]["Salvadanai"] = salvadanai
-
-            cur.execute("SELECT * FROM Obiettivi_Risparmio WHERE id_famiglia = %s", (id_famiglia,))
-            obiettivi = [dict(row) for row in cur.fetchall()]
-            for o in obiettivi:
-                if family_key: o['importo_obiettivo'] = _decrypt_if_key(o['importo_obiettivo'], family_key, crypto, silent=True)
-            backup["tabelle"]["Obiettivi_Risparmio"] = obiettivi
-            
-            # 12. Contatti
-            cur.execute("SELECT * FROM Contatti WHERE id_famiglia = %s OR id_utente = ANY(%s)", (id_famiglia, id_utenti))
-            contatti = [dict(row) for row in cur.fetchall()]
-            for co in contatti:
-                if family_key:
-                    for f in ['nome_encrypted', 'cognome_encrypted', 'societa_encrypted', 'iban_encrypted', 'email_encrypted', 'telefono_encrypted']:
-                        if co.get(f): co[f.replace('_encrypted', '')] = _decrypt_if_key(co[f], family_key, crypto, silent=True)
-            backup["tabelle"]["Contatti"] = contatti
-
-            # 13. Configurazioni
-            cur.execute("SELECT * FROM Configurazioni WHERE id_famiglia = %s", (id_famiglia,))
-            backup["tabelle"]["Configurazioni"] = [dict(row) for row in cur.fetchall()]
-
-            return backup
+        if not backup["tabelle"].get("Famiglie"):
+            return None
+        return backup
     except Exception as e:
         print(f"[ERRORE] Backup dati fallito: {e}")
         import traceback
         traceback.print_exc()
         return None
 
+
+def leggi_backup_famiglia(sorgente):
+    """
+    Legge un file di backup e lo restituisce nella forma di ottieni_backup_completo_famiglia
+    ({"metadata": ..., "tabelle": {nome: [righe]}}).
+    Accetta sia il formato JSON Lines compresso di scrivi_backup_famiglia (.jsonl.gz)
+    sia il JSON unico dei backup precedenti (.json), come percorso, bytes o file binario.
+
+    Returns:
+        Il dizionario del backup, oppure None se il file non è un backup valido.
+    """
+    try:
+        if isinstance(sorgente, (bytes, bytearray)):
+            dati = bytes(sorgente)
+        elif isinstance(sorgente, (str, os.PathLike)):
+            with open(sorgente, 'rb') as f:
+                dati = f.read()
+        else:
+            dati = sorgente.read()
+
+        if dati[:2] == b'\x1f\x8b':
+            dati = gzip.decompress(dati)
+        testo = dati.decode('utf-8')
+
+        # Formato precedente: un unico oggetto JSON
+        try:
+            backup = json.loads(testo)
+        except ValueError:
+            backup = None
+        if isinstance(backup, dict) and "tabelle" in backup:
+            return backup
+
+        backup = {"metadata": None, "tabelle": {}}
+        for numero, linea in enumerate(testo.splitlines(), start=1):
+            if not linea.strip():
+                continue
+            record = json.loads(linea)
+            if "metadata" in record:
+                backup["metadata"] = record["metadata"]
+                for tabella in record["metadata"].get("tabelle", []):
+                    backup["tabelle"].setdefault(tabella, [])
+            elif "tabella" in record:
+                backup["tabelle"].setdefault(record["tabella"], []).append(record.get("riga"))
+            else:
+                raise ValueError(f"riga {numero} non riconosciuta")
+
+        if backup["metadata"] is None or not backup["tabelle"].get("Famiglie"):
+            return None
+        return backup
+    except Exception as e:
+        print(f"[ERRORE] Lettura backup fallita: {e}")
+        return None
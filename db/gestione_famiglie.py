@@ -22,6 +22,8 @@ from db.crypto_helpers import (
     SERVER_SECRET_KEY,
     crypto as _crypto_instance
 )
+from db.directory_membri import ottieni_directory_famiglia, risolvi_utenti, invalida_directory_membri
+from db.directory_famiglie import aggiorna_directory_famiglie, aggiorna_nome_directory
 
 def aggiungi_utente_a_famiglia(id_utente: str, id_famiglia: str, ruolo: str = 'user') -> bool:
     try:
@@ -29,7 +31,15 @@ def aggiungi_utente_a_famiglia(id_utente: str, id_famiglia: str, ruolo: str = 'u
             cur = con.cursor()
             cur.execute("INSERT INTO Appartenenza_Famiglia (id_utente, id_famiglia, ruolo) VALUES (%s, %s, %s)",
                         (id_utente, id_famiglia, ruolo))
-            return True
+            aggiorna_directory_famiglie(cur, [id_famiglia])
+            con.commit()
+        # Cache invalidate solo a transazione chiusa: un caricamento concorrente
+        # non può rimettere in cache le righe precedenti al commit
+        invalida_directory_membri(id_famiglia=id_famiglia)
+        # Import locale: gestione_conti importa già questo modulo
+        from db.gestione_conti import invalida_catalogo_conti
+        invalida_catalogo_conti(id_famiglia)
+        return True
     except Exception as e:
         print(f"[ERRORE] Errore aggiunta utente a famiglia: {e}")
         return False
@@ -93,50 +103,35 @@ def rimuovi_utente_da_famiglia(id_utente: str, id_famiglia: str) -> bool:
                     forza_cambio_password = FALSE
                 WHERE id_utente = %s
             """, (anonymous_username, anonymous_email, invalid_password_hash, id_utente))
+            aggiorna_directory_famiglie(cur, [id_famiglia])
             
             con.commit()
-            
-            print(f"[INFO] Utente {id_utente} disabilitato e anonimizzato (soft delete)")
-            return True
+        # Cache invalidate solo a transazione chiusa
+        invalida_directory_membri(id_famiglia=id_famiglia, id_utente=id_utente)
+        # Import locale: gestione_conti importa già questo modulo
+        from db.gestione_conti import invalida_catalogo_conti
+        invalida_catalogo_conti(id_famiglia)
+        
+        print(f"[INFO] Utente {id_utente} disabilitato e anonimizzato (soft delete)")
+        return True
             
     except Exception as e:
         print(f"[ERRORE] Errore disabilitazione utente: {e}")
         return False
 
 def ottieni_membri_famiglia(id_famiglia: str, master_key_b64: Optional[str] = None, id_utente_current: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Membri della famiglia con nome visualizzato ed email in chiaro (dalla directory membri)."""
     try:
-        with get_db_connection() as con:
-            cur = con.cursor()
-            cur.execute("""
-                SELECT U.id_utente, U.username, U.email, AF.ruolo, 
-                       U.nome_enc_server, U.cognome_enc_server, U.email_enc
-                FROM Utenti U
-                JOIN Appartenenza_Famiglia AF ON U.id_utente = AF.id_utente
-                WHERE AF.id_famiglia = %s
-            """, (id_famiglia,))
-            or_rows = [dict(row) for row in cur.fetchall()]
-
-            for row in or_rows:
-                 # Decrypt server-side encrypted name/surname
-                 n = decrypt_system_data(row.get('nome_enc_server'))
-                 c = decrypt_system_data(row.get('cognome_enc_server'))
-                 
-                 if n or c:
-                     row['nome_visualizzato'] = f"{n or ''} {c or ''}".strip()
-                 else:
-                     row['nome_visualizzato'] = row['username']
-                 
-                 # Decripta l'email se è nella colonna criptata
-                 # Prova prima email_enc (nuovi utenti), poi email legacy
-                 email_enc = row.get('email_enc')
-                 if email_enc:
-                     decrypted_email = decrypt_system_data(email_enc)
-                     if decrypted_email:
-                         row['email'] = decrypted_email
-                 # Se email è ancora None o sembra anonimizzata, non fare nulla
-                 # L'email legacy potrebbe essere già in chiaro per utenti vecchi
-
-            return or_rows
+        return [
+            {
+                'id_utente': m['id_utente'],
+                'username': m['username'],
+                'email': m['email'],
+                'ruolo': m['ruolo'],
+                'nome_visualizzato': m['nome_visualizzato'],
+            }
+            for m in ottieni_directory_famiglia(id_famiglia).values()
+        ]
     except Exception as e:
         print(f"[ERRORE] Errore recupero membri famiglia: {e}")
         return []
@@ -269,6 +264,8 @@ def crea_famiglia_e_admin(nome_famiglia, id_admin, master_key_b64=None):
             id_famiglia = cur.fetchone()['id_famiglia']
             cur.execute("INSERT INTO Appartenenza_Famiglia (id_utente, id_famiglia, ruolo, chiave_famiglia_criptata) VALUES (%s, %s, %s, %s)",
                         (id_admin, id_famiglia, 'admin', chiave_famiglia_criptata))
+            aggiorna_directory_famiglie(cur, [id_famiglia])
+            aggiorna_nome_directory(cur, id_famiglia, nome_famiglia, codice_famiglia)
             
             con.commit() # Commit insertion first
 
@@ -286,6 +283,36 @@ def crea_famiglia_e_admin(nome_famiglia, id_admin, master_key_b64=None):
         return None
 
 
+def rinomina_famiglia(id_famiglia, nuovo_nome, master_key_b64, id_utente) -> bool:
+    """
+    Rinomina la famiglia (solo admin): il nome è cifrato con la chiave famiglia,
+    la copia per il pannello admin con la chiave di sistema.
+    """
+    id_famiglia = _valida_id_int(id_famiglia)
+    nuovo_nome = (nuovo_nome or "").strip()
+    if not id_famiglia or not nuovo_nome or not master_key_b64:
+        return False
+    if ottieni_ruolo_utente(id_utente, id_famiglia) != 'admin':
+        return False
+    try:
+        crypto, master_key = _get_crypto_and_key(master_key_b64)
+        family_key = _get_family_key_for_user(id_famiglia, id_utente, master_key, crypto)
+        if not family_key:
+            return False
+        with get_db_connection() as con:
+            cur = con.cursor()
+            cur.execute("UPDATE Famiglie SET nome_famiglia = %s WHERE id_famiglia = %s",
+                        (_encrypt_if_key(nuovo_nome, family_key, crypto), id_famiglia))
+            if cur.rowcount == 0:
+                return False
+            aggiorna_nome_directory(cur, id_famiglia, nuovo_nome)
+            con.commit()
+            return True
+    except Exception as e:
+        print(f"[ERRORE] Errore rinomina famiglia: {e}")
+        return False
+
+
 def aggiungi_saldo_iniziale(id_conto, saldo_iniziale):
     if saldo_iniziale <= 0:
         return None
@@ -317,7 +344,15 @@ def aggiungi_utente_a_famiglia(id_famiglia, id_utente, ruolo):
             # cur.execute("PRAGMA foreign_keys = ON;") # Removed for Supabase
             cur.execute("INSERT INTO Appartenenza_Famiglia (id_utente, id_famiglia, ruolo) VALUES (%s, %s, %s)",
                         (id_utente, id_famiglia, ruolo))
-            return True
+            aggiorna_directory_famiglie(cur, [id_famiglia])
+            con.commit()
+        # Cache invalidate solo a transazione chiusa: un caricamento concorrente
+        # non può rimettere in cache le righe precedenti al commit
+        invalida_directory_membri(id_famiglia=id_famiglia)
+        # Import locale: gestione_conti importa già questo modulo
+        from db.gestione_conti import invalida_catalogo_conti
+        invalida_catalogo_conti(id_famiglia)
+        return True
     except Exception as e:
         print(f"[ERRORE] Errore generico: {e}")
         return None
@@ -326,35 +361,11 @@ def ottieni_utenti_famiglia(id_famiglia):
     id_famiglia = _valida_id_int(id_famiglia)
     if not id_famiglia: return []
     try:
-        with get_db_connection() as con:
-            # con.row_factory = sqlite3.Row # Removed for Supabase
-            cur = con.cursor()
-            cur.execute("""
-                        SELECT U.id_utente, 
-                               U.username,
-                               U.nome_enc_server,
-                               U.cognome_enc_server
-                        FROM Utenti U
-                                 JOIN Appartenenza_Famiglia AF ON U.id_utente = AF.id_utente
-                        WHERE AF.id_famiglia = %s
-                        """, (id_famiglia,))
-            
-            results = []
-            for row in cur.fetchall():
-                 n = decrypt_system_data(row.get('nome_enc_server'))
-                 c = decrypt_system_data(row.get('cognome_enc_server'))
-                 
-                 display = row['username']
-                 if n or c:
-                     display = f"{n or ''} {c or ''}".strip()
-                 
-                 results.append({
-                     'id_utente': row['id_utente'],
-                     'nome_visualizzato': display
-                 })
-                 
-            return sorted(results, key=lambda x: x['nome_visualizzato'])
-
+        results = [
+            {'id_utente': m['id_utente'], 'nome_visualizzato': m['nome_visualizzato']}
+            for m in ottieni_directory_famiglia(id_famiglia).values()
+        ]
+        return sorted(results, key=lambda x: x['nome_visualizzato'])
     except Exception as e:
         print(f"[ERRORE] Errore recupero utenti famiglia: {e}")
         return []
@@ -424,25 +435,11 @@ def ottieni_totali_famiglia(id_famiglia, master_key_b64=None, id_utente_richiede
         with get_db_connection() as con:
             cur = con.cursor()
             
-            # 1. Fetch users in family with server encrypted names
-            cur.execute("""
-                        SELECT U.id_utente,
-                               U.username,
-                               U.nome_enc_server,
-                               U.cognome_enc_server
-                        FROM Utenti U
-                                 JOIN Appartenenza_Famiglia AF ON U.id_utente = AF.id_utente
-                        WHERE AF.id_famiglia = %s
-                        """, (id_famiglia,))
-            
-            users = []
-            for row in cur.fetchall():
-                 n = decrypt_system_data(row.get('nome_enc_server'))
-                 c = decrypt_system_data(row.get('cognome_enc_server'))
-                 display = row['username']
-                 if n or c:
-                     display = f"{n or ''} {c or ''}".strip()
-                 users.append({'id_utente': row['id_utente'], 'nome_visualizzato': display})
+            # 1. Membri della famiglia (nomi già decriptati nella directory)
+            users = [
+                {'id_utente': m['id_utente'], 'nome_visualizzato': m['nome_visualizzato']}
+                for m in ottieni_directory_famiglia(id_famiglia).values()
+            ]
 
             # 2. Iterate users and calculate totals
             results = []
@@ -562,6 +559,47 @@ def get_family_summary(id_famiglia: str, master_key_b64: Optional[str] = None, i
         logger.error(f"Errore get_family_summary: {e}")
         return None
 
+# Transazioni personali dei membri e condivise della famiglia in un intervallo di date
+# (parametri: id_famiglia, inizio, fine, id_famiglia, inizio, fine)
+_SQL_DETTAGLI_FAMIGLIA = """
+    -- Transazioni Personali (nomi utente risolti dalla directory membri)
+    SELECT T.data, 
+           T.descrizione, 
+           T.importo, 
+           T.importo_nascosto,
+           C.nome_conto,
+           Cat.nome_categoria,
+           Sub.nome_sottocategoria,
+           C.id_utente  -- Needed to identify who owns the data to decrypt
+    FROM Transazioni T
+    JOIN Conti C ON T.id_conto = C.id_conto
+    JOIN Appartenenza_Famiglia AF ON C.id_utente = AF.id_utente -- To filter family
+    LEFT JOIN Sottocategorie Sub ON T.id_sottocategoria = Sub.id_sottocategoria
+    LEFT JOIN Categorie Cat ON Sub.id_categoria = Cat.id_categoria
+    WHERE AF.id_famiglia = %s
+      AND T.data BETWEEN %s AND %s
+
+    UNION ALL
+
+    -- Transazioni Condivise (Shared)
+    SELECT TC.data,
+           TC.descrizione,
+           TC.importo,
+           TC.importo_nascosto,
+           CC.nome_conto,
+           Cat.nome_categoria,
+           SCat.nome_sottocategoria,
+           TC.id_utente_autore AS id_utente
+    FROM TransazioniCondivise TC
+             JOIN ContiCondivisi CC ON TC.id_conto_condiviso = CC.id_conto_condiviso
+             LEFT JOIN Sottocategorie SCat ON TC.id_sottocategoria = SCat.id_sottocategoria
+             LEFT JOIN Categorie Cat ON SCat.id_categoria = Cat.id_categoria
+    WHERE CC.id_famiglia = %s
+      AND TC.data BETWEEN %s AND %s
+    ORDER BY data DESC, id_utente, nome_conto
+"""
+
+
 def ottieni_dettagli_famiglia(id_famiglia, anno, mese, master_key_b64=None, id_utente=None):
     data_inizio = f"{anno}-{mese:02d}-01"
     ultimo_giorno = (datetime.date(anno, mese, 1) + relativedelta(months=1) - relativedelta(days=1)).day
@@ -571,52 +609,7 @@ def ottieni_dettagli_famiglia(id_famiglia, anno, mese, master_key_b64=None, id_u
         with get_db_connection() as con:
             # con.row_factory = sqlite3.Row # Removed for Supabase
             cur = con.cursor()
-            cur.execute("""
-                        -- Transazioni Personali
-                        SELECT U.username_enc AS utente_username_enc,
-                               U.nome_enc_server AS utente_nome_server_enc, 
-                               U.cognome_enc_server AS utente_cognome_server_enc,
-                               T.data, 
-                               T.descrizione, 
-                               T.importo, 
-                               T.importo_nascosto,
-                               C.nome_conto,
-                               Cat.nome_categoria,
-                               Sub.nome_sottocategoria,
-                               U.id_utente  -- Needed to identify who owns the data to decrypt
-                        FROM Transazioni T
-                        JOIN Conti C ON T.id_conto = C.id_conto
-                        JOIN Utenti U ON C.id_utente = U.id_utente
-                        JOIN Appartenenza_Famiglia AF ON U.id_utente = AF.id_utente -- To filter family
-                        LEFT JOIN Sottocategorie Sub ON T.id_sottocategoria = Sub.id_sottocategoria
-                        LEFT JOIN Categorie Cat ON Sub.id_categoria = Cat.id_categoria
-                        WHERE AF.id_famiglia = %s
-                          AND T.data BETWEEN %s AND %s
-                        
-                        UNION ALL
-
-                        -- Transazioni Condivise (Shared)
-                        SELECT U.username_enc AS utente_username_enc,
-                               U.nome_enc_server AS utente_nome_server_enc,
-                               U.cognome_enc_server AS utente_cognome_server_enc,
-                               TC.data,
-                               TC.descrizione,
-                               TC.importo,
-                               TC.importo_nascosto,
-                               CC.nome_conto,
-                               Cat.nome_categoria,
-                               SCat.nome_sottocategoria,
-                               TC.id_utente_autore AS id_utente
-                        FROM TransazioniCondivise TC
-                                 JOIN ContiCondivisi CC ON TC.id_conto_condiviso = CC.id_conto_condiviso
-                                 LEFT JOIN Utenti U
-                                           ON TC.id_utente_autore = U.id_utente -- Join per ottenere il nome dell'autore
-                                 LEFT JOIN Sottocategorie SCat ON TC.id_sottocategoria = SCat.id_sottocategoria
-                                 LEFT JOIN Categorie Cat ON SCat.id_categoria = Cat.id_categoria
-                        WHERE CC.id_famiglia = %s
-                          AND TC.data BETWEEN %s AND %s
-                        ORDER BY data DESC, utente_username_enc, nome_conto
-                        """, (id_famiglia, data_inizio, data_fine, id_famiglia, data_inizio, data_fine))
+            cur.execute(_SQL_DETTAGLI_FAMIGLIA, (id_famiglia, data_inizio, data_fine, id_famiglia, data_inizio, data_fine))
             results = [dict(row) for row in cur.fetchall()]
             
             # Decrypt if key available
@@ -625,40 +618,13 @@ def ottieni_dettagli_famiglia(id_famiglia, anno, mese, master_key_b64=None, id_u
             if master_key and id_utente:
                 family_key = _get_family_key_for_user(id_famiglia, id_utente, master_key, crypto)
             
+            # Nomi utente: una sola decrittazione per membro (anche ex membri autori di condivise)
+            directory = risolvi_utenti(id_famiglia, {row.get('id_utente') for row in results})
+            
             for row in results:
-                owner_id = row.get('owner_id_utente')
-                
-                # Build display name: decrypt nome/cognome with master_key and combine
-                utente_username_enc = row.pop('utente_username_enc', '') or ''
-                nome_enc = row.pop('utente_nome_enc', '') or ''
-                cognome_enc = row.pop('utente_cognome_enc', '') or ''
-                
-                # Decrypt username (system data)
-                row['utente_username'] = decrypt_system_data(utente_username_enc) or "Sconosciuto"
-                
-                # Decrypt Name/Surname (Server Key preferred for visibility)
-                nome_server = decrypt_system_data(row.get('utente_nome_server_enc'))
-                cognome_server = decrypt_system_data(row.get('utente_cognome_server_enc'))
-                
-                if nome_server and cognome_server:
-                    nome_raw = nome_server
-                    cognome_raw = cognome_server
-                else:
-                    # Fallback to encrypted blobs if backfill hasn't run
-                     nome_raw = ''
-                     cognome_raw = ''
-                
-                # Cleanup encrypted strings for display
-                if CryptoManager.is_encrypted(nome_raw): 
-                     nome_raw = '' # Hide encrypted blob
-                if CryptoManager.is_encrypted(cognome_raw):
-                     cognome_raw = ''
-
-                # Build display name: prefer nome+cognome, fallback to username
-                if nome_raw or cognome_raw:
-                    row['utente_nome'] = f"{nome_raw} {cognome_raw}".strip()
-                else:
-                    row['utente_nome'] = row['utente_username']
+                voce = directory.get(row.get('id_utente'))
+                row['utente_username'] = (voce['username'] if voce else None) or "Sconosciuto"
+                row['utente_nome'] = voce['nome_visualizzato'] if voce else row['utente_username']
                 
                 # Decrypt transaction data
                 descrizione_orig = row['descrizione']
@@ -779,7 +745,11 @@ def modifica_ruolo_utente(id_utente, id_famiglia, nuovo_ruolo):
             # cur.execute("PRAGMA foreign_keys = ON;") # Removed for Supabase
             cur.execute("UPDATE Appartenenza_Famiglia SET ruolo = %s WHERE id_utente = %s AND id_famiglia = %s",
                         (nuovo_ruolo, id_utente, id_famiglia))
-            return cur.rowcount > 0
+            modificato = cur.rowcount > 0
+            con.commit()
+        # Dopo il commit, come in aggiungi_utente_a_famiglia
+        invalida_directory_membri(id_famiglia=id_famiglia)
+        return modificato
     except Exception as e:
         print(f"[ERRORE] Errore generico durante la modifica del ruolo: {e}")
         return False
@@ -792,7 +762,14 @@ def rimuovi_utente_da_famiglia(id_utente, id_famiglia):
             # cur.execute("PRAGMA foreign_keys = ON;") # Removed for Supabase
             cur.execute("DELETE FROM Appartenenza_Famiglia WHERE id_utente = %s AND id_famiglia = %s",
                         (id_utente, id_famiglia))
-            return cur.rowcount > 0
+            rimosso = cur.rowcount > 0
+            aggiorna_directory_famiglie(cur, [id_famiglia])
+            con.commit()
+        # Dopo il commit, come in aggiungi_utente_a_famiglia
+        invalida_directory_membri(id_famiglia=id_famiglia)
+        from db.gestione_conti import invalida_catalogo_conti
+        invalida_catalogo_conti(id_famiglia)
+        return rimosso
     except Exception as e:
         print(f"[ERRORE] Errore generico durante la rimozione utente: {e}")
         return False
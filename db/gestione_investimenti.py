@@ -12,6 +12,7 @@ import os
 logger = setup_logger(__name__)
 import json
 import base64
+from dateutil.relativedelta import relativedelta
 
 from db.crypto_helpers import (
     _encrypt_if_key, _decrypt_if_key, 
@@ -20,7 +21,8 @@ from db.crypto_helpers import (
     generate_unique_code,
     SERVER_SECRET_KEY,
     crypto as _crypto_instance,
-    _get_family_key_for_user
+    _get_family_key_for_user,
+    _DecrittatoreMultiChiave
 )
 
 # Importazioni da altri moduli per evitare NameError
@@ -213,6 +215,131 @@ def aggiorna_prezzo_manuale_asset(id_asset, nuovo_prezzo):
         return False
 
 
+# Righe per UPDATE ... FROM (VALUES ...): resta ben sotto il limite di parametri di pg8000
+_ASSET_PER_UPDATE = 1000
+
+
+def aggiorna_prezzi_asset(prezzi_per_asset: Dict[int, float]) -> int:
+    """
+    Versione in blocco di aggiorna_prezzo_manuale_asset: {id_asset: prezzo}
+    scritti con un solo UPDATE ... FROM (VALUES ...) per blocco e un solo commit.
+    Ritorna il numero di asset aggiornati.
+    """
+    righe = [(int(id_asset), float(prezzo)) for id_asset, prezzo in prezzi_per_asset.items() if prezzo is not None]
+    if not righe:
+        return 0
+    adesso = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        with get_db_connection() as con:
+            cur = con.cursor()
+            aggiornati = 0
+            for i in range(0, len(righe), _ASSET_PER_UPDATE):
+                blocco = righe[i:i + _ASSET_PER_UPDATE]
+                valori = ", ".join(["(%s::INTEGER, %s::NUMERIC)"] * len(blocco))
+                params = [v for riga in blocco for v in riga]
+                cur.execute(f"""
+                    UPDATE Asset A
+                    SET prezzo_attuale_manuale = V.prezzo, data_aggiornamento = %s
+                    FROM (VALUES {valori}) AS V(id_asset, prezzo)
+                    WHERE A.id_asset = V.id_asset
+                """, (adesso, *params))
+                aggiornati += max(cur.rowcount, 0)
+            con.commit()
+            return aggiornati
+    except Exception as e:
+        logger.error(f"Errore aggiornamento prezzi asset in blocco: {e}")
+        return 0
+
+
+def ottieni_asset_da_sincronizzare(id_utente=None, id_famiglia=None, master_key_b64=None,
+                                   family_key_b64=None) -> List[Dict[str, Any]]:
+    """
+    Asset dei conti Investimento di un utente (id_utente) o di tutti i membri di
+    una famiglia (id_famiglia) con una sola query, ticker e nome decriptati.
+
+    Chiavi provate: chiave famiglia e master key dell'utente, oppure la chiave
+    famiglia del server (family_key_b64) per i job di background. Gli asset il
+    cui ticker resta cifrato vengono esclusi.
+    Ritorna [{id_asset, id_conto, ticker, nome_asset}].
+    """
+    crypto, master_key = _get_crypto_and_key(master_key_b64)
+    chiavi = []
+    if family_key_b64:
+        # Il job server passava la chiave famiglia come master_key_b64: proviamo entrambe le forme
+        chiavi.append(family_key_b64.encode())
+        try:
+            chiavi.append(base64.b64decode(family_key_b64))
+        except Exception:
+            pass
+    if master_key and id_utente:
+        famiglia_utente = id_famiglia or ottieni_prima_famiglia_utente(id_utente)
+        if famiglia_utente:
+            chiavi.append(_get_family_key_for_user(famiglia_utente, id_utente, master_key, crypto))
+    chiavi.append(master_key)
+    decrittatore = _DecrittatoreMultiChiave(chiavi, crypto)
+
+    try:
+        with get_db_connection() as con:
+            cur = con.cursor()
+            if id_utente and not family_key_b64:
+                cur.execute("""
+                    SELECT A.id_asset, A.id_conto, A.ticker, A.nome_asset
+                    FROM Asset A
+                    JOIN Conti C ON C.id_conto = A.id_conto
+                    WHERE C.id_utente = %s AND C.tipo = 'Investimento'
+                """, (id_utente,))
+            else:
+                cur.execute("""
+                    SELECT A.id_asset, A.id_conto, A.ticker, A.nome_asset
+                    FROM Asset A
+                    JOIN Conti C ON C.id_conto = A.id_conto
+                    JOIN Appartenenza_Famiglia AF ON AF.id_utente = C.id_utente
+                    WHERE AF.id_famiglia = %s AND C.tipo = 'Investimento'
+                """, (id_famiglia,))
+            righe = cur.fetchall()
+    except Exception as e:
+        logger.error(f"Errore lettura asset da sincronizzare: {e}")
+        return []
+
+    asset = []
+    for r in righe:
+        sorgente = ('conto', r['id_conto'])
+        ticker = decrittatore.decritta(r['ticker'], sorgente)
+        if not ticker or ticker == "[ENCRYPTED]" or CryptoManager.is_encrypted(ticker):
+            continue
+        asset.append({
+            'id_asset': r['id_asset'],
+            'id_conto': r['id_conto'],
+            'ticker': ticker,
+            'nome_asset': decrittatore.decritta(r['nome_asset'], sorgente),
+        })
+    return asset
+
+
+def sincronizza_prezzi_portafoglio(id_utente=None, id_famiglia=None, master_key_b64=None,
+                                   family_key_b64=None) -> Dict[str, Any]:
+    """
+    Aggiorna i prezzi di tutti gli asset di un utente o di una famiglia:
+    una query per gli asset, una richiesta per ticker distinto (in parallelo),
+    un solo UPDATE in blocco. Stessi parametri di ottieni_asset_da_sincronizzare.
+
+    Returns:
+        {'aggiornati': int, 'ticker': int, 'asset': [asset sincronizzati]}
+    """
+    from utils.yfinance_manager import ottieni_prezzi_multipli
+
+    asset = ottieni_asset_da_sincronizzare(id_utente, id_famiglia, master_key_b64, family_key_b64)
+    tickers = sorted({a['ticker'] for a in asset})
+    if not tickers:
+        return {'aggiornati': 0, 'ticker': 0, 'asset': asset}
+
+    prezzi = ottieni_prezzi_multipli(tickers)
+    aggiornati = aggiorna_prezzi_asset({
+        a['id_asset']: prezzi[a['ticker']] for a in asset if prezzi.get(a['ticker']) is not None
+    })
+    return {'aggiornati': aggiornati, 'ticker': len(tickers), 'asset': asset}
+
+
 def modifica_asset_dettagli(id_asset, nuovo_ticker, nuovo_nome, nuova_quantita=None, nuovo_costo_medio=None, master_key_b64=None):
     nuovo_ticker_upper = nuovo_ticker.upper()
     nuovo_nome_upper = nuovo_nome.upper()
@@ -470,8 +597,29 @@ def _esegui_spesa_fissa(spesa, descrizione_custom=None, data_esecuzione=None, ma
         return False
 
 
+# Descrizioni delle transazioni di un conto personale nel mese (controllo spese fisse già pagate)
+# (parametri: id_conto, inizio_mese, inizio_mese_successivo)
+_SQL_DESCRIZIONI_MESE_CONTO = """
+    SELECT descrizione FROM Transazioni
+    WHERE id_conto = %s
+    AND data >= %s AND data < %s
+"""
+
+
+# Descrizioni delle transazioni di un conto condiviso nel mese (controllo spese fisse già pagate)
+# (parametri: id_conto_condiviso, inizio_mese, inizio_mese_successivo)
+_SQL_DESCRIZIONI_MESE_CONTO_CONDIVISO = """
+    SELECT descrizione FROM TransazioniCondivise
+    WHERE id_conto_condiviso = %s
+    AND data >= %s AND data < %s
+"""
+
+
 def check_e_processa_spese_fisse(id_famiglia, master_key_b64=None, id_utente=None, forced_family_key_b64=None):
     oggi = datetime.date.today()
+    # Intervallo del mese corrente come stringhe ISO: predicato servito dall'indice (conto, data)
+    inizio_mese = oggi.replace(day=1).strftime('%Y-%m-%d')
+    inizio_mese_successivo = (oggi.replace(day=1) + relativedelta(months=1)).strftime('%Y-%m-%d')
     spese_eseguite = 0
     try:
         spese_da_processare = ottieni_spese_fisse_famiglia(id_famiglia, master_key_b64=master_key_b64, id_utente=id_utente, forced_family_key_b64=forced_family_key_b64)
@@ -532,11 +680,7 @@ def check_e_processa_spese_fisse(id_famiglia, master_key_b64=None, id_utente=Non
 
                     # Check personal account
                     if conto_pers_check:
-                        cur.execute("""
-                            SELECT descrizione FROM Transazioni
-                            WHERE id_conto = %s
-                            AND TO_CHAR(data::date, 'YYYY-MM') = %s
-                        """, (conto_pers_check, oggi.strftime('%Y-%m')))
+                        cur.execute(_SQL_DESCRIZIONI_MESE_CONTO, (conto_pers_check, inizio_mese, inizio_mese_successivo))
                         for row in cur.fetchall():
                              if _is_dup_desc(row['descrizione']): 
                                  already_paid = True
@@ -544,11 +688,7 @@ def check_e_processa_spese_fisse(id_famiglia, master_key_b64=None, id_utente=Non
                     
                     # Check shared account
                     if not already_paid and conto_cond_check:
-                        cur.execute("""
-                            SELECT descrizione FROM TransazioniCondivise
-                            WHERE id_conto_condiviso = %s
-                            AND TO_CHAR(data::date, 'YYYY-MM') = %s
-                        """, (conto_cond_check, oggi.strftime('%Y-%m')))
+                        cur.execute(_SQL_DESCRIZIONI_MESE_CONTO_CONDIVISO, (conto_cond_check, inizio_mese, inizio_mese_successivo))
                         for row in cur.fetchall():
                              if _is_dup_desc(row['descrizione']):
                                  already_paid = True
@@ -1048,3 +1188,41 @@ def ottieni_asset_conto(id_conto: int, master_key_b64: Optional[str] = None, is_
         logger.error(f"Errore ottieni_asset_conto: {e}")
         return []
 
+def ottieni_asset_conti(ids_conti: List[int], master_key_b64: Optional[str] = None, id_famiglia: Optional[str] = None, id_utente: Optional[str] = None) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Versione in blocco di ottieni_asset_conto: gli asset di più conti con una
+    sola query, {id_conto: [asset]}. La chiave che decritta gli asset di un
+    conto viene ricordata e provata per prima sugli altri asset dello stesso conto.
+    """
+    risultato = {id_conto: [] for id_conto in ids_conti}
+    if not ids_conti:
+        return risultato
+    try:
+        crypto, master_key = _get_crypto_and_key(master_key_b64)
+        family_key = None
+        if id_utente and master_key:
+            id_famiglia = id_famiglia or ottieni_prima_famiglia_utente(id_utente)
+            if id_famiglia:
+                family_key = _get_family_key_for_user(id_famiglia, id_utente, master_key, crypto)
+        decrittatore = _DecrittatoreMultiChiave([master_key, family_key], crypto)
+
+        with get_db_connection() as con:
+            cur = con.cursor()
+            placeholders = ','.join(['%s'] * len(ids_conti))
+            cur.execute(f"SELECT id_asset, id_conto, nome_asset, ticker, quantita FROM Asset WHERE id_conto IN ({placeholders})",
+                        tuple(ids_conti))
+            for r in cur.fetchall():
+                try:
+                    sorgente = ('conto', r['id_conto'])
+                    risultato.setdefault(r['id_conto'], []).append({
+                        'id': r['id_asset'],
+                        'nome': decrittatore.decritta(r['nome_asset'], sorgente),
+                        'ticker': decrittatore.decritta(r['ticker'], sorgente),
+                        'quantita': float(r['quantita'])
+                    })
+                except: continue
+        return risultato
+    except Exception as e:
+        logger.error(f"Errore ottieni_asset_conti: {e}")
+        return {id_conto: [] for id_conto in ids_conti}
+
@@ -19,12 +19,14 @@ from db.crypto_helpers import (
     generate_unique_code,
     SERVER_SECRET_KEY,
     crypto as _crypto_instance,
-    _get_family_key_for_user
+    _get_family_key_for_user,
+    _DecrittatoreMultiChiave
 )
 
 # Importazioni da altri moduli per evitare NameError
 from db.gestione_famiglie import ottieni_prima_famiglia_utente
 from utils.cache_manager import cache_manager
+from db.gestione_conti import invalida_catalogo_conti
 
 
 # --- GESTIONE OBIETTIVI RISPARMIO (ACCANTONAMENTI) ---
@@ -85,6 +87,9 @@ def ottieni_obiettivi(id_famiglia: str, master_key_b64: Optional[str] = None, id
             
             rows = cur.fetchall()
             obiettivi = []
+
+            # Salvadanai di tutti gli obiettivi in blocco (Dynamic Logic: min(Assigned, RealBalance))
+            salvadanai_per_obiettivo = ottieni_salvadanai_obiettivi([row['id'] for row in rows], id_famiglia, master_key_b64, id_utente)
             
             for row in rows:
                 try:
@@ -95,8 +100,7 @@ def ottieni_obiettivi(id_famiglia: str, master_key_b64: Optional[str] = None, id
                     importo_obj = row['importo_obiettivo'] if row['importo_obiettivo'] else 0.0
                     note = _decrypt_if_key(row['note'], key_to_use, crypto, silent=True)
                     
-                    # Calculate accumulated amount using Dynamic Logic (min(Assigned, RealBalance))
-                    salvadanai = ottieni_salvadanai_obiettivo(goal_id, id_famiglia, master_key_b64, id_utente)
+                    salvadanai = salvadanai_per_obiettivo.get(goal_id, [])
                     totale_accumulato = sum(s['importo'] for s in salvadanai)
 
                     obiettivi.append({
@@ -229,11 +233,12 @@ def crea_salvadanaio(id_famiglia: str, nome: str, importo: float, id_obiettivo:
             row = cur.fetchone()
             con.commit()
             
-            if row:
-                if id_famiglia:
-                    cache_manager.invalidate_pattern(f"family_piggy_banks:{id_famiglia}")
-                return row['id_salvadanaio']
-            return None
+        if row:
+            if id_famiglia:
+                cache_manager.invalidate_pattern(f"family_piggy_banks:{id_famiglia}")
+            invalida_catalogo_conti(id_famiglia)
+            return row['id_salvadanaio']
+        return None
             
     except Exception as e:
         logger.error(f"Errore crea_salvadanaio: {e}")
@@ -486,204 +491,155 @@ def esegui_giroconto_salvadanaio(
         logger.error(f"Errore esegui_giroconto_salvadanaio: {e}")
         return False
 
-def ottieni_salvadanai_obiettivo(id_obiettivo: int, id_famiglia: str, master_key_b64: Optional[str] = None, id_utente: Optional[str] = None) -> List[Dict[str, Any]]:
+def _saldi_per_id(cur, tabella, colonna, ids):
+    """Somma degli importi per conto, una sola query per tutti gli id."""
+    if not ids:
+        return {}
+    placeholders = ','.join(['%s'] * len(ids))
+    cur.execute(f"SELECT {colonna} AS id, SUM(importo) AS saldo FROM {tabella} WHERE {colonna} IN ({placeholders}) GROUP BY {colonna}",
+                tuple(ids))
+    return {r['id']: float(r['saldo'] or 0.0) for r in cur.fetchall()}
+
+
+def ottieni_salvadanai_obiettivi(ids_obiettivi: List[int], id_famiglia: str, master_key_b64: Optional[str] = None, id_utente: Optional[str] = None) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Risolve i salvadanai di più obiettivi in blocco: {id_obiettivo: [salvadanai]}.
+    Nomi, valori degli asset e dei conti collegati arrivano da un'unica query;
+    i saldi dei conti a saldo totale (usa_saldo_totale) da una query per tipo di
+    conto (personale/condiviso) per tutti i salvadanai insieme.
+    """
+    risultato = {id_obj: [] for id_obj in ids_obiettivi}
+    if not ids_obiettivi:
+        return risultato
     try:
         crypto, master_key = _get_crypto_and_key(master_key_b64)
         family_key = None
         if master_key and id_utente:
              family_key = _get_family_key_for_user(id_famiglia, id_utente, master_key, crypto)
-        key_to_use = family_key if family_key else master_key
-        
+        # Chiave famiglia prima, poi master key (salvadanai creati con l'una o l'altra)
+        decrittatore = _DecrittatoreMultiChiave([family_key, master_key], crypto)
+
         with get_db_connection() as con:
             cur = con.cursor()
-            cur.execute("""
-                SELECT s.id_salvadanaio, s.nome, s.importo_assegnato, s.id_conto, s.id_conto_condiviso, s.id_asset,
-                       c.nome_conto, a.nome_asset, a.ticker
+            placeholders = ','.join(['%s'] * len(ids_obiettivi))
+            cur.execute(f"""
+                SELECT s.id_salvadanaio, s.id_obiettivo, s.nome, s.importo_assegnato, s.usa_saldo_totale,
+                       s.id_conto, s.id_conto_condiviso, s.id_asset,
+                       c.nome_conto, c.tipo AS tipo_conto, c.valore_manuale, c.rettifica_saldo,
+                       cc.nome_conto AS nome_conto_condiviso, cc.valore_manuale AS valore_manuale_condiviso,
+                       a.nome_asset, a.ticker, a.quantita, a.prezzo_attuale_manuale, a.costo_iniziale_unitario
                 FROM Salvadanai s
                 LEFT JOIN Conti c ON s.id_conto = c.id_conto
+                LEFT JOIN ContiCondivisi cc ON s.id_conto_condiviso = cc.id_conto_condiviso
                 LEFT JOIN Asset a ON s.id_asset = a.id_asset
-                WHERE s.id_obiettivo = %s AND s.id_famiglia = %s
-            """, (id_obiettivo, id_famiglia))
-            
-            rows = cur.fetchall()
-            results = []
-            for row in rows:
-                # Decryption Strategy: Try Family Key first, then Master Key
-                # This handles mixed history (PBs created with Family Key vs Master Key).
-                
-                nome = "[ENCRYPTED]"
-                imp_str = "0.0"
-                usa_saldo_totale = row.get('usa_saldo_totale', False)
-                
-                # Helper to try keys
-                def try_decrypt(val, keys):
-                    last_res = None
-                    for k in keys:
-                        if not k: continue
-                        try:
-                            # Pass silent=True to avoid excessive logging during trial
-                            res = _decrypt_if_key(val, k, crypto, silent=True) # Assuming _decrypt_if_key passes silent arg (Modified below?)
-                            
-                            if res == "[ENCRYPTED]":
-                                last_res = res
-                                continue # Try next key
-                            
-                            return res
-                        except: continue
-                    return last_res if last_res else "[ENCRYPTED]"
-
-                keys_to_try = [family_key, master_key] if family_key else [master_key]
-                
-                try:
-                    nome = try_decrypt(row['nome'], keys_to_try)
-                    importo_nominale = float(row['importo_assegnato']) if row['importo_assegnato'] else 0.0
-                    
-                    source_name = "Manuale / Esterno"
-                    source_balance = 0.0
-                    source_found = False
-                    
-                    # --- BALANCE CALCULATION START ---
-                    
-                    # 1. Linked to Account (Personal)
-                    if row['id_conto']:
-                        try:
-                            # Only calculate Account Balance if needed (for usa_saldo_totale)
-                            # Standard PBs (Physical) hold their own funds, so we generally trust importo_assegnato.
-                            
-                            if usa_saldo_totale:
-                                # Fetch manual value (Pension) and rectification (Checking) logic
-                                cur.execute("SELECT tipo, valore_manuale, rettifica_saldo FROM Conti WHERE id_conto = %s", (row['id_conto'],))
-                                c_res = cur.fetchone()
-                                
-                                if c_res:
-                                    if c_res['tipo'] == 'Fondo Pensione' and c_res['valore_manuale'] is not None:
-                                         # Pension Fund -> Use encrypted manual value
-                                         val_man_enc = c_res['valore_manuale']
-                                         val_man_dec = try_decrypt(val_man_enc, keys_to_try)
-                                         try: source_balance = float(val_man_dec)
-                                         except: source_balance = 0.0
-                                    else:
-                                         # Standard Account -> Sum Transactions + Rectification
-                                         cur.execute("SELECT SUM(importo) as saldo FROM Transazioni WHERE id_conto = %s", (row['id_conto'],))
-                                         t_res = cur.fetchone()
-                                         trans_sum = float(t_res['saldo']) if t_res and t_res['saldo'] is not None else 0.0
-                                         
-                                         rettifica = 0.0
-                                         if c_res['rettifica_saldo']:
-                                             try:
-                                                 r_dec = try_decrypt(c_res['rettifica_saldo'], keys_to_try)
-                                                 rettifica = float(r_dec)
-                                             except: pass
-                                         
-                                         source_balance = trans_sum + rettifica
-                                    source_found = True
-                        except Exception as e:
-                            # logger.warning(f"Error fetching balance for conto {row['id_conto']}: {e}")
-                            pass
-
-                    # 2. Linked to Shared Account
-                    elif row['id_conto_condiviso']:
-                        try:
-                            # Similar logic for shared.. only if usa_saldo_totale needed
-                             if usa_saldo_totale:
-                                cur.execute("SELECT valore_manuale FROM ContiCondivisi WHERE id_conto_condiviso = %s", (row['id_conto_condiviso'],))
-                                cc_res = cur.fetchone()
-                                if cc_res and cc_res['valore_manuale'] is not None:
-                                    val_man_enc = cc_res['valore_manuale']
-                                    val_man_dec = try_decrypt(val_man_enc, keys_to_try) 
-                                    try: source_balance = float(val_man_dec)
-                                    except: source_balance = 0.0
-                                else:
-                                     cur.execute("SELECT SUM(importo) as saldo FROM TransazioniCondivise WHERE id_conto_condiviso = %s", (row['id_conto_condiviso'],))
-                                     t_res = cur.fetchone()
-                                     source_balance = float(t_res['saldo']) if t_res and t_res['saldo'] is not None else 0.0
-                                source_found = True
-                        except: pass
-
-                    # 3. Linked to Asset (ALWAYS Virtual -> Need Source Balance)
-                    elif row['id_asset']:
-                         try:
-                             cur.execute("SELECT quantita, prezzo_attuale_manuale, costo_iniziale_unitario FROM Asset WHERE id_asset = %s", (row['id_asset'],))
-                             a_res = cur.fetchone()
-                             if a_res:
-                                 qty = float(a_res['quantita'])
-                                 price = float(a_res['prezzo_attuale_manuale']) if a_res['prezzo_attuale_manuale'] else float(a_res['costo_iniziale_unitario'])
-                                 source_balance = qty * price
-                                 source_found = True
-                         except: pass
-
-                    # --- BALANCE CALCULATION END ---
-
-                    # Decrypt Source Name (Account) if present
+                WHERE s.id_obiettivo IN ({placeholders}) AND s.id_famiglia = %s
+            """, tuple(ids_obiettivi) + (id_famiglia,))
+            rows = [dict(r) for r in cur.fetchall()]
+
+            # Saldi dinamici: solo per i conti senza valore manuale, in blocco
+            ids_conti = {r['id_conto'] for r in rows
+                         if r['usa_saldo_totale'] and r['id_conto'] and r['tipo_conto'] is not None}
+            ids_condivisi = {r['id_conto_condiviso'] for r in rows
+                             if r['usa_saldo_totale'] and not r['id_conto'] and r['id_conto_condiviso']
+                             and r['valore_manuale_condiviso'] is None}
+            saldi_conti = _saldi_per_id(cur, "Transazioni", "id_conto", sorted(ids_conti))
+            saldi_condivisi = _saldi_per_id(cur, "TransazioniCondivise", "id_conto_condiviso", sorted(ids_condivisi))
+
+        def in_float(valore, sorgente):
+            try: return float(decrittatore.decritta(valore, sorgente))
+            except (TypeError, ValueError): return 0.0
+
+        for row in rows:
+            try:
+                usa_saldo_totale = bool(row['usa_saldo_totale'])
+                nome = decrittatore.decritta(row['nome'], ('salvadanaio', row['id_salvadanaio']))
+                importo_nominale = float(row['importo_assegnato']) if row['importo_assegnato'] else 0.0
+
+                source_name = "Manuale / Esterno"
+                source_balance = 0.0
+                source_found = False
+
+                # 1. Conto personale: il saldo serve solo per i salvadanai a saldo totale
+                if row['id_conto']:
+                    sorgente = ('conto', row['id_conto'])
                     if row['nome_conto']:
-                        # Try both keys (Legacy Support)
-                        source_name = f"Conto: {try_decrypt(row['nome_conto'], keys_to_try)}"
-                    
-                    # Decrypt Source Name (Asset) if present
-                    if row['nome_asset']: 
-                        # Asset lookup strategy
-                        # Try keys for Asset Name AND Ticker
-                        s_asset = try_decrypt(row['nome_asset'], keys_to_try)
-                        s_ticker = try_decrypt(row['ticker'], keys_to_try)
-                        
+                        source_name = f"Conto: {decrittatore.decritta(row['nome_conto'], sorgente)}"
+                    if usa_saldo_totale and row['tipo_conto'] is not None:
+                        tipo = decrittatore.decritta(row['tipo_conto'], sorgente)
+                        if tipo == 'Fondo Pensione' and row['valore_manuale'] is not None:
+                            source_balance = in_float(row['valore_manuale'], sorgente)
+                        else:
+                            rettifica = in_float(row['rettifica_saldo'], sorgente) if row['rettifica_saldo'] else 0.0
+                            source_balance = saldi_conti.get(row['id_conto'], 0.0) + rettifica
+                        source_found = True
+
+                # 2. Conto condiviso
+                elif row['id_conto_condiviso']:
+                    sorgente = ('conto_condiviso', row['id_conto_condiviso'])
+                    if row['nome_conto_condiviso']:
+                        source_name = f"Conto Condiviso: {decrittatore.decritta(row['nome_conto_condiviso'], sorgente)}"
+                    else:
+                        source_name = "Conto Condiviso"
+                    if usa_saldo_totale:
+                        if row['valore_manuale_condiviso'] is not None:
+                            source_balance = in_float(row['valore_manuale_condiviso'], sorgente)
+                        else:
+                            source_balance = saldi_condivisi.get(row['id_conto_condiviso'], 0.0)
+                        source_found = True
+
+                # 3. Asset (sempre virtuale: serve il valore della fonte)
+                elif row['id_asset']:
+                    sorgente = ('asset', row['id_asset'])
+                    if row['quantita'] is not None:
+                        prezzo = row['prezzo_attuale_manuale'] or row['costo_iniziale_unitario'] or 0
+                        source_balance = float(row['quantita']) * float(prezzo)
+                        source_found = True
+                    if row['nome_asset']:
+                        s_asset = decrittatore.decritta(row['nome_asset'], sorgente)
+                        s_ticker = decrittatore.decritta(row['ticker'], sorgente)
                         if s_asset != "[ENCRYPTED]":
                             source_name = f"Asset: {s_asset} ({s_ticker})"
                         else:
-                             source_name = f"Asset: [Privato/Encrypted]"
-                                     
-                    if row['id_conto_condiviso']:
-                        # Fetch Shared Account Name
-                        try:
-                            cur.execute("SELECT nome_conto FROM ContiCondivisi WHERE id_conto_condiviso = %s", (row['id_conto_condiviso'],))
-                            cc_row = cur.fetchone()
-                            if cc_row:
-                                cc_name = try_decrypt(cc_row['nome_conto'], keys_to_try)
-                                source_name = f"Conto Condiviso: {cc_name}"
-                        except:
-                            source_name = "Conto Condiviso" 
-                    
-                    # Final Importo logic remain same
-                    
-                    final_importo = importo_nominale
-                    
-                    # Special Rule for Assets or Dynamic Accounts
-                    # Assets are ALWAYS virtual, so we cap.
-                    # Accounts are only capped if usa_saldo_totale (dynamic tracking), otherwise we trust the assigned amount (Physical PB).
-                    
-                    if row['id_asset'] and source_found:
-                         # Heuristic: If assigned is 0, assume user wants Full Value (since empty field implies that).
-                         # Also checking usa_saldo_totale flag.
-                         if usa_saldo_totale or importo_nominale == 0:
-                              final_importo = max(0.0, source_balance)
-                         else:
-                              final_importo = max(0.0, min(importo_nominale, source_balance))
-                    
-                    elif (row['id_conto'] or row['id_conto_condiviso']) and usa_saldo_totale and source_found:
-                         final_importo = max(0.0, source_balance)
-                         
-                    # Else (Fixed Account PB): use importo_nominale as is.
-                        
-                    results.append({
-                        'id': row['id_salvadanaio'],
-                        'nome': nome,
-                        'importo': final_importo,
-                        'source': source_name,
-                        'usa_saldo_totale': usa_saldo_totale, # Useful for UI?
-                        'source_balance': source_balance # useful for debug?
-                    })
-                except Exception as ex:
-                    # logger.error(f"Error processing salvadanaio {row['id_salvadanaio']}: {ex}")
-                    results.append({
-                        'id': row['id_salvadanaio'],
-                        'nome': "[ENCRYPTED]",
-                        'importo': 0.0,
-                        'source': "Errore Decrittazione"
-                    })
-
-            return results
+                            source_name = "Asset: [Privato/Encrypted]"
+
+                # Gli asset sono sempre virtuali (importo limitato al valore della fonte);
+                # i conti solo se a saldo totale, altrimenti vale l'importo assegnato.
+                final_importo = importo_nominale
+                if row['id_asset'] and source_found:
+                    # Importo assegnato 0 = tutto il valore dell'asset
+                    if usa_saldo_totale or importo_nominale == 0:
+                        final_importo = max(0.0, source_balance)
+                    else:
+                        final_importo = max(0.0, min(importo_nominale, source_balance))
+                elif (row['id_conto'] or row['id_conto_condiviso']) and usa_saldo_totale and source_found:
+                    final_importo = max(0.0, source_balance)
+
+                salvadanaio = {
+                    'id': row['id_salvadanaio'],
+                    'nome': nome,
+                    'importo': final_importo,
+                    'source': source_name,
+                    'usa_saldo_totale': usa_saldo_totale,
+                    'source_balance': source_balance,
+                }
+            except Exception:
+                salvadanaio = {
+                    'id': row['id_salvadanaio'],
+                    'nome': "[ENCRYPTED]",
+                    'importo': 0.0,
+                    'source': "Errore Decrittazione"
+                }
+            salvadanaio.update({'id_conto': row['id_conto'], 'id_conto_condiviso': row['id_conto_condiviso'],
+                                'id_asset': row['id_asset']})
+            risultato.setdefault(row['id_obiettivo'], []).append(salvadanaio)
+
+        return risultato
     except Exception as e:
-        logger.error(f"Errore ottieni_salvadanai: {e}")
-        return []
+        logger.error(f"Errore ottieni_salvadanai_obiettivi: {e}")
+        return {id_obj: [] for id_obj in ids_obiettivi}
+
+def ottieni_salvadanai_obiettivo(id_obiettivo: int, id_famiglia: str, master_key_b64: Optional[str] = None, id_utente: Optional[str] = None) -> List[Dict[str, Any]]:
+    return ottieni_salvadanai_obiettivi([id_obiettivo], id_famiglia, master_key_b64, id_utente).get(id_obiettivo, [])
 
 def elimina_salvadanaio(id_salvadanaio: int, id_famiglia: str, master_key_b64: Optional[str] = None, id_utente: Optional[str] = None) -> bool:
     try:
@@ -748,7 +704,9 @@ def elimina_salvadanaio(id_salvadanaio: int, id_famiglia: str, master_key_b64: O
             # Proceed to Delete ONLY if Refund success or not needed
             cur.execute("DELETE FROM Salvadanai WHERE id_salvadanaio = %s AND id_famiglia = %s", (id_salvadanaio, id_famiglia))
             con.commit()
-            return True
+        invalida_catalogo_conti(id_famiglia)
+        cache_manager.invalidate_pattern(f"family_piggy_banks:{id_famiglia}")
+        return True
 
     except Exception as e:
         logger.error(f"Errore eliminazione salvadanaio: {e}")
@@ -794,6 +752,7 @@ def collega_salvadanaio_obiettivo(id_salvadanaio: int, id_obiettivo: int, id_fam
             cur = con.cursor()
             cur.execute("UPDATE Salvadanai SET id_obiettivo = %s WHERE id_salvadanaio = %s AND id_famiglia = %s", (id_obiettivo, id_salvadanaio, id_famiglia))
             con.commit()
+            cache_manager.invalidate_pattern(f"family_piggy_banks:{id_famiglia}")
             return True
     except Exception as e:
         logger.error(f"Errore collegamento salvadanaio-obiettivo: {e}")
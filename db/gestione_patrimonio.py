@@ -251,78 +251,77 @@ def elimina_prestito(id_prestito):
         return None
 
 
-def _applica_override_piani_ammortamento(results, cur):
+# Riepilogo del piano sulla riga Prestiti: ricalcolato da ogni funzione che scrive
+# PianoAmmortamento, così le letture non aggregano mai le rate.
+_SQL_RIEPILOGO_PIANO = """
+    UPDATE Prestiti P SET
+        piano_rate_totali = A.rate_totali,
+        piano_rate_pagate = A.rate_pagate,
+        piano_residuo = A.residuo,
+        piano_capitale_residuo = A.capitale_residuo,
+        piano_interessi_residui = A.interessi_residui,
+        piano_prossima_rata = A.prossima_rata,
+        piano_prossima_scadenza = A.prossima_scadenza
+    FROM (
+        SELECT X.id_prestito,
+               COUNT(R.id_rata) AS rate_totali,
+               COUNT(R.id_rata) FILTER (WHERE R.stato = 'pagata') AS rate_pagate,
+               COALESCE(SUM(R.importo_rata) FILTER (WHERE R.stato = 'da_pagare'), 0) AS residuo,
+               COALESCE(SUM(R.quota_capitale) FILTER (WHERE R.stato = 'da_pagare'), 0) AS capitale_residuo,
+               COALESCE(SUM(R.quota_interessi) FILTER (WHERE R.stato = 'da_pagare'), 0) AS interessi_residui,
+               (ARRAY_AGG(R.importo_rata ORDER BY R.data_scadenza, R.numero_rata)
+                    FILTER (WHERE R.stato = 'da_pagare'))[1] AS prossima_rata,
+               MIN(R.data_scadenza) FILTER (WHERE R.stato = 'da_pagare') AS prossima_scadenza
+        FROM Prestiti X
+        LEFT JOIN PianoAmmortamento R ON R.id_prestito = X.id_prestito
+        WHERE X.id_prestito = %s
+        GROUP BY X.id_prestito
+    ) A
+    WHERE P.id_prestito = A.id_prestito
+"""
+
+_COLONNE_RIEPILOGO_PIANO = (
+    'piano_rate_totali', 'piano_rate_pagate', 'piano_residuo', 'piano_capitale_residuo',
+    'piano_interessi_residui', 'piano_prossima_rata', 'piano_prossima_scadenza',
+)
+
+
+def _aggiorna_riepilogo_piano(cur, id_prestito, riepilogo=None):
     """
-    Helper interno per arricchire una lista di prestiti (o record collegati a prestiti)
-    con i dati reali calcolati dal Piano Ammortamento.
-    'results' deve essere una lista di dizionari (record della tabella Prestiti o Immobili).
-    Modifica i dizionari in-place.
+    Aggiorna le colonne piano_* di un prestito nella transazione corrente.
+    Se 'riepilogo' (da riepiloga_piano) è fornito lo scrive direttamente,
+    altrimenti lo ricalcola dalle rate del solo prestito indicato.
     """
-    ids_prestiti = []
-    for r in results:
-        pid = r.get('id_prestito') or r.get('id_prestito_collegato')
-        if pid:
-            ids_prestiti.append(pid)
-            
-    if not ids_prestiti:
+    if riepilogo is None:
+        cur.execute(_SQL_RIEPILOGO_PIANO, (id_prestito,))
         return
+    assegnazioni = ", ".join(f"{c} = %s" for c in _COLONNE_RIEPILOGO_PIANO)
+    cur.execute(f"UPDATE Prestiti SET {assegnazioni} WHERE id_prestito = %s",
+                tuple(riepilogo[c] for c in _COLONNE_RIEPILOGO_PIANO) + (id_prestito,))
+
 
-    piano_map = {} # id_prestito -> { 'rate_pagate': 0, 'rate_totali': 0, ... }
-    ids_unique = list(set(ids_prestiti))
-    placeholders = ','.join(['%s'] * len(ids_unique))
-    query_piano = f"""
-        SELECT id_prestito, importo_rata, quota_capitale, quota_interessi, data_scadenza, stato 
-        FROM PianoAmmortamento 
-        WHERE id_prestito IN ({placeholders})
-        ORDER BY data_scadenza ASC
+def _applica_override_piani_ammortamento(results):
+    """
+    Helper interno per arricchire una lista di prestiti (o record collegati a prestiti)
+    con i dati reali del Piano Ammortamento, letti dalle colonne di riepilogo piano_*.
+    'results' deve essere una lista di dizionari (record della tabella Prestiti o Immobili
+    con le colonne piano_* del prestito collegato). Modifica i dizionari in-place.
     """
-    cur.execute(query_piano, tuple(ids_unique))
-    rows_piano = cur.fetchall()
-    
-    for r in rows_piano:
-        pid = r['id_prestito']
-        if pid not in piano_map:
-            piano_map[pid] = {
-                'rate_pagate': 0, 
-                'rate_totali': 0, 
-                'next_rata_found': False, 
-                'next_rata_importo': 0.0,
-                'residuo_totale': 0.0,
-                'capitale_residuo': 0.0,
-                'interessi_residui': 0.0
-            }
-        
-        piano_map[pid]['rate_totali'] += 1
-        
-        if r['stato'] == 'pagata':
-            piano_map[pid]['rate_pagate'] += 1
-        elif r['stato'] == 'da_pagare':
-            # Somma residuo
-            piano_map[pid]['residuo_totale'] += float(r['importo_rata'])
-            piano_map[pid]['capitale_residuo'] += float(r['quota_capitale'])
-            piano_map[pid]['interessi_residui'] += float(r['quota_interessi'])
-            
-            if not piano_map[pid]['next_rata_found']:
-                # La prima rata 'da_pagare' (ordinato data ASC) è quella corrente
-                piano_map[pid]['next_rata_found'] = True
-                piano_map[pid]['next_rata_importo'] = float(r['importo_rata'])
-    
-    # Applica override ai risultati
     for row in results:
-        pid = row.get('id_prestito') or row.get('id_prestito_collegato')
-        if pid in piano_map:
-            pm = piano_map[pid]
-            row['rate_pagate'] = pm['rate_pagate']
-            if 'numero_mesi_totali' in row:
-                row['numero_mesi_totali'] = pm['rate_totali']
-            if 'importo_residuo' in row:
-                row['importo_residuo'] = pm['residuo_totale']
-            if 'valore_mutuo_residuo' in row:
-                row['valore_mutuo_residuo'] = pm['residuo_totale']
-            row['capitale_residuo'] = pm['capitale_residuo']
-            row['interessi_residui'] = pm['interessi_residui']
-            if pm['next_rata_found'] and 'importo_rata' in row:
-               row['importo_rata'] = pm['next_rata_importo']
+        if not row.get('piano_rate_totali'):
+            continue  # Nessun piano: restano i valori statici
+        residuo = float(row['piano_residuo'] or 0)
+        row['rate_pagate'] = row['piano_rate_pagate']
+        if 'numero_mesi_totali' in row:
+            row['numero_mesi_totali'] = row['piano_rate_totali']
+        if 'importo_residuo' in row:
+            row['importo_residuo'] = residuo
+        if 'valore_mutuo_residuo' in row:
+            row['valore_mutuo_residuo'] = residuo
+        row['capitale_residuo'] = float(row['piano_capitale_residuo'] or 0)
+        row['interessi_residui'] = float(row['piano_interessi_residui'] or 0)
+        if row.get('piano_prossima_rata') is not None and 'importo_rata' in row:
+            row['importo_rata'] = float(row['piano_prossima_rata'])
 
 def ottieni_prestiti_famiglia(id_famiglia, master_key_b64=None, id_utente=None, forced_family_key_b64=None):
     try:
@@ -382,7 +381,7 @@ def ottieni_prestiti_famiglia(id_famiglia, master_key_b64=None, id_utente=None,
                 row['lista_quote'] = quote_map.get(row['id_prestito'], [])
 
             # --- Override Piano Ammortamento ---
-            _applica_override_piani_ammortamento(results, cur)
+            _applica_override_piani_ammortamento(results)
             
             return results
     except Exception as e:
@@ -411,6 +410,13 @@ def check_e_paga_rate_scadute(id_famiglia, master_key_b64=None, id_utente=None,
                 pay_data = None # (amount, id_rata_schedule)
 
                 # 2. Controllo Piano Ammortamento (Prioritario)
+                # Il riepilogo sul prestito dice già se la prossima rata è futura: niente query.
+                # Senza rate da pagare si prosegue, per la logica legacy (statica) come prima
+                if p.get('piano_rate_totali'):
+                    prossima = p.get('piano_prossima_scadenza')
+                    if prossima and str(prossima) > oggi.isoformat():
+                        continue
+
                 cur.execute("""
                     SELECT id_rata, data_scadenza, importo_rata 
                     FROM PianoAmmortamento 
@@ -500,6 +506,7 @@ def effettua_pagamento_rata(id_prestito, id_conto_pagamento, importo_pagato, dat
             rata_row = cur.fetchone()
             if rata_row:
                 cur.execute("UPDATE PianoAmmortamento SET stato = 'pagata' WHERE id_rata = %s", (rata_row['id_rata'],))
+                _aggiorna_riepilogo_piano(cur, id_prestito)
             # ------------------------------------------------------
             descrizione = f"Pagamento rata {nome_prestito} (Prestito ID: {id_prestito})"
             
@@ -710,7 +717,9 @@ def ottieni_immobili_famiglia(id_famiglia, master_key_b64=None, id_utente=None):
             # con.row_factory = sqlite3.Row # Removed for Supabase
             cur = con.cursor()
             cur.execute("""
-                        SELECT I.*, P.importo_residuo AS valore_mutuo_residuo, P.nome AS nome_mutuo
+                        SELECT I.*, P.importo_residuo AS valore_mutuo_residuo, P.nome AS nome_mutuo,
+                               P.piano_rate_totali, P.piano_rate_pagate, P.piano_residuo,
+                               P.piano_capitale_residuo, P.piano_interessi_residui
                         FROM Immobili I
                                  LEFT JOIN Prestiti P ON I.id_prestito_collegato = P.id_prestito
                         WHERE I.id_famiglia = %s
@@ -722,7 +731,7 @@ def ottieni_immobili_famiglia(id_famiglia, master_key_b64=None, id_utente=None):
                 return []
             
             # --- Override Piano Ammortamento per Mutui collegati ---
-            _applica_override_piani_ammortamento(results, cur)
+            _applica_override_piani_ammortamento(results)
             
             # Decrypt sensitive data if keys available
             crypto, master_key = _get_crypto_and_key(master_key_b64)
@@ -794,6 +803,7 @@ def ottieni_immobili_famiglia(id_famiglia, master_key_b64=None, id_utente=None):
 def aggiungi_rata_piano_ammortamento(id_prestito, numero_rata, data_scadenza, importo_rata, quota_capitale, quota_interessi, spese_fisse=0, stato='da_pagare'):
     """
     Aggiunge una rata al piano di ammortamento di un prestito.
+    Per scrivere un piano intero usare salva_piano_ammortamento.
     """
     try:
         with get_db_connection() as con:
@@ -803,12 +813,52 @@ def aggiungi_rata_piano_ammortamento(id_prestito, numero_rata, data_scadenza, im
                 (id_prestito, numero_rata, data_scadenza, importo_rata, quota_capitale, quota_interessi, spese_fisse, stato)
                 VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
             """, (id_prestito, numero_rata, data_scadenza, importo_rata, quota_capitale, quota_interessi, spese_fisse, stato))
+            _aggiorna_riepilogo_piano(cur, id_prestito)
             con.commit()
             return True
     except Exception as e:
         print(f"[ERRORE] Errore aggiunta rata piano ammortamento: {e}")
         return False
 
+# Righe per INSERT multi-riga: 8 parametri a riga, ben sotto il limite del protocollo
+_RATE_PER_INSERT = 500
+
+def salva_piano_ammortamento(id_prestito, rate, sostituisci=True):
+    """
+    Scrive un piano di ammortamento intero in un'unica transazione:
+    cancella il piano esistente (se 'sostituisci'), inserisce le rate con
+    INSERT multi-riga e aggiorna il riepilogo piano_* del prestito.
+    'rate' è una lista di dict come quelle di utils.piano_ammortamento.genera_piano
+    o dell'import CSV (spese_fisse e stato opzionali).
+    """
+    from utils.piano_ammortamento import riepiloga_piano
+
+    try:
+        valori = [
+            (id_prestito, r['numero_rata'], r['data_scadenza'], r['importo_rata'], r['quota_capitale'],
+             r['quota_interessi'], r.get('spese_fisse') or 0, r.get('stato') or 'da_pagare')
+            for r in rate
+        ]
+        with get_db_connection() as con:
+            cur = con.cursor()
+            if sostituisci:
+                cur.execute("DELETE FROM PianoAmmortamento WHERE id_prestito = %s", (id_prestito,))
+            for i in range(0, len(valori), _RATE_PER_INSERT):
+                blocco = valori[i:i + _RATE_PER_INSERT]
+                placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s)"] * len(blocco))
+                cur.execute(f"""
+                    INSERT INTO PianoAmmortamento 
+                    (id_prestito, numero_rata, data_scadenza, importo_rata, quota_capitale, quota_interessi, spese_fisse, stato)
+                    VALUES {placeholders}
+                """, tuple(v for riga in blocco for v in riga))
+            # Con sostituzione il piano scritto è tutto il piano: il riepilogo si calcola in memoria
+            _aggiorna_riepilogo_piano(cur, id_prestito, riepiloga_piano(rate) if sostituisci else None)
+            con.commit()
+            return True
+    except Exception as e:
+        print(f"[ERRORE] Errore salvataggio piano ammortamento: {e}")
+        return False
+
 def ottieni_piano_ammortamento(id_prestito):
     """
     Recupera il piano di ammortamento completo per un prestito, ordinato per numero rata.
@@ -834,6 +884,7 @@ def elimina_piano_ammortamento(id_prestito):
         with get_db_connection() as con:
             cur = con.cursor()
             cur.execute("DELETE FROM PianoAmmortamento WHERE id_prestito = %s", (id_prestito,))
+            _aggiorna_riepilogo_piano(cur, id_prestito)
             con.commit()
             return True
     except Exception as e:
@@ -847,26 +898,18 @@ def aggiorna_stato_rata_piano(id_rata, nuovo_stato):
     try:
         with get_db_connection() as con:
             cur = con.cursor()
-            # 1. Recupera id_prestito
-            cur.execute("SELECT id_prestito FROM PianoAmmortamento WHERE id_rata = %s", (id_rata,))
+            # 1. Aggiorna stato rata e recupera id_prestito
+            cur.execute("UPDATE PianoAmmortamento SET stato = %s WHERE id_rata = %s RETURNING id_prestito", (nuovo_stato, id_rata))
             row = cur.fetchone()
             if not row: return False
             id_prestito = row['id_prestito']
             
-            # 2. Aggiorna stato rata
-            cur.execute("UPDATE PianoAmmortamento SET stato = %s WHERE id_rata = %s", (nuovo_stato, id_rata))
-            
-            # 3. Ricalcola residuo totale (somma rate 'da_pagare')
-            cur.execute("SELECT SUM(importo_rata) as residuo FROM PianoAmmortamento WHERE id_prestito = %s AND stato = 'da_pagare'", (id_prestito,))
-            res_row = cur.fetchone()
-            nuovo_residuo = float(res_row['residuo'] or 0)
-            
-            # 4. Aggiorna tabella Prestiti (valore statico)
-            cur.execute("UPDATE Prestiti SET importo_residuo = %s WHERE id_prestito = %s", (nuovo_residuo, id_prestito))
+            # 2. Ricalcola il riepilogo del piano e allinea il residuo statico
+            _aggiorna_riepilogo_piano(cur, id_prestito)
+            cur.execute("UPDATE Prestiti SET importo_residuo = piano_residuo WHERE id_prestito = %s", (id_prestito,))
             
             con.commit()
             return True
     except Exception as e:
         print(f"[ERRORE] Errore aggiornamento stato rata e residuo: {e}")
         return False
-
@@ -188,6 +188,20 @@ def elimina_transazione(id_transazione, master_key_b64=None):
         return None
 
 
+# Liquidità dei conti personali (saldo = transazioni fino alla data + rettifica)
+# (parametri: data_limite, id_utente)
+_SQL_LIQUIDITA_PERSONALE = """
+    SELECT COALESCE(SUM(
+        (SELECT COALESCE(SUM(T.importo), 0.0) FROM Transazioni T WHERE T.id_conto = C.id_conto AND T.data <= %s) +
+        COALESCE(C.rettifica_saldo, 0.0)
+    ), 0.0) as val
+    FROM Conti C
+    WHERE C.id_utente = %s
+      AND C.tipo NOT IN ('Investimento', 'Fondo Pensione', 'Risparmio')
+      AND (C.nascosto = FALSE OR C.nascosto IS NULL)
+"""
+
+
 def ottieni_riepilogo_patrimonio_utente(id_utente, anno, mese, master_key_b64=None):
     try:
         data_limite = datetime.date(anno, mese, 1) + relativedelta(months=1) - relativedelta(days=1)
@@ -198,16 +212,7 @@ def ottieni_riepilogo_patrimonio_utente(id_utente, anno, mese, master_key_b64=No
             
             # 1. Liquidità Personale (somma saldi conti personali)
             # Saldo = SUM(transazioni fino a data_limite) + rettifica_saldo
-            cur.execute("""
-                SELECT COALESCE(SUM(
-                    (SELECT COALESCE(SUM(T.importo), 0.0) FROM Transazioni T WHERE T.id_conto = C.id_conto AND T.data <= %s) +
-                    COALESCE(CAST(NULLIF(CAST(C.rettifica_saldo AS TEXT), '') AS NUMERIC), 0.0)
-                ), 0.0) as val
-                FROM Conti C
-                WHERE C.id_utente = %s
-                  AND C.tipo NOT IN ('Investimento', 'Fondo Pensione', 'Risparmio')
-                  AND (C.nascosto = FALSE OR C.nascosto IS NULL)
-            """, (data_limite_str, id_utente))
+            cur.execute(_SQL_LIQUIDITA_PERSONALE, (data_limite_str, id_utente))
             liquidita_personale = float(cur.fetchone()['val'] or 0.0)
 
             # 1.2 Liquidità Condivisa (saldo / n.partecipanti per ogni conto)
@@ -216,7 +221,7 @@ def ottieni_riepilogo_patrimonio_utente(id_utente, anno, mese, master_key_b64=No
                 SELECT CC.id_conto_condiviso, CC.tipo_condivisione,
                     (SELECT COALESCE(SUM(TC.importo), 0.0) FROM TransazioniCondivise TC 
                      WHERE TC.id_conto_condiviso = CC.id_conto_condiviso AND TC.data <= %s) +
-                    COALESCE(CAST(NULLIF(CAST(CC.rettifica_saldo AS TEXT), '') AS NUMERIC), 0.0) as saldo,
+                    COALESCE(CC.rettifica_saldo, 0.0) as saldo,
                     CASE 
                         WHEN CC.tipo_condivisione = 'famiglia' THEN 
                             (SELECT COUNT(*) FROM Appartenenza_Famiglia AF WHERE AF.id_famiglia = CC.id_famiglia)
@@ -384,7 +389,8 @@ def ottieni_riepilogo_patrimonio_utente(id_utente, anno, mese, master_key_b64=No
 
             # 6. Prestiti Totali (quota personale dell'utente) - Calcolo avanzato con Piano Ammortamento
             cur.execute("""
-                SELECT id_prestito, CAST(importo_residuo AS NUMERIC) as res_db 
+                SELECT id_prestito, CAST(importo_residuo AS NUMERIC) as res_db,
+                       piano_rate_totali, piano_residuo
                 FROM Prestiti 
                 WHERE id_famiglia IN (SELECT id_famiglia FROM Appartenenza_Famiglia WHERE id_utente = %s)
             """, (id_utente,))
@@ -402,21 +408,13 @@ def ottieni_riepilogo_patrimonio_utente(id_utente, anno, mese, master_key_b64=No
                 for q in quotes_rows:
                     if q['id_prestito'] not in quotes_map: quotes_map[q['id_prestito']] = {}
                     quotes_map[q['id_prestito']][q['id_utente']] = float(q['percentuale'])
-                
-                # Schedules (Residuo da Piano)
-                cur.execute(f"SELECT id_prestito, SUM(importo_rata) as val FROM PianoAmmortamento WHERE id_prestito IN ({ph}) AND stato='da_pagare' GROUP BY id_prestito", tuple(l_ids))
-                sched_map = {r['id_prestito']: float(r['val']) for r in cur.fetchall()}
-                
-                # Check esistenza piano
-                cur.execute(f"SELECT DISTINCT id_prestito FROM PianoAmmortamento WHERE id_prestito IN ({ph})", tuple(l_ids))
-                has_sched = {r['id_prestito']: True for r in cur.fetchall()}
 
                 for l in loans:
                      pid = l['id_prestito']
                      
-                     # 1. Determina Residuo Base
-                     if has_sched.get(pid):
-                         residuo = sched_map.get(pid, 0.0)
+                     # 1. Determina Residuo Base (riepilogo del piano, se presente)
+                     if l['piano_rate_totali']:
+                         residuo = float(l['piano_residuo'] or 0.0)
                      else:
                          residuo = float(l['res_db'] or 0.0)
                      
@@ -470,7 +468,7 @@ def ottieni_riepilogo_patrimonio_famiglia_aggregato(id_famiglia, anno, mese, mas
             cur.execute("""
                 SELECT COALESCE(SUM(
                     (SELECT COALESCE(SUM(T.importo), 0.0) FROM Transazioni T WHERE T.id_conto = C.id_conto AND T.data <= %s) +
-                    COALESCE(CAST(NULLIF(CAST(C.rettifica_saldo AS TEXT), '') AS NUMERIC), 0.0)
+                    COALESCE(C.rettifica_saldo, 0.0)
                 ), 0.0) as val
                 FROM Conti C
                 JOIN Appartenenza_Famiglia AF ON C.id_utente = AF.id_utente
@@ -485,7 +483,7 @@ def ottieni_riepilogo_patrimonio_famiglia_aggregato(id_famiglia, anno, mese, mas
                 SELECT COALESCE(SUM(
                     (SELECT COALESCE(SUM(TC.importo), 0.0) FROM TransazioniCondivise TC 
                      WHERE TC.id_conto_condiviso = CC.id_conto_condiviso AND TC.data <= %s) +
-                    COALESCE(CAST(NULLIF(CAST(CC.rettifica_saldo AS TEXT), '') AS NUMERIC), 0.0)
+                    COALESCE(CC.rettifica_saldo, 0.0)
                 ), 0.0) as val
                 FROM ContiCondivisi CC
                 WHERE CC.id_famiglia = %s
@@ -603,62 +601,15 @@ def ottieni_riepilogo_patrimonio_famiglia_aggregato(id_famiglia, anno, mese, mas
             risparmio = risparmio + valore_salvadanai
 
             # 6. Prestiti Totali (totale famiglia) - Calcolo avanzato con Piano Ammortamento
-            prestiti_totali = 0.0
+            # Se il prestito ha un piano fa fede il residuo del piano (0 se tutto pagato),
+            # altrimenti il residuo statico
             cur.execute("""
-                SELECT id_prestito, CAST(importo_residuo AS NUMERIC) as residuo_db
+                SELECT COALESCE(SUM(CASE WHEN piano_rate_totali > 0 THEN CAST(piano_residuo AS NUMERIC)
+                                         ELSE CAST(importo_residuo AS NUMERIC) END), 0) AS totale
                 FROM Prestiti
                 WHERE id_famiglia = %s
             """, (id_famiglia,))
-            prestiti_rows = cur.fetchall()
-            
-            if prestiti_rows:
-                ids = [r['id_prestito'] for r in prestiti_rows]
-                residui_db = {r['id_prestito']: float(r['residuo_db'] or 0.0) for r in prestiti_rows}
-                
-                # Check piani custom
-                if ids:
-                    placeholders = ','.join(['%s'] * len(ids))
-                    cur.execute(f"""
-                        SELECT id_prestito, SUM(importo_rata) as residuo_piano
-                        FROM PianoAmmortamento
-                        WHERE id_prestito IN ({placeholders}) AND stato = 'da_pagare'
-                        GROUP BY id_prestito
-                    """, tuple(ids))
-                    piani_rows = cur.fetchall()
-                    residui_piano = {r['id_prestito']: float(r['residuo_piano']) for r in piani_rows}
-                else:
-                    residui_piano = {}
-                
-                # Calcola totale unificando le fonti
-                for pid in ids:
-                    # Se esiste almeno una rata nel piano (o meglio se c'è entry nel group by), usiamo quella somma
-                    # OCCHIO: Se il piano esiste ma tutto pagato? residuo_piano non avrà entry (stato='da_pagare').
-                    # Dobbiamo distinguere "Piano inesistente" da "Piano finito".
-                    # Per semplicità, se c'è un piano ammortamento caricato per quel prestito, PRESUMIAMO che faccia fede.
-                    # Ma qui residui_piano ha solo 'da_pagare'.
-                    # Se non c'è entry in residui_piano, potrebbe essere: No Piano O Piano Finito.
-                    # Bisognerebbe controllare se esiste il piano.
-                    
-                    # Approccio più robusto: Count row piano per ID.
-                    pass 
-                
-                # --- FIX LOGICA MIGLIORATA ---
-                # Check esistenza piano globale per questi ID
-                has_piano_map = {}
-                if ids:
-                    ph = ','.join(['%s'] * len(ids))
-                    cur.execute(f"SELECT DISTINCT id_prestito FROM PianoAmmortamento WHERE id_prestito IN ({ph})", tuple(ids))
-                    rows_exist = cur.fetchall()
-                    for re in rows_exist:
-                        has_piano_map[re['id_prestito']] = True
-                
-                for pid in ids:
-                    if has_piano_map.get(pid):
-                        # Se ha un piano, usiamo la somma 'da_pagare' (che sarà 0 se tutto pagato, corretta)
-                        prestiti_totali += residui_piano.get(pid, 0.0)
-                    else:
-                        # Se NON ha piano, usiamo il residuo statico DB
-                        prestiti_totali += residui_db[pid]
+            prestiti_totali = float(cur.fetchone()['totale'] or 0.0)
             
             patrimonio_netto = liquidita + investimenti + fondi_pensione + risparmio + patrimonio_immobile_lordo - prestiti_totali
             
@@ -681,6 +632,60 @@ def ottieni_riepilogo_patrimonio_famiglia_aggregato(id_famiglia, anno, mese, mas
         }
 
 
+# Transazioni personali e condivise visibili all'utente in un intervallo di date
+# (parametri: id_utente, inizio, fine, id_utente, id_utente, inizio, fine)
+_SQL_TRANSAZIONI_UTENTE = """
+    -- Transazioni Personali
+    SELECT T.id_transazione,
+           T.data,
+           T.descrizione,
+           T.importo,
+           C.nome_conto,
+           C.id_conto,
+           Cat.nome_categoria,
+           SCat.nome_sottocategoria,
+           SCat.id_sottocategoria,
+           'personale' AS tipo_transazione,
+           0           AS id_transazione_condivisa, -- Placeholder
+           T.id_carta,
+           T.importo_nascosto
+    FROM Transazioni T
+             JOIN Conti C ON T.id_conto = C.id_conto
+             LEFT JOIN Sottocategorie SCat ON T.id_sottocategoria = SCat.id_sottocategoria
+             LEFT JOIN Categorie Cat ON SCat.id_categoria = Cat.id_categoria
+    WHERE C.id_utente = %s
+      AND C.tipo != 'Fondo Pensione' AND T.data BETWEEN %s AND %s
+
+    UNION ALL
+
+    -- Transazioni Condivise
+    SELECT 0                     AS id_transazione, -- Placeholder
+           TC.data,
+           TC.descrizione,
+           TC.importo,
+           CC.nome_conto,
+           CC.id_conto_condiviso AS id_conto,
+           Cat.nome_categoria,
+           SCat.nome_sottocategoria,
+           SCat.id_sottocategoria,
+           'condivisa'           AS tipo_transazione,
+           TC.id_transazione_condivisa,
+           TC.id_carta,
+           TC.importo_nascosto
+    FROM TransazioniCondivise TC
+             JOIN ContiCondivisi CC ON TC.id_conto_condiviso = CC.id_conto_condiviso
+             LEFT JOIN PartecipazioneContoCondiviso PCC
+                       ON CC.id_conto_condiviso = PCC.id_conto_condiviso
+             LEFT JOIN Sottocategorie SCat ON TC.id_sottocategoria = SCat.id_sottocategoria
+             LEFT JOIN Categorie Cat ON SCat.id_categoria = Cat.id_categoria
+    WHERE ((PCC.id_utente = %s AND CC.tipo_condivisione = 'utenti')
+       OR (CC.id_famiglia IN (SELECT id_famiglia FROM Appartenenza_Famiglia WHERE id_utente = %s) AND
+           CC.tipo_condivisione = 'famiglia')) AND TC.data BETWEEN %s AND %s
+
+    ORDER BY data DESC, id_transazione DESC, id_transazione_condivisa DESC
+"""
+
+
 def ottieni_transazioni_utente(id_utente, anno, mese, master_key_b64=None):
     data_inizio = f"{anno}-{mese:02d}-01"
     ultimo_giorno = (datetime.date(anno, mese, 1) + relativedelta(months=1) - relativedelta(days=1)).day
@@ -690,56 +695,7 @@ def ottieni_transazioni_utente(id_utente, anno, mese, master_key_b64=None):
         with get_db_connection() as con:
             # con.row_factory = sqlite3.Row # Removed for Supabase
             cur = con.cursor()
-            cur.execute("""
-                        -- Transazioni Personali
-                        SELECT T.id_transazione,
-                               T.data,
-                               T.descrizione,
-                               T.importo,
-                               C.nome_conto,
-                               C.id_conto,
-                               Cat.nome_categoria,
-                               SCat.nome_sottocategoria,
-                               SCat.id_sottocategoria,
-                               'personale' AS tipo_transazione,
-                               0           AS id_transazione_condivisa, -- Placeholder
-                               T.id_carta,
-                               T.importo_nascosto
-                        FROM Transazioni T
-                                 JOIN Conti C ON T.id_conto = C.id_conto
-                                 LEFT JOIN Sottocategorie SCat ON T.id_sottocategoria = SCat.id_sottocategoria
-                                 LEFT JOIN Categorie Cat ON SCat.id_categoria = Cat.id_categoria
-                        WHERE C.id_utente = %s
-                          AND C.tipo != 'Fondo Pensione' AND T.data BETWEEN %s AND %s
-                        
-                        UNION ALL
-
-                        -- Transazioni Condivise
-                        SELECT 0                     AS id_transazione, -- Placeholder
-                               TC.data,
-                               TC.descrizione,
-                               TC.importo,
-                               CC.nome_conto,
-                               CC.id_conto_condiviso AS id_conto,
-                               Cat.nome_categoria,
-                               SCat.nome_sottocategoria,
-                               SCat.id_sottocategoria,
-                               'condivisa'           AS tipo_transazione,
-                               TC.id_transazione_condivisa,
-                               TC.id_carta,
-                               TC.importo_nascosto
-                        FROM TransazioniCondivise TC
-                                 JOIN ContiCondivisi CC ON TC.id_conto_condiviso = CC.id_conto_condiviso
-                                 LEFT JOIN PartecipazioneContoCondiviso PCC
-                                           ON CC.id_conto_condiviso = PCC.id_conto_condiviso
-                                 LEFT JOIN Sottocategorie SCat ON TC.id_sottocategoria = SCat.id_sottocategoria
-                                 LEFT JOIN Categorie Cat ON SCat.id_categoria = Cat.id_categoria
-                        WHERE ((PCC.id_utente = %s AND CC.tipo_condivisione = 'utenti')
-                           OR (CC.id_famiglia IN (SELECT id_famiglia FROM Appartenenza_Famiglia WHERE id_utente = %s) AND
-                               CC.tipo_condivisione = 'famiglia')) AND TC.data BETWEEN %s AND %s
-
-                        ORDER BY data DESC, id_transazione DESC, id_transazione_condivisa DESC
-                        """, (id_utente, data_inizio, data_fine, id_utente, id_utente, data_inizio, data_fine))
+            cur.execute(_SQL_TRANSAZIONI_UTENTE, (id_utente, data_inizio, data_fine, id_utente, id_utente, data_inizio, data_fine))
             results = [dict(row) for row in cur.fetchall()]
             
             # Decrypt if key available
@@ -15,6 +15,7 @@ import secrets
 import string
 import base64
 from utils.cache_manager import cache_manager
+from utils.contesto_inserimento import invalida_contesti_inserimento
 
 from db.crypto_helpers import (
     _encrypt_if_key, _decrypt_if_key, 
@@ -24,6 +25,8 @@ from db.crypto_helpers import (
     SERVER_SECRET_KEY,
     crypto as _crypto_instance
 )
+from db.directory_membri import invalida_directory_membri
+from db.directory_famiglie import aggiorna_directory_famiglie
 
 def esporta_dati_famiglia(id_famiglia: str, id_utente: str, master_key_b64: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
     """
@@ -178,7 +181,7 @@ def verifica_login(login_identifier: str, password: str) -> Optional[Dict[str, A
                              
                              # Send Email
                              try:
-                                 from utils.email_sender import send_email
+                                 from utils.email_outbox import accoda_email
                                  email_dest = decrypt_system_data(risultato.get('email_enc')) or risultato.get('email')
                                  if email_dest:
                                      subject = "BudgetAmico - Avviso di Sicurezza: Account Sospeso"
@@ -188,9 +191,8 @@ def verifica_login(login_identifier: str, password: str) -> Optional[Dict[str, A
                                      <p>Se non sei stato tu, qualcuno potrebbe non autorizzato sta provando ad accedere.</p>
                                      <p>Per riattivare l'account, contatta il supporto o l'amministratore di sistema.</p>
                                      """
-                                     # Run email sending in background or just try-catch to not block DB op too long?
-                                     # Blocking for simplicity here.
-                                     send_email(email_dest, subject, body)
+                                     # In coda: il login non aspetta il server SMTP
+                                     accoda_email(email_dest, subject, body)
                              except Exception as e_mail:
                                  logger.error(f"Failed to send suspension email: {e_mail}")
                                  
@@ -337,6 +339,7 @@ def verifica_login(login_identifier: str, password: str) -> Optional[Dict[str, A
                                         WHERE id_utente = %s
                                      """, (n_enc_srv, c_enc_srv, risultato['id_utente']))
                                      con_up_names.commit()
+                                 invalida_directory_membri(id_utente=risultato['id_utente'])
                      except Exception as e_mig_names:
                          print(f"[MIGRATION ERROR NAMES] {e_mig_names}")
 
@@ -442,6 +445,7 @@ def crea_utente_invitato(email: str, ruolo: str, id_famiglia: str, id_admin: Opt
                 INSERT INTO Appartenenza_Famiglia (id_utente, id_famiglia, ruolo, chiave_famiglia_criptata)
                 VALUES (%s, %s, %s, %s)
             """, (id_utente, id_famiglia, ruolo, family_key_encrypted_for_new_user))
+            aggiorna_directory_famiglie(cur, [id_famiglia])
             
             con.commit()
             
@@ -730,6 +734,7 @@ def cambia_password_e_username(id_utente: str, password_raw: str, nuovo_username
             ))
             
             con.commit()
+            invalida_directory_membri(id_utente=id_utente)
             
             return {
                 "success": True, 
@@ -788,7 +793,10 @@ def imposta_conto_default_utente(id_utente, id_conto_personale=None, id_conto_co
                     "UPDATE Utenti SET id_conto_default = NULL, id_conto_condiviso_default = NULL, id_carta_default = NULL WHERE id_utente = %s",
                     (id_utente,))
 
-            return cur.rowcount > 0
+            esito = cur.rowcount > 0
+            con.commit()
+            invalida_contesti_inserimento(id_utente=id_utente)
+            return esito
     except Exception as e:
         print(f"[ERRORE] Errore durante l'impostazione del conto di default: {e}")
         return False
@@ -1045,6 +1053,7 @@ def aggiorna_profilo_utente(id_utente, dati_profilo, master_key_b64=None):
                                     print(f"[WARN] Errore update display name per famiglia {fam['id_famiglia']}: {e}")
             
             con.commit()
+            invalida_directory_membri(id_utente=id_utente)
             return True
     except Exception as e:
         print(f"[ERRORE] Errore durante l'aggiornamento del profilo: {e}")
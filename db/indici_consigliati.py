@@ -0,0 +1,134 @@
+"""
+Indici consigliati per le query calde sulle transazioni e normalizzazione dei
+tipi delle colonne usate nei loro predicati.
+
+Le query di Personale, Famiglia, Budget e Patrimonio filtrano le transazioni
+per conto (o per famiglia via Appartenenza_Famiglia) e per intervallo di date,
+e sommano importo per sottocategoria: gli indici (conto, data) INCLUDE
+(importo, id_sottocategoria) le servono senza leggere la tabella. Gli indici
+a colonna singola che diventano prefissi di quelli nuovi vengono rimossi.
+
+Le date restano TEXT (tutti i lettori, export compresi, si aspettano stringhe
+'YYYY-MM-DD'), ma vengono portate in forma ISO canonica e tenute tali da un
+trigger BEFORE: così i predicati di intervallo sulla stringa (BETWEEN, >=, <)
+sono esatti e serviti dall'indice, senza CAST nei predicati. rettifica_saldo
+diventa DOUBLE PRECISION, e i lettori non hanno più bisogno di
+CAST(NULLIF(CAST(... AS TEXT), '') AS NUMERIC).
+"""
+from typing import List
+
+# (nome, definizione): applicati con CREATE INDEX IF NOT EXISTS.
+# Appartenenza_Famiglia(id_utente, id_famiglia) è già la chiave primaria.
+INDICI_CONSIGLIATI = (
+    ("idx_transazioni_conto_data",
+     "Transazioni(id_conto, data) INCLUDE (importo, id_sottocategoria)"),
+    ("idx_transazionicondivise_conto_data",
+     "TransazioniCondivise(id_conto_condiviso, data) INCLUDE (importo, id_sottocategoria)"),
+    ("idx_transazioni_carta_data",
+     "Transazioni(id_carta, data) INCLUDE (importo) WHERE id_carta IS NOT NULL"),
+    ("idx_transazionicondivise_carta_data",
+     "TransazioniCondivise(id_carta, data) INCLUDE (importo) WHERE id_carta IS NOT NULL"),
+    ("idx_appartenenza_famiglia_famiglia_utente", "Appartenenza_Famiglia(id_famiglia, id_utente)"),
+    ("idx_conti_utente", "Conti(id_utente) INCLUDE (tipo, nascosto, rettifica_saldo)"),
+    ("idx_conticondivisi_famiglia", "ContiCondivisi(id_famiglia) INCLUDE (tipo, tipo_condivisione)"),
+    ("idx_partecipazione_utente_conto", "PartecipazioneContoCondiviso(id_utente, id_conto_condiviso)"),
+)
+
+# Indici resi superflui (prefissi di quelli consigliati)
+INDICI_SOSTITUITI = (
+    "idx_transazioni_id_conto",
+    "idx_transazioni_id_carta",
+    "idx_transazionicondivise_id_conto_condiviso",
+    "idx_transazionicondivise_id_carta",
+    "idx_appartenenza_famiglia_id_famiglia",
+    "idx_conti_id_utente",
+    "idx_conticondivisi_id_famiglia",
+    "idx_partecipazione_id_utente",
+)
+
+_TABELLE_CON_DATA = ("Transazioni", "TransazioniCondivise")
+_TABELLE_CON_RETTIFICA = ("Conti", "ContiCondivisi")
+
+_REGEX_DATA_ISO = r"^\d{4}-\d{2}-\d{2}$"
+
+
+def _tipo_colonna(cur, tabella: str, colonna: str):
+    cur.execute("""
+        SELECT data_type FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = %s AND column_name = %s
+    """, (tabella.lower(), colonna))
+    row = cur.fetchone()
+    return row['data_type'] if row else None
+
+
+def applica_indici_consigliati(cur) -> None:
+    """Crea gli indici consigliati e rimuove quelli sostituiti."""
+    for nome, definizione in INDICI_CONSIGLIATI:
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON {definizione}")
+    for nome in INDICI_SOSTITUITI:
+        cur.execute(f"DROP INDEX IF EXISTS {nome}")
+
+
+def normalizza_colonne_tipizzate(cur) -> None:
+    """
+    Date delle transazioni in forma ISO canonica (più trigger che la mantiene)
+    e rettifica_saldo numerica. Idempotente.
+    """
+    # Valori non convertibili: restano come sono (date) o diventano NULL (rettifiche)
+    cur.execute(f"""
+        CREATE OR REPLACE FUNCTION _ba_data_iso(t TEXT) RETURNS TEXT AS $$
+        BEGIN
+            IF t ~ '{_REGEX_DATA_ISO}' THEN
+                RETURN t;
+            END IF;
+            RETURN to_char(CAST(t AS DATE), 'YYYY-MM-DD');
+        EXCEPTION WHEN others THEN
+            RETURN t;
+        END;
+        $$ LANGUAGE plpgsql STABLE;
+    """)
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION normalizza_data_transazione() RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.data := _ba_data_iso(NEW.data);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for tabella in _TABELLE_CON_DATA:
+        if _tipo_colonna(cur, tabella, 'data') != 'text':
+            continue
+        cur.execute(f"UPDATE {tabella} SET data = _ba_data_iso(data) WHERE data !~ %s", (_REGEX_DATA_ISO,))
+        trigger = f"trg_{tabella.lower()}_data_iso"
+        cur.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {tabella}")
+        cur.execute(f"""
+            CREATE TRIGGER {trigger} BEFORE INSERT OR UPDATE OF data ON {tabella}
+            FOR EACH ROW EXECUTE FUNCTION normalizza_data_transazione()
+        """)
+
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION _ba_try_numeric(t TEXT) RETURNS DOUBLE PRECISION AS $$
+        BEGIN
+            RETURN CAST(NULLIF(t, '') AS DOUBLE PRECISION);
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql IMMUTABLE;
+    """)
+    for tabella in _TABELLE_CON_RETTIFICA:
+        if _tipo_colonna(cur, tabella, 'rettifica_saldo') in ('double precision', 'real', 'numeric', None):
+            continue
+        cur.execute(f"""
+            ALTER TABLE {tabella} ALTER COLUMN rettifica_saldo TYPE DOUBLE PRECISION
+            USING _ba_try_numeric(CAST(rettifica_saldo AS TEXT))
+        """)
+        cur.execute(f"ALTER TABLE {tabella} ALTER COLUMN rettifica_saldo SET DEFAULT 0.0")
+    cur.execute("DROP FUNCTION IF EXISTS _ba_try_numeric(TEXT)")
+
+
+def indici_mancanti(cur) -> List[str]:
+    """Nomi degli indici consigliati non presenti nel database."""
+    cur.execute("SELECT indexname FROM pg_indexes WHERE indexname = ANY(%s)",
+                ([nome for nome, _ in INDICI_CONSIGLIATI],))
+    presenti = {row['indexname'] for row in cur.fetchall()}
+    return [nome for nome, _ in INDICI_CONSIGLIATI if nome not in presenti]
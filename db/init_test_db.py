@@ -1,6 +1,7 @@
 import os
 import sys
 import psycopg2
+import psycopg2.extras
 from urllib.parse import urlparse
 from dotenv import load_dotenv
 
@@ -11,6 +12,8 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
 from db.crea_database import TABLES, SCHEMA_VERSION
+from db.catalogo_periodi import installa_trigger_catalogo
+from db.indici_consigliati import applica_indici_consigliati, normalizza_colonne_tipizzate
 
 def get_connection_params(db_url):
     result = urlparse(db_url)
@@ -66,7 +69,8 @@ def init_test_db():
     try:
         params = get_connection_params(db_url)
         conn = psycopg2.connect(**params)
-        cur = conn.cursor()
+        # Cursore a dizionario: gli helper di schema condivisi con le migrazioni leggono row['colonna']
+        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         
         print("Creazione tabelle...")
         
@@ -90,10 +94,12 @@ def init_test_db():
             "Sottocategorie",   # Ref Categorie
             "Carte",            # Ref Utenti, Conti
             "StoricoMassimaliCarte",
+            "Addebiti_Carte",   # Ref Carte
             "Contatti",         # Ref Utenti, Famiglie
             "CondivisioneContatto",
             "Transazioni",      # Ref Conti, Sottocategorie, Carte
             "TransazioniCondivise",
+            "Catalogo_Periodi",
             "Budget",           # Ref Famiglie, Sottocategorie
             "Budget_Storico",
             "Prestiti",         # Ref Famiglie, Conti
@@ -106,7 +112,12 @@ def init_test_db():
             "Storico_Asset",
             "SpeseFisse",       # Ref Famiglie, Conti, Categorie
             "Configurazioni",   # Ref Famiglie
+            "Versioni_Configurazioni",
             "Log_Sistema",      # Ref Utenti
+            "Log_Sistema_Orario",
+            "Statistiche_Accessi",
+            "Outbox_Email",
+            "Directory_Famiglie", # Ref Famiglie
             "Config_Logger"
         ]
 
@@ -161,7 +172,16 @@ def init_test_db():
         cur.execute("ALTER TABLE Utenti ADD CONSTRAINT fk_utenti_conticondivisi FOREIGN KEY (id_conto_condiviso_default) REFERENCES ContiCondivisi(id_conto_condiviso) ON DELETE SET NULL")
         cur.execute("ALTER TABLE Utenti ADD CONSTRAINT fk_utenti_carte FOREIGN KEY (id_carta_default) REFERENCES Carte(id_carta) ON DELETE SET NULL")
 
-        # 5. InfoDB per versione
+        # 5. Trigger che mantengono Catalogo_Periodi (nelle migrazioni da installa_trigger_catalogo)
+        print("  - Trigger Catalogo_Periodi")
+        installa_trigger_catalogo(cur)
+
+        # 6. Date ISO canoniche (trigger BEFORE) e indici consigliati, come la migrazione v36 -> v37
+        print("  - Normalizzazione date e indici consigliati")
+        normalizza_colonne_tipizzate(cur)
+        applica_indici_consigliati(cur)
+
+        # 7. InfoDB per versione
         print("  - InfoDB")
         cur.execute("""
             CREATE TABLE IF NOT EXISTS InfoDB (
@@ -1155,6 +1155,477 @@ def _migra_da_v29_a_v30(con):
         return False
 
 
+def _migra_da_v30_a_v31(con):
+    """
+    Logica specifica per migrare un DB dalla versione 30 alla 31.
+    - Converte Log_Sistema.dettagli in JSONB.
+    - Indici compositi per la paginazione keyset (timestamp, id_log) con filtri.
+    - Tabella di rollup orario Log_Sistema_Orario mantenuta da trigger.
+    """
+    print("Esecuzione migrazione da v30 a v31...")
+    try:
+        cur = con.cursor()
+
+        # 1. dettagli TEXT -> JSONB (i valori non JSON vengono conservati come stringa JSON)
+        print("  - Conversione Log_Sistema.dettagli in JSONB...")
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION _ba_try_jsonb(t TEXT) RETURNS JSONB AS $$
+            BEGIN
+                RETURN t::jsonb;
+            EXCEPTION WHEN others THEN
+                RETURN to_jsonb(t);
+            END;
+            $$ LANGUAGE plpgsql IMMUTABLE;
+        """)
+        cur.execute("""
+            SELECT data_type FROM information_schema.columns
+            WHERE table_name = 'log_sistema' AND column_name = 'dettagli'
+        """)
+        col = cur.fetchone()
+        if col and col['data_type'] != 'jsonb':
+            cur.execute("ALTER TABLE Log_Sistema ALTER COLUMN dettagli TYPE JSONB USING _ba_try_jsonb(dettagli)")
+        cur.execute("DROP FUNCTION IF EXISTS _ba_try_jsonb(TEXT)")
+
+        # 2. Indici keyset (sostituiscono quelli a colonna singola)
+        print("  - Creazione indici compositi per Log_Sistema...")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_log_ts_id ON Log_Sistema(timestamp DESC, id_log DESC)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_log_livello_ts_id ON Log_Sistema(livello, timestamp DESC, id_log DESC)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_log_componente_ts_id ON Log_Sistema(componente, timestamp DESC, id_log DESC)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_log_famiglia_ts_id ON Log_Sistema(id_famiglia, timestamp DESC, id_log DESC)")
+        cur.execute("DROP INDEX IF EXISTS idx_log_timestamp")
+        cur.execute("DROP INDEX IF EXISTS idx_log_livello")
+        cur.execute("DROP INDEX IF EXISTS idx_log_componente")
+
+        # 3. Rollup orario
+        print("  - Creazione tabella Log_Sistema_Orario...")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS Log_Sistema_Orario (
+                ora TIMESTAMP NOT NULL,
+                livello TEXT NOT NULL,
+                componente TEXT NOT NULL,
+                conteggio INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (ora, livello, componente)
+            )
+        """)
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION log_sistema_rollup_ins() RETURNS TRIGGER AS $$
+            BEGIN
+                INSERT INTO Log_Sistema_Orario (ora, livello, componente, conteggio)
+                SELECT date_trunc('hour', COALESCE(n.timestamp, CURRENT_TIMESTAMP)), n.livello, n.componente, COUNT(*)
+                FROM nuove n
+                GROUP BY 1, 2, 3
+                ON CONFLICT (ora, livello, componente)
+                DO UPDATE SET conteggio = Log_Sistema_Orario.conteggio + EXCLUDED.conteggio;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION log_sistema_rollup_del() RETURNS TRIGGER AS $$
+            BEGIN
+                UPDATE Log_Sistema_Orario R
+                SET conteggio = R.conteggio - v.n
+                FROM (
+                    SELECT date_trunc('hour', COALESCE(o.timestamp, CURRENT_TIMESTAMP)) AS ora, o.livello, o.componente, COUNT(*) AS n
+                    FROM vecchie o
+                    GROUP BY 1, 2, 3
+                ) v
+                WHERE R.ora = v.ora AND R.livello = v.livello AND R.componente = v.componente;
+                DELETE FROM Log_Sistema_Orario WHERE conteggio <= 0;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        cur.execute("DROP TRIGGER IF EXISTS trg_log_sistema_rollup_ins ON Log_Sistema")
+        cur.execute("""
+            CREATE TRIGGER trg_log_sistema_rollup_ins AFTER INSERT ON Log_Sistema
+            REFERENCING NEW TABLE AS nuove
+            FOR EACH STATEMENT EXECUTE FUNCTION log_sistema_rollup_ins()
+        """)
+        cur.execute("DROP TRIGGER IF EXISTS trg_log_sistema_rollup_del ON Log_Sistema")
+        cur.execute("""
+            CREATE TRIGGER trg_log_sistema_rollup_del AFTER DELETE ON Log_Sistema
+            REFERENCING OLD TABLE AS vecchie
+            FOR EACH STATEMENT EXECUTE FUNCTION log_sistema_rollup_del()
+        """)
+
+        # 4. Backfill del rollup dai log esistenti
+        print("  - Popolamento iniziale Log_Sistema_Orario...")
+        cur.execute("DELETE FROM Log_Sistema_Orario")
+        cur.execute("""
+            INSERT INTO Log_Sistema_Orario (ora, livello, componente, conteggio)
+            SELECT date_trunc('hour', COALESCE(timestamp, CURRENT_TIMESTAMP)), livello, componente, COUNT(*)
+            FROM Log_Sistema
+            GROUP BY 1, 2, 3
+        """)
+
+        con.commit()
+        print("Migrazione a v31 completata con successo.")
+        return True
+    except Exception as e:
+        print(f"❌ Errore critico durante la migrazione da v30 a v31: {e}")
+        try: con.rollback() 
+        except: pass
+        return False
+
+
+def _migra_da_v31_a_v32(con):
+    """
+    Logica specifica per migrare un DB dalla versione 31 alla 32.
+    - Crea la tabella Statistiche_Accessi (contatori orari per utente)
+      aggiornata da aggiorna_ultimo_accesso, e la popola dai log esistenti.
+    """
+    print("Esecuzione migrazione da v31 a v32...")
+    try:
+        cur = con.cursor()
+        print("  - Creazione tabella Statistiche_Accessi...")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS Statistiche_Accessi (
+                ora TIMESTAMP NOT NULL,
+                id_utente INTEGER NOT NULL REFERENCES Utenti(id_utente) ON DELETE CASCADE,
+                accessi INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (ora, id_utente)
+            )
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_statistiche_accessi_utente ON Statistiche_Accessi(id_utente, ora DESC)")
+
+        print("  - Popolamento iniziale da Log_Sistema...")
+        cur.execute("""
+            INSERT INTO Statistiche_Accessi (ora, id_utente, accessi)
+            SELECT date_trunc('hour', L.timestamp), L.id_utente, COUNT(*)
+            FROM Log_Sistema L
+            JOIN Utenti U ON U.id_utente = L.id_utente
+            WHERE L.timestamp IS NOT NULL
+              AND (L.messaggio LIKE 'LOGIN RIUSCITO%' OR L.messaggio LIKE '[NAV]%')
+            GROUP BY 1, 2
+            ON CONFLICT (ora, id_utente) DO NOTHING
+        """)
+
+        con.commit()
+        print("Migrazione a v32 completata con successo.")
+        return True
+    except Exception as e:
+        print(f"❌ Errore critico durante la migrazione da v31 a v32: {e}")
+        try: con.rollback() 
+        except: pass
+        return False
+
+
+def _migra_da_v32_a_v33(con):
+    """
+    Logica specifica per migrare un DB dalla versione 32 alla 33.
+    - Aggiunge a Prestiti le colonne di riepilogo del piano di ammortamento
+      (piano_*), mantenute dalle funzioni che scrivono PianoAmmortamento,
+      e le popola dai piani esistenti.
+    """
+    print("Esecuzione migrazione da v32 a v33...")
+    try:
+        cur = con.cursor()
+        print("  - Aggiunta colonne riepilogo piano a Prestiti...")
+        cur.execute("""
+            ALTER TABLE Prestiti
+                ADD COLUMN IF NOT EXISTS piano_rate_totali INTEGER DEFAULT 0,
+                ADD COLUMN IF NOT EXISTS piano_rate_pagate INTEGER DEFAULT 0,
+                ADD COLUMN IF NOT EXISTS piano_residuo NUMERIC DEFAULT 0,
+                ADD COLUMN IF NOT EXISTS piano_capitale_residuo NUMERIC DEFAULT 0,
+                ADD COLUMN IF NOT EXISTS piano_interessi_residui NUMERIC DEFAULT 0,
+                ADD COLUMN IF NOT EXISTS piano_prossima_rata NUMERIC,
+                ADD COLUMN IF NOT EXISTS piano_prossima_scadenza TEXT
+        """)
+
+        print("  - Popolamento iniziale da PianoAmmortamento...")
+        cur.execute("""
+            UPDATE Prestiti P SET
+                piano_rate_totali = A.rate_totali,
+                piano_rate_pagate = A.rate_pagate,
+                piano_residuo = A.residuo,
+                piano_capitale_residuo = A.capitale_residuo,
+                piano_interessi_residui = A.interessi_residui,
+                piano_prossima_rata = A.prossima_rata,
+                piano_prossima_scadenza = A.prossima_scadenza
+            FROM (
+                SELECT id_prestito,
+                       COUNT(*) AS rate_totali,
+                       COUNT(*) FILTER (WHERE stato = 'pagata') AS rate_pagate,
+                       COALESCE(SUM(importo_rata) FILTER (WHERE stato = 'da_pagare'), 0) AS residuo,
+                       COALESCE(SUM(quota_capitale) FILTER (WHERE stato = 'da_pagare'), 0) AS capitale_residuo,
+                       COALESCE(SUM(quota_interessi) FILTER (WHERE stato = 'da_pagare'), 0) AS interessi_residui,
+                       (ARRAY_AGG(importo_rata ORDER BY data_scadenza, numero_rata)
+                            FILTER (WHERE stato = 'da_pagare'))[1] AS prossima_rata,
+                       MIN(data_scadenza) FILTER (WHERE stato = 'da_pagare') AS prossima_scadenza
+                FROM PianoAmmortamento
+                GROUP BY id_prestito
+            ) A
+            WHERE P.id_prestito = A.id_prestito
+        """)
+
+        con.commit()
+        print("Migrazione a v33 completata con successo.")
+        return True
+    except Exception as e:
+        print(f"❌ Errore critico durante la migrazione da v32 a v33: {e}")
+        try: con.rollback() 
+        except: pass
+        return False
+
+
+def _migra_da_v33_a_v34(con):
+    """
+    Logica specifica per migrare un DB dalla versione 33 alla 34.
+    - Crea Directory_Famiglie (nome cifrato con la chiave di sistema, membri,
+      ultima attività, spazio occupato) letta dal pannello admin, e la popola.
+      I nomi si recuperano con la chiave server (automazione cloud) o con il
+      backup server della master key di un membro; le altre famiglie li
+      ottengono alla prossima rinomina.
+    """
+    print("Esecuzione migrazione da v33 a v34...")
+    try:
+        from db.directory_famiglie import ricalcola_directory_famiglie, popola_nomi_da_chiave_server
+        cur = con.cursor()
+        print("  - Creazione tabella Directory_Famiglie...")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS Directory_Famiglie (
+                id_famiglia INTEGER PRIMARY KEY REFERENCES Famiglie(id_famiglia) ON DELETE CASCADE,
+                nome_enc_server TEXT,
+                codice_bindex TEXT,
+                num_membri INTEGER NOT NULL DEFAULT 0,
+                ultima_attivita TIMESTAMP,
+                dimensione_byte BIGINT NOT NULL DEFAULT 0,
+                aggiornato_il TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_directory_famiglie_codice ON Directory_Famiglie(codice_bindex)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_directory_famiglie_membri ON Directory_Famiglie(num_membri, id_famiglia)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_directory_famiglie_attivita ON Directory_Famiglie(ultima_attivita, id_famiglia)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_directory_famiglie_dimensione ON Directory_Famiglie(dimensione_byte, id_famiglia)")
+
+        print("  - Popolamento iniziale (membri, attività, spazio)...")
+        ricalcola_directory_famiglie(cur)
+        print("  - Recupero nomi e codici famiglia...")
+        print(f"    {popola_nomi_da_chiave_server(cur)} famiglie aggiornate.")
+
+        con.commit()
+        print("Migrazione a v34 completata con successo.")
+        return True
+    except Exception as e:
+        print(f"❌ Errore critico durante la migrazione da v33 a v34: {e}")
+        try: con.rollback() 
+        except: pass
+        return False
+
+
+def _migra_da_v34_a_v35(con):
+    """
+    Logica specifica per migrare un DB dalla versione 34 alla 35.
+    - Crea Versioni_Configurazioni: un contatore per ambito (globale,
+      famiglia:<id>, utente:<id>) incrementato da set_configurazione e usato
+      per riverificare gli snapshot di configurazione in memoria.
+    """
+    print("Esecuzione migrazione da v34 a v35...")
+    try:
+        cur = con.cursor()
+        print("  - Creazione tabella Versioni_Configurazioni...")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS Versioni_Configurazioni (
+                ambito TEXT PRIMARY KEY,
+                versione BIGINT NOT NULL DEFAULT 0,
+                aggiornato_il TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        con.commit()
+        print("Migrazione a v35 completata con successo.")
+        return True
+    except Exception as e:
+        print(f"❌ Errore critico durante la migrazione da v34 a v35: {e}")
+        try: con.rollback() 
+        except: pass
+        return False
+
+
+def _migra_da_v35_a_v36(con):
+    """
+    Logica specifica per migrare un DB dalla versione 35 alla 36.
+    - Crea Catalogo_Periodi (mesi con transazioni per conto, conto condiviso e
+      carta) letto dai selettori del mese, i trigger che lo mantengono su
+      Transazioni e TransazioniCondivise, e lo popola.
+    """
+    print("Esecuzione migrazione da v35 a v36...")
+    try:
+        from db.catalogo_periodi import installa_trigger_catalogo, ricostruisci_catalogo_periodi
+        cur = con.cursor()
+        print("  - Creazione tabella Catalogo_Periodi...")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS Catalogo_Periodi (
+                ambito TEXT NOT NULL,
+                id_ambito INTEGER NOT NULL,
+                anno INTEGER NOT NULL,
+                mese INTEGER NOT NULL,
+                num_transazioni INTEGER NOT NULL DEFAULT 0,
+                totale NUMERIC NOT NULL DEFAULT 0,
+                PRIMARY KEY (ambito, id_ambito, anno, mese)
+            )
+        """)
+        print("  - Creazione trigger su Transazioni e TransazioniCondivise...")
+        installa_trigger_catalogo(cur)
+        print("  - Popolamento iniziale dalle transazioni esistenti...")
+        ricostruisci_catalogo_periodi(cur)
+
+        con.commit()
+        print("Migrazione a v36 completata con successo.")
+        return True
+    except Exception as e:
+        print(f"❌ Errore critico durante la migrazione da v35 a v36: {e}")
+        try: con.rollback() 
+        except: pass
+        return False
+
+
+def _migra_da_v36_a_v37(con):
+    """
+    Logica specifica per migrare un DB dalla versione 36 alla 37.
+    - Date delle transazioni in forma ISO canonica (trigger di normalizzazione)
+      e rettifica_saldo numerica.
+    - Indici composti/covering per le query calde sulle transazioni; rimuove
+      gli indici a colonna singola che ne sono prefissi.
+    """
+    print("Esecuzione migrazione da v36 a v37...")
+    try:
+        from db.indici_consigliati import applica_indici_consigliati, normalizza_colonne_tipizzate
+        cur = con.cursor()
+        try:
+            cur.execute("SET statement_timeout = 0")
+        except Exception as e:
+            print(f"    [!] Impossibile impostare timeout illimitato: {e}")
+
+        print("  - Normalizzazione date e rettifiche saldo...")
+        normalizza_colonne_tipizzate(cur)
+        print("  - Creazione indici consigliati... (Potrebbe richiedere tempo)")
+        applica_indici_consigliati(cur)
+        cur.execute("ANALYZE Transazioni")
+        cur.execute("ANALYZE TransazioniCondivise")
+
+        con.commit()
+        print("Migrazione a v37 completata con successo.")
+        return True
+    except Exception as e:
+        print(f"❌ Errore critico durante la migrazione da v36 a v37: {e}")
+        try: con.rollback() 
+        except: pass
+        return False
+
+
+def _migra_da_v37_a_v38(con):
+    """
+    Logica specifica per migrare un DB dalla versione 37 alla 38.
+    - Catalogo_Periodi tiene anche il totale degli importi del mese (trigger
+      aggiornati e ricostruzione).
+    - Carte.giorno_addebito_pianificato (in chiaro, per il job di addebito) e
+      registro Addebiti_Carte con chiave unica (carta, anno, mese).
+    """
+    print("Esecuzione migrazione da v37 a v38...")
+    try:
+        from db.catalogo_periodi import installa_trigger_catalogo, ricostruisci_catalogo_periodi
+        cur = con.cursor()
+        print("  - Totali mensili in Catalogo_Periodi...")
+        cur.execute("ALTER TABLE Catalogo_Periodi ADD COLUMN IF NOT EXISTS totale NUMERIC NOT NULL DEFAULT 0")
+        installa_trigger_catalogo(cur)
+        ricostruisci_catalogo_periodi(cur)
+
+        print("  - Giorno di addebito pianificato e registro Addebiti_Carte...")
+        cur.execute("ALTER TABLE Carte ADD COLUMN IF NOT EXISTS giorno_addebito_pianificato INTEGER")
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_carte_addebito_pianificato ON Carte(giorno_addebito_pianificato)
+            WHERE attiva = TRUE AND tipo_carta = 'credito' AND addebito_automatico = TRUE
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS Addebiti_Carte (
+                id_addebito SERIAL PRIMARY KEY,
+                id_carta INTEGER NOT NULL REFERENCES Carte(id_carta) ON DELETE CASCADE,
+                anno INTEGER NOT NULL,
+                mese INTEGER NOT NULL,
+                data_addebito TEXT NOT NULL,
+                importo DOUBLE PRECISION NOT NULL,
+                id_transazione_conto INTEGER,
+                id_transazione_carta INTEGER,
+                eseguito_il TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (id_carta, anno, mese)
+            )
+        """)
+
+        con.commit()
+        print("Migrazione a v38 completata con successo.")
+        return True
+    except Exception as e:
+        print(f"❌ Errore critico durante la migrazione da v37 a v38: {e}")
+        try: con.rollback() 
+        except: pass
+        return False
+
+
+def _migra_da_v38_a_v39(con):
+    """
+    Logica specifica per migrare un DB dalla versione 38 alla 39.
+    - Coda Outbox_Email per l'invio asincrono delle email (utils.email_outbox).
+    """
+    print("Esecuzione migrazione da v38 a v39...")
+    try:
+        cur = con.cursor()
+        print("  - Creazione tabella Outbox_Email...")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS Outbox_Email (
+                id_email SERIAL PRIMARY KEY,
+                destinatario TEXT NOT NULL,
+                oggetto TEXT NOT NULL,
+                corpo TEXT,
+                allegato TEXT,
+                nome_allegato TEXT,
+                stato TEXT NOT NULL DEFAULT 'in_coda' CHECK(stato IN ('in_coda','in_invio','inviata','fallita')),
+                tentativi INTEGER NOT NULL DEFAULT 0,
+                prossimo_tentativo TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                ultimo_errore TEXT,
+                creato_il TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                inviato_il TIMESTAMP
+            )
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_outbox_email_pronte ON Outbox_Email(prossimo_tentativo)
+            WHERE stato IN ('in_coda', 'in_invio')
+        """)
+
+        con.commit()
+        print("Migrazione a v39 completata con successo.")
+        return True
+    except Exception as e:
+        print(f"❌ Errore critico durante la migrazione da v38 a v39: {e}")
+        try: con.rollback() 
+        except: pass
+        return False
+
+
+def _migra_da_v39_a_v40(con):
+    """
+    Logica specifica per migrare un DB dalla versione 39 alla 40.
+    - Trigger di Catalogo_Periodi separati per evento: l'UPDATE ignora le righe
+      in cui non cambiano data, importo, conto o carta e la pulizia delle righe
+      a zero riguarda solo i periodi toccati dallo statement.
+    """
+    print("Esecuzione migrazione da v39 a v40...")
+    try:
+        from db.catalogo_periodi import installa_trigger_catalogo
+        cur = con.cursor()
+        print("  - Reinstallazione trigger di Catalogo_Periodi...")
+        installa_trigger_catalogo(cur)
+
+        con.commit()
+        print("Migrazione a v40 completata con successo.")
+        return True
+    except Exception as e:
+        print(f"❌ Errore critico durante la migrazione da v39 a v40: {e}")
+        try: con.rollback() 
+        except: pass
+        return False
+
+
 def migra_database(con, versione_vecchia=None, versione_nuova=None):
     """
     Funzione principale che gestisce il processo di migrazione.
@@ -1334,6 +1805,56 @@ def migra_database(con, versione_vecchia=None, versione_nuova=None):
                  raise Exception("Migrazione da v29 a v30 fallita.")
             versione_vecchia = 30
 
+        if versione_vecchia == 30 and versione_nuova >= 31:
+            if not _migra_da_v30_a_v31(con):
+                 raise Exception("Migrazione da v30 a v31 fallita.")
+            versione_vecchia = 31
+
+        if versione_vecchia == 31 and versione_nuova >= 32:
+            if not _migra_da_v31_a_v32(con):
+                 raise Exception("Migrazione da v31 a v32 fallita.")
+            versione_vecchia = 32
+
+        if versione_vecchia == 32 and versione_nuova >= 33:
+            if not _migra_da_v32_a_v33(con):
+                 raise Exception("Migrazione da v32 a v33 fallita.")
+            versione_vecchia = 33
+
+        if versione_vecchia == 33 and versione_nuova >= 34:
+            if not _migra_da_v33_a_v34(con):
+                 raise Exception("Migrazione da v33 a v34 fallita.")
+            versione_vecchia = 34
+
+        if versione_vecchia == 34 and versione_nuova >= 35:
+            if not _migra_da_v34_a_v35(con):
+                 raise Exception("Migrazione da v34 a v35 fallita.")
+            versione_vecchia = 35
+
+        if versione_vecchia == 35 and versione_nuova >= 36:
+            if not _migra_da_v35_a_v36(con):
+                 raise Exception("Migrazione da v35 a v36 fallita.")
+            versione_vecchia = 36
+
+        if versione_vecchia == 36 and versione_nuova >= 37:
+            if not _migra_da_v36_a_v37(con):
+                 raise Exception("Migrazione da v36 a v37 fallita.")
+            versione_vecchia = 37
+
+        if versione_vecchia == 37 and versione_nuova >= 38:
+            if not _migra_da_v37_a_v38(con):
+                 raise Exception("Migrazione da v37 a v38 fallita.")
+            versione_vecchia = 38
+
+        if versione_vecchia == 38 and versione_nuova >= 39:
+            if not _migra_da_v38_a_v39(con):
+                 raise Exception("Migrazione da v38 a v39 fallita.")
+            versione_vecchia = 39
+
+        if versione_vecchia == 39 and versione_nuova >= 40:
+            if not _migra_da_v39_a_v40(con):
+                 raise Exception("Migrazione da v39 a v40 fallita.")
+            versione_vecchia = 40
+
 
 
 
@@ -0,0 +1,176 @@
+"""
+Coda persistente delle email in uscita (Outbox_Email).
+
+Chi deve mandare una email la accoda (una INSERT) e torna subito; il worker
+di utils.email_outbox preleva i messaggi pronti, li invia su una connessione
+SMTP riusata e ne registra l'esito. Corpo e allegato sono cifrati con la
+chiave di sistema e vengono cancellati appena il messaggio è consegnato.
+
+Il prelievo marca le righe 'in_invio' con FOR UPDATE SKIP LOCKED, così più
+processi (app e background service) non inviano due volte lo stesso
+messaggio; la marcatura scade dopo _DURATA_PRELIEVO, e un worker morto a
+metà invio non blocca la riga per sempre.
+"""
+import base64
+from typing import Any, Dict, List, Optional
+
+from db.supabase_manager import get_db_connection
+from db.crypto_helpers import encrypt_system_data, decrypt_system_data
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+STATO_IN_CODA = 'in_coda'
+STATO_IN_INVIO = 'in_invio'
+STATO_INVIATA = 'inviata'
+STATO_FALLITA = 'fallita'
+
+# Secondi dopo i quali un messaggio 'in_invio' torna prelevabile
+_DURATA_PRELIEVO = 600
+
+
+def accoda_email(destinatario: str, oggetto: str, corpo: str,
+                 allegato: Optional[bytes] = None, nome_allegato: Optional[str] = None) -> Optional[int]:
+    """Inserisce un messaggio nella coda; restituisce id_email o None in caso di errore."""
+    try:
+        # Senza chiave di sistema non si accoda nulla: il worker invierebbe un messaggio vuoto
+        corpo_enc = encrypt_system_data(corpo)
+        if not corpo_enc:
+            print(f"[ERRORE] Email per {destinatario} non accodata: cifratura del corpo non riuscita")
+            return None
+        allegato_enc = None
+        if allegato and nome_allegato:
+            allegato_enc = encrypt_system_data(base64.b64encode(allegato).decode('ascii'))
+            if not allegato_enc:
+                print(f"[ERRORE] Email per {destinatario} non accodata: cifratura dell'allegato non riuscita")
+                return None
+        with get_db_connection() as con:
+            cur = con.cursor()
+            cur.execute("""
+                INSERT INTO Outbox_Email (destinatario, oggetto, corpo, allegato, nome_allegato)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING id_email
+            """, (destinatario, oggetto, corpo_enc, allegato_enc,
+                  nome_allegato if allegato_enc else None))
+            id_email = cur.fetchone()['id_email']
+            con.commit()
+            return id_email
+    except Exception as e:
+        print(f"[ERRORE] Errore accodamento email per {destinatario}: {e}")
+        return None
+
+
+def preleva_email(limite: int = 20) -> List[Dict[str, Any]]:
+    """
+    Marca come 'in_invio' fino a `limite` messaggi pronti (in coda e col
+    tentativo scaduto, oppure prelevati da un worker che non ha concluso) e
+    li restituisce con corpo e allegato decriptati.
+    """
+    try:
+        with get_db_connection() as con:
+            cur = con.cursor()
+            cur.execute("""
+                UPDATE Outbox_Email SET stato = %s, tentativi = tentativi + 1,
+                       prossimo_tentativo = NOW() + make_interval(secs => %s)
+                WHERE id_email IN (
+                    SELECT id_email FROM Outbox_Email
+                    WHERE stato IN (%s, %s) AND prossimo_tentativo <= NOW()
+                    ORDER BY prossimo_tentativo, id_email
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id_email, destinatario, oggetto, corpo, allegato, nome_allegato, tentativi
+            """, (STATO_IN_INVIO, _DURATA_PRELIEVO, STATO_IN_CODA, STATO_IN_INVIO, limite))
+            righe = cur.fetchall()
+            con.commit()
+    except Exception as e:
+        print(f"[ERRORE] Errore prelievo outbox email: {e}")
+        return []
+
+    messaggi = []
+    for riga in sorted(righe, key=lambda r: r['id_email']):
+        allegato = None
+        if riga.get('allegato'):
+            allegato = base64.b64decode(decrypt_system_data(riga['allegato']) or '')
+        messaggi.append({
+            'id_email': riga['id_email'],
+            'destinatario': riga['destinatario'],
+            'oggetto': riga['oggetto'],
+            'corpo': decrypt_system_data(riga['corpo']) or '',
+            'allegato': allegato,
+            'nome_allegato': riga.get('nome_allegato'),
+            'tentativi': riga['tentativi'],
+        })
+    return messaggi
+
+
+def segna_inviata(id_email: int) -> bool:
+    """Messaggio consegnato: corpo e allegato non servono più."""
+    try:
+        with get_db_connection() as con:
+            cur = con.cursor()
+            cur.execute("""
+                UPDATE Outbox_Email
+                SET stato = %s, inviato_il = NOW(), corpo = NULL, allegato = NULL, ultimo_errore = NULL
+                WHERE id_email = %s
+            """, (STATO_INVIATA, id_email))
+            con.commit()
+            return True
+    except Exception as e:
+        print(f"[ERRORE] Errore aggiornamento outbox email {id_email}: {e}")
+        return False
+
+
+def segna_errore(id_email: int, errore: str, ritardo_s: Optional[float]) -> bool:
+    """
+    Registra un invio fallito: con ritardo_s il messaggio torna in coda dopo
+    quel numero di secondi, con None è scartato definitivamente.
+    """
+    try:
+        with get_db_connection() as con:
+            cur = con.cursor()
+            if ritardo_s is None:
+                cur.execute("""
+                    UPDATE Outbox_Email SET stato = %s, ultimo_errore = %s, corpo = NULL, allegato = NULL
+                    WHERE id_email = %s
+                """, (STATO_FALLITA, errore[:500], id_email))
+            else:
+                cur.execute("""
+                    UPDATE Outbox_Email SET stato = %s, ultimo_errore = %s,
+                           prossimo_tentativo = NOW() + make_interval(secs => %s)
+                    WHERE id_email = %s
+                """, (STATO_IN_CODA, errore[:500], float(ritardo_s), id_email))
+            con.commit()
+            return True
+    except Exception as e:
+        print(f"[ERRORE] Errore aggiornamento outbox email {id_email}: {e}")
+        return False
+
+
+def ottieni_statistiche_outbox() -> Dict[str, int]:
+    """Numero di messaggi per stato."""
+    try:
+        with get_db_connection() as con:
+            cur = con.cursor()
+            cur.execute("SELECT stato, COUNT(*) AS n FROM Outbox_Email GROUP BY stato")
+            return {r['stato']: r['n'] for r in cur.fetchall()}
+    except Exception as e:
+        print(f"[ERRORE] Errore statistiche outbox email: {e}")
+        return {}
+
+
+def pulisci_outbox(giorni: int = 30) -> int:
+    """Elimina i messaggi conclusi (inviati o scartati) più vecchi di `giorni`."""
+    try:
+        with get_db_connection() as con:
+            cur = con.cursor()
+            cur.execute("""
+                DELETE FROM Outbox_Email
+                WHERE stato IN (%s, %s) AND creato_il < NOW() - make_interval(days => %s)
+            """, (STATO_INVIATA, STATO_FALLITA, int(giorni)))
+            eliminati = cur.rowcount
+            con.commit()
+            return eliminati
+    except Exception as e:
+        print(f"[ERRORE] Errore pulizia outbox email: {e}")
+        return 0
@@ -0,0 +1,198 @@
+"""
+Snapshot in memoria delle Configurazioni, uno per ambito (globale, famiglia, utente).
+
+get_configurazione leggeva una chiave per round-trip, e allo scadere del TTL ogni
+chiave tornava al DB per conto suo (SMTP da sola sono sei query e sei decrypt).
+Qui ogni ambito viene caricato per intero con una query, le chiavi sensibili
+sono decriptate una sola volta, e le letture sono servite da un dizionario
+immutabile. Ogni ambito ha un numero di versione in Versioni_Configurazioni,
+incrementato da set_configurazione nella stessa transazione della scrittura:
+uno snapshot viene riverificato ogni _INTERVALLO_VERIFICA secondi con una query
+di una riga e ricaricato (sostituito in blocco) solo se la versione è cambiata.
+"""
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from db.supabase_manager import get_db_connection
+from db.crypto_helpers import decrypt_system_data
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CHIAVI_SENSIBILI = ('smtp_server', 'smtp_port', 'smtp_user', 'smtp_password', 'smtp_from_email', 'smtp_sender')
+
+# Chiavi monouso scritte e rilette subito, anche da processi diversi: mai in snapshot
+PREFISSI_FUORI_SNAPSHOT = ('verify_email_',)
+
+AMBITO_GLOBALE = "globale"
+
+_INTERVALLO_VERIFICA = 30
+# Senza tabella delle versioni (DB non migrato) si torna al vecchio TTL
+_TTL_SENZA_VERSIONE = 600
+
+_VUOTO: Mapping[str, str] = MappingProxyType({})
+
+# {ambito: {"valori": MappingProxyType, "versione": int | None, "verificato": float, "caricato": float}}
+_snapshot: Dict[str, Dict[str, Any]] = {}
+_snapshot_lock = threading.Lock()
+
+
+def ambito_configurazione(id_famiglia=None, id_utente=None) -> str:
+    """Ambito di una chiave: le preferenze utente hanno precedenza sulla famiglia."""
+    if id_utente:
+        return f"utente:{id_utente}"
+    if id_famiglia is not None:
+        return f"famiglia:{id_famiglia}"
+    return AMBITO_GLOBALE
+
+
+def fuori_snapshot(chiave: str) -> bool:
+    return chiave.startswith(PREFISSI_FUORI_SNAPSHOT)
+
+
+def _query_ambito(ambito: str) -> Tuple[str, tuple, int]:
+    """(query, parametri, lunghezza del prefisso da togliere alle chiavi)."""
+    tipo, _, ident = ambito.partition(":")
+    if tipo == "utente":
+        prefisso = f"user:{ident}:"
+        return ("SELECT chiave, valore FROM Configurazioni WHERE id_famiglia IS NULL AND chiave LIKE %s",
+                (prefisso + "%",), len(prefisso))
+    if tipo == "famiglia":
+        return "SELECT chiave, valore FROM Configurazioni WHERE id_famiglia = %s", (int(ident),), 0
+    return ("""
+        SELECT chiave, valore FROM Configurazioni
+        WHERE id_famiglia IS NULL AND chiave NOT LIKE %s AND chiave NOT LIKE %s
+    """, ("user:%", r"verify\_email\_%"), 0)
+
+
+def _decripta_valore(chiave: str, valore: Optional[str]) -> Optional[str]:
+    if chiave in CHIAVI_SENSIBILI and valore:
+        try:
+            decrypted = decrypt_system_data(valore)
+            if decrypted:
+                return decrypted
+        except Exception as e:
+            logger.warning(f"Failed to system-decrypt {chiave}: {e}")
+    return valore
+
+
+def _leggi_versioni(con, ambiti: Iterable[str]) -> Optional[Dict[str, int]]:
+    """Versioni correnti degli ambiti (0 se mai scritti); None se la tabella non esiste."""
+    ambiti = list(ambiti)
+    cur = con.cursor()
+    try:
+        cur.execute("SELECT ambito, versione FROM Versioni_Configurazioni WHERE ambito = ANY(%s)", (ambiti,))
+        trovate = {r['ambito']: int(r['versione']) for r in cur.fetchall()}
+    except Exception as e:
+        logger.warning(f"Versioni configurazione non disponibili: {e}")
+        try: con.rollback()
+        except Exception: pass
+        return None
+    return {a: trovate.get(a, 0) for a in ambiti}
+
+
+def _carica_ambiti(ambiti: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    ambiti = list(ambiti)
+    with get_db_connection() as con:
+        # Prima la versione e poi i dati: una scrittura concorrente al più provoca
+        # un ricaricamento in più, mai uno snapshot nuovo con dati vecchi
+        versioni = _leggi_versioni(con, ambiti)
+        cur = con.cursor()
+        caricati = {}
+        for ambito in ambiti:
+            query, params, taglio = _query_ambito(ambito)
+            cur.execute(query, params)
+            valori = {}
+            for row in cur.fetchall():
+                chiave = row['chiave'][taglio:]
+                valori[chiave] = _decripta_valore(chiave, row['valore'])
+            caricati[ambito] = valori
+    now = time.monotonic()
+    return {
+        ambito: {
+            'valori': MappingProxyType(valori),
+            'versione': versioni.get(ambito) if versioni is not None else None,
+            'verificato': now,
+            'caricato': now,
+        }
+        for ambito, valori in caricati.items()
+    }
+
+
+def _ancora_valido(ambito: str, entry: Dict[str, Any], now: float) -> bool:
+    if now - entry['verificato'] < _INTERVALLO_VERIFICA:
+        return True
+    if entry['versione'] is None:
+        return now - entry['caricato'] < _TTL_SENZA_VERSIONE
+    try:
+        with get_db_connection() as con:
+            versioni = _leggi_versioni(con, [ambito])
+    except Exception as e:
+        logger.warning(f"Verifica versione configurazioni {ambito} fallita: {e}")
+        return now - entry['caricato'] < _TTL_SENZA_VERSIONE
+    if versioni is None or versioni[ambito] != entry['versione']:
+        return False
+    with _snapshot_lock:
+        if _snapshot.get(ambito) is entry:
+            entry['verificato'] = now
+    return True
+
+
+def ottieni_snapshot(ambito: str) -> Mapping[str, str]:
+    """Dizionario immutabile {chiave: valore in chiaro} dell'ambito (chiavi utente senza prefisso)."""
+    now = time.monotonic()
+    with _snapshot_lock:
+        entry = _snapshot.get(ambito)
+    if entry is not None and _ancora_valido(ambito, entry, now):
+        return entry['valori']
+    try:
+        nuovo = _carica_ambiti([ambito])[ambito]
+    except Exception as e:
+        logger.error(f"Errore caricamento configurazioni {ambito}: {e}")
+        return entry['valori'] if entry is not None else _VUOTO
+    with _snapshot_lock:
+        _snapshot[ambito] = nuovo
+    return nuovo['valori']
+
+
+def precarica_configurazioni(id_famiglia=None, id_utente=None) -> None:
+    """Carica con una sola connessione gli snapshot globale, di famiglia e utente mancanti."""
+    ambiti = [AMBITO_GLOBALE]
+    if id_famiglia is not None:
+        ambiti.append(ambito_configurazione(id_famiglia=id_famiglia))
+    if id_utente:
+        ambiti.append(ambito_configurazione(id_utente=id_utente))
+    with _snapshot_lock:
+        ambiti = [a for a in ambiti if a not in _snapshot]
+    if not ambiti:
+        return
+    try:
+        caricati = _carica_ambiti(ambiti)
+    except Exception as e:
+        logger.error(f"Errore precaricamento configurazioni: {e}")
+        return
+    with _snapshot_lock:
+        for ambito, entry in caricati.items():
+            _snapshot.setdefault(ambito, entry)
+
+
+def registra_modifica(cur, ambito: str) -> None:
+    """Incrementa la versione dell'ambito nella transazione del chiamante (prima del commit)."""
+    cur.execute("""
+        INSERT INTO Versioni_Configurazioni (ambito, versione, aggiornato_il)
+        VALUES (%s, 1, CURRENT_TIMESTAMP)
+        ON CONFLICT (ambito) DO UPDATE SET
+            versione = Versioni_Configurazioni.versione + 1,
+            aggiornato_il = EXCLUDED.aggiornato_il
+    """, (ambito,))
+
+
+def invalida_snapshot(ambito: Optional[str] = None) -> None:
+    """Scarta lo snapshot di un ambito (o tutti): la prossima lettura lo ricarica."""
+    with _snapshot_lock:
+        if ambito is None:
+            _snapshot.clear()
+        else:
+            _snapshot.pop(ambito, None)
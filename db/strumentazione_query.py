@@ -0,0 +1,269 @@
+"""
+Strumentazione delle query: tempi, righe, chiamante e allarmi N+1.
+
+Ogni esecuzione su un cursore strumentato registra l'impronta dello statement
+(letterali e placeholder sostituiti da '?', spazi compattati), la latenza, le
+righe restituite, la funzione db.* che l'ha lanciata e la vista/tab/dialog da
+cui è partita. Gli aggregati per impronta sono esposti al pannello admin e
+esportabili in JSON.
+
+Una "richiesta logica" (richiesta_query) raggruppa le query di un'azione
+dell'utente, per esempio il caricamento di una tab: se la stessa impronta vi
+viene eseguita più di SOGLIA_N_PIU_1 volte scatta un allarme N+1.
+
+Da spenta (default) costa un controllo di booleano in DictConnection.cursor():
+si accende con BUDGETAMICO_QUERY_STATS=1 o abilita_strumentazione(). Nei test,
+budget_query(massimo) la accende per il blocco e fallisce se le query
+eseguite superano il budget.
+"""
+import atexit
+import contextvars
+import json
+import os
+import re
+import sys
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from utils.logger import setup_logger, LOG_DIR
+
+logger = setup_logger(__name__)
+
+_VERO = ("1", "true", "yes", "on")
+
+SOGLIA_N_PIU_1 = int(os.getenv("BUDGETAMICO_QUERY_N1_SOGLIA", "10"))
+FILE_STATISTICHE = os.getenv("BUDGETAMICO_QUERY_STATS_FILE") or os.path.join(LOG_DIR, "query_stats.json")
+
+# Moduli di infrastruttura da saltare nella ricerca del chiamante
+_MODULI_INFRASTRUTTURA = ("db.supabase_manager", "db.strumentazione_query", "db.gestione_db")
+_PREFISSI_VISTA = ("views.", "tabs.", "dialogs.", "controllers.", "app_controller")
+_PROFONDITA_MASSIMA = 40
+
+_stato_lock = threading.Lock()
+_abilitata = os.getenv("BUDGETAMICO_QUERY_STATS", "").lower() in _VERO
+_budget_attivi = 0
+
+# Letto da DictConnection.cursor(): unico costo a strumentazione spenta
+attiva = _abilitata
+
+_aggregati: Dict[str, Dict[str, Any]] = {}
+_allarmi: deque = deque(maxlen=50)
+_totali = {"query": 0, "tempo_ms": 0.0, "errori": 0, "allarmi_n_piu_1": 0}
+
+
+class BudgetQuerySuperato(AssertionError):
+    """Sollevata da budget_query quando un blocco esegue più query del previsto."""
+
+
+class _Richiesta:
+    def __init__(self, nome: str, genitore: Optional["_Richiesta"] = None,
+                 massimo: Optional[int] = None, soglia: Optional[int] = None):
+        self.nome = nome
+        self.genitore = genitore
+        self.massimo = massimo
+        self.soglia = soglia if soglia is not None else SOGLIA_N_PIU_1
+        self.totale = 0
+        self.per_impronta: Counter = Counter()
+        self.allarmi: List[str] = []
+
+
+_richiesta_corrente: contextvars.ContextVar = contextvars.ContextVar("richiesta_query", default=None)
+
+
+def _aggiorna_attiva() -> None:
+    global attiva
+    attiva = _abilitata or _budget_attivi > 0
+
+
+def abilita_strumentazione(abilitata: bool = True) -> None:
+    """Accende o spegne la raccolta (le statistiche già raccolte restano)."""
+    global _abilitata
+    with _stato_lock:
+        _abilitata = bool(abilitata)
+        _aggiorna_attiva()
+
+
+def strumentazione_attiva() -> bool:
+    return attiva
+
+
+_RE_COMMENTI = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_RE_STRINGHE = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMERI = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_RE_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s")
+_RE_LISTE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_SPAZI = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def impronta_query(query: str) -> str:
+    """Forma normalizzata dello statement: stesse query con parametri diversi, stessa impronta."""
+    testo = _RE_COMMENTI.sub(" ", query)
+    testo = _RE_STRINGHE.sub("?", testo)
+    testo = _RE_PLACEHOLDER.sub("?", testo)
+    testo = _RE_NUMERI.sub("?", testo)
+    testo = _RE_LISTE.sub("(?...)", testo)
+    return _RE_SPAZI.sub(" ", testo).strip()
+
+
+def _origine(frame) -> tuple:
+    """(funzione db.* chiamante, vista di origine) risalendo lo stack."""
+    funzione = vista = None
+    profondita = 0
+    while frame is not None and profondita < _PROFONDITA_MASSIMA and vista is None:
+        modulo = frame.f_globals.get("__name__", "")
+        if funzione is None and modulo.startswith("db.") and modulo not in _MODULI_INFRASTRUTTURA:
+            funzione = f"{modulo}.{frame.f_code.co_name}"
+        elif modulo.startswith(_PREFISSI_VISTA):
+            vista = f"{modulo}.{frame.f_code.co_name}"
+        frame = frame.f_back
+        profondita += 1
+    return funzione, vista
+
+
+def _nuovo_aggregato(impronta: str) -> Dict[str, Any]:
+    return {"impronta": impronta, "esecuzioni": 0, "tempo_totale_ms": 0.0, "tempo_max_ms": 0.0,
+            "righe": 0, "errori": 0, "funzioni": Counter(), "viste": Counter()}
+
+
+def registra_esecuzione(query: str, durata_s: float, righe: Optional[int], errore: bool = False) -> None:
+    """Chiamata dal cursore strumentato dopo ogni execute."""
+    impronta = impronta_query(query)
+    funzione, vista = _origine(sys._getframe(2))
+    durata_ms = durata_s * 1000.0
+
+    with _stato_lock:
+        agg = _aggregati.get(impronta)
+        if agg is None:
+            agg = _aggregati[impronta] = _nuovo_aggregato(impronta)
+        agg["esecuzioni"] += 1
+        agg["tempo_totale_ms"] += durata_ms
+        agg["tempo_max_ms"] = max(agg["tempo_max_ms"], durata_ms)
+        if righe is not None and righe > 0:
+            agg["righe"] += righe
+        if errore:
+            agg["errori"] += 1
+            _totali["errori"] += 1
+        agg["funzioni"][funzione or "-"] += 1
+        agg["viste"][vista or "-"] += 1
+        _totali["query"] += 1
+        _totali["tempo_ms"] += durata_ms
+
+        # La stessa richiesta può ricevere query da più thread (AsyncTask ne eredita il contesto)
+        superate = []
+        richiesta = _richiesta_corrente.get()
+        while richiesta is not None:
+            richiesta.totale += 1
+            richiesta.per_impronta[impronta] += 1
+            if richiesta.per_impronta[impronta] == richiesta.soglia + 1:
+                superate.append(richiesta)
+            richiesta = richiesta.genitore
+
+    for richiesta in superate:
+        _segnala_n_piu_1(richiesta, impronta, funzione, vista)
+
+
+def _segnala_n_piu_1(richiesta: _Richiesta, impronta: str, funzione, vista) -> None:
+    richiesta.allarmi.append(impronta)
+    logger.warning(f"[N+1] '{richiesta.nome}': oltre {richiesta.soglia} esecuzioni di "
+                   f"{impronta[:120]} (da {funzione or '-'}, vista {vista or '-'})")
+    with _stato_lock:
+        _totali["allarmi_n_piu_1"] += 1
+        _allarmi.append({"richiesta": richiesta.nome, "impronta": impronta, "funzione": funzione,
+                         "vista": vista, "quando": datetime.now().isoformat(timespec="seconds")})
+
+
+@contextmanager
+def richiesta_query(nome: str, soglia: Optional[int] = None):
+    """Raggruppa le query di un'azione dell'utente per il controllo N+1."""
+    if not attiva:
+        yield None
+        return
+    richiesta = _Richiesta(nome, _richiesta_corrente.get(), soglia=soglia)
+    token = _richiesta_corrente.set(richiesta)
+    try:
+        yield richiesta
+    finally:
+        _richiesta_corrente.reset(token)
+
+
+@contextmanager
+def budget_query(massimo: int, per_impronta: Optional[int] = None, nome: str = "budget"):
+    """
+    Modalità test: accende la strumentazione per il blocco e solleva
+    BudgetQuerySuperato se si eseguono più di `massimo` query, o più di
+    `per_impronta` esecuzioni della stessa impronta.
+    """
+    global _budget_attivi
+    with _stato_lock:
+        _budget_attivi += 1
+        _aggiorna_attiva()
+    richiesta = _Richiesta(nome, _richiesta_corrente.get(), massimo=massimo,
+                           soglia=per_impronta if per_impronta is not None else SOGLIA_N_PIU_1)
+    token = _richiesta_corrente.set(richiesta)
+    try:
+        yield richiesta
+    finally:
+        _richiesta_corrente.reset(token)
+        with _stato_lock:
+            _budget_attivi -= 1
+            _aggiorna_attiva()
+    if richiesta.totale > massimo:
+        dettaglio = ", ".join(f"{n}x {i[:80]}" for i, n in richiesta.per_impronta.most_common(5))
+        raise BudgetQuerySuperato(f"{nome}: {richiesta.totale} query eseguite, budget {massimo} ({dettaglio})")
+    if per_impronta is not None and richiesta.allarmi:
+        raise BudgetQuerySuperato(f"{nome}: oltre {per_impronta} esecuzioni di {richiesta.allarmi[0][:120]}")
+
+
+def ottieni_statistiche_query(limite: int = 20, ordina_per: str = "tempo_totale_ms") -> Dict[str, Any]:
+    """Totali, impronte più costose (per `ordina_per`) e allarmi N+1 recenti."""
+    with _stato_lock:
+        impronte = [
+            {**agg,
+             "tempo_medio_ms": agg["tempo_totale_ms"] / agg["esecuzioni"] if agg["esecuzioni"] else 0.0,
+             "funzioni": dict(agg["funzioni"].most_common(5)),
+             "viste": dict(agg["viste"].most_common(5))}
+            for agg in _aggregati.values()
+        ]
+        risultato = {"attiva": attiva, "totali": dict(_totali), "allarmi": list(_allarmi)}
+    impronte.sort(key=lambda a: a.get(ordina_per, 0), reverse=True)
+    risultato["impronte"] = impronte[:limite] if limite else impronte
+    return risultato
+
+
+def azzera_statistiche_query() -> None:
+    with _stato_lock:
+        _aggregati.clear()
+        _allarmi.clear()
+        for chiave in _totali:
+            _totali[chiave] = 0.0 if chiave == "tempo_ms" else 0
+
+
+def esporta_statistiche_query(percorso: Optional[str] = None) -> Optional[str]:
+    """Scrive tutte le statistiche in JSON; restituisce il percorso o None in caso di errore."""
+    percorso = percorso or FILE_STATISTICHE
+    try:
+        dati = ottieni_statistiche_query(limite=0)
+        dati["esportato_il"] = datetime.now().isoformat(timespec="seconds")
+        os.makedirs(os.path.dirname(percorso) or ".", exist_ok=True)
+        temporaneo = f"{percorso}.tmp"
+        with open(temporaneo, "w", encoding="utf-8") as f:
+            json.dump(dati, f, ensure_ascii=False, indent=2)
+        os.replace(temporaneo, percorso)
+        return percorso
+    except Exception as e:
+        logger.error(f"Errore esportazione statistiche query: {e}")
+        return None
+
+
+def _esporta_in_uscita() -> None:
+    if _totali["query"]:
+        esporta_statistiche_query()
+
+
+if _abilitata:
+    atexit.register(_esporta_in_uscita)
@@ -4,13 +4,19 @@ Versione unificata e pulita per BudgetAmico Web.
 """
 
 import pg8000.dbapi
+from pg8000.core import IN_FAILED_TRANSACTION
+import contextvars
 import os
+import re
 import threading
 import queue
 import time
+import uuid
+from contextlib import contextmanager
 from urllib.parse import urlparse
 from typing import Optional
 from utils.logger import setup_logger
+from db import strumentazione_query
 
 logger = setup_logger("SupabaseManager")
 
@@ -47,12 +53,28 @@ class DictCursor:
     def __getattr__(self, name): return getattr(self._cursor, name)
 
 
+class DictCursorStrumentato(DictCursor):
+    """DictCursor che registra tempi e righe di ogni execute (vedi db.strumentazione_query)."""
+    def execute(self, query, params=None):
+        inizio = time.perf_counter()
+        errore = True
+        try:
+            risultato = self._cursor.execute(query, params) if params else self._cursor.execute(query)
+            errore = False
+            return risultato
+        finally:
+            righe = getattr(self._cursor, "rowcount", None) if not errore else None
+            strumentazione_query.registra_esecuzione(query, time.perf_counter() - inizio, righe, errore)
+
+
 class DictConnection:
     """Wrapper per connessione pg8000 che supporta DictCursor."""
     def __init__(self, conn):
         self._conn = conn
     
     def cursor(self):
+        if strumentazione_query.attiva:
+            return DictCursorStrumentato(self._conn.cursor())
         return DictCursor(self._conn.cursor())
     
     def commit(self): return self._conn.commit()
@@ -279,17 +301,234 @@ class SupabaseManager:
         logger.info(f"Chiuse {count} connessioni dal pool.")
 
 
+# =============================================================================
+# UNITÀ DI LAVORO
+# Il caricamento di una vista attraversa molte funzioni db.*, ognuna con il suo
+# "with get_db_connection()": checkout, ping, RLS, commit e rilascio per blocco.
+# Dentro unita_di_lavoro() i get_db_connection() annidati (stesso id_utente) si
+# uniscono a un'unica connessione, in una transazione REPEATABLE READ: tutte le
+# letture vedono lo stesso snapshot. Il contesto è una ContextVar, quindi non
+# attraversa i thread (ogni thread ha la sua unità o nessuna).
+#
+# Ogni blocco annidato apre un SAVEPOINT: all'uscita pulita (o con commit())
+# il savepoint viene rilasciato, mentre un'eccezione, un rollback() del blocco
+# o un errore SQL intercettato dal blocco stesso tornano al savepoint, così la
+# transazione condivisa non resta abortita per i blocchi successivi. Solo
+# l'unità più esterna committa, alla sua chiusura: se fallisce, anche le
+# scritture dei blocchi annidati vengono annullate. Chi deve avere una
+# transazione e un commit propri usa get_db_connection(condivisa=False).
+# =============================================================================
+
+_unita_corrente: contextvars.ContextVar = contextvars.ContextVar("unita_di_lavoro", default=None)
+
+# Statement che non modificano dati (SET/RESET solo di sessione)
+_RE_SOLA_LETTURA = re.compile(r"\s*(SELECT|SHOW|EXPLAIN|FETCH|DECLARE|CLOSE|MOVE|SET|RESET)\b", re.I)
+
+
+class _UnitaDiLavoro:
+    """Connessione condivisa di un'unità di lavoro, acquisita al primo utilizzo."""
+    def __init__(self, id_utente=None):
+        self.id_utente = id_utente
+        self.conn = None
+        self.scritture_pendenti = False
+        self.blocchi = 0
+        self.profondita = 0
+        # Cambia a ogni rollback completo, che elimina i savepoint aperti
+        self.generazione = 0
+
+    def connessione(self) -> DictConnection:
+        if self.conn is None:
+            conn = SupabaseManager.get_connection(self.id_utente)
+            try:
+                # Chiude la transazione del ping/RLS e apre quella dello snapshot
+                conn.commit()
+                self._apri_snapshot(conn)
+            except Exception:
+                SupabaseManager.release_connection(conn)
+                raise
+            self.conn = conn
+        return self.conn
+
+    @staticmethod
+    def _apri_snapshot(conn):
+        cur = conn._conn.cursor()
+        cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        cur.close()
+
+    def _esegui(self, sql):
+        cur = self.conn._conn.cursor()
+        cur.execute(sql)
+        cur.close()
+
+    def rollback(self):
+        self.generazione += 1
+        self.conn.rollback()
+        self.scritture_pendenti = False
+        self._apri_snapshot(self.conn)
+
+    def apri_blocco(self) -> tuple:
+        """Apre il savepoint di un blocco annidato; restituisce lo stato da ripristinare."""
+        self.connessione()
+        nome = f"ba_blocco_{self.profondita + 1}"
+        self._esegui(f"SAVEPOINT {nome}")
+        self.profondita += 1
+        return (nome, self.generazione, self.scritture_pendenti)
+
+    def rilascia_blocco(self, blocco: tuple):
+        """Conferma il lavoro del blocco nella transazione dell'unità (RELEASE SAVEPOINT)."""
+        nome, generazione, _ = blocco
+        if generazione == self.generazione:
+            self._esegui(f"RELEASE SAVEPOINT {nome}")
+
+    def conferma_blocco(self, blocco: tuple) -> tuple:
+        """commit() di un blocco annidato: rilascia il savepoint e ne apre uno nuovo."""
+        self.rilascia_blocco(blocco)
+        nome = blocco[0]
+        self._esegui(f"SAVEPOINT {nome}")
+        return (nome, self.generazione, self.scritture_pendenti)
+
+    def chiudi_blocco(self):
+        self.profondita -= 1
+
+    def annulla_blocco(self, blocco: tuple):
+        """Annulla il lavoro del blocco; senza più il suo savepoint annulla la transazione."""
+        nome, generazione, scritture = blocco
+        if generazione != self.generazione:
+            self.rollback()
+            return
+        try:
+            self._esegui(f"ROLLBACK TO SAVEPOINT {nome}")
+        except Exception as e:
+            logger.warning(f"Rollback al savepoint {nome} fallito, annullo la transazione: {e}")
+            self.rollback()
+            return
+        self.scritture_pendenti = scritture
+
+    def transazione_fallita(self) -> bool:
+        """True se un errore SQL ha abortito la transazione (stato riportato dal server)."""
+        return getattr(self.conn._conn, "_transaction_status", None) == IN_FAILED_TRANSACTION
+
+    def chiudi(self, errore: bool = False):
+        if self.conn is None:
+            return
+        conn, self.conn = self.conn, None
+        try:
+            if errore:
+                try: conn.rollback()
+                except: pass
+            elif self.scritture_pendenti:
+                # Unico commit dell'unità: un errore qui deve arrivare al chiamante
+                conn.commit()
+        finally:
+            SupabaseManager.release_connection(conn)
+
+
+class _CursoreCondiviso:
+    """Cursore di un blocco annidato: segnala all'unità le scritture non ancora committate."""
+    def __init__(self, cursore, unita: _UnitaDiLavoro):
+        self._cursore = cursore
+        self._unita = unita
+
+    def execute(self, query, params=None):
+        if not self._unita.scritture_pendenti and not _RE_SOLA_LETTURA.match(query):
+            self._unita.scritture_pendenti = True
+        return self._cursore.execute(query, params)
+
+    def __iter__(self): return iter(self._cursore)
+    def __enter__(self): return self
+    def __exit__(self, exc_type, exc_val, exc_tb): self._cursore.close()
+    def __getattr__(self, name): return getattr(self._cursore, name)
+
+
+class ConnessioneCondivisa:
+    """
+    Connessione vista da un blocco annidato in un'unità di lavoro: il commit
+    rilascia il savepoint del blocco (il commit vero lo fa l'unità alla
+    chiusura), il rollback torna al savepoint.
+    """
+    def __init__(self, unita: _UnitaDiLavoro, blocco: tuple):
+        self._unita = unita
+        self.blocco = blocco
+
+    def cursor(self):
+        return _CursoreCondiviso(self._unita.conn.cursor(), self._unita)
+
+    def commit(self): self.blocco = self._unita.conferma_blocco(self.blocco)
+    def rollback(self): self._unita.annulla_blocco(self.blocco)
+    def close(self): pass
+    def __getattr__(self, name): return getattr(self._unita.conn, name)
+
+
+@contextmanager
+def unita_di_lavoro(id_utente=None):
+    """
+    Esegue il blocco (o la funzione, se usata come decoratore) su un'unica
+    connessione e un unico snapshot. Se un'unità è già attiva ci si unisce.
+    """
+    esistente = _unita_corrente.get()
+    if esistente is not None:
+        yield esistente
+        return
+    unita = _UnitaDiLavoro(id_utente)
+    token = _unita_corrente.set(unita)
+    try:
+        yield unita
+    except BaseException:
+        unita.chiudi(errore=True)
+        raise
+    else:
+        unita.chiudi()
+    finally:
+        _unita_corrente.reset(token)
+
+
+def contesto_per_thread() -> contextvars.Context:
+    """
+    Copia del contesto corrente per un thread di lavoro (contesto.run(...)):
+    porta con sé le ContextVar, come la richiesta di db.strumentazione_query,
+    ma non l'unità di lavoro, la cui connessione non va usata da due thread.
+    """
+    contesto = contextvars.copy_context()
+    contesto.run(_unita_corrente.set, None)
+    return contesto
+
+
 class SupabaseConnection:
     """Context manager per gestire automaticamente get/release connection."""
-    def __init__(self, id_utente=None):
+    def __init__(self, id_utente=None, condivisa=True):
         self.id_utente = id_utente
+        self.condivisa = condivisa
         self.conn = None
+        self.unita = None
+        self.conn_condivisa = None
     
     def __enter__(self):
+        unita = _unita_corrente.get() if self.condivisa else None
+        if unita is not None and unita.id_utente == self.id_utente:
+            self.conn_condivisa = ConnessioneCondivisa(unita, unita.apri_blocco())
+            unita.blocchi += 1
+            self.unita = unita
+            return self.conn_condivisa
         self.conn = SupabaseManager.get_connection(self.id_utente)
         return self.conn
     
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.unita is not None:
+            unita, self.unita = self.unita, None
+            try:
+                if exc_type is not None or unita.transazione_fallita():
+                    # Anche un errore SQL intercettato dal blocco: si torna al suo savepoint
+                    unita.annulla_blocco(self.conn_condivisa.blocco)
+                else:
+                    unita.rilascia_blocco(self.conn_condivisa.blocco)
+            except Exception as e:
+                if exc_type is not None:
+                    logger.warning(f"Rollback unità di lavoro fallito: {e}")
+                else:
+                    raise
+            finally:
+                unita.chiudi_blocco()
+            return False
         if self.conn:
             if exc_type is not None:
                 try: self.conn.rollback()
@@ -297,6 +536,39 @@ class SupabaseConnection:
             SupabaseManager.release_connection(self.conn)
         return False
 
-def get_db_connection(id_utente=None):
-    """Factory per SupabaseConnection context manager."""
-    return SupabaseConnection(id_utente)
+def get_db_connection(id_utente=None, condivisa=True):
+    """
+    Factory per SupabaseConnection context manager.
+    Dentro unita_di_lavoro() la connessione è quella dell'unità, salvo
+    condivisa=False (scritture che devono avere una transazione e un commit propri).
+    """
+    return SupabaseConnection(id_utente, condivisa)
+
+
+def iter_query_chunks(conn, query, params=None, chunk_size=500):
+    """
+    Itera i risultati di una query a blocchi tramite un cursore server-side
+    (DECLARE/FETCH), senza caricare l'intero result set in memoria.
+    Deve essere usato all'interno di una transazione aperta (default pg8000).
+
+    Yields:
+        Liste di righe (dict) di al massimo chunk_size elementi.
+    """
+    nome_cursore = f"ba_cur_{uuid.uuid4().hex[:12]}"
+    cur = conn.cursor()
+    try:
+        if params:
+            cur.execute(f"DECLARE {nome_cursore} NO SCROLL CURSOR FOR {query}", params)
+        else:
+            cur.execute(f"DECLARE {nome_cursore} NO SCROLL CURSOR FOR {query}")
+        while True:
+            cur.execute(f"FETCH FORWARD {int(chunk_size)} FROM {nome_cursore}")
+            rows = cur.fetchall()
+            if not rows:
+                break
+            yield rows
+    finally:
+        try: cur.execute(f"CLOSE {nome_cursore}")
+        except: pass
+        try: cur.close()
+        except: pass
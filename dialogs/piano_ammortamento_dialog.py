@@ -4,10 +4,11 @@ import csv
 import io
 from db.gestione_db import (
     aggiungi_rata_piano_ammortamento,
+    salva_piano_ammortamento,
     ottieni_piano_ammortamento,
-    elimina_piano_ammortamento,
     aggiorna_stato_rata_piano
 )
+from utils.piano_ammortamento import genera_piano
 
 class PianoAmmortamentoDialog:
     def __init__(self, controller):
@@ -28,6 +29,21 @@ class PianoAmmortamentoDialog:
         self.txt_quota_interessi = ft.TextField(label="Q. Interessi", width=100, keyboard_type=ft.KeyboardType.NUMBER)
         self.txt_spese = ft.TextField(label="Spese", width=80, keyboard_type=ft.KeyboardType.NUMBER, value="0")
 
+        # --- Campi Generazione Piano ---
+        self.txt_gen_capitale = ft.TextField(label="Capitale", width=110, keyboard_type=ft.KeyboardType.NUMBER)
+        self.txt_gen_tasso = ft.TextField(label="Tasso annuo %", width=110, keyboard_type=ft.KeyboardType.NUMBER)
+        self.txt_gen_num_rate = ft.TextField(label="N° rate", width=80, keyboard_type=ft.KeyboardType.NUMBER)
+        self.txt_gen_prima_rata = ft.TextField(
+            label="Prima rata", width=130, read_only=True,
+            suffix=ft.IconButton(icon=ft.Icons.CALENDAR_MONTH,
+                                 on_click=lambda e: self._apri_date_picker(e, self.txt_gen_prima_rata))
+        )
+        self.dd_gen_metodo = ft.Dropdown(
+            label="Metodo", width=130, value="francese",
+            options=[ft.dropdown.Option("francese", "Francese"), ft.dropdown.Option("italiano", "Italiano")]
+        )
+        self._campo_data = self.txt_data_scadenza
+
         # --- Tabella Rate ---
         self.data_table = ft.DataTable(
             columns=[
@@ -52,6 +68,13 @@ class PianoAmmortamentoDialog:
                     ft.ElevatedButton("Carica da CSV", icon=ft.Icons.UPLOAD, on_click=lambda e: self.controller.pick_files_dialog.pick_files(allow_multiple=False, allowed_extensions=["csv"])),
                 ]),
                 ft.Divider(),
+                ft.Text("Genera Piano:", weight="bold"),
+                ft.Row([
+                    self.txt_gen_capitale, self.txt_gen_tasso, self.txt_gen_num_rate,
+                    self.txt_gen_prima_rata, self.dd_gen_metodo,
+                    ft.IconButton(icon=ft.Icons.AUTO_FIX_HIGH, icon_color="blue", on_click=self._genera_piano_click)
+                ], scroll=ft.ScrollMode.ADAPTIVE),
+                ft.Divider(),
                 ft.Text("Aggiungi Rata Manuale:", weight="bold"),
                 ft.Row([
                     self.txt_num_rata, self.txt_data_scadenza, self.txt_importo_rata,
@@ -362,36 +385,53 @@ class PianoAmmortamentoDialog:
                     except Exception as ex:
                         print(f"Skipping row {row}: {ex}")
 
-            if self.is_memory_mode:
-                self.rate_correnti.clear()
-                self.rate_correnti.extend(temp_rows)
-                self.controller.show_snack_bar(f"Importate {count} rate (in memoria).", success=True)
-                self._aggiorna_tabella()
-            else:
-                # DB Mode
-                # Pulisci piano esistente? Chiedi conferma? Per ora aggiungiamo in coda o sovrascriviamo se UNIQUE clash
-                # Meglio pulire prima se è un import massivo
-                elimina_piano_ammortamento(self.id_prestito_corrente)
-                for r in temp_rows:
-                    aggiungi_rata_piano_ammortamento(
-                        self.id_prestito_corrente, r['numero_rata'], r['data_scadenza'], 
-                        r['importo_rata'], r['quota_capitale'], r['quota_interessi'], r['spese_fisse']
-                    )
-                self.controller.show_snack_bar(f"Importate {count} rate con successo.", success=True)
-                self.rate_correnti = ottieni_piano_ammortamento(self.id_prestito_corrente)
-                self._aggiorna_tabella()
+            self._sostituisci_piano(temp_rows, f"Importate {count} rate")
             
         except Exception as ex:
             self.controller.show_error_dialog(f"Errore importazione CSV: {ex}")
 
-    def _apri_date_picker(self, e):
+    def _sostituisci_piano(self, rate, messaggio):
+        """Rimpiazza il piano corrente (in memoria o sul DB, con un'unica scrittura)."""
+        if self.is_memory_mode:
+            self.rate_correnti.clear()
+            self.rate_correnti.extend(rate)
+            self.controller.show_snack_bar(f"{messaggio} (in memoria).", success=True)
+        elif salva_piano_ammortamento(self.id_prestito_corrente, rate):
+            self.controller.show_snack_bar(f"{messaggio} con successo.", success=True)
+            self.rate_correnti = ottieni_piano_ammortamento(self.id_prestito_corrente)
+        else:
+            self.controller.show_snack_bar("Errore salvataggio piano.", success=False)
+            return
+        self.txt_num_rata.value = str(len(self.rate_correnti) + 1)
+        self._aggiorna_tabella()
+
+    def _genera_piano_click(self, e):
+        try:
+            capitale = float(self.txt_gen_capitale.value.replace(",", "."))
+            tasso = float((self.txt_gen_tasso.value or "0").replace(",", "."))
+            num_rate = int(self.txt_gen_num_rate.value)
+            prima_rata = datetime.datetime.strptime(self.txt_gen_prima_rata.value, '%Y-%m-%d').date()
+        except (ValueError, AttributeError, TypeError):
+            self.controller.show_snack_bar("Dati non validi (capitale, tasso, rate e prima rata)", success=False)
+            return
+
+        # Come per l'import CSV, le rate già scadute risultano pagate
+        rate = genera_piano(capitale, tasso, num_rate, prima_rata, metodo=self.dd_gen_metodo.value,
+                            pagate_fino_a=datetime.date.today())
+        if not rate:
+            self.controller.show_snack_bar("Capitale e numero rate devono essere positivi", success=False)
+            return
+        self._sostituisci_piano(rate, f"Generate {len(rate)} rate")
+
+    def _apri_date_picker(self, e, campo=None):
         # Callback already set in __init__
+        self._campo_data = campo or self.txt_data_scadenza
         self.date_picker.open = True
         self.controller.page.update()
 
     def _on_date_set(self, e):
         if self.date_picker.value:
-            self.txt_data_scadenza.value = self.date_picker.value.strftime('%Y-%m-%d')
+            self._campo_data.value = self.date_picker.value.strftime('%Y-%m-%d')
             self.date_picker.open = False
             self.controller.page.update()
 
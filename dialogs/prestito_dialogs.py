@@ -10,7 +10,7 @@ from db.gestione_db import (
     effettua_pagamento_rata,
     ottieni_membri_famiglia,
     ottieni_quote_prestito,
-    aggiungi_rata_piano_ammortamento,
+    salva_piano_ammortamento,
     ottieni_piano_ammortamento,
     ottieni_ids_conti_tecnici_carte,
     get_configurazione,
@@ -497,20 +497,8 @@ class PrestitoDialogs:
                 if not self.prestito_in_modifica and self.temp_piano_ammortamento:
                     try:
                         id_new_prestito = success
-                        count_rate = 0
-                        for rata in self.temp_piano_ammortamento:
-                            aggiungi_rata_piano_ammortamento(
-                                id_new_prestito, 
-                                rata['numero_rata'], 
-                                rata['data_scadenza'], 
-                                rata['importo_rata'], 
-                                rata['quota_capitale'], 
-                                rata['quota_interessi'], 
-                                rata['spese_fisse'],
-                                stato=rata.get('stato', 'da_pagare')
-                            )
-                            count_rate += 1
-                        print(f"Salvate {count_rate} rate del piano ammortamento per prestito {id_new_prestito}")
+                        if salva_piano_ammortamento(id_new_prestito, self.temp_piano_ammortamento):
+                            print(f"Salvate {len(self.temp_piano_ammortamento)} rate del piano ammortamento per prestito {id_new_prestito}")
                     except Exception as e_rata:
                         print(f"Errore salvataggio piano ammortamento differito: {e_rata}")
 
@@ -6,17 +6,12 @@ from db.gestione_db import (
     aggiungi_transazione,
     modifica_transazione,
     ottieni_tutti_i_conti_utente,
-    ottieni_categorie_e_sottocategorie,
-    ottieni_conto_default_utente,
     aggiungi_transazione_condivisa,
     modifica_transazione_condivisa,
     elimina_transazione,
     elimina_transazione_condivisa,
     ottieni_carte_utente,
-    ottieni_tutti_i_conti_famiglia,
     esegui_giroconto,
-    ottieni_ids_conti_tecnici_carte,
-    get_configurazione,
 )
 from db.gestione_obiettivi import (
     ottieni_salvadanai_conto,
@@ -146,6 +141,11 @@ class TransactionDialog(ft.AlertDialog):
         ]
         self.actions_alignment = ft.MainAxisAlignment.END
 
+        # Controlli delle opzioni conto per tipo operazione, legati al contesto da cui derivano
+        self._contesto_controlli = None
+        self._lingua_controlli = None
+        self._cache_controlli = {}
+
     def _update_texts(self):
         """Aggiorna tutti i testi fissi con le traduzioni correnti."""
         self.title.value = self.loc.get("new_transaction")
@@ -260,228 +260,91 @@ class TransactionDialog(ft.AlertDialog):
         self.dd_conto_destinazione_dialog.value = None
         self.lbl_error_dest.visible = False
 
-    def _popola_dropdowns(self):
-        utente_id = self.controller.get_user_id()
-        famiglia_id = self.controller.get_family_id()
-        
-        if not famiglia_id or str(famiglia_id).strip() == "":
-            logger.warning("[DIALOG] _popola_dropdowns: Missing famiglia_id, skipping DB calls.")
-            return
-
-        master_key_b64 = self.controller.page.session.get("master_key")
-
-        # 0. Recupera Matrice FOP Globale
-        tipo_op = self.radio_tipo_transazione.value or "Spesa"
-        raw_matrix = get_configurazione("global_fop_matrix")
-        
-        matrix_source = {}
-        matrix_dest = {}
-        
-        if raw_matrix:
-            try:
-                full_matrix = json.loads(raw_matrix)
-                if tipo_op == "Giroconto":
-                    matrix_source = full_matrix.get("Giroconto (Mittente)", {})
-                    matrix_dest = full_matrix.get("Giroconto (Ricevente)", {})
-                else:
-                    matrix_source = full_matrix.get(tipo_op, {})
-            except: logger.error("Errore parsing global_fop_matrix")
-        
-        # Se la matrice è vuota, usiamo dei default interni per sicurezza
-        if not matrix_source:
-            matrix_source = {
-                "Conto Corrente": {"Personale": True, "Condiviso": True, "Altri Familiari": (tipo_op == "Giroconto")},
-                "Carte": {"Personale": (tipo_op == "Spesa"), "Condiviso": (tipo_op == "Spesa"), "Altri Familiari": False},
-                "Salvadanaio": {"Personale": (tipo_op == "Giroconto"), "Condiviso": (tipo_op == "Giroconto"), "Altri Familiari": (tipo_op == "Giroconto")}
-            }
-        if tipo_op == "Giroconto" and not matrix_dest:
-             matrix_dest = matrix_source.copy()
-
-        # 1. Recupera tutti i conti della famiglia (necessario per Altri Familiari)
-        conti_famiglia = ottieni_tutti_i_conti_famiglia(famiglia_id, utente_id, master_key_b64=master_key_b64)
-        ids_conti_tecnici = ottieni_ids_conti_tecnici_carte(utente_id)
-
-        # Mappatura tipi matrice -> tipi DB
-        tipo_map = {
-            "Conto Corrente": ["Conto Corrente", "Conto", "Corrente"],
-            "Carte": ["Carta", "Carta di Credito", "Prepagata"],
-            "Risparmio": ["Risparmio", "Conto Deposito"],
-            "Investimenti": ["Investimenti", "Investimento", "Crypto", "Azioni", "Obbligazioni", "ETF", "Fondo"],
-            "Contanti": ["Contanti"],
-            "Fondo Pensione": ["Fondo Pensione"],
-            "Salvadanaio": ["Salvadanaio"],
-            "Satispay": ["Satispay"],
-            "PayPal": ["PayPal"]
-        }
-
-        def is_allowed(account_data, scope, matrix_to_check):
-            t_db = str(account_data.get('tipo') or "").strip().lower()
-            cat_fop = None
-            
-            # Special handling for Portafoglio Elettronico
-            if t_db == "portafoglio elettronico":
-                try:
-                    config = json.loads(account_data.get('config_speciale') or '{}')
-                    sottotipo = config.get('sottotipo', '').strip().lower()
-                    if sottotipo == 'satispay': cat_fop = "Satispay"
-                    elif sottotipo == 'paypal': cat_fop = "PayPal"
-                except: pass
-            
-            if not cat_fop:
-                for cat, db_list in tipo_map.items():
-                    if any(t_db == x.strip().lower() for x in db_list):
-                        cat_fop = cat
-                        break
-            
-            if not cat_fop: return False
-            
-            # Check FOP with fallback
-            scope_perms = matrix_to_check.get(cat_fop)
-            if scope_perms is not None:
-                return scope_perms.get(scope, False)
-            return True if scope != "Altri Familiari" else False
-
-        opzioni_sorgente = []
-        opzioni_destinazione = []
-
-        for c in conti_famiglia:
-            if c['id_conto'] in ids_conti_tecnici or "Saldo" in (c.get('nome_conto') or ""):
-                continue
-            
-            if c['is_condiviso']: scope = "Condiviso"
-            elif str(c['id_utente_owner']) == str(utente_id): scope = "Personale"
-            else: scope = "Altri Familiari"
+    def _ottieni_contesto(self):
+        """Contesto di inserimento precompilato della sessione (nessuna query se già pronto)."""
+        return self.controller.contesto_inserimento.ottieni(
+            self.controller.get_family_id(),
+            self.controller.get_user_id(),
+            self.controller.page.session.get("master_key"),
+        )
 
-            prefix = "C" if c['is_condiviso'] else "P"
-            suffix = ""
-            if scope == "Condiviso": suffix = " " + self.loc.get("shared_suffix")
-            elif scope == "Altri Familiari": suffix = f" ({c.get('nome_owner', 'Altro')})"
-            
-            icon = "🏦"
-            if c['tipo'] in tipo_map["Carte"]: icon = "💳"
-            elif c['tipo'] == "Salvadanaio": icon = "🐷"
-            elif c['tipo'] == "Contanti": icon = "💵"
-            elif c['tipo'] == "Portafoglio Elettronico": icon = "📱"
-            
-            key = f"{prefix}{c['id_conto']}"
-            if c['tipo'] in tipo_map["Carte"] or c['tipo'] == "Salvadanaio": 
-                key = c['id_conto'] 
+    def _testo_opzione(self, opzione):
+        suffix = ""
+        if opzione['scope'] == "Condiviso": suffix = " " + self.loc.get("shared_suffix")
+        elif opzione['scope'] == "Altri Familiari": suffix = f" ({opzione['data'].get('nome_owner', 'Altro')})"
+        return f"{opzione['nome']}{suffix}"
 
-            opt = ft.dropdown.Option(key=key, text=f"{icon} {c['nome_conto']}{suffix}", data=c)
-            
-            if is_allowed(c, scope, matrix_source):
-                opzioni_sorgente.append(opt)
-            
-            if tipo_op == "Giroconto" and is_allowed(c, scope, matrix_dest):
-                opzioni_destinazione.append(opt)
+    def _crea_menu_items(self, opzioni, is_dest):
+        from utils.styles import AppStyles
 
-        # --- APPLICA ORDINAMENTO GLOBALE PER TIPO ---
-        raw_sort_order = get_configurazione("global_fop_sort_order")
-        if raw_sort_order:
-            try:
-                global_sort_keys = json.loads(raw_sort_order)  # es. ["satispay", "carta_debito", "carta_credito", ...]
-            except:
-                global_sort_keys = []
+        items = []
+        for opzione in opzioni:
+            c = opzione['data']
+            logo = AppStyles.get_logo_control(
+                tipo=c['tipo'], 
+                config_speciale=c.get('config_speciale'), 
+                size=20, 
+                color=ft.Colors.ON_SURFACE,
+                icona=c.get('icona'),
+                colore=c.get('colore')
+            )
             
-            if global_sort_keys:
-                # Mappatura tipo DB -> sorting key globale
-                def _get_type_sort_key(account_data):
-                    t_db = str(account_data.get('tipo') or "").strip().lower()
-                    
-                    # Portafoglio Elettronico -> Satispay/PayPal
-                    if t_db == "portafoglio elettronico":
-                        try:
-                            config = json.loads(account_data.get('config_speciale') or '{}')
-                            sottotipo = config.get('sottotipo', '').strip().lower()
-                            if sottotipo == 'satispay': return "satispay"
-                            elif sottotipo == 'paypal': return "paypal"
-                        except: pass
-                        return "portafoglio_elettronico"
-                    
-                    # Carte (credito/debito)
-                    if t_db in ["carta", "carta di credito", "prepagata"]:
-                        circuito = str(account_data.get('circuito') or "").strip().lower()
-                        tipo_carta = str(account_data.get('tipo_carta') or "").strip().lower()
-                        if tipo_carta == "credito" or t_db == "carta di credito": return "carta_credito"
-                        if tipo_carta == "debito" or t_db == "prepagata": return "carta_debito"
-                        return "carta_credito"  # default
-                    
-                    # Conti
-                    type_mapping = {
-                        "conto corrente": "conto_corrente", "conto": "conto_corrente", "corrente": "conto_corrente",
-                        "risparmio": "conto_risparmio", "conto deposito": "conto_risparmio",
-                        "contanti": "contanti",
-                        "investimenti": "investimento", "investimento": "investimento",
-                        "crypto": "investimento", "azioni": "investimento", "obbligazioni": "investimento",
-                        "etf": "investimento", "fondo": "investimento",
-                        "fondo pensione": "fondo_pensione",
-                        "salvadanaio": "conto_risparmio",
-                    }
-                    return type_mapping.get(t_db, "conto_corrente")
-
-                def get_sort_index(opt):
-                    sort_key = _get_type_sort_key(opt.data)
-                    try: return global_sort_keys.index(sort_key)
-                    except ValueError: return 999
-                
-                opzioni_sorgente.sort(key=get_sort_index)
-                opzioni_destinazione.sort(key=get_sort_index)
-        # ------------------------------------------
+            items.append(
+                ft.PopupMenuItem(
+                    content=ft.Row([
+                        logo,
+                        ft.Column([
+                            ft.Text(self._testo_opzione(opzione), size=14, color=ft.Colors.ON_SURFACE),
+                            ft.Text(c['tipo'], size=10, color=ft.Colors.GREY_500),
+                        ], spacing=0)
+                    ], spacing=10),
+                    data=c,
+                    on_click=lambda e, k=opzione['key'], d=c, dest=is_dest: self._select_account(k, d, is_dest=dest)
+                )
+            )
+        return items
 
-        self.dd_conto_dialog.options = opzioni_sorgente
-        self.dd_conto_destinazione_dialog.options = opzioni_destinazione
+    def _popola_dropdowns(self):
+        contesto = self._ottieni_contesto()
+        if contesto is None:
+            logger.warning("[DIALOG] _popola_dropdowns: Missing famiglia_id, skipping DB calls.")
+            return
 
-        # Popola PopupMenuButton
-        from utils.styles import AppStyles
-        
-        def create_menu_items(options, is_dest):
-            items = []
-            for opt in options:
-                c = opt.data
-                suffix = ""
-                if c.get('is_condiviso'): suffix = " " + self.loc.get("shared_suffix")
-                elif str(c.get('id_utente_owner')) != str(utente_id): 
-                     suffix = f" ({c.get('nome_owner', 'Altro')})"
+        # Controlli Flet ricreati solo quando cambia il contesto (o la lingua), non ad ogni cambio tipo
+        if self._contesto_controlli is not contesto or self._lingua_controlli != self.loc.language:
+            self._contesto_controlli = contesto
+            self._lingua_controlli = self.loc.language
+            self._cache_controlli = {}
 
-                logo = AppStyles.get_logo_control(
-                    tipo=c['tipo'], 
-                    config_speciale=c.get('config_speciale'), 
-                    size=20, 
-                    color=ft.Colors.ON_SURFACE,
-                    icona=c.get('icona'),
-                    colore=c.get('colore')
-                )
-                
-                items.append(
-                    ft.PopupMenuItem(
-                        content=ft.Row([
-                            logo,
-                            ft.Column([
-                                ft.Text(f"{c['nome_conto']}{suffix}", size=14, color=ft.Colors.ON_SURFACE),
-                                ft.Text(c['tipo'], size=10, color=ft.Colors.GREY_500),
-                            ], spacing=0)
-                        ], spacing=10),
-                        data=c,
-                        on_click=lambda e, k=opt.key, d=c, dest=is_dest: self._select_account(k, d, is_dest=dest)
-                    )
-                )
-            return items
+        tipo_op = self.radio_tipo_transazione.value or "Spesa"
+        controlli = self._cache_controlli.get(tipo_op)
+        if controlli is None:
+            opzioni_sorgente, opzioni_destinazione = contesto.opzioni_per(tipo_op)
+            controlli = (
+                [ft.dropdown.Option(key=o['key'], text=f"{o['icona']} {self._testo_opzione(o)}", data=o['data'])
+                 for o in opzioni_sorgente],
+                [ft.dropdown.Option(key=o['key'], text=f"{o['icona']} {self._testo_opzione(o)}", data=o['data'])
+                 for o in opzioni_destinazione],
+                self._crea_menu_items(opzioni_sorgente, False),
+                self._crea_menu_items(opzioni_destinazione, True),
+            )
+            self._cache_controlli[tipo_op] = controlli
 
-        self.pm_conto.items = create_menu_items(opzioni_sorgente, False)
-        self.pm_dest.items = create_menu_items(opzioni_destinazione, True)
+        self.dd_conto_dialog.options = controlli[0]
+        self.dd_conto_destinazione_dialog.options = controlli[1]
+        self.pm_conto.items = controlli[2]
+        self.pm_dest.items = controlli[3]
 
         # 4. Categories Dropdown
         self.dd_sottocategoria_dialog.options = [
             ft.dropdown.Option(key="", text=self.loc.get("no_category")),
             ft.dropdown.Option(key="INTERESSI", text="💰 Interessi")
         ]
-        if famiglia_id:
-            categorie = ottieni_categorie_e_sottocategorie(famiglia_id)
-            for cat_data in categorie:
-                for sub_cat in cat_data['sottocategorie']:
-                    self.dd_sottocategoria_dialog.options.append(
-                        ft.dropdown.Option(key=sub_cat['id_sottocategoria'], text=f"{cat_data['nome_categoria']} - {sub_cat['nome_sottocategoria']}")
-                    )
+        for cat_data in contesto.categorie:
+            for sub_cat in cat_data['sottocategorie']:
+                self.dd_sottocategoria_dialog.options.append(
+                    ft.dropdown.Option(key=sub_cat['id_sottocategoria'], text=f"{cat_data['nome_categoria']} - {sub_cat['nome_sottocategoria']}")
+                )
 
     def _on_tipo_transazione_change(self, e):
         tipo = self.radio_tipo_transazione.value
@@ -536,10 +399,8 @@ class TransactionDialog(ft.AlertDialog):
         # Simpler: just use IDs if we don't want to re-fetch names here.
         # But better to show names.
         
-        id_utente = self.controller.get_user_id()
-        famiglia_id = self.controller.get_family_id()
-        master_key_b64 = self.controller.page.session.get("master_key")
-        conti = ottieni_tutti_i_conti_famiglia(famiglia_id, id_utente, master_key_b64=master_key_b64)
+        contesto = self._ottieni_contesto()
+        conti = contesto.conti if contesto else []
         
         self.dd_paypal_fonte_dialog.options = [
             ft.dropdown.Option(str(c['id_conto']), c['nome_conto'])
@@ -632,8 +493,8 @@ class TransactionDialog(ft.AlertDialog):
             # _popola_dropdowns viene già chiamato internamente da _reset_campi -> _on_tipo_transazione_change
             self._reset_campi()
 
-            utente_id = self.controller.get_user_id()
-            conto_default_info = ottieni_conto_default_utente(utente_id)
+            contesto = self._ottieni_contesto()
+            conto_default_info = contesto.conto_default if contesto else None
             if conto_default_info:
                 if conto_default_info['tipo'] == 'carta':
                     # Find the option key for this card (CARD_{id_carta}_{acc}_{flag})
@@ -0,0 +1,24 @@
+# db.gestione_db risolve i nomi on-demand con importlib: l'analisi statica
+# non vede i moduli tematici né il monolite, quindi vanno dichiarati qui
+# (stesso elenco di _REGISTRO_MODULI in db/gestione_db.py).
+hiddenimports = [
+    'db.crypto_helpers',
+    'db.gestione_admin',
+    'db.gestione_config',
+    'db.gestione_budget',
+    'db.gestione_utenti',
+    'db.gestione_famiglie',
+    'db.gestione_categorie',
+    'db.gestione_conti',
+    'db.gestione_inviti',
+    'db.gestione_transazioni',
+    'db.gestione_patrimonio',
+    'db.gestione_investimenti',
+    'db.gestione_giroconti',
+    'db.gestione_export',
+    'db.gestione_spese_fisse',
+    'db.gestione_carte',
+    'db.gestione_obiettivi',
+    'db.gestione_contatti',
+    'db._gestione_db_monolith',
+]
@@ -0,0 +1,9 @@
+# utils.localization importa le stringhe di ogni lingua on-demand con importlib:
+# l'analisi statica non vede i moduli, quindi vanno dichiarati qui
+# (stesso elenco di LINGUE_DISPONIBILI in utils/localization.py).
+hiddenimports = [
+    'utils.locales.it',
+    'utils.locales.en',
+    'utils.locales.es',
+    'utils.locales.de',
+]
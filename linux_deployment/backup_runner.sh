@@ -41,7 +41,7 @@ pip install pg8000 python-dotenv scramp > /dev/null
 
 # 5. Esecuzione Backup
 echo "Avvio script Python..."
-python3 db/backup_supabase.py
+python3 db/backup_supabase.py "$@"
 
 EXIT_CODE=$?
 
@@ -0,0 +1,107 @@
+"""
+Micro-benchmark della formattazione degli importi in valuta.
+
+Confronta, sullo stesso carico, il formato storico ("{:,.2f}" + tre replace +
+format del modello) con FormatoValuta.formatta e FormatoValuta.format_many, a
+cache fredda (importi tutti diversi) e con la distribuzione tipica di una
+render (zeri, budget tondi, saldi ripetuti). Prima di misurare verifica che
+l'output sia identico su tutto il carico.
+
+Uso (dalla root del progetto):
+    python scripts/benchmark_formato_valuta.py [--importi 5000] [--ripetizioni 7]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from utils.localization import CURRENCIES  # noqa: E402
+from utils.formato_valuta import FormatoValuta  # noqa: E402
+
+
+def formato_storico(amount, currency_info):
+    formatted_amount = "{:,.2f}".format(amount)
+    formatted_amount = formatted_amount.replace(",", "X").replace(".", ",").replace("X", ".")
+    return currency_info["format"].format(amount=formatted_amount, symbol=currency_info["symbol"])
+
+
+def carico_render(n, rnd):
+    """Importi come in una render: molti zeri, budget tondi, saldi e spese ricorrenti."""
+    ricorrenti = [round(rnd.uniform(-2000, 2000), 2) for _ in range(60)]
+    importi = []
+    for _ in range(n):
+        p = rnd.random()
+        if p < 0.15:
+            importi.append(0.0)
+        elif p < 0.35:
+            importi.append(float(rnd.choice((50, 100, 150, 200, 250, 300, 500, 1000))))
+        elif p < 0.75:
+            importi.append(rnd.choice(ricorrenti))
+        else:
+            importi.append(round(rnd.uniform(-5000, 5000), 2))
+    return importi
+
+
+def _mediana(funzione, ripetizioni):
+    tempi = []
+    for _ in range(ripetizioni):
+        t0 = time.perf_counter()
+        funzione()
+        tempi.append(time.perf_counter() - t0)
+    return statistics.median(tempi)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--importi", type=int, default=5000)
+    parser.add_argument("--ripetizioni", type=int, default=7)
+    parser.add_argument("--valuta", default="EUR", choices=sorted(CURRENCIES))
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    info = CURRENCIES[args.valuta]
+    carichi = {
+        "importi distinti (cache fredda)": [round(rnd.uniform(-1e6, 1e6), 2) + i * 1e-9 for i in range(args.importi)],
+        "render tipica": carico_render(args.importi, rnd),
+    }
+
+    # Parità esatta, compresi i casi limite
+    verifica = FormatoValuta(info["symbol"], info["format"])
+    limite = [0, -0.0, True, Decimal("-0"), Decimal("2.675"), -0.004, 1e20, float("inf")]
+    for importi in list(carichi.values()) + [limite]:
+        attesi = [formato_storico(a, info) for a in importi]
+        assert [verifica.formatta(a) for a in importi] == attesi, "output diverso da quello storico"
+        assert verifica.format_many(importi) == attesi, "output diverso da quello storico"
+
+    print(f"{args.importi} importi, valuta {args.valuta}, mediana su {args.ripetizioni} ripetizioni")
+    for nome_carico, importi in carichi.items():
+        print(f"\n{nome_carico}:")
+        misure = {}
+
+        misure["storico"] = _mediana(lambda: [formato_storico(a, info) for a in importi], args.ripetizioni)
+
+        def formatta_singolo():
+            formato = FormatoValuta(info["symbol"], info["format"])
+            f = formato.formatta
+            return [f(a) for a in importi]
+
+        def formatta_lista():
+            return FormatoValuta(info["symbol"], info["format"]).format_many(importi)
+
+        misure["formatta (una chiamata per importo)"] = _mediana(formatta_singolo, args.ripetizioni)
+        misure["format_many"] = _mediana(formatta_lista, args.ripetizioni)
+
+        base = misure["storico"]
+        for nome, secondi in misure.items():
+            per_importo = secondi / len(importi) * 1e9
+            print(f"  {nome:40s} {secondi * 1000:8.2f} ms  {per_importo:7.0f} ns/importo  {base / secondi:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
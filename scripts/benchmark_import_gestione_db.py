@@ -0,0 +1,91 @@
+"""
+Benchmark del tempo di import della facciata db.gestione_db.
+
+Confronta l'import lazy attuale con il comportamento eager storico (monolite +
+star-import dei 18 moduli tematici), ciascuno in un interprete pulito.
+Con --importtime stampa anche il dettaglio di `python -X importtime`
+(nota: -X importtime non registra i moduli caricati via importlib.import_module,
+per questo il tempo complessivo è misurato con perf_counter nel processo figlio).
+
+Uso (dalla root del progetto):
+    python scripts/benchmark_import_gestione_db.py [--ripetizioni 5] [--importtime]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Baseline storica: la facciata eager (monolite + star-import dei moduli tematici)
+_EAGER = "from db._gestione_db_monolith import *\n" + "".join(
+    f"from db.{m} import *\n" for m in (
+        "crypto_helpers", "gestione_admin", "gestione_config", "gestione_budget", "gestione_utenti",
+        "gestione_famiglie", "gestione_categorie", "gestione_conti", "gestione_inviti",
+        "gestione_transazioni", "gestione_patrimonio", "gestione_investimenti", "gestione_giroconti",
+        "gestione_export", "gestione_spese_fisse", "gestione_carte", "gestione_obiettivi",
+        "gestione_contatti",
+    )
+)
+
+SCENARI = {
+    "lazy (import db.gestione_db)": "import db.gestione_db",
+    "primo accesso (get_configurazione)": "from db.gestione_db import get_configurazione",
+    "eager storico (monolite + 18 moduli)": _EAGER,
+}
+
+# Eseguito nel processo figlio: misura il codice e riporta tempo e moduli db.* caricati
+_SONDA = """
+import sys, time
+t0 = time.perf_counter()
+exec(compile({codice!r}, "<scenario>", "exec"), {{}})
+dt = time.perf_counter() - t0
+print(dt, sum(1 for m in sys.modules if m.startswith("db.")))
+"""
+
+
+def _misura(codice, importtime=False):
+    """Ritorna (secondi, moduli_db_caricati) eseguendo lo scenario in un interprete pulito."""
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    res = subprocess.run(cmd + ["-c", _SONDA.format(codice=codice)],
+                         cwd=ROOT, capture_output=True, text=True)
+    if res.returncode != 0:
+        raise RuntimeError(res.stderr.strip().splitlines()[-1] if res.stderr else "import fallito")
+    if importtime:
+        # Dettaglio -X importtime: i 15 import con tempo cumulativo maggiore
+        righe = [r for r in res.stderr.splitlines() if r.startswith("import time:") and "self [us]" not in r]
+        righe.sort(key=lambda r: int(r.split("|")[1]), reverse=True)
+        for r in righe[:15]:
+            print("   ", r)
+    secondi, moduli = res.stdout.split()
+    return float(secondi), int(moduli)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ripetizioni", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true",
+                        help="Mostra gli import più lenti (-X importtime) per ogni scenario")
+    args = parser.parse_args()
+
+    # Primo giro a vuoto per popolare __pycache__
+    for codice in SCENARI.values():
+        _misura(codice)
+
+    for nome, codice in SCENARI.items():
+        tempi = []
+        moduli = 0
+        for _ in range(max(1, args.ripetizioni)):
+            secondi, moduli = _misura(codice)
+            tempi.append(secondi)
+        print(f"{nome:40s} mediana {statistics.median(tempi) * 1000:8.1f} ms  "
+              f"(moduli db caricati: {moduli})")
+        if args.importtime:
+            _misura(codice, importtime=True)
+
+
+if __name__ == "__main__":
+    main()
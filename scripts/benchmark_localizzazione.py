@@ -0,0 +1,183 @@
+"""
+Benchmark della localizzazione: import, primo uso di una lingua e costruzione
+completa della dashboard.
+
+Confronta le tabelle compilate di utils.localization con il comportamento
+storico (tutte le lingue in un unico dizionario costruito all'import, lookup
+annidato e str.format a ogni get), replicato qui da LocalizzazioneStorica.
+
+Scenario dashboard: con flet installato costruisce DashboardView (tutte le
+schede) con un controller finto, misurando il tempo totale e le chiamate a
+loc.get; senza flet ripete le chiamate loc.get/format_currency trovate
+staticamente in views/, tabs/ e dialogs/ (lo stesso carico di stringhe di
+una build_controls completa, senza il costo dei controlli).
+
+Uso (dalla root del progetto):
+    python scripts/benchmark_localizzazione.py [--ripetizioni 5] [--lingua it]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from utils import localization  # noqa: E402
+
+_RE_CHIAMATA = re.compile(r"loc\.get\(\s*[\"']([A-Za-z0-9_]+)[\"']")
+_CARTELLE_UI = ("views", "tabs", "dialogs")
+
+
+class LocalizzazioneStorica(localization.LocalizationManager):
+    """Replica della vecchia implementazione: dizionario annidato eager, nessuna memo."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.strings = {l: dict(localization._carica_stringhe(l)) for l in localization.LINGUE_DISPONIBILI}
+
+    def get(self, key, *args):
+        try:
+            translated_string = self.strings[self.language].get(key, key)
+            if args:
+                return translated_string.format(*args)
+            return translated_string
+        except KeyError:
+            return self.strings.get(self.language, {}).get(key, key)
+
+    def format_currency(self, amount):
+        currency_info = self.currencies.get(self.currency, self.currencies["EUR"])
+        formatted_amount = "{:,.2f}".format(amount)
+        formatted_amount = formatted_amount.replace(",", "X").replace(".", ",").replace("X", ".")
+        return currency_info["format"].format(amount=formatted_amount, symbol=currency_info["symbol"])
+
+
+SCENARI_IMPORT = {
+    "import utils.localization": "import utils.localization",
+    "import + prima get (una lingua)": "from utils.localization import loc\nloc.get('app_title')",
+    "storico: tutte le lingue all'import": "\n".join(
+        f"import utils.locales.{l}" for l in localization.LINGUE_DISPONIBILI),
+}
+
+_SONDA = """
+import sys, time
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+exec(compile({codice!r}, "<scenario>", "exec"), {{}})
+print(time.perf_counter() - t0)
+"""
+
+
+def _misura_import(codice):
+    res = subprocess.run([sys.executable, "-c", _SONDA.format(root=ROOT, codice=codice)],
+                         cwd=ROOT, capture_output=True, text=True)
+    if res.returncode != 0:
+        raise RuntimeError(res.stderr.strip().splitlines()[-1] if res.stderr else "import fallito")
+    return float(res.stdout.split()[-1])
+
+
+def _chiavi_ui():
+    """Chiavi passate letteralmente a loc.get nei moduli dell'interfaccia (con ripetizioni)."""
+    chiavi = []
+    for cartella in _CARTELLE_UI:
+        for radice, _, files in os.walk(os.path.join(ROOT, cartella)):
+            for nome in files:
+                if nome.endswith(".py"):
+                    with open(os.path.join(radice, nome), encoding="utf-8", errors="replace") as f:
+                        chiavi.extend(_RE_CHIAMATA.findall(f.read()))
+    return chiavi
+
+
+def _dashboard_flet(manager):
+    """Costruisce la dashboard completa; None se flet o le schede non sono disponibili."""
+    try:
+        from unittest.mock import MagicMock
+        import flet  # noqa: F401
+        from views.dashboard_view import DashboardView
+    except Exception:
+        return None
+    controller = MagicMock()
+    controller.loc = manager
+    chiamate = [0]
+    originale = manager.get
+
+    def get_contato(key, *args):
+        chiamate[0] += 1
+        return originale(key, *args)
+
+    manager.get = get_contato
+    try:
+        t0 = time.perf_counter()
+        DashboardView(controller).build_view()
+        return time.perf_counter() - t0, chiamate[0]
+    except Exception as e:
+        print(f"    (dashboard flet non costruibile: {e})")
+        return None
+    finally:
+        del manager.get
+
+
+def _replay(manager, chiavi, importi, giri):
+    get = manager.get
+    formatta = manager.format_currency
+    t0 = time.perf_counter()
+    for _ in range(giri):
+        for chiave in chiavi:
+            get(chiave)
+        for importo in importi:
+            formatta(importo)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ripetizioni", type=int, default=5)
+    parser.add_argument("--lingua", default="it", choices=localization.LINGUE_DISPONIBILI)
+    parser.add_argument("--giri", type=int, default=50,
+                        help="Build simulate per ripetizione nello scenario senza flet")
+    args = parser.parse_args()
+    ripetizioni = max(1, args.ripetizioni)
+
+    print("Import (interprete pulito):")
+    for codice in SCENARI_IMPORT.values():
+        _misura_import(codice)  # popola __pycache__
+    for nome, codice in SCENARI_IMPORT.items():
+        tempi = [_misura_import(codice) for _ in range(ripetizioni)]
+        print(f"  {nome:40s} mediana {statistics.median(tempi) * 1000:8.2f} ms")
+
+    nuovo = localization.LocalizationManager(default_lang=args.lingua)
+    storico = LocalizzazioneStorica(default_lang=args.lingua)
+
+    print("\nDashboard completa:")
+    misure = {}
+    for nome, manager in (("tabelle compilate", nuovo), ("storico", storico)):
+        tempi = []
+        for _ in range(ripetizioni):
+            risultato = _dashboard_flet(manager)
+            if risultato is None:
+                break
+            tempi.append(risultato[0])
+        if tempi:
+            misure[nome] = statistics.median(tempi)
+            print(f"  {nome:40s} mediana {misure[nome] * 1000:8.2f} ms  (loc.get: {risultato[1]})")
+
+    if not misure:
+        chiavi = _chiavi_ui()
+        # Importi tipici di una dashboard: saldi ricorrenti e valori distinti
+        importi = [round(i * 37.13 - 500, 2) for i in range(200)] * 3
+        print(f"  flet non disponibile: replay di {len(chiavi)} loc.get e {len(importi)} "
+              f"format_currency per build, {args.giri} build per misura")
+        for nome, manager in (("tabelle compilate", nuovo), ("storico", storico)):
+            tempi = [_replay(manager, chiavi, importi, args.giri) / args.giri for _ in range(ripetizioni)]
+            misure[nome] = statistics.median(tempi)
+            print(f"  {nome:40s} mediana {misure[nome] * 1000:8.3f} ms per build")
+
+    if misure.get("storico") and misure.get("tabelle compilate"):
+        print(f"\n  speedup: {misure['storico'] / misure['tabelle compilate']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
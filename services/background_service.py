@@ -6,19 +6,22 @@ import traceback
 import os
 import datetime
 from db.supabase_manager import get_db_connection
+from db.catalogo_periodi import riallinea_catalogo_periodi
+from db.addebiti_carte import esegui_addebiti_carte
+from db.outbox_email import pulisci_outbox
 from db.gestione_db import (
     check_e_processa_spese_fisse,
     get_server_family_key,
     ottieni_dettagli_conti_utente,
     ottieni_portafoglio,
-    aggiorna_prezzo_manuale_asset,
+    sincronizza_prezzi_portafoglio,
     ottieni_membri_famiglia,
     trigger_budget_history_update,
     check_e_paga_rate_scadute
 )
-from utils.yfinance_manager import ottieni_prezzi_multipli
 from utils.crypto_manager import CryptoManager
 from utils.db_logger import DBLogger, cleanup_old_logs
+from utils.email_outbox import ottieni_worker
 
 logger = logging.getLogger("BackgroundService")
 db_logger = DBLogger("BackgroundService")
@@ -47,6 +50,15 @@ class BackgroundService:
         
         # 3. Log cleanup -> Every 24 hours
         schedule.every(24).hours.do(lambda: cleanup_old_logs(days=30))
+
+        # 4. Riallineamento catalogo periodi (mantenuto dai trigger) -> Every 7 days
+        schedule.every(7).days.do(riallinea_catalogo_periodi)
+
+        # 5. Pulizia outbox email (messaggi conclusi) -> Every 24 hours
+        schedule.every(24).hours.do(lambda: pulisci_outbox(giorni=30))
+
+        # Worker outbox email: invia anche i messaggi accodati da client già chiusi
+        ottieni_worker()
         
         # Esegui subito all'avvio (in un thread separato per non bloccare)
         threading.Thread(target=self.run_all_jobs_now).start()
@@ -143,6 +155,13 @@ class BackgroundService:
                                    id_famiglia=id_famiglia, include_traceback=True)
                     traceback.print_exc()
 
+            # 3. SALDO CARTE: tutte le carte in scadenza oggi, in un solo passaggio
+            # (idempotente: il registro Addebiti_Carte impedisce doppi addebiti)
+            n_carte = esegui_addebiti_carte()
+            if n_carte > 0:
+                logger.info(f"Addebitati {n_carte} saldi carta.")
+                db_logger.info(f"Addebitati {n_carte} saldi carta", dettagli={"count": n_carte})
+
             db_logger.info("Ciclo jobs background completato", 
                           dettagli={"famiglie_processate": len(families)})
 
@@ -192,87 +211,22 @@ class BackgroundService:
         logger.info("Avvio Job: Aggiornamento Asset")
         families = self._get_enabled_families()
         
-        # Raccogli tutti gli asset di tutte le famiglie abilitate
-        # NOTA: Per aggiornare gli asset, abbiamo bisogno di iterare sui CONTI.
-        # Gli asset sono criptati con la chiave famiglia (se in conto inv condiviso?)
-        # O con la chiave utente.
-        # Se sono criptati con chiave UTENTE, non possiamo aggiornarli (non abbiamo la chiave master utente).
-        # Se sono criptati con chiave FAMIGLIA (possibile per conti inv condivisi o se l'utente è un admin che abbiamo "impersonato" con la sua masterkey salvata come family key), ok.
-        
-        # Nella mia implementazione attuale, ho salvato la MasterKey ADMIN come "server_encrypted_key".
-        # Quindi posso decriptare TUTTO ciò che l'admin vede.
-        
-        # Tuttavia, iterare su tutti i conti di tutti gli utenti di una famiglia è costoso.
-        # Semplificazione: Iteriamo sui conti dell'Admin (o dei membri) se riusciamo a decriptarli.
-        
-        # Approccio:
-        # 1. Per ogni famiglia abilitata:
-        #    - Recupera la chiave (che è la Master Key dell'Admin).
-        #    - Deve trovare CHI è l'admin per usare le funzioni "ottieni_conti_utente". 
-        #    - Ma `ottieni_portafoglio` prende id_conto.
-        #    - Possiamo fare una query grezza per trovare conti di tipo "Investimento" legati alla famiglia.
-        
+        # Solo le famiglie con automazione cloud: la chiave famiglia del server
+        # decritta i ticker degli asset cifrati con chiave famiglia; quelli
+        # cifrati con la sola master key di un utente restano esclusi.
         for id_famiglia in families:
             try:
-                fk_b64 = get_server_family_key(id_famiglia) # Questo è in realtà la Master Key dell'Admin
+                fk_b64 = get_server_family_key(id_famiglia)
                 if not fk_b64: continue
-                
-                master_key = fk_b64
-                
-                # Troviamo i conti investimento accessibili con questa chiave
-                # Non sappiamo a priori chi è l'utente della chiave, ma possiamo provare a decriptare
-                # o semplicemente cercare tutti i conti investimento della famiglia (se condivisi) o degli utenti.
-                
-                # Query: Trova tutti i conti di tipo 'Investimento' appartenenti a utenti della famiglia
-                # (Questo è un po' aggressivo, proverà a decriptare asset di tutti).
-                # Se la chiave fallisce, pazienza.
-                
-                conti_investimento = []
-                with get_db_connection() as con:
-                    cur = con.cursor()
-                    cur.execute("""
-                        SELECT C.id_conto 
-                        FROM Conti C
-                        JOIN Appartenenza_Famiglia AF ON C.id_utente = AF.id_utente
-                        WHERE AF.id_famiglia = %s AND C.tipo = 'Investimento'
-                    """, (id_famiglia,))
-                    rows = cur.fetchall()
-                    conti_investimento = [r['id_conto'] for r in rows]
-
-                all_tickers = set()
-                asset_map = [] # List of (id_asset, ticker_decrypted)
 
-                for id_conto in conti_investimento:
-                    # Ottieni portafoglio (usa la master key fornita per tentare decrittazione)
-                    # `ottieni_portafoglio` usa `_get_key_for_transaction` internamente.
-                    # Se passiamo `master_key_b64=fk_b64`, esso userà quella.
-                    # Se il conto è di un altro utente, `_get_key_for_transaction` potrebbe fallire nel trovare la family key corretta
-                    # se si basa sulla master key dell'utente.
-                    # MA se `fk_b64` è la Master Key dell'Admin, funziona solo per i conti dell'Admin.
-                    # Se è la Family Key vera, funziona per i conti con Family Key.
-                    
-                    assets = ottieni_portafoglio(id_conto, master_key_b64=fk_b64)
-                    for asset in assets:
-                         if asset.get('ticker') and asset['ticker'] != '[ENCRYPTED]':
-                             all_tickers.add(asset['ticker'])
-                             asset_map.append((asset['id_asset'], asset['ticker']))
-
-                if not all_tickers: continue
-                
-                # Batch update
-                logger.info(f"Aggiornamento {len(all_tickers)} asset per famiglia {id_famiglia}...")
-                prezzi = ottieni_prezzi_multipli(list(all_tickers))
-                
-                updated_count = 0
-                for id_asset, ticker in asset_map:
-                    if ticker in prezzi and prezzi[ticker] is not None:
-                        aggiorna_prezzo_manuale_asset(id_asset, prezzi[ticker])
-                        updated_count += 1
+                # Una query per gli asset dei membri, un UPDATE in blocco per la famiglia
+                esito = sincronizza_prezzi_portafoglio(id_famiglia=id_famiglia, family_key_b64=fk_b64)
+                updated_count = esito['aggiornati']
                 
                 if updated_count > 0:
                     logger.info(f"Famiglia {id_famiglia}: {updated_count} prezzi aggiornati.")
                     db_logger.info(f"Prezzi asset aggiornati", 
-                                  dettagli={"count": updated_count, "tickers": len(all_tickers)},
+                                  dettagli={"count": updated_count, "tickers": esito['ticker']},
                                   id_famiglia=id_famiglia)
 
             except Exception as e:
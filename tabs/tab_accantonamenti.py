@@ -5,7 +5,7 @@ from utils.styles import AppStyles, AppColors
 from db.gestione_db import (
     crea_obiettivo, ottieni_obiettivi, aggiorna_obiettivo, elimina_obiettivo,
     crea_salvadanaio, ottieni_salvadanai_obiettivo, elimina_salvadanaio,
-    ottieni_conti, ottieni_asset_conto, ottieni_salvadanai_conto,
+    ottieni_conti, ottieni_asset_conti, ottieni_tutti_salvadanai_famiglia,
     collega_salvadanaio_obiettivo, ottieni_prima_famiglia_utente,
     ottieni_conti_condivisi_famiglia, scollega_salvadanaio_obiettivo,
     get_configurazione, ottieni_tutti_i_conti_famiglia, ottieni_ids_conti_tecnici_carte
@@ -389,15 +389,25 @@ class AccantonamentiTab(ft.Container):
             if pb.get('id_conto_condiviso'): used_shared_accounts.add(pb['id_conto_condiviso'])
             if pb.get('id_asset'): used_assets.add(pb['id_asset'])
             
+        conti = [c for c in conti if is_allowed(c)]
+
+        # Asset e salvadanai di tutti i conti in blocco (una query ciascuno)
+        asset_per_conto = ottieni_asset_conti(
+            [c['id_conto'] for c in conti if c['tipo'] == 'Investimento'], master_key_b64, id_famiglia, id_utente
+        )
+        pbs_per_conto = {}
+        if id_famiglia:
+            for pb in ottieni_tutti_salvadanai_famiglia(id_famiglia, master_key_b64, id_utente):
+                if pb['id_conto_condiviso']:
+                    pbs_per_conto.setdefault((True, pb['id_conto_condiviso']), []).append(pb)
+                elif pb['id_conto']:
+                    pbs_per_conto.setdefault((False, pb['id_conto']), []).append(pb)
+
         options = []
         for c in conti:
-            if not is_allowed(c):
-                continue
-
             if c['tipo'] == 'Investimento':
                 # Gli investimenti/asset sono ora gestiti via FOP (solitamente disabilitati per accantonamenti)
-                is_shared_acc = c.get('condiviso', False)
-                assets = ottieni_asset_conto(c['id_conto'], master_key_b64, is_shared=is_shared_acc, id_utente=id_utente)
+                assets = asset_per_conto.get(c['id_conto'], [])
                 if not assets:
                     if c['id_conto'] not in used_accounts:
                         options.append(ft.dropdown.Option(key=f"account_{c['id_conto']}", text=f"{c['nome_conto']} (Vuoto)"))
@@ -423,7 +433,7 @@ class AccantonamentiTab(ft.Container):
                 
                 # Salvadanai associati (mostra solo se il conto è permesso)
                 if id_famiglia:
-                     pbs = ottieni_salvadanai_conto(c['id_conto'], id_famiglia, master_key_b64, id_utente, is_condiviso=is_shared)
+                     pbs = pbs_per_conto.get((is_shared, c['id_conto']), [])
                      for pb in pbs:
                          if pb.get('id_obiettivo') == self.current_obj_for_funds['id']:
                              continue
@@ -8,6 +8,7 @@ from db.gestione_db import (
 import datetime
 from utils.styles import AppStyles, AppColors, PageConstants
 from utils.async_task import AsyncTask
+from utils.riconcilia_lista import RiconciliatoreLista
 
 
 class BudgetTab(ft.Container):
@@ -52,6 +53,17 @@ class BudgetTab(ft.Container):
         
         # --- Contenitore Principale ---
         self.container_content = ft.Column(expand=True, scroll=ft.ScrollMode.ADAPTIVE)
+        # Vista dettaglio: le card delle categorie sono tenute per id e riusate
+        # tra un refresh e l'altro (si ricostruiscono solo quelle cambiate)
+        self.lista_categorie = ft.Column(spacing=10)
+        self._card_categorie = RiconciliatoreLista(
+            self.lista_categorie,
+            chiave=lambda el: el[0],
+            crea=self._crea_card_categoria,
+            firma=lambda el: tuple(el[1].items()),
+        )
+        self._tema_categorie = None
+        self._modo_visualizzato = None
         
         self.content = ft.Column(
             controls=[
@@ -116,23 +128,28 @@ class BudgetTab(ft.Container):
 
     def _aggiorna_contenuto(self):
         """Carica i dati dal DB e aggiorna la UI in asincrono."""
-        # 1. Mostra Loading
-        self.container_content.controls.clear()
-        self.container_content.controls.append(
-            ft.Container(
-                content=ft.Column([
-                    ft.ProgressRing(color=AppColors.PRIMARY),
-                    AppStyles.body_text("Elaborazione budget...", color=AppColors.TEXT_SECONDARY)
-                ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
-                alignment=ft.Alignment(0, 0),
-                padding=50
+        mode = list(self.seg_view_mode.selected)[0]
+
+        # 1. Mostra Loading (solo se la stessa vista non è già a schermo:
+        # altrimenti i controlli attuali restano e vengono riconciliati)
+        if self._modo_visualizzato != mode:
+            self.container_content.controls.clear()
+            self.container_content.controls.append(
+                ft.Container(
+                    content=ft.Column([
+                        ft.ProgressRing(color=AppColors.PRIMARY),
+                        AppStyles.body_text("Elaborazione budget...", color=AppColors.TEXT_SECONDARY)
+                    ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+                    alignment=ft.Alignment(0, 0),
+                    padding=50
+                )
             )
-        )
-        if self.controller.page:
-            self.controller.page.update()
+            if self.controller.page:
+                self.controller.page.update()
 
         id_famiglia = self.controller.get_family_id()
         if not id_famiglia:
+            self._modo_visualizzato = None
             self.container_content.controls.clear()
             self.container_content.controls.append(AppStyles.body_text("Nessuna famiglia selezionata."))
             if self.controller.page:
@@ -142,7 +159,6 @@ class BudgetTab(ft.Container):
         master_key_b64 = self.controller.page.session.get("master_key")
         id_utente = self.controller.get_user_id()
         anno = int(self.dd_anno.value)
-        mode = list(self.seg_view_mode.selected)[0]
         
 
 
@@ -153,7 +169,8 @@ class BudgetTab(ft.Container):
             target=self._fetch_data,
             args=(mode, id_famiglia, anno, mese, master_key_b64, id_utente),
             callback=self._on_data_loaded,
-            error_callback=self._on_error
+            error_callback=self._on_error,
+            connessione_unica=True
         )
         task.start()
 
@@ -167,17 +184,19 @@ class BudgetTab(ft.Container):
 
     def _on_data_loaded(self, result):
         try:
-            self.container_content.controls.clear()
-            
             mode = result['mode']
             dati = result['dati']
             
             if mode == "dettaglio":
                 self._costruisci_vista_dettaglio(dati)
-            elif mode == "mensile":
-                self._costruisci_vista_mensile(dati)
             else:
-                self._costruisci_vista_annuale(dati, result['anno'])
+                # Viste di analisi (grafici): ricostruite ogni volta
+                self._modo_visualizzato = None
+                self.container_content.controls.clear()
+                if mode == "mensile":
+                    self._costruisci_vista_mensile(dati)
+                else:
+                    self._costruisci_vista_annuale(dati, result['anno'])
                 
             if self.page:
                 self.page.update()
@@ -186,6 +205,7 @@ class BudgetTab(ft.Container):
 
     def _on_error(self, e):
         print(f"Errore BudgetTab: {e}")
+        self._modo_visualizzato = None
         try:
             self.container_content.controls.clear()
             self.container_content.controls.append(AppStyles.body_text(f"Errore during il caricamento: {e}", color=AppColors.ERROR))
@@ -426,12 +446,15 @@ class BudgetTab(ft.Container):
 
     def _costruisci_vista_dettaglio(self, budget_data):
         if not budget_data:
+            self._modo_visualizzato = None
+            self.container_content.controls.clear()
             self.container_content.controls.append(
                 AppStyles.empty_state(ft.Icons.MONEY_OFF, "Nessun budget definito per questo mese.")
             )
             return
 
         theme = self.controller._get_current_theme_scheme() or ft.ColorScheme()
+        loc = self.controller.loc
         
         sorted_cats = sorted(
             [c for c in budget_data.items() if "entrat" not in c[1]['nome_categoria'].lower()],
@@ -442,12 +465,9 @@ class BudgetTab(ft.Container):
         tot_limite = 0
         tot_spesa = 0
         
-        lista_categorie = ft.Column(spacing=10)
-        
         for cat_id, cat_data in sorted_cats:
             tot_limite += cat_data['importo_limite_totale']
             tot_spesa += cat_data['spesa_totale_categoria']
-            lista_categorie.controls.append(self._crea_widget_categoria(cat_data, theme))
             
         # Add Global Summary Card
         # Removed condition to always show totals
@@ -458,13 +478,24 @@ class BudgetTab(ft.Container):
             'spesa_totale_categoria': tot_spesa,
             'sottocategorie': []
         }
-        # Insert at the top with a bit of separation
-        lista_categorie.controls.insert(0, ft.Column([
-            self._crea_widget_categoria(global_data, theme, is_global=True),
-            ft.Divider(height=20, color=ft.Colors.TRANSPARENT)
-        ]))
-
-        self.container_content.controls.append(lista_categorie)
+        # Il totale va in cima, poi le categorie: solo le card cambiate sono ricostruite
+        self._tema_categorie = theme
+        elementi = [("__totale__", global_data, True)]
+        elementi.extend((cat_id, cat_data, False) for cat_id, cat_data in sorted_cats)
+        self._card_categorie.riconcilia(elementi, contesto=(loc.language, loc.currency, theme.primary))
+
+        attuali = self.container_content.controls
+        if len(attuali) != 1 or attuali[0] is not self.lista_categorie:
+            self.container_content.controls = [self.lista_categorie]
+        self._modo_visualizzato = "dettaglio"
+
+    def _crea_card_categoria(self, elemento):
+        _, cat_data, is_global = elemento
+        card = self._crea_widget_categoria(cat_data, self._tema_categorie, is_global=is_global)
+        if is_global:
+            # Totale con un po' di separazione dalle categorie
+            return ft.Column([card, ft.Divider(height=20, color=ft.Colors.TRANSPARENT)])
+        return card
 
     def _crea_widget_categoria(self, cat_data, theme, is_global=False):
         loc = self.controller.loc
@@ -97,7 +97,8 @@ class ContiTab(ft.Container):
             target=self._fetch_data,
             args=(utente_id, master_key_b64),
             callback=partial(self._on_data_loaded, theme),
-            error_callback=self._on_error
+            error_callback=self._on_error,
+            connessione_unica=True
         )
         task.start()
 
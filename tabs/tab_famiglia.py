@@ -114,7 +114,8 @@ class FamigliaTab(ft.Container):
             target=self._fetch_data,
             args=(famiglia_id, ruolo, theme.primary), # Pass primary color string if needed, or object
             callback=self._on_data_loaded,
-            error_callback=self._on_error
+            error_callback=self._on_error,
+            connessione_unica=True
         )
         task.start()
 
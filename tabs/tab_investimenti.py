@@ -4,12 +4,14 @@ from db.gestione_db import (
     ottieni_dettagli_conti_utente,
     ottieni_portafoglio,
     aggiorna_prezzo_manuale_asset,
+    sincronizza_prezzi_portafoglio,
     elimina_conto
 )
 from utils.styles import AppStyles, AppColors, PageConstants
-from utils.yfinance_manager import ottieni_prezzo_asset, ottieni_prezzi_multipli
+from utils.yfinance_manager import ottieni_prezzo_asset
 from dialogs.investimento_dialog import InvestimentoDialog
 from utils.async_task import AsyncTask
+from utils.riconcilia_lista import RiconciliatoreLista
 from tabs.subtab_storico_asset import StoricoAssetSubTab
 from tabs.subtab_monte_carlo import MonteCarloSubTab
 import datetime
@@ -25,6 +27,18 @@ class InvestimentiTab(ft.Container):
         self.txt_valore_totale = AppStyles.title_text("")
         self.txt_gain_loss_totale = AppStyles.body_text("")
         self.lv_portafogli = ft.Column(expand=True, scroll=ft.ScrollMode.ADAPTIVE, spacing=15)
+        # Card dei portafogli per id_conto (e righe asset per id_asset dentro ogni card):
+        # al refresh si aggiornano solo i valori cambiati
+        self._card_portafogli = RiconciliatoreLista(
+            self.lv_portafogli,
+            chiave=lambda item: item['conto']['id_conto'],
+            crea=self._crea_card_portafoglio,
+            firma=self._firma_portafoglio,
+            aggiorna=self._aggiorna_card_portafoglio,
+            vuoto=lambda: AppStyles.body_text(self.controller.loc.get("no_investment_accounts")),
+        )
+        self._tema_portafogli = None
+        self._contesto_controlli = None
         
         # Sotto-tab
         self.storico_subtab = StoricoAssetSubTab(controller)
@@ -86,22 +100,29 @@ class InvestimentiTab(ft.Container):
         Avvia il caricamento asincrono dei dati.
         """
         theme = self.controller._get_current_theme_scheme() or ft.ColorScheme()
-        self.portafoglio_content.controls = self.build_controls(theme)
+        # Intestazione ricostruita solo se cambiano lingua o tema: ricrearla a ogni
+        # refresh farebbe reinviare al client anche la lista portafogli che contiene
+        contesto = (self.controller.loc.language, theme.primary)
+        if contesto != self._contesto_controlli or not self.portafoglio_content.controls:
+            self.portafoglio_content.controls = self.build_controls(theme)
+            self._contesto_controlli = contesto
         
-        # 1. Mostra Loading State dentro la lista portafogli
-        self.lv_portafogli.controls.clear()
-        self.lv_portafogli.controls.append(
-            ft.Container(
-                content=ft.Column([
-                    ft.ProgressRing(color=AppColors.PRIMARY),
-                    AppStyles.body_text("Caricamento portafoglio...", color=AppColors.TEXT_SECONDARY)
-                ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
-                alignment=ft.Alignment(0, 0),
-                padding=50
+        # 1. Mostra Loading State dentro la lista portafogli (solo al primo caricamento:
+        # ai refresh successivi le card restano e vengono riconciliate all'arrivo dei dati)
+        if not len(self._card_portafogli):
+            self.lv_portafogli.controls.clear()
+            self.lv_portafogli.controls.append(
+                ft.Container(
+                    content=ft.Column([
+                        ft.ProgressRing(color=AppColors.PRIMARY),
+                        AppStyles.body_text("Caricamento portafoglio...", color=AppColors.TEXT_SECONDARY)
+                    ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+                    alignment=ft.Alignment(0, 0),
+                    padding=50
+                )
             )
-        )
-        if self.controller.page:
-            self.controller.page.update()
+            if self.controller.page:
+                self.controller.page.update()
 
         utente_id = self.controller.get_user_id()
         if not utente_id:
@@ -141,43 +162,31 @@ class InvestimentiTab(ft.Container):
         """
         dati_portafogli = result
         theme = self.controller._get_current_theme_scheme() or ft.ColorScheme()
+        loc = self.controller.loc
         
         try:
-            self.lv_portafogli.controls.clear()
-
             valore_totale = 0
             gain_loss_totale = 0
 
-            if not dati_portafogli:
-                self.lv_portafogli.controls.append(
-                    AppStyles.body_text(self.controller.loc.get("no_investment_accounts"))
-                )
-            else:
-                for item in dati_portafogli:
-                    conto = item['conto']
-                    portafoglio = item['portafoglio']
-                    
-                    # Calcola valore e gain/loss per questo portafoglio
-                    valore_portafoglio = 0
-                    gain_loss_portafoglio = 0
-                    
-                    for asset in portafoglio:
-                        valore_portafoglio += asset['quantita'] * asset['prezzo_attuale_manuale']
-                        gain_loss_portafoglio += asset['gain_loss_totale']
-                    
-                    valore_totale += valore_portafoglio
-                    gain_loss_totale += gain_loss_portafoglio
-                    
-                    # Crea widget per questo portafoglio
-                    self.lv_portafogli.controls.append(
-                        self._crea_widget_portafoglio(conto, portafoglio, valore_portafoglio, gain_loss_portafoglio, theme)
-                    )
+            for item in dati_portafogli:
+                # Calcola valore e gain/loss per questo portafoglio
+                item['valore'] = sum(a['quantita'] * a['prezzo_attuale_manuale'] for a in item['portafoglio'])
+                item['gain_loss'] = sum(a['gain_loss_totale'] for a in item['portafoglio'])
+                valore_totale += item['valore']
+                gain_loss_totale += item['gain_loss']
+
+            # Il tema serve a crea/aggiorna delle card; nel contesto perché cambiarlo ricrea le righe
+            self._tema_portafogli = theme
+            self._card_portafogli.riconcilia(
+                dati_portafogli,
+                contesto=(loc.language, loc.currency, theme.surface_variant)
+            )
 
             # Aggiorna i totali
-            self.txt_valore_totale.value = self.controller.loc.format_currency(valore_totale)
+            self.txt_valore_totale.value = loc.format_currency(valore_totale)
             self.txt_valore_totale.color = theme.primary
             
-            self.txt_gain_loss_totale.value = f"{self.controller.loc.get('total_gain_loss')}: {self.controller.loc.format_currency(gain_loss_totale)}"
+            self.txt_gain_loss_totale.value = f"{loc.get('total_gain_loss')}: {loc.format_currency(gain_loss_totale)}"
             self.txt_gain_loss_totale.color = AppColors.SUCCESS if gain_loss_totale >= 0 else AppColors.ERROR
 
             if self.controller.page:
@@ -242,49 +251,79 @@ class InvestimentiTab(ft.Container):
             ft.Container(content=self.lv_portafogli, expand=True)
         ]
 
+    @staticmethod
+    def _firma_portafoglio(item):
+        return (tuple(item['conto'].items()), item['valore'], item['gain_loss'],
+                [tuple(a.items()) for a in item['portafoglio']])
+
+    def _crea_card_portafoglio(self, item):
+        card = self._crea_widget_portafoglio(item['conto'], item['portafoglio'], item['valore'],
+                                             item['gain_loss'], self._tema_portafogli or ft.ColorScheme())
+        return card
+
+    def _aggiorna_card_portafoglio(self, card, item):
+        """Aggiorna sul posto intestazione, pulsanti e righe asset di una card esistente."""
+        loc = self.controller.loc
+        parti = card.data
+        conto = item['conto']
+        parti['nome'].value = conto['nome_conto']
+        parti['valore'].value = f"{loc.get('value')}: {loc.format_currency(item['valore'])}"
+        parti['gain_loss'].value = f"G/L: {loc.format_currency(item['gain_loss'])}"
+        parti['gain_loss'].color = AppColors.SUCCESS if item['gain_loss'] >= 0 else AppColors.ERROR
+        parti['gestisci'].data = conto
+        parti['modifica'].data = conto
+        parti['conto'] = conto
+        parti['asset'].riconcilia(item['portafoglio'])
+
     def _crea_widget_portafoglio(self, conto, portafoglio, valore_totale, gain_loss_totale, theme):
         loc = self.controller.loc
         
         # Header del portafoglio
+        txt_nome = AppStyles.subheader_text(conto['nome_conto'])
+        txt_valore = AppStyles.caption_text(f"{loc.get('value')}: {loc.format_currency(valore_totale)}")
+        txt_gain_loss = AppStyles.data_text(
+            f"G/L: {loc.format_currency(gain_loss_totale)}",
+            size=14,
+            color=AppColors.SUCCESS if gain_loss_totale >= 0 else AppColors.ERROR
+        )
         header = ft.Row([
             ft.Column([
-                AppStyles.subheader_text(conto['nome_conto']),
-                AppStyles.caption_text(f"{loc.get('value')}: {loc.format_currency(valore_totale)}")
+                txt_nome,
+                txt_valore
             ], expand=True),
             ft.Column([
-                AppStyles.data_text(
-                    f"G/L: {loc.format_currency(gain_loss_totale)}",
-                    size=14,
-                    color=AppColors.SUCCESS if gain_loss_totale >= 0 else AppColors.ERROR
-                )
+                txt_gain_loss
             ], horizontal_alignment=ft.CrossAxisAlignment.END)
         ])
         
-        # Tabella asset
-        if not portafoglio:
-            asset_list = ft.Column([
-                AppStyles.body_text(loc.get("no_assets_in_portfolio"))
-            ], spacing=5)
-        else:
-            asset_list = ft.Column(
-                [self._crea_widget_asset(asset, conto, theme) for asset in portafoglio],
-                spacing=5
-            )
+        # Tabella asset (righe per id_asset, riconciliate ai refresh successivi)
+        asset_list = ft.Column(spacing=5)
+        parti = {'nome': txt_nome, 'valore': txt_valore, 'gain_loss': txt_gain_loss, 'conto': conto}
+        righe_asset = RiconciliatoreLista(
+            asset_list,
+            chiave=lambda asset: asset['id_asset'],
+            crea=lambda asset: self._crea_widget_asset(asset, parti['conto'], theme),
+            vuoto=lambda: AppStyles.body_text(loc.get("no_assets_in_portfolio")),
+        )
+        righe_asset.riconcilia(portafoglio)
         
         # Pulsanti per gestire conto e portafoglio
+        btn_gestisci = ft.ElevatedButton(
+            loc.get("manage_portfolio"),
+            icon=ft.Icons.INSIGHTS,
+            data=conto,
+            on_click=lambda e: self.controller.portafoglio_dialogs.apri_dialog_portafoglio(e, e.control.data)
+        )
+        btn_modifica = ft.IconButton(
+            icon=ft.Icons.EDIT,
+            tooltip=loc.get("edit_account"),
+            icon_color=AppColors.INFO,
+            data=conto,
+            on_click=self._modifica_conto_investimento
+        )
         btn_row = ft.Row([
-            ft.ElevatedButton(
-                loc.get("manage_portfolio"),
-                icon=ft.Icons.INSIGHTS,
-                on_click=lambda e, c=conto: self.controller.portafoglio_dialogs.apri_dialog_portafoglio(e, c)
-            ),
-            ft.IconButton(
-                icon=ft.Icons.EDIT,
-                tooltip=loc.get("edit_account"),
-                icon_color=AppColors.INFO,
-                data=conto,
-                on_click=self._modifica_conto_investimento
-            ),
+            btn_gestisci,
+            btn_modifica,
             ft.IconButton(
                 icon=ft.Icons.DELETE,
                 tooltip=loc.get("delete_account"),
@@ -295,6 +334,7 @@ class InvestimentiTab(ft.Container):
                 )
             )
         ], alignment=ft.MainAxisAlignment.END)
+        parti.update({'asset': righe_asset, 'gestisci': btn_gestisci, 'modifica': btn_modifica})
         
         return AppStyles.card_container(
             content=ft.Column([
@@ -304,7 +344,8 @@ class InvestimentiTab(ft.Container):
                 ft.Container(height=10),
                 btn_row
             ], spacing=5),
-            padding=15
+            padding=15,
+            data=parti
         )
 
     def _crea_widget_asset(self, asset, conto, theme):
@@ -416,35 +457,9 @@ class InvestimentiTab(ft.Container):
         task.start()
 
     def _run_sync_tutti(self, utente_id, master_key_b64):
-        # Ottieni tutti i conti di investimento
-        conti_utente = ottieni_dettagli_conti_utente(utente_id, master_key_b64=master_key_b64)
-        conti_investimento = [c for c in conti_utente if c['tipo'] == 'Investimento']
-        
-        # Raccogli tutti i ticker unici
-        tutti_asset = []
-        for conto in conti_investimento:
-            portafoglio = ottieni_portafoglio(conto['id_conto'], master_key_b64=master_key_b64)
-            tutti_asset.extend(portafoglio)
-        
-        if not tutti_asset:
-            return 0
-        
-        # Ottieni prezzi per tutti i ticker
-        tickers = list(set([
-            asset['ticker'] for asset in tutti_asset 
-            if asset.get('ticker') and asset['ticker'] != "[ENCRYPTED]" and not CryptoManager.is_encrypted(asset['ticker'])
-        ]))
-        prezzi = ottieni_prezzi_multipli(tickers)
-        
-        # Aggiorna i prezzi nel database
-        aggiornati = 0
-        for asset in tutti_asset:
-            ticker = asset['ticker']
-            if ticker in prezzi and prezzi[ticker] is not None:
-                aggiorna_prezzo_manuale_asset(asset['id_asset'], prezzi[ticker])
-                aggiornati += 1
-                
-        return aggiornati
+        # Asset di tutti i conti investimento in una query, un UPDATE per tutti i prezzi
+        esito = sincronizza_prezzi_portafoglio(id_utente=utente_id, master_key_b64=master_key_b64)
+        return esito['aggiornati']
 
     def _on_sync_complete(self, aggiornati):
         self.sincronizzazione_in_corso = False
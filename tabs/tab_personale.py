@@ -9,6 +9,7 @@ from db.gestione_db import (
 )
 import datetime
 from utils.async_task import AsyncTask
+from utils.riconcilia_lista import RiconciliatoreLista
 from utils.styles import AppStyles, AppColors, PageConstants
 from utils.logger import setup_logger
 
@@ -48,6 +49,14 @@ class PersonaleTab(ft.Container):
             expand=True,
             spacing=10
         )
+        # Card delle transazioni per chiave: al refresh si ricreano solo le righe cambiate
+        self._righe_transazioni = RiconciliatoreLista(
+            self.lista_transazioni,
+            chiave=lambda riga: (riga[0]['tipo_transazione'], riga[0]['id_transazione'],
+                                 riga[0]['id_transazione_condivisa']),
+            crea=self._crea_card_transazione,
+            firma=lambda riga: (tuple(riga[0].items()), riga[2]),
+        )
         
         # Loading Indicator
         self.loading_view = ft.Container(
@@ -330,58 +339,66 @@ class PersonaleTab(ft.Container):
     def _popola_lista_transazioni(self, limite=None):
         """Popola la lista transazioni con un limite opzionale."""
         loc = self.controller.loc
-        self.lista_transazioni.controls.clear()
         
         transazioni_da_mostrare = self.transazioni_correnti
         if limite:
             transazioni_da_mostrare = self.transazioni_correnti[:limite]
-        
+
+        # Importi numerici e formattati di tutte le righe in un passaggio
+        importi = []
         for t in transazioni_da_mostrare:
-            azioni = ft.Row([
-                ft.IconButton(icon=ft.Icons.EDIT, tooltip=loc.get("edit"), data=t,
-                              on_click=lambda e: self.controller.transaction_dialog.apri_dialog_modifica_transazione(
-                                  e.control.data),
-                              icon_color=AppColors.INFO, icon_size=20),
-                ft.IconButton(icon=ft.Icons.DELETE, tooltip=loc.get("delete"), data=t,
-                              on_click=lambda e: self.controller.open_confirm_delete_dialog(
-                                  partial(self.elimina_cliccato, e)),
-                              icon_color=AppColors.ERROR, icon_size=20)
-            ], spacing=0)
-
-            # Formatta l'importo
             importo = t.get('importo', 0)
             if isinstance(importo, str):
                 try:
                     importo = float(importo.replace(',', '.'))
                 except:
                     importo = 0
-            
-            card_content = ft.ResponsiveRow(
-                [
-                    # Col 1: Descrizione e Conto (tutto spazio su mobile, metà su tablet/pc)
-                    ft.Column([
-                        AppStyles.body_text(t['descrizione']),
-                        AppStyles.caption_text(f"{t['data']} - {t['nome_conto']}"),
-                    ], col={"xs": 12, "sm": 6}, spacing=2),
-                    
-                    # Col 2: Importo e Categoria 
-                    ft.Column([
-                        AppStyles.currency_text(
-                            loc.format_currency(importo),
-                            color=AppColors.SUCCESS if importo >= 0 else AppColors.ERROR
-                        ),
-                        AppStyles.caption_text(t.get('nome_sottocategoria') or loc.get("no_category"))
-                    ], col={"xs": 8, "sm": 4}, alignment=ft.MainAxisAlignment.END, horizontal_alignment=ft.CrossAxisAlignment.END, spacing=2),
-                    
-                    # Col 3: Azioni (piccolo spazio a destra su mobile)
-                    ft.Column([azioni], col={"xs": 4, "sm": 2}, alignment=ft.MainAxisAlignment.CENTER, horizontal_alignment=ft.CrossAxisAlignment.END)
-                ],
-                vertical_alignment=ft.CrossAxisAlignment.CENTER
-            )
-            
-            self.lista_transazioni.controls.append(
-                AppStyles.card_container(card_content, padding=10)
-            )
+            importi.append(importo)
+        importi_formattati = loc.format_many(importi)
+
+        self._righe_transazioni.riconcilia(
+            zip(transazioni_da_mostrare, importi, importi_formattati),
+            contesto=loc.language
+        )
+
+    def _crea_card_transazione(self, riga):
+        """Card di una transazione: riga = (transazione, importo, importo formattato)."""
+        loc = self.controller.loc
+        t, importo, importo_formattato = riga
+        azioni = ft.Row([
+            ft.IconButton(icon=ft.Icons.EDIT, tooltip=loc.get("edit"), data=t,
+                          on_click=lambda e: self.controller.transaction_dialog.apri_dialog_modifica_transazione(
+                              e.control.data),
+                          icon_color=AppColors.INFO, icon_size=20),
+            ft.IconButton(icon=ft.Icons.DELETE, tooltip=loc.get("delete"), data=t,
+                          on_click=lambda e: self.controller.open_confirm_delete_dialog(
+                              partial(self.elimina_cliccato, e)),
+                          icon_color=AppColors.ERROR, icon_size=20)
+        ], spacing=0)
+
+        card_content = ft.ResponsiveRow(
+            [
+                # Col 1: Descrizione e Conto (tutto spazio su mobile, metà su tablet/pc)
+                ft.Column([
+                    AppStyles.body_text(t['descrizione']),
+                    AppStyles.caption_text(f"{t['data']} - {t['nome_conto']}"),
+                ], col={"xs": 12, "sm": 6}, spacing=2),
+                
+                # Col 2: Importo e Categoria 
+                ft.Column([
+                    AppStyles.currency_text(
+                        importo_formattato,
+                        color=AppColors.SUCCESS if importo >= 0 else AppColors.ERROR
+                    ),
+                    AppStyles.caption_text(t.get('nome_sottocategoria') or loc.get("no_category"))
+                ], col={"xs": 8, "sm": 4}, alignment=ft.MainAxisAlignment.END, horizontal_alignment=ft.CrossAxisAlignment.END, spacing=2),
+                
+                # Col 3: Azioni (piccolo spazio a destra su mobile)
+                ft.Column([azioni], col={"xs": 4, "sm": 2}, alignment=ft.MainAxisAlignment.CENTER, horizontal_alignment=ft.CrossAxisAlignment.END)
+            ],
+            vertical_alignment=ft.CrossAxisAlignment.CENTER
+        )
+        return AppStyles.card_container(card_content, padding=10)
 
     def _mostra_tutte_transazioni(self, e):
         """Passa alla vista espansa con tutte le transazioni."""
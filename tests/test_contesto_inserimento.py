@@ -0,0 +1,116 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import json
+import sys
+import os
+
+# Adattamento path per importare i moduli corretti
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import contesto_inserimento
+from utils.contesto_inserimento import GestoreContestoInserimento, costruisci_opzioni
+
+
+def _conto(id_conto, tipo, owner=1, condiviso=False, nome=None, **extra):
+    c = {'id_conto': id_conto, 'nome_conto': nome or f"Conto {id_conto}", 'tipo': tipo,
+         'is_condiviso': condiviso, 'id_utente_owner': None if condiviso else owner, 'nome_owner': 'Bea'}
+    c.update(extra)
+    return c
+
+
+class _TaskSincrono:
+    """Sostituto di AsyncTask che esegue il target subito, nel thread del test."""
+    def __init__(self, target, args=(), kwargs=None, callback=None, error_callback=None):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+
+class TestCostruisciOpzioni(unittest.TestCase):
+
+    def setUp(self):
+        self.conti = [
+            _conto(1, 'Conto Corrente'),
+            _conto('CARD_7_1_P', 'Carta'),
+            _conto(2, 'Conto Corrente', owner=2),
+            _conto(3, 'Conto Corrente', condiviso=True),
+            _conto('PB_4', 'Salvadanaio', condiviso=True),
+            _conto(5, 'Portafoglio Elettronico', config_speciale=json.dumps({'sottotipo': 'satispay'})),
+            _conto(6, 'Conto Corrente', nome="Saldo iniziale"),
+            _conto(99, 'Conto Corrente'),
+        ]
+
+    def test_default_senza_matrice(self):
+        opzioni = costruisci_opzioni(self.conti, [99], 1, {}, [])
+        spesa, _ = opzioni["Spesa"]
+        # Satispay non è nei default: ammesso per fallback (non per Altri Familiari)
+        self.assertEqual([o['key'] for o in spesa], ['P1', 'CARD_7_1_P', 'C3', 'P5'])
+        incasso, _ = opzioni["Incasso"]
+        self.assertEqual([o['key'] for o in incasso], ['P1', 'C3', 'P5'])
+        sorgente, destinazione = opzioni["Giroconto"]
+        self.assertEqual([o['key'] for o in sorgente], ['P1', 'P2', 'C3', 'PB_4', 'P5'])
+        self.assertEqual([o['key'] for o in destinazione], [o['key'] for o in sorgente])
+        self.assertEqual(spesa[0]['scope'], "Personale")
+        self.assertEqual(spesa[2]['scope'], "Condiviso")
+
+    def test_matrice_e_ordinamento(self):
+        matrice = {"Spesa": {"Satispay": {"Personale": True}, "Carte": {"Personale": True}}}
+        opzioni = costruisci_opzioni(self.conti, [], 1, matrice, ["satispay", "carta_credito"])
+        spesa, destinazione = opzioni["Spesa"]
+        # Categorie non in matrice: ammesse (fallback) ma ordinate in coda
+        self.assertEqual([o['key'] for o in spesa], ['P5', 'CARD_7_1_P', 'P1', 'C3', 'PB_4', 'P99'])
+        self.assertEqual(destinazione, [])
+        self.assertEqual(spesa[0]['icona'], "📱")
+
+
+class TestGestoreContestoInserimento(unittest.TestCase):
+
+    def setUp(self):
+        self.costruisci = patch('utils.contesto_inserimento.costruisci_contesto',
+                                side_effect=lambda *a: MagicMock(name="contesto"))
+        self.mock_costruisci = self.costruisci.start()
+        self.task = patch('utils.contesto_inserimento.AsyncTask', _TaskSincrono)
+        self.task.start()
+
+    def tearDown(self):
+        self.task.stop()
+        self.costruisci.stop()
+
+    def test_prepara_e_riuso(self):
+        gestore = GestoreContestoInserimento()
+        gestore.prepara(10, 1, "mk")
+        self.assertEqual(self.mock_costruisci.call_count, 1)
+        c1 = gestore.ottieni(10, 1, "mk")
+        c2 = gestore.ottieni(10, 1, "mk")
+        self.assertIs(c1, c2)
+        self.assertEqual(self.mock_costruisci.call_count, 1)
+
+    def test_invalidazione_per_famiglia_e_utente(self):
+        gestore = GestoreContestoInserimento()
+        gestore.prepara(10, 1, "mk")
+        c1 = gestore.ottieni(10, 1, "mk")
+
+        contesto_inserimento.invalida_contesti_inserimento(id_famiglia=11)
+        contesto_inserimento.invalida_contesti_inserimento(id_utente=2)
+        self.assertIs(gestore.ottieni(10, 1, "mk"), c1)
+
+        # Ricostruito in background (qui sincrono): ottieni non interroga il DB
+        contesto_inserimento.invalida_contesti_inserimento(id_famiglia="10")
+        self.assertEqual(self.mock_costruisci.call_count, 2)
+        c2 = gestore.ottieni(10, 1, "mk")
+        self.assertIsNot(c2, c1)
+        self.assertEqual(self.mock_costruisci.call_count, 2)
+
+    def test_cambio_sessione_e_reset(self):
+        gestore = GestoreContestoInserimento()
+        self.assertIsNone(gestore.ottieni(None, 1))
+        gestore.ottieni(10, 1, "mk")
+        gestore.ottieni(20, 1, "mk")
+        self.assertEqual(self.mock_costruisci.call_count, 2)
+        gestore.reset()
+        self.assertFalse(gestore.riguarda())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import threading
+import zipfile
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.export_writer import StreamingExportWriter, ExportAnnullato
+
+
+def _righe(n):
+    for i in range(n):
+        yield {'data': f'2024-01-{(i % 28) + 1:02d}', 'descrizione': f'Riga {i}', 'importo': -i}
+
+
+class TestStreamingExportWriter(unittest.TestCase):
+
+    def test_xlsx_write_only(self):
+        from openpyxl import load_workbook
+
+        progress = []
+        writer = StreamingExportWriter('xlsx', on_progress=lambda f, n: progress.append((f, n)))
+        self.assertEqual(writer.scrivi_foglio('Transazioni_Famiglia', _righe(1200)), 1200)
+        self.assertEqual(writer.scrivi_foglio('Vuoto', iter([])), 0)
+        file_export, totale = writer.chiudi()
+        self.addCleanup(file_export.close)
+
+        self.assertEqual(totale, 1200)
+        wb = load_workbook(file_export, read_only=True)
+        self.assertEqual(wb.sheetnames, ['Transazioni_Famiglia'])
+        rows = list(wb['Transazioni_Famiglia'].iter_rows(values_only=True))
+        self.assertEqual(rows[0], ('data', 'descrizione', 'importo'))
+        self.assertEqual(len(rows), 1201)
+        self.assertEqual(progress[-1], ('Transazioni_Famiglia', 1200))
+
+    def test_csv_zip(self):
+        writer = StreamingExportWriter('csv')
+        writer.scrivi_foglio('Spese_Fisse', _righe(3))
+        file_export, _ = writer.chiudi()
+        self.addCleanup(file_export.close)
+
+        with zipfile.ZipFile(file_export) as zf:
+            self.assertEqual(zf.namelist(), ['Spese_Fisse.csv'])
+            contenuto = zf.read('Spese_Fisse.csv').decode('utf-8-sig').splitlines()
+        self.assertEqual(contenuto[0], 'data;descrizione;importo')
+        self.assertEqual(len(contenuto), 4)
+
+    def test_colonne_unione_delle_chiavi(self):
+        writer = StreamingExportWriter('csv')
+        righe = [{'data': '2024-01-01', 'importo': 1}, {'data': '2024-01-02', 'importo': 2, 'note': 'solo qui'}]
+        self.assertEqual(writer.scrivi_foglio('Dettaglio_Portafogli', iter(righe)), 2)
+        file_export, _ = writer.chiudi()
+        self.addCleanup(file_export.close)
+
+        with zipfile.ZipFile(file_export) as zf:
+            contenuto = zf.read('Dettaglio_Portafogli.csv').decode('utf-8-sig').splitlines()
+        self.assertEqual(contenuto, ['data;importo;note', '2024-01-01;1;', '2024-01-02;2;solo qui'])
+
+    def test_cancellazione(self):
+        cancel = threading.Event()
+        writer = StreamingExportWriter('xlsx', cancel_event=cancel)
+
+        def righe_con_annullamento():
+            for i, r in enumerate(_righe(2000)):
+                if i == 600:
+                    cancel.set()
+                yield r
+
+        with self.assertRaises(ExportAnnullato):
+            writer.scrivi_foglio('Transazioni_Famiglia', righe_con_annullamento())
+        writer.scarta()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import time
+
+# Adattamento path per importare i moduli corretti
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.indice_ticker import IndiceTicker, normalizza
+
+SIMBOLI = [
+    {'ticker': 'AAPL', 'nome': 'Apple Inc.', 'borsa': 'NASDAQ', 'tipo': 'EQUITY'},
+    {'ticker': 'APC.DE', 'nome': 'Apple Inc.', 'borsa': 'XETRA', 'tipo': 'EQUITY'},
+    {'ticker': '1AAPL.MI', 'nome': 'Apple Inc.', 'borsa': 'Milano', 'tipo': 'EQUITY'},
+    {'ticker': 'ENI.MI', 'nome': 'Eni S.p.A.', 'borsa': 'Milano', 'tipo': 'EQUITY'},
+    {'ticker': 'SWDA.MI', 'nome': 'iShares Core MSCI World UCITS ETF', 'borsa': 'Milano', 'tipo': 'ETF'},
+]
+
+
+class TestIndiceTicker(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.percorso = os.path.join(self.tmp.name, 'ticker_index.json')
+        # Nessun salvataggio differito durante i test: si salva esplicitamente
+        self.salva_bg = patch.object(IndiceTicker, '_salva_in_background')
+        self.salva_bg.start()
+        self.indice = IndiceTicker(self.percorso)
+        self.indice.aggiungi_simboli(SIMBOLI)
+
+    def tearDown(self):
+        self.salva_bg.stop()
+        self.tmp.cleanup()
+
+    def test_normalizza(self):
+        self.assertEqual(normalizza("  Société Générale, S.A. "), "societe generale s.a.")
+
+    def test_prefisso_e_filtro_borsa(self):
+        self.assertEqual([r['ticker'] for r in self.indice.cerca_locale("Apple Milano")], ['1AAPL.MI'])
+        self.assertEqual([r['ticker'] for r in self.indice.cerca_locale("msci wor")], ['SWDA.MI'])
+        # Ticker esatto (anche senza suffisso) prima dei match sul nome
+        self.assertEqual(self.indice.cerca_locale("eni")[0]['ticker'], 'ENI.MI')
+        self.assertEqual(self.indice.cerca_locale("aapl")[0]['ticker'], 'AAPL')
+        self.assertEqual(self.indice.cerca_locale("zzz"), [])
+
+    def test_aggiornamento_non_perde_dati(self):
+        self.indice.aggiungi_simboli([{'ticker': 'eni.mi', 'nome': 'ENI SPA'}])
+        self.assertEqual(len(self.indice), len(SIMBOLI))
+        r = self.indice.cerca_locale("eni spa")[0]
+        self.assertEqual((r['borsa'], r['nome']), ('Milano', 'ENI SPA'))
+        # Le chiavi del vecchio nome sono state rimosse
+        self.assertEqual(self.indice.cerca_locale("eni s.p.a"), [])
+
+    def test_rete_solo_su_miss_e_lru(self):
+        remoti = [{'ticker': 'MSFT', 'nome': 'Microsoft Corporation', 'borsa': 'NASDAQ', 'tipo': 'EQUITY'}]
+        with patch('utils.yfinance_manager.cerca_ticker', return_value=remoti) as mock_remoto:
+            self.assertEqual(self.indice.cerca("apple")[0]['nome'], 'Apple Inc.')
+            mock_remoto.assert_not_called()
+
+            self.assertEqual(self.indice.cerca("microsof"), remoti)
+            self.assertEqual(mock_remoto.call_count, 1)
+            # Ora il simbolo è nell'indice e la query nella LRU
+            self.assertEqual(self.indice.cerca("micro")[0]['ticker'], 'MSFT')
+            self.assertIsNotNone(self.indice.query_remota_in_cache("Microsof"))
+            self.assertEqual(mock_remoto.call_count, 1)
+
+            self.indice.cerca("apple", forza_remoto=True)
+            self.assertEqual(mock_remoto.call_count, 2)
+
+    def test_lru_limitata(self):
+        indice = IndiceTicker(None, max_query_remote=2)
+        for q in ("aa", "bb", "cc"):
+            indice.registra_query_remota(q, 10, [])
+        self.assertIsNone(indice.query_remota_in_cache("aa"))
+        self.assertIsNotNone(indice.query_remota_in_cache("cc"))
+
+    def test_persistenza(self):
+        self.indice.registra_query_remota("apple", 10, SIMBOLI[:1])
+        self.indice.salva()
+        ricaricato = IndiceTicker(self.percorso)
+        self.assertEqual(len(ricaricato), len(SIMBOLI))
+        self.assertEqual(ricaricato.query_remota_in_cache("apple")[0]['ticker'], 'AAPL')
+
+    def test_file_v1_ignorato(self):
+        # I file v1 potevano contenere gli asset posseduti dagli utenti
+        import json
+        with open(self.percorso, 'w', encoding='utf-8') as f:
+            json.dump({'versione': 1, 'simboli': SIMBOLI, 'query_remote': []}, f)
+        self.assertEqual(len(IndiceTicker(self.percorso)), 0)
+
+    def test_ricerca_locale_veloce(self):
+        indice = IndiceTicker(None)
+        indice.aggiungi_simboli({'ticker': f"T{i:05d}.MI", 'nome': f"Societa {i} Holding", 'borsa': 'Milano'}
+                                for i in range(5000))
+        t0 = time.perf_counter()
+        for _ in range(100):
+            indice.cerca_locale("T1234")
+        self.assertLess((time.perf_counter() - t0) / 100, 0.005)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Adattamento path per importare i moduli corretti
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import localization
+from utils.localization import LocalizationManager
+
+
+class TestLocalization(unittest.TestCase):
+
+    def test_lingua_caricata_al_primo_uso(self):
+        with patch.dict(localization._tabelle, clear=True), \
+                patch('utils.localization._carica_stringhe', wraps=localization._carica_stringhe) as carica:
+            loc = LocalizationManager(default_lang="en")
+            self.assertEqual(carica.call_count, 0)
+            self.assertEqual(loc.get("edit"), "Edit")
+            loc.get("delete")
+            self.assertEqual(list(localization._tabelle), ["en"])
+            self.assertEqual(carica.call_count, 1)
+            self.assertIn("es", loc.strings)
+
+    def test_get_come_prima(self):
+        loc = LocalizationManager()
+        with patch.dict(localization._tabelle, {"it": localization._TabellaLingua("it", {
+                "saluto": "Ciao {}", "graffe": "{{letterale}}", "semplice": "Testo"})}):
+            self.assertEqual(loc.get("saluto", "Anna"), "Ciao Anna")
+            self.assertEqual(loc.get("saluto"), "Ciao {}")
+            self.assertEqual(loc.get("graffe"), "{{letterale}}")
+            self.assertEqual(loc.get("graffe", 1), "{letterale}")
+            self.assertEqual(loc.get("semplice", 1), "Testo")
+            self.assertEqual(loc.get("mancante"), "mancante")
+            self.assertEqual(loc.get("mancante_{}", 2), "mancante_2")
+
+    def test_valuta_memo(self):
+        loc = LocalizationManager()
+        self.assertEqual(loc.format_currency(1234.5), "1.234,50 €")
+        self.assertEqual(loc.format_currency(1234.5), "1.234,50 €")
+        self.assertEqual(loc.format_currency(-0.0), "-0,00 €")
+        loc.set_currency("USD")
+        self.assertEqual(loc.format_currency(1234.5), "$1.234,50")
+        self.assertEqual(loc.format_many([0, 1234.5, True]), ["$0,00", "$1.234,50", "$1,00"])
+        self.assertGreaterEqual(localization._formati["EUR"].info_cache().hits, 1)
+
+    def test_formato_valuta_come_storico(self):
+        from decimal import Decimal
+        from utils.formato_valuta import FormatoValuta
+
+        def storico(importo, modello="{amount} {symbol}"):
+            cifre = "{:,.2f}".format(importo).replace(",", "X").replace(".", ",").replace("X", ".")
+            return modello.format(amount=cifre, symbol="€")
+
+        importi = [0, -0.0, Decimal("-0"), Decimal("-1234567.895"), 1, True, 1.0, -0.004, 98765432.1, 10 ** 20]
+        for modello in ("{amount} {symbol}", "{symbol}{amount}", "{symbol}", "{amount}/{amount}"):
+            formato = FormatoValuta("€", modello)
+            attesi = [storico(a, modello) for a in importi]
+            self.assertEqual([formato.formatta(a) for a in importi], attesi)
+            self.assertEqual(formato.format_many(importi), attesi)
+
+
+if __name__ == '__main__':
+    unittest.main()
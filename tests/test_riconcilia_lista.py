@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+
+# Adattamento path per importare i moduli corretti
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.riconcilia_lista import RiconciliatoreLista
+
+
+class ContenitoreFinto:
+    def __init__(self):
+        self.controls = []
+        self.update_inviati = 0
+
+    def update(self):
+        self.update_inviati += 1
+
+
+class TestRiconciliaLista(unittest.TestCase):
+
+    def setUp(self):
+        self.contenitore = ContenitoreFinto()
+        self.aggiornati = []
+        self.riconciliatore = RiconciliatoreLista(
+            self.contenitore,
+            chiave=lambda riga: riga['id'],
+            crea=lambda riga: {'riga': dict(riga)},
+            aggiorna=lambda controllo, riga: self.aggiornati.append(riga['id']),
+            vuoto=lambda: 'vuoto',
+        )
+
+    def test_riuso_aggiornamento_inserimento_rimozione(self):
+        righe = [{'id': 1, 'importo': 10}, {'id': 2, 'importo': 20}, {'id': 3, 'importo': 30}]
+        esito = self.riconciliatore.riconcilia(righe, invia=True)
+        self.assertEqual(esito['create'], 3)
+        self.assertEqual(self.contenitore.update_inviati, 1)
+        primo, secondo, _ = self.contenitore.controls
+
+        righe = [{'id': 4, 'importo': 40}, {'id': 1, 'importo': 10}, {'id': 2, 'importo': 25}]
+        esito = self.riconciliatore.riconcilia(righe, intestazione=['titolo'], invia=True)
+        self.assertEqual(esito, {'riusate': 1, 'aggiornate': 1, 'create': 1, 'rimosse': 1})
+        self.assertEqual(self.aggiornati, [2])
+        self.assertEqual(self.contenitore.controls[0], 'titolo')
+        self.assertIs(self.contenitore.controls[2], primo)
+        self.assertIs(self.contenitore.controls[3], secondo)
+        self.assertEqual(self.contenitore.update_inviati, 2)
+
+        # Nessun cambiamento: stessa lista, nessun update
+        controlli = self.contenitore.controls
+        self.riconciliatore.riconcilia(righe, intestazione=['titolo'], invia=True)
+        self.assertIs(self.contenitore.controls, controlli)
+        self.assertEqual(self.contenitore.update_inviati, 2)
+
+    def test_contesto_ricostruisce_e_vuoto(self):
+        righe = [{'id': 1, 'importo': 10}]
+        self.riconciliatore.riconcilia(righe, contesto='it')
+        prima = self.contenitore.controls[0]
+        esito = self.riconciliatore.riconcilia(righe, contesto='en')
+        self.assertEqual(esito['create'], 1)
+        self.assertIsNot(self.contenitore.controls[0], prima)
+        self.assertEqual(self.aggiornati, [])
+
+        self.riconciliatore.riconcilia([], contesto='en')
+        self.assertEqual(self.contenitore.controls, ['vuoto'])
+        self.assertEqual(len(self.riconciliatore), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
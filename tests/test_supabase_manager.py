@@ -66,5 +66,117 @@ class TestSupabaseManager(unittest.TestCase):
         # Should be released
         self.assertFalse(SupabaseManager._pool_queue.empty())
 
+    def test_iter_query_chunks(self):
+        from db.supabase_manager import iter_query_chunks
+
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.side_effect = [[{'id': 1}, {'id': 2}], [{'id': 3}], []]
+
+        chunks = list(iter_query_chunks(mock_conn, "SELECT * FROM T WHERE x = %s", (5,), chunk_size=2))
+
+        self.assertEqual(chunks, [[{'id': 1}, {'id': 2}], [{'id': 3}]])
+        first_sql, first_params = mock_cursor.execute.call_args_list[0][0]
+        self.assertIn("NO SCROLL CURSOR FOR SELECT * FROM T", first_sql)
+        self.assertEqual(first_params, (5,))
+        self.assertIn("FETCH FORWARD 2", mock_cursor.execute.call_args_list[1][0][0])
+        self.assertIn("CLOSE", mock_cursor.execute.call_args_list[-1][0][0])
+
+    @patch('pg8000.dbapi.connect')
+    def test_unita_di_lavoro_una_connessione(self, mock_connect):
+        from db.supabase_manager import get_db_connection, unita_di_lavoro
+
+        mock_conn = MagicMock()
+        mock_connect.return_value = mock_conn
+
+        attive = SupabaseManager.get_metrics()["active_now"]
+        with unita_di_lavoro():
+            with get_db_connection() as con:
+                con.cursor().execute("SELECT 1 FROM Conti")
+            with get_db_connection() as con:
+                con.cursor().execute("SELECT 2 FROM Conti")
+            self.assertEqual(SupabaseManager.get_metrics()["active_now"], attive + 1)
+            with get_db_connection(condivisa=False) as con:
+                self.assertEqual(SupabaseManager.get_metrics()["active_now"], attive + 2)
+
+        self.assertEqual(mock_connect.call_count, 2)
+        eseguite = [c[0][0] for c in mock_conn.cursor.return_value.execute.call_args_list]
+        self.assertIn("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ", eseguite)
+        self.assertEqual(SupabaseManager.get_metrics()["active_now"], attive)
+
+    @patch('pg8000.dbapi.connect')
+    def test_unita_di_lavoro_scritture_annidate(self, mock_connect):
+        from db.supabase_manager import get_db_connection, unita_di_lavoro
+
+        mock_conn = MagicMock()
+        mock_connect.return_value = mock_conn
+
+        with unita_di_lavoro():
+            with get_db_connection() as con:
+                con.cursor().execute("SELECT 1")
+            mock_conn.commit.reset_mock()
+            with get_db_connection() as con:
+                con.cursor().execute("UPDATE Conti SET nome = %s", ("x",))
+            # All'uscita il blocco rilascia il suo savepoint: il commit spetta all'unità
+            eseguite = [c[0][0] for c in mock_conn.cursor.return_value.execute.call_args_list]
+            self.assertIn("RELEASE SAVEPOINT ba_blocco_1", eseguite)
+            self.assertFalse(mock_conn.commit.called)
+            with self.assertRaises(ValueError):
+                with get_db_connection() as con:
+                    raise ValueError("errore")
+            # L'eccezione annulla solo il blocco, tornando al suo savepoint
+            eseguite = [c[0][0] for c in mock_conn.cursor.return_value.execute.call_args_list]
+            self.assertIn("ROLLBACK TO SAVEPOINT ba_blocco_1", eseguite)
+            self.assertFalse(mock_conn.rollback.called)
+        self.assertTrue(mock_conn.commit.called)
+
+    @patch('pg8000.dbapi.connect')
+    def test_unita_di_lavoro_commit_annidato_poi_errore(self, mock_connect):
+        from db.supabase_manager import get_db_connection, unita_di_lavoro
+
+        mock_conn = MagicMock()
+        mock_connect.return_value = mock_conn
+        eseguite = mock_conn.cursor.return_value.execute
+
+        with self.assertRaises(ValueError):
+            with unita_di_lavoro():
+                with get_db_connection() as con:
+                    con.cursor().execute("SELECT 1 FROM Conti")
+                inizio = len(mock_conn.mock_calls)
+                with get_db_connection() as con:
+                    con.cursor().execute("INSERT INTO Conti (nome_conto) VALUES (%s)", ("x",))
+                    con.commit()
+                self.assertNotIn(unittest.mock.call.commit(), mock_conn.mock_calls[inizio:])
+                raise ValueError("errore dopo la scrittura annidata")
+        # Il commit del blocco interno era solo un RELEASE: l'errore esterno annulla tutto
+        sql = [c[0][0] for c in eseguite.call_args_list]
+        self.assertIn("RELEASE SAVEPOINT ba_blocco_1", sql)
+        # (l'unico commit successivo è quello del rilascio nel pool, a transazione annullata)
+        chiamate = mock_conn.mock_calls[inizio:]
+        self.assertLess(chiamate.index(unittest.mock.call.rollback()), chiamate.index(unittest.mock.call.commit()))
+
+    @patch('pg8000.dbapi.connect')
+    def test_unita_di_lavoro_errore_intercettato(self, mock_connect):
+        from db.supabase_manager import get_db_connection, unita_di_lavoro
+
+        mock_conn = MagicMock()
+        mock_connect.return_value = mock_conn
+        eseguite = mock_conn.cursor.return_value.execute
+
+        with unita_di_lavoro():
+            with get_db_connection() as esterna:
+                with get_db_connection() as con:
+                    # Il blocco intercetta l'errore SQL: la transazione resta abortita
+                    mock_conn._transaction_status = b"E"
+                mock_conn._transaction_status = b"T"
+                self.assertEqual(eseguite.call_args_list[-1][0][0], "ROLLBACK TO SAVEPOINT ba_blocco_2")
+                esterna.cursor().execute("SELECT 1 FROM Conti")
+        sql = [c[0][0] for c in eseguite.call_args_list]
+        self.assertEqual(sql.count("SAVEPOINT ba_blocco_1"), 1)
+        self.assertEqual(sql.count("SAVEPOINT ba_blocco_2"), 1)
+        self.assertNotIn("ROLLBACK TO SAVEPOINT ba_blocco_1", sql)
+        self.assertFalse(mock_conn.rollback.called)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,13 +1,20 @@
 import threading
 import time
 
+from db.supabase_manager import unita_di_lavoro, contesto_per_thread
+
 class AsyncTask:
     """
     Helper per eseguire task bloccanti in un thread separato 
     e aggiornare la UI al termine.
     """
-    def __init__(self, target, args=(), kwargs=None, callback=None, error_callback=None):
+    def __init__(self, target, args=(), kwargs=None, callback=None, error_callback=None, connessione_unica=False):
+        """
+        connessione_unica: esegue il target in un'unità di lavoro (una sola
+        connessione e un solo snapshot per tutte le query del caricamento).
+        """
         self.target = target
+        self.connessione_unica = connessione_unica
         self.args = args
         self.kwargs = kwargs or {}
         self.callback = callback
@@ -16,14 +23,19 @@ class AsyncTask:
         self.error = None
 
     def start(self):
-        """Avvia il task in un thread separato."""
-        thread = threading.Thread(target=self._run)
+        """Avvia il task in un thread separato, nel contesto del chiamante (es. richiesta_query)."""
+        contesto = contesto_per_thread()
+        thread = threading.Thread(target=contesto.run, args=(self._run,))
         thread.daemon = True # Il thread si chiude se il programma principale si chiude
         thread.start()
 
     def _run(self):
         try:
-            self.result = self.target(*self.args, **self.kwargs)
+            if self.connessione_unica:
+                with unita_di_lavoro():
+                    self.result = self.target(*self.args, **self.kwargs)
+            else:
+                self.result = self.target(*self.args, **self.kwargs)
             if self.callback:
                 self.callback(self.result)
         except Exception as e:
@@ -166,6 +166,19 @@ class CacheManager:
                 logger.info(f"Cache INVALIDATED: {cache_key}")
                 self._save_to_disk()
     
+    def invalidate_pattern(self, pattern: str) -> None:
+        """Invalida tutte le chiavi (memoria e disco) che contengono `pattern`."""
+        with self._lock:
+            keys_mem = [k for k in self._memory_cache.keys() if pattern in k]
+            for k in keys_mem: del self._memory_cache[k]
+            keys_disk = [k for k in self._disk_cache.keys() if pattern in k]
+            for k in keys_disk: del self._disk_cache[k]
+
+            if keys_mem or keys_disk:
+                logger.info(f"Cache INVALIDATED: {len(keys_mem)} mem, {len(keys_disk)} disk entries per pattern '{pattern}'")
+                if keys_disk:
+                    self._save_to_disk()
+
     def invalidate_all(self, id_famiglia: Optional[str] = None) -> None:
         """Invalida tutta la cache per una famiglia specifica."""
         with self._lock:
@@ -0,0 +1,348 @@
+"""
+Contesto di inserimento transazioni precompilato per sessione.
+
+Il TransactionDialog è l'azione più frequente dell'app: ad ogni apertura (e ad
+ogni cambio Spesa/Incasso/Giroconto) rileggeva la matrice FOP, l'ordinamento
+globale, i conti della famiglia, i conti tecnici delle carte, le categorie e il
+conto di default, ricalcolando filtri e ordinamenti. Qui tutto questo viene
+compilato una volta in un ContestoInserimento immutabile, con le liste di
+opzioni già filtrate e ordinate per ogni tipo di operazione.
+
+Ogni sessione ha un GestoreContestoInserimento: il contesto viene ricostruito in
+background quando conti, carte, salvadanai, categorie, conto di default o la
+configurazione FOP cambiano (invalida_contesti_inserimento), così il dialog si
+apre senza chiamate al database.
+"""
+import json
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.async_task import AsyncTask
+from utils.logger import setup_logger
+
+logger = setup_logger("ContestoInserimento")
+
+TIPI_OPERAZIONE = ("Spesa", "Incasso", "Giroconto")
+
+# Chiavi di configurazione che concorrono al contesto (set_configurazione invalida su queste)
+CHIAVI_CONFIG_CONTESTO = ("global_fop_matrix", "global_fop_sort_order")
+
+# Mappatura tipi matrice -> tipi DB
+TIPO_MAP = {
+    "Conto Corrente": ["Conto Corrente", "Conto", "Corrente"],
+    "Carte": ["Carta", "Carta di Credito", "Prepagata"],
+    "Risparmio": ["Risparmio", "Conto Deposito"],
+    "Investimenti": ["Investimenti", "Investimento", "Crypto", "Azioni", "Obbligazioni", "ETF", "Fondo"],
+    "Contanti": ["Contanti"],
+    "Fondo Pensione": ["Fondo Pensione"],
+    "Salvadanaio": ["Salvadanaio"],
+    "Satispay": ["Satispay"],
+    "PayPal": ["PayPal"]
+}
+_CATEGORIA_PER_TIPO = {
+    tipo.strip().lower(): categoria
+    for categoria, tipi_db in TIPO_MAP.items()
+    for tipo in tipi_db
+}
+
+# Mappatura tipo DB -> chiave di ordinamento globale (global_fop_sort_order)
+_ORDINAMENTO_PER_TIPO = {
+    "conto corrente": "conto_corrente", "conto": "conto_corrente", "corrente": "conto_corrente",
+    "risparmio": "conto_risparmio", "conto deposito": "conto_risparmio",
+    "contanti": "contanti",
+    "investimenti": "investimento", "investimento": "investimento",
+    "crypto": "investimento", "azioni": "investimento", "obbligazioni": "investimento",
+    "etf": "investimento", "fondo": "investimento",
+    "fondo pensione": "fondo_pensione",
+    "salvadanaio": "conto_risparmio",
+}
+
+
+def _sottotipo_portafoglio(account_data: Dict[str, Any]) -> str:
+    try:
+        config = json.loads(account_data.get('config_speciale') or '{}')
+        return config.get('sottotipo', '').strip().lower()
+    except Exception:
+        return ""
+
+
+def categoria_fop(account_data: Dict[str, Any]) -> Optional[str]:
+    """Categoria della matrice FOP a cui appartiene il conto (None se non mappato)."""
+    t_db = str(account_data.get('tipo') or "").strip().lower()
+    if t_db == "portafoglio elettronico":
+        sottotipo = _sottotipo_portafoglio(account_data)
+        if sottotipo == 'satispay': return "Satispay"
+        if sottotipo == 'paypal': return "PayPal"
+    return _CATEGORIA_PER_TIPO.get(t_db)
+
+
+def chiave_ordinamento_tipo(account_data: Dict[str, Any]) -> str:
+    """Chiave di global_fop_sort_order corrispondente al tipo del conto."""
+    t_db = str(account_data.get('tipo') or "").strip().lower()
+
+    # Portafoglio Elettronico -> Satispay/PayPal
+    if t_db == "portafoglio elettronico":
+        sottotipo = _sottotipo_portafoglio(account_data)
+        if sottotipo in ('satispay', 'paypal'):
+            return sottotipo
+        return "portafoglio_elettronico"
+
+    # Carte (credito/debito)
+    if t_db in ["carta", "carta di credito", "prepagata"]:
+        tipo_carta = str(account_data.get('tipo_carta') or "").strip().lower()
+        if tipo_carta == "credito" or t_db == "carta di credito": return "carta_credito"
+        if tipo_carta == "debito" or t_db == "prepagata": return "carta_debito"
+        return "carta_credito"  # default
+
+    return _ORDINAMENTO_PER_TIPO.get(t_db, "conto_corrente")
+
+
+def matrici_per_tipo(full_matrix: Dict[str, Any], tipo_op: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Ritorna (matrice sorgente, matrice destinazione) per il tipo di operazione, con i default interni."""
+    if tipo_op == "Giroconto":
+        matrix_source = full_matrix.get("Giroconto (Mittente)", {})
+        matrix_dest = full_matrix.get("Giroconto (Ricevente)", {})
+    else:
+        matrix_source = full_matrix.get(tipo_op, {})
+        matrix_dest = {}
+
+    # Se la matrice è vuota, usiamo dei default interni per sicurezza
+    if not matrix_source:
+        matrix_source = {
+            "Conto Corrente": {"Personale": True, "Condiviso": True, "Altri Familiari": (tipo_op == "Giroconto")},
+            "Carte": {"Personale": (tipo_op == "Spesa"), "Condiviso": (tipo_op == "Spesa"), "Altri Familiari": False},
+            "Salvadanaio": {"Personale": (tipo_op == "Giroconto"), "Condiviso": (tipo_op == "Giroconto"), "Altri Familiari": (tipo_op == "Giroconto")}
+        }
+    if tipo_op == "Giroconto" and not matrix_dest:
+        matrix_dest = matrix_source.copy()
+    return matrix_source, matrix_dest
+
+
+def is_allowed(cat_fop: Optional[str], scope: str, matrix_to_check: Dict[str, Any]) -> bool:
+    if not cat_fop:
+        return False
+    # Check FOP with fallback
+    scope_perms = matrix_to_check.get(cat_fop)
+    if scope_perms is not None:
+        return scope_perms.get(scope, False)
+    return scope != "Altri Familiari"
+
+
+def costruisci_opzioni(conti_famiglia: List[Dict[str, Any]], ids_conti_tecnici, id_utente,
+                       full_matrix: Dict[str, Any], global_sort_keys: List[str]) -> Dict[str, Tuple[list, list]]:
+    """
+    Calcola per ogni tipo di operazione le opzioni (sorgente, destinazione) già
+    filtrate con la matrice FOP e ordinate con global_fop_sort_order.
+    Ogni opzione è un dict: key, icona, nome, scope, data (il conto).
+    """
+    ids_conti_tecnici = set(ids_conti_tecnici or ())
+    # Prima occorrenza di ogni chiave, come list.index()
+    indice_ordinamento = {k: i for i, k in reversed(list(enumerate(global_sort_keys or [])))}
+
+    # Parte indipendente dal tipo di operazione: calcolata una sola volta per conto
+    candidati = []
+    for c in conti_famiglia:
+        if c['id_conto'] in ids_conti_tecnici or "Saldo" in (c.get('nome_conto') or ""):
+            continue
+
+        if c['is_condiviso']: scope = "Condiviso"
+        elif str(c['id_utente_owner']) == str(id_utente): scope = "Personale"
+        else: scope = "Altri Familiari"
+
+        icona = "🏦"
+        if c['tipo'] in TIPO_MAP["Carte"]: icona = "💳"
+        elif c['tipo'] == "Salvadanaio": icona = "🐷"
+        elif c['tipo'] == "Contanti": icona = "💵"
+        elif c['tipo'] == "Portafoglio Elettronico": icona = "📱"
+
+        key = f"{'C' if c['is_condiviso'] else 'P'}{c['id_conto']}"
+        if c['tipo'] in TIPO_MAP["Carte"] or c['tipo'] == "Salvadanaio":
+            key = c['id_conto']
+
+        opzione = {'key': key, 'icona': icona, 'nome': c['nome_conto'], 'scope': scope, 'data': c}
+        candidati.append((opzione, categoria_fop(c), indice_ordinamento.get(chiave_ordinamento_tipo(c), 999)))
+
+    opzioni = {}
+    for tipo_op in TIPI_OPERAZIONE:
+        matrix_source, matrix_dest = matrici_per_tipo(full_matrix, tipo_op)
+        sorgente = [(o, idx) for o, cat, idx in candidati if is_allowed(cat, o['scope'], matrix_source)]
+        destinazione = []
+        if tipo_op == "Giroconto":
+            destinazione = [(o, idx) for o, cat, idx in candidati if is_allowed(cat, o['scope'], matrix_dest)]
+        if indice_ordinamento:
+            # sort stabile: a parità di tipo resta l'ordine del catalogo
+            sorgente.sort(key=lambda x: x[1])
+            destinazione.sort(key=lambda x: x[1])
+        opzioni[tipo_op] = ([o for o, _ in sorgente], [o for o, _ in destinazione])
+    return opzioni
+
+
+def _json_o_default(raw, default):
+    if not raw:
+        return default
+    try:
+        return json.loads(raw)
+    except Exception:
+        logger.error(f"Errore parsing configurazione contesto inserimento: {raw[:50]!r}")
+        return default
+
+
+class ContestoInserimento:
+    """Snapshot immutabile dei dati necessari al TransactionDialog. Non modificarlo."""
+
+    def __init__(self, id_famiglia, id_utente, conti, fop_matrix, opzioni, categorie, conto_default):
+        self.id_famiglia = id_famiglia
+        self.id_utente = id_utente
+        self.conti = conti
+        self.fop_matrix = fop_matrix
+        self.opzioni = opzioni
+        self.categorie = categorie
+        self.conto_default = conto_default
+
+    def opzioni_per(self, tipo_op: Optional[str]) -> Tuple[list, list]:
+        """(sorgente, destinazione) per il tipo di operazione (default Spesa)."""
+        return self.opzioni.get(tipo_op or "Spesa", self.opzioni["Spesa"])
+
+
+def costruisci_contesto(id_famiglia, id_utente, master_key_b64=None) -> ContestoInserimento:
+    """Legge dal DB (tramite le cache esistenti) e compila il contesto di inserimento."""
+    from db.gestione_db import (
+        get_configurazione,
+        ottieni_tutti_i_conti_famiglia,
+        ottieni_ids_conti_tecnici_carte,
+        ottieni_categorie_e_sottocategorie,
+        ottieni_conto_default_utente,
+    )
+    fop_matrix = _json_o_default(get_configurazione("global_fop_matrix"), {})
+    global_sort_keys = _json_o_default(get_configurazione("global_fop_sort_order"), [])
+    conti = ottieni_tutti_i_conti_famiglia(id_famiglia, id_utente, master_key_b64=master_key_b64)
+    ids_conti_tecnici = ottieni_ids_conti_tecnici_carte(id_utente)
+
+    return ContestoInserimento(
+        id_famiglia=id_famiglia,
+        id_utente=id_utente,
+        conti=conti,
+        fop_matrix=fop_matrix,
+        opzioni=costruisci_opzioni(conti, ids_conti_tecnici, id_utente, fop_matrix, global_sort_keys),
+        categorie=ottieni_categorie_e_sottocategorie(id_famiglia),
+        conto_default=ottieni_conto_default_utente(id_utente),
+    )
+
+
+# Gestori vivi (uno per sessione), per propagare le invalidazioni dal layer DB
+_gestori = weakref.WeakSet()
+_gestori_lock = threading.Lock()
+
+
+class GestoreContestoInserimento:
+    """
+    Mantiene il ContestoInserimento di una sessione.
+    - prepara(): imposta la sessione e avvia la costruzione in background (login)
+    - ottieni(): contesto corrente; lo costruisce in modo sincrono solo se manca o è invalidato
+    - invalida(): segna il contesto come vecchio e lo ricostruisce in background
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessione = None  # (id_famiglia, id_utente, master_key_b64)
+        self._contesto = None
+        self._versione = 0
+        self._versione_contesto = -1
+        self._in_costruzione = False
+        with _gestori_lock:
+            _gestori.add(self)
+
+    def riguarda(self, id_famiglia=None, id_utente=None) -> bool:
+        sessione = self._sessione
+        if sessione is None:
+            return False
+        if id_famiglia is not None and str(sessione[0]) != str(id_famiglia):
+            return False
+        if id_utente is not None and str(sessione[1]) != str(id_utente):
+            return False
+        return True
+
+    def prepara(self, id_famiglia, id_utente, master_key_b64=None) -> None:
+        with self._lock:
+            self._imposta_sessione((id_famiglia, id_utente, master_key_b64))
+        self.ricostruisci_in_background()
+
+    def reset(self) -> None:
+        """Dimentica sessione e contesto (logout)."""
+        with self._lock:
+            self._sessione = None
+            self._contesto = None
+            self._versione += 1
+
+    def invalida(self) -> None:
+        with self._lock:
+            self._versione += 1
+        self.ricostruisci_in_background()
+
+    def ottieni(self, id_famiglia, id_utente, master_key_b64=None) -> Optional[ContestoInserimento]:
+        if not id_famiglia or str(id_famiglia).strip() == "":
+            return None
+        sessione = (id_famiglia, id_utente, master_key_b64)
+        with self._lock:
+            if sessione != self._sessione:
+                self._imposta_sessione(sessione)
+            elif self._contesto is not None and self._versione_contesto == self._versione:
+                return self._contesto
+            versione = self._versione
+
+        # Fallback sincrono: primo accesso prima della costruzione in background o contesto invalidato
+        logger.debug("Contesto inserimento non pronto: costruzione sincrona")
+        contesto = costruisci_contesto(*sessione)
+        self._pubblica(sessione, versione, contesto)
+        return contesto
+
+    def ricostruisci_in_background(self) -> None:
+        with self._lock:
+            if self._sessione is None or self._in_costruzione:
+                # Una costruzione in corso ricontrolla la versione al termine
+                return
+            self._in_costruzione = True
+        AsyncTask(target=self._ciclo_costruzione).start()
+
+    def _imposta_sessione(self, sessione) -> None:
+        self._sessione = sessione
+        self._contesto = None
+        self._versione += 1
+
+    def _pubblica(self, sessione, versione, contesto) -> None:
+        with self._lock:
+            if sessione == self._sessione and versione >= self._versione_contesto:
+                self._contesto = contesto
+                self._versione_contesto = versione
+
+    def _ciclo_costruzione(self) -> None:
+        try:
+            while True:
+                with self._lock:
+                    sessione, versione = self._sessione, self._versione
+                if sessione is None:
+                    return
+                try:
+                    self._pubblica(sessione, versione, costruisci_contesto(*sessione))
+                except Exception as e:
+                    logger.error(f"Errore costruzione contesto inserimento: {e}")
+                    return
+                with self._lock:
+                    if self._versione == versione:
+                        return
+        finally:
+            with self._lock:
+                self._in_costruzione = False
+
+
+def invalida_contesti_inserimento(id_famiglia=None, id_utente=None) -> None:
+    """
+    Invalida (e ricostruisce in background) i contesti delle sessioni interessate:
+    quelle della famiglia, quelle dell'utente o, senza argomenti, tutte.
+    """
+    with _gestori_lock:
+        gestori = list(_gestori)
+    for gestore in gestori:
+        if gestore.riguarda(id_famiglia, id_utente):
+            gestore.invalida()
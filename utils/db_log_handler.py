@@ -224,7 +224,7 @@ class DBLogHandler(logging.Handler):
                     
                     cur.execute("""
                         INSERT INTO Log_Sistema (livello, componente, messaggio, dettagli, id_utente, id_famiglia)
-                        VALUES (%s, %s, %s, %s, %s, %s)
+                        VALUES (%s, %s, %s, CAST(%s AS JSONB), %s, %s)
                     """, (level_name, self.componente, message, details, id_utente, id_famiglia))
                     
                     conn.commit()
@@ -9,7 +9,7 @@ import threading
 import traceback
 import json
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from db.supabase_manager import get_db_connection
 
 
@@ -49,7 +49,7 @@ class DBLogger:
                     cur.execute("""
                         INSERT INTO Log_Sistema 
                         (livello, componente, messaggio, dettagli, id_utente, id_famiglia)
-                        VALUES (%s, %s, %s, %s, %s, %s)
+                        VALUES (%s, %s, %s, CAST(%s AS JSONB), %s, %s)
                     """, (livello, self.componente, messaggio, dettagli_str, id_utente, id_famiglia))
                     
                     conn.commit()
@@ -156,10 +156,11 @@ def get_logs(
     a_data: Optional[datetime] = None,
     id_famiglia: Optional[int] = None,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    prima_di: Optional[Tuple[datetime, int]] = None
 ) -> List[Dict[str, Any]]:
     """
-    Recupera i log dal database con filtri opzionali.
+    Recupera i log dal database con filtri opzionali, dal più recente.
     
     Args:
         livello: Filtra per livello (DEBUG, INFO, WARNING, ERROR, CRITICAL)
@@ -168,7 +169,9 @@ def get_logs(
         a_data: Data fine range
         id_famiglia: Filtra per famiglia
         limit: Numero massimo di log da recuperare
-        offset: Offset per paginazione
+        offset: Offset per paginazione (legacy, ignorato se è indicato prima_di)
+        prima_di: Cursore keyset (timestamp, id_log) dell'ultimo log della pagina
+                  precedente; restituisce i log successivi senza scansionare quelli saltati.
     
     Returns:
         Lista di dizionari con i log
@@ -201,8 +204,15 @@ def get_logs(
                 query += " AND id_famiglia = %s"
                 params.append(id_famiglia)
             
-            query += " ORDER BY timestamp DESC LIMIT %s OFFSET %s"
-            params.extend([limit, offset])
+            if prima_di:
+                query += " AND (timestamp, id_log) < (%s, %s)"
+                params.extend(prima_di)
+            
+            query += " ORDER BY timestamp DESC, id_log DESC LIMIT %s"
+            params.append(limit)
+            if offset and not prima_di:
+                query += " OFFSET %s"
+                params.append(offset)
             
             cur.execute(query, params)
             rows = cur.fetchall()
@@ -211,8 +221,8 @@ def get_logs(
             logs = []
             for row in rows:
                 log_entry = dict(row)
-                # Parse dettagli JSON se presente
-                if log_entry.get("dettagli"):
+                # dettagli è JSONB (già decodificato dal driver); le righe pre-migrazione sono testo
+                if isinstance(log_entry.get("dettagli"), str):
                     try:
                         log_entry["dettagli"] = json.loads(log_entry["dettagli"])
                     except:
@@ -225,9 +235,15 @@ def get_logs(
         return []
 
 
+def cursore_log(log: Dict[str, Any]) -> Tuple[datetime, int]:
+    """Cursore keyset (timestamp, id_log) da passare come prima_di per la pagina successiva."""
+    return (log["timestamp"], log["id_log"])
+
+
 def get_log_stats() -> Dict[str, Any]:
     """
-    Recupera statistiche sui log.
+    Recupera statistiche sui log dal rollup orario Log_Sistema_Orario
+    (mantenuto da trigger su insert/delete), senza scansionare Log_Sistema.
     
     Returns:
         Dizionario con statistiche (count per livello, ultimo log, etc.)
@@ -238,24 +254,24 @@ def get_log_stats() -> Dict[str, Any]:
             
             # Count per livello
             cur.execute("""
-                SELECT livello, COUNT(*) as count 
-                FROM Log_Sistema 
+                SELECT livello, SUM(conteggio) as count 
+                FROM Log_Sistema_Orario 
                 GROUP BY livello
             """)
-            level_counts = {row["livello"]: row["count"] for row in cur.fetchall()}
+            level_counts = {row["livello"]: int(row["count"]) for row in cur.fetchall()}
             
             # Componenti attivi nelle ultime 24h
             cur.execute("""
                 SELECT DISTINCT componente 
-                FROM Log_Sistema 
-                WHERE timestamp > NOW() - INTERVAL '24 hours'
+                FROM Log_Sistema_Orario 
+                WHERE ora > date_trunc('hour', NOW() - INTERVAL '24 hours')
             """)
             active_components = [row["componente"] for row in cur.fetchall()]
             
-            # Ultimo log
+            # Ultimo log (index-only su idx_log_ts_id)
             cur.execute("""
                 SELECT timestamp FROM Log_Sistema 
-                ORDER BY timestamp DESC LIMIT 1
+                ORDER BY timestamp DESC, id_log DESC LIMIT 1
             """)
             last_log = cur.fetchone()
             
@@ -275,7 +291,7 @@ def get_distinct_components() -> List[str]:
     try:
         with get_db_connection() as conn:
             cur = conn.cursor()
-            cur.execute("SELECT DISTINCT componente FROM Log_Sistema ORDER BY componente")
+            cur.execute("SELECT DISTINCT componente FROM Log_Sistema_Orario ORDER BY componente")
             return [row["componente"] for row in cur.fetchall()]
     except Exception as e:
         print(f"[DB_LOGGER ERROR] Errore durante recupero componenti: {e}")
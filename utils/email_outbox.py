@@ -0,0 +1,187 @@
+"""
+Invio asincrono delle email tramite la coda Outbox_Email.
+
+accoda_email() scrive il messaggio in coda e sveglia il worker: il chiamante
+(login, job) non aspetta handshake TLS e login del server SMTP. Il
+worker è un thread daemon che preleva i messaggi pronti e li invia sul pool
+di utils.email_sender, con:
+- limite di invii al minuto (SMTP_MAX_PER_MINUTO, default 30), per restare
+  sotto le soglie dei provider;
+- ritentativi con backoff esponenziale (30s, 60s, 120s, ... fino a 1 ora)
+  per gli errori temporanei, fino a TENTATIVI_MASSIMI;
+- scarto immediato per gli errori definitivi (destinatario rifiutato,
+  risposte 5xx che non siano di autenticazione).
+
+Le email che devono dare un esito immediato all'utente (codici di verifica,
+credenziali, chiave famiglia) restano su send_email, che usa lo stesso pool;
+così anche il backup della famiglia, per non copiarne l'allegato nella coda.
+"""
+import os
+import smtplib
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from db.outbox_email import (
+    accoda_email as _inserisci_in_coda,
+    preleva_email,
+    segna_inviata,
+    segna_errore,
+)
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+TENTATIVI_MASSIMI = 6
+BACKOFF_BASE = 30.0
+BACKOFF_MASSIMO = 3600.0
+INTERVALLO_CONTROLLO = 30.0
+_MESSAGGI_PER_GIRO = 20
+
+
+def ritardo_tentativo(tentativi: int) -> float:
+    """Attesa prima del prossimo tentativo dopo `tentativi` invii falliti."""
+    return min(BACKOFF_BASE * (2 ** max(tentativi - 1, 0)), BACKOFF_MASSIMO)
+
+
+def errore_definitivo(errore: Exception) -> bool:
+    """True se ritentare non servirebbe (il messaggio va scartato)."""
+    if isinstance(errore, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)):
+        return True
+    if isinstance(errore, smtplib.SMTPAuthenticationError):
+        # Credenziali errate: l'admin può correggerle, il messaggio resta in coda
+        return False
+    if isinstance(errore, smtplib.SMTPResponseException):
+        return 500 <= errore.smtp_code < 600
+    return False
+
+
+def _invio_predefinito(messaggio: Dict[str, Any]) -> None:
+    from utils.email_sender import invia_email
+    invia_email(messaggio['destinatario'], messaggio['oggetto'], messaggio['corpo'],
+                attachment_bytes=messaggio.get('allegato'), attachment_name=messaggio.get('nome_allegato'))
+
+
+class WorkerOutbox:
+    """
+    Svuota la coda Outbox_Email. elabora_coda() fa un giro sincrono (usato
+    anche dai job e dai test); avvia() lo ripete in un thread daemon ogni
+    `intervallo` secondi o appena viene chiamato sveglia().
+    """
+
+    def __init__(self, invia: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 max_per_minuto: Optional[int] = None, intervallo: float = INTERVALLO_CONTROLLO):
+        self.invia = invia or _invio_predefinito
+        if max_per_minuto is None:
+            max_per_minuto = int(os.getenv("SMTP_MAX_PER_MINUTO", "30"))
+        self.intervallo_minimo = 60.0 / max_per_minuto if max_per_minuto > 0 else 0.0
+        self.intervallo = intervallo
+        self._ultimo_invio = None
+        self._sveglia = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _rispetta_limite(self) -> bool:
+        """Attende lo slot del prossimo invio; False se il worker viene fermato nel frattempo."""
+        if self._ultimo_invio is not None and self.intervallo_minimo:
+            attesa = self._ultimo_invio + self.intervallo_minimo - time.monotonic()
+            if attesa > 0 and self._stop.wait(attesa):
+                return False
+        self._ultimo_invio = time.monotonic()
+        return True
+
+    def _invia_uno(self, messaggio: Dict[str, Any]) -> bool:
+        try:
+            self.invia(messaggio)
+        except Exception as e:
+            tentativi = messaggio['tentativi']
+            if errore_definitivo(e) or tentativi >= TENTATIVI_MASSIMI:
+                logger.error(f"Email {messaggio['id_email']} a {messaggio['destinatario']} scartata "
+                             f"dopo {tentativi} tentativi: {e}")
+                segna_errore(messaggio['id_email'], str(e), None)
+            else:
+                ritardo = ritardo_tentativo(tentativi)
+                logger.warning(f"Invio email {messaggio['id_email']} fallito ({e}), nuovo tentativo tra {ritardo:.0f}s")
+                segna_errore(messaggio['id_email'], str(e), ritardo)
+            return False
+        segna_inviata(messaggio['id_email'])
+        return True
+
+    def elabora_coda(self) -> Tuple[int, int]:
+        """Invia i messaggi pronti; restituisce (inviati, falliti)."""
+        inviati = falliti = 0
+        with self._lock:
+            while not self._stop.is_set():
+                messaggi = preleva_email(_MESSAGGI_PER_GIRO)
+                if not messaggi:
+                    break
+                for messaggio in messaggi:
+                    if not self._rispetta_limite():
+                        # Fermato: i messaggi già prelevati tornano prelevabili alla scadenza
+                        return inviati, falliti
+                    if self._invia_uno(messaggio):
+                        inviati += 1
+                    else:
+                        falliti += 1
+                if len(messaggi) < _MESSAGGI_PER_GIRO:
+                    break
+        return inviati, falliti
+
+    def _ciclo(self):
+        while not self._stop.is_set():
+            try:
+                self.elabora_coda()
+            except Exception as e:
+                logger.error(f"Errore worker outbox email: {e}")
+            self._sveglia.wait(self.intervallo)
+            self._sveglia.clear()
+
+    def avvia(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._ciclo, name="OutboxEmail", daemon=True)
+        self._thread.start()
+
+    def sveglia(self):
+        self._sveglia.set()
+
+    def ferma(self, attesa: float = 5.0):
+        self._stop.set()
+        self._sveglia.set()
+        if self._thread is not None:
+            self._thread.join(attesa)
+            self._thread = None
+
+
+_worker: Optional[WorkerOutbox] = None
+_worker_lock = threading.Lock()
+
+
+def ottieni_worker() -> WorkerOutbox:
+    """Worker del processo, avviato alla prima richiesta."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = WorkerOutbox()
+        _worker.avvia()
+        return _worker
+
+
+def accoda_email(to_email, subject, body, attachment_bytes=None, attachment_name=None):
+    """
+    Mette in coda un'email (impostazioni SMTP globali) e sveglia il worker.
+    Stessa firma e stesso esito (successo, errore) di send_email, ma il
+    successo indica che il messaggio è in coda, non ancora consegnato.
+    Gli allegati oltre DIMENSIONE_MASSIMA_ALLEGATO sono rifiutati: la coda
+    li conserverebbe per intero (in base64, cifrati) fino alla consegna.
+    """
+    from utils.email_sender import DIMENSIONE_MASSIMA_ALLEGATO
+    if attachment_bytes and len(attachment_bytes) > DIMENSIONE_MASSIMA_ALLEGATO:
+        return False, "Allegato troppo grande per la coda email."
+    id_email = _inserisci_in_coda(to_email, subject, body, attachment_bytes, attachment_name)
+    if id_email is None:
+        return False, "Impossibile accodare l'email."
+    ottieni_worker().sveglia()
+    return True, None
@@ -1,5 +1,7 @@
 import smtplib
 import os
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import logging
@@ -8,82 +10,242 @@ from db.gestione_db import get_smtp_config
 # Configurazione logger
 logger = logging.getLogger(__name__)
 
-def send_email(to_email, subject, body, smtp_config=None, attachment_bytes=None, attachment_name=None):
+_VERO = ("1", "true", "yes", "on")
+
+# Oltre questa dimensione i provider rifiutano il messaggio (25 MB dopo la codifica base64)
+DIMENSIONE_MASSIMA_ALLEGATO = int(os.getenv("SMTP_MAX_ALLEGATO_MB", "18")) * 1024 * 1024
+
+
+def _risolvi_config(smtp_config=None):
     """
-    Invia un'email utilizzando le impostazioni SMTP con supporto opzionale per allegati.
-    
-    Args:
-        to_email (str): Indirizzo email del destinatario.
-        subject (str): Oggetto dell'email.
-        body (str): Corpo dell'email.
-        smtp_config (dict, optional): Dizionario con le impostazioni SMTP.
-        attachment_bytes (bytes, optional): Contenuto dell'allegato in byte.
-        attachment_name (str, optional): Nome del file allegato.
+    Impostazioni SMTP effettive: quelle passate, altrimenti la configurazione
+    globale, altrimenti le variabili d'ambiente. None se incomplete.
     """
     settings = None
     if smtp_config and smtp_config.get('server'):
-        smtp_server = smtp_config.get('server')
-        smtp_port = smtp_config.get('port')
-        smtp_user = smtp_config.get('user')
-        smtp_password = smtp_config.get('password')
+        sorgente = smtp_config
     else:
         settings = get_smtp_config()
-        if settings and settings.get('server'): 
-            smtp_server = settings.get('server')
-            smtp_port = settings.get('port')
-            smtp_user = settings.get('user')
-            smtp_password = settings.get('password')
+        if settings and settings.get('server'):
+            sorgente = settings
         else:
-            smtp_server = os.getenv("SMTP_SERVER")
-            smtp_port = os.getenv("SMTP_PORT")
-            smtp_user = os.getenv("SMTP_USER")
-            smtp_password = os.getenv("SMTP_PASSWORD")
+            sorgente = {
+                'server': os.getenv("SMTP_SERVER"),
+                'port': os.getenv("SMTP_PORT"),
+                'user': os.getenv("SMTP_USER"),
+                'password': os.getenv("SMTP_PASSWORD"),
+            }
 
-    if not all([smtp_server, smtp_port, smtp_user, smtp_password]):
-        logger.error(f"Configurazione SMTP incompleta: server={bool(smtp_server)}, port={bool(smtp_port)}, user={bool(smtp_user)}, pass={bool(smtp_password)}")
-        return False, "Configurazione SMTP incompleta."
+    cfg = {k: sorgente.get(k) for k in ('server', 'port', 'user', 'password')}
+    if not all(cfg.values()):
+        logger.error(f"Configurazione SMTP incompleta: server={bool(cfg['server'])}, port={bool(cfg['port'])}, user={bool(cfg['user'])}, pass={bool(cfg['password'])}")
+        return None
 
     # Email Mittente (Sender): Alcuni provider (come Brevo) richiedono un mittente verificato
     # che può essere diverso dall'utente SMTP.
-    from_email = smtp_config.get('sender') if smtp_config and smtp_config.get('sender') else \
-                (settings.get('sender') if (settings and settings.get('sender')) else smtp_user)
+    cfg['sender'] = smtp_config.get('sender') if smtp_config and smtp_config.get('sender') else \
+                    (settings.get('sender') if (settings and settings.get('sender')) else cfg['user'])
+    tls = smtp_config.get('tls') if smtp_config and smtp_config.get('tls') is not None else None
+    cfg['tls'] = tls if tls is not None else os.getenv("SMTP_STARTTLS", "1").lower() in _VERO
+    return cfg
+
+
+def costruisci_messaggio(from_email, to_email, subject, body, attachment_bytes=None, attachment_name=None):
+    """Messaggio MIME (corpo HTML, allegato opzionale) pronto per sendmail."""
+    from email.mime.application import MIMEApplication
+
+    msg = MIMEMultipart()
+    msg['Subject'] = subject
+    msg['From'] = from_email
+    msg['To'] = to_email
+
+    # Corpo email (HTML)
+    msg.attach(MIMEText(body, 'html'))
+
+    # Aggiunta allegato se presente
+    if attachment_bytes and attachment_name:
+        print(f"[DEBUG] [SMTP] Allegato presente: {attachment_name} ({len(attachment_bytes)} bytes)")
+        part = MIMEApplication(attachment_bytes)
+        part.add_header('Content-Disposition', 'attachment', filename=attachment_name)
+        msg.attach(part)
+    return msg.as_string()
+
+
+class _ConnessioneSMTP:
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.aperta_il = time.monotonic()
+        self.ultimo_uso = self.aperta_il
+        self.inviati = 0
+
+
+class PoolSMTP:
+    """
+    Connessioni SMTP riusate tra un invio e l'altro, per configurazione
+    (server, porta, utente): handshake TLS e login si pagano una volta sola.
+
+    Una connessione ferma da più di `verifica_dopo` secondi viene controllata
+    con NOOP prima del riuso; oltre `eta_massima` secondi o `messaggi_massimi`
+    invii viene chiusa e riaperta (i provider chiudono comunque le sessioni
+    lunghe). Se il server ha chiuso la connessione nel frattempo l'invio viene
+    ripetuto una volta su una connessione nuova.
+    """
+
+    def __init__(self, connessioni_per_server=2, verifica_dopo=30.0, eta_massima=300.0,
+                 messaggi_massimi=100, timeout=15):
+        self.connessioni_per_server = connessioni_per_server
+        self.verifica_dopo = verifica_dopo
+        self.eta_massima = eta_massima
+        self.messaggi_massimi = messaggi_massimi
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._libere = {}
+        self.metriche = {"aperte": 0, "riusate": 0, "inviati": 0}
+
+    @staticmethod
+    def _chiave(cfg):
+        return (cfg['server'], int(cfg['port']), cfg['user'], cfg['password'], bool(cfg.get('tls', True)))
+
+    def _apri(self, cfg):
+        print(f"[DEBUG] [SMTP] Nuova connessione: {cfg['server']}:{cfg['port']} (utente {cfg['user']})")
+        smtp = smtplib.SMTP(cfg['server'], int(cfg['port']), timeout=self.timeout)
+        try:
+            if cfg.get('tls', True):
+                smtp.starttls()
+            smtp.login(cfg['user'], cfg['password'])
+        except Exception:
+            self._chiudi(smtp)
+            raise
+        with self._lock:
+            self.metriche["aperte"] += 1
+        return _ConnessioneSMTP(smtp)
+
+    @staticmethod
+    def _chiudi(smtp):
+        try:
+            smtp.quit()
+        except Exception:
+            try:
+                smtp.close()
+            except Exception:
+                pass
 
-    print(f"[DEBUG] [SMTP] Protocollo: {smtp_server}:{smtp_port}")
-    print(f"[DEBUG] [SMTP] Auth User: {smtp_user}")
+    def _ancora_valida(self, conn, adesso):
+        if adesso - conn.aperta_il > self.eta_massima or conn.inviati >= self.messaggi_massimi:
+            return False
+        if adesso - conn.ultimo_uso > self.verifica_dopo:
+            try:
+                return conn.smtp.noop()[0] == 250
+            except Exception:
+                return False
+        return True
+
+    def _prendi(self, chiave, cfg):
+        while True:
+            with self._lock:
+                libere = self._libere.get(chiave)
+                conn = libere.pop() if libere else None
+            if conn is None:
+                return self._apri(cfg)
+            if self._ancora_valida(conn, time.monotonic()):
+                with self._lock:
+                    self.metriche["riusate"] += 1
+                return conn
+            self._chiudi(conn.smtp)
+
+    def _rilascia(self, chiave, conn):
+        conn.ultimo_uso = time.monotonic()
+        with self._lock:
+            libere = self._libere.setdefault(chiave, [])
+            if len(libere) < self.connessioni_per_server:
+                libere.append(conn)
+                return
+        self._chiudi(conn.smtp)
+
+    def invia(self, cfg, from_email, to_email, messaggio):
+        """Invia un messaggio già serializzato; solleva le eccezioni di smtplib."""
+        chiave = self._chiave(cfg)
+        conn = self._prendi(chiave, cfg)
+        try:
+            try:
+                conn.smtp.sendmail(from_email, to_email, messaggio)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # Il server ha chiuso la sessione mentre era nel pool: una nuova e si riprova
+                self._chiudi(conn.smtp)
+                conn = self._apri(cfg)
+                conn.smtp.sendmail(from_email, to_email, messaggio)
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+            # Il server ha risposto (rifiuto o errore del messaggio): salvo 421 la sessione resta utilizzabile
+            if getattr(e, 'smtp_code', None) == 421:
+                self._chiudi(conn.smtp)
+                raise
+            try:
+                conn.smtp.rset()
+                self._rilascia(chiave, conn)
+            except Exception:
+                self._chiudi(conn.smtp)
+            raise
+        except Exception:
+            self._chiudi(conn.smtp)
+            raise
+        conn.inviati += 1
+        with self._lock:
+            self.metriche["inviati"] += 1
+        self._rilascia(chiave, conn)
+
+    def chiudi_tutto(self):
+        with self._lock:
+            tutte = [c for libere in self._libere.values() for c in libere]
+            self._libere.clear()
+        for conn in tutte:
+            self._chiudi(conn.smtp)
+
+
+# Pool condiviso da send_email e dal worker dell'outbox
+pool_smtp = PoolSMTP()
+
+
+def invia_email(to_email, subject, body, smtp_config=None, attachment_bytes=None, attachment_name=None):
+    """
+    Come send_email ma solleva le eccezioni (ValueError per configurazione
+    incompleta, smtplib.SMTPException per gli errori del server): serve al
+    worker dell'outbox per distinguere gli errori definitivi da quelli temporanei.
+    """
+    cfg = _risolvi_config(smtp_config)
+    if cfg is None:
+        raise ValueError("Configurazione SMTP incompleta.")
+
+    from_email = cfg['sender']
+    print(f"[DEBUG] [SMTP] Protocollo: {cfg['server']}:{cfg['port']}")
     print(f"[DEBUG] [SMTP] From Header: {from_email}")
     print(f"[DEBUG] [SMTP] To: {to_email}")
 
+    messaggio = costruisci_messaggio(from_email, to_email, subject, body, attachment_bytes, attachment_name)
+    # USA from_email come mittente busta per massima compatibilità
+    pool_smtp.invia(cfg, from_email, to_email, messaggio)
+    logger.info(f"Email inviata con successo a {to_email}")
+
+
+def send_email(to_email, subject, body, smtp_config=None, attachment_bytes=None, attachment_name=None):
+    """
+    Invia un'email utilizzando le impostazioni SMTP con supporto opzionale per allegati.
+    L'invio è sincrono (per i flussi che mostrano subito l'esito) ma usa una
+    connessione del pool; per gli invii che non devono bloccare vedi
+    utils.email_outbox.accoda_email.
+
+    Args:
+        to_email (str): Indirizzo email del destinatario.
+        subject (str): Oggetto dell'email.
+        body (str): Corpo dell'email.
+        smtp_config (dict, optional): Dizionario con le impostazioni SMTP.
+        attachment_bytes (bytes, optional): Contenuto dell'allegato in byte.
+        attachment_name (str, optional): Nome del file allegato.
+    """
     try:
-        from email.mime.application import MIMEApplication
-        
-        msg = MIMEMultipart()
-        msg['Subject'] = subject
-        msg['From'] = from_email
-        msg['To'] = to_email
-
-        # Corpo email (HTML)
-        msg.attach(MIMEText(body, 'html'))
-
-        # Aggiunta allegato se presente
-        if attachment_bytes and attachment_name:
-            print(f"[DEBUG] [SMTP] Allegato presente: {attachment_name} ({len(attachment_bytes)} bytes)")
-            part = MIMEApplication(attachment_bytes)
-            part.add_header('Content-Disposition', 'attachment', filename=attachment_name)
-            msg.attach(part)
-
-        # Connessione al server SMTP
-        server = smtplib.SMTP(smtp_server, int(smtp_port), timeout=15)
-        # server.set_debuglevel(1) # Forza log smtplib su console (diretto a stderr)
-        server.starttls()
-        server.login(smtp_user, smtp_password)
-        
-        # USA from_email come mittente busta per massima compatibilità
-        server.sendmail(from_email, to_email, msg.as_string())
-        server.quit()
-
-        logger.info(f"Email inviata con successo a {to_email}")
+        invia_email(to_email, subject, body, smtp_config, attachment_bytes, attachment_name)
         return True, None
-
+    except ValueError as e:
+        return False, str(e)
     except Exception as e:
         import traceback
         traceback.print_exc()
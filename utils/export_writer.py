@@ -0,0 +1,187 @@
+"""
+Export Writer per Budget Amico
+Scrittura in streaming di report multi-foglio (xlsx write-only o CSV in zip).
+
+Le righe vengono consumate da iterabili (tipicamente generatori che leggono il DB
+a blocchi) e scritte una alla volta: la memoria occupata non dipende dal numero
+di righe esportate.
+"""
+import csv
+import io
+import pickle
+import tempfile
+import threading
+import zipfile
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.logger import setup_logger
+
+logger = setup_logger("ExportWriter")
+
+# Oltre questa soglia il file temporaneo passa dalla RAM al disco
+_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+_PROGRESS_EVERY = 500
+
+
+class ExportAnnullato(Exception):
+    """Sollevata quando l'export viene annullato dall'utente."""
+
+
+class StreamingExportWriter:
+    """
+    Scrive fogli da iterabili di dizionari in un file temporaneo.
+
+    Args:
+        formato: 'xlsx' (openpyxl write-only, memoria costante) oppure 'csv'
+                 (archivio zip con un CSV per foglio).
+        on_progress: callback(nome_foglio, righe_scritte) chiamata ogni
+                     _PROGRESS_EVERY righe e a fine foglio.
+        cancel_event: threading.Event; se impostato l'export si interrompe
+                      sollevando ExportAnnullato.
+    """
+
+    def __init__(self, formato: str = 'xlsx',
+                 on_progress: Optional[Callable[[str, int], None]] = None,
+                 cancel_event: Optional[threading.Event] = None):
+        if formato not in ('xlsx', 'csv'):
+            raise ValueError(f"Formato export non supportato: {formato}")
+        self.formato = formato
+        self.on_progress = on_progress
+        self.cancel_event = cancel_event or threading.Event()
+        self.righe_per_foglio: Dict[str, int] = {}
+
+        self._file = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES, mode='w+b')
+        if formato == 'xlsx':
+            from openpyxl import Workbook
+            self._workbook = Workbook(write_only=True)
+            self._zip = None
+        else:
+            self._workbook = None
+            self._zip = zipfile.ZipFile(self._file, mode='w', compression=zipfile.ZIP_DEFLATED)
+
+    def _check_cancel(self):
+        if self.cancel_event.is_set():
+            raise ExportAnnullato("Esportazione annullata.")
+
+    def _notify(self, nome_foglio: str, righe: int):
+        if self.on_progress:
+            try:
+                self.on_progress(nome_foglio, righe)
+            except Exception as e:
+                logger.warning(f"Errore callback progresso export: {e}")
+
+    @staticmethod
+    def _cella(valore: Any) -> Any:
+        """Converte i tipi non supportati da openpyxl/csv (es. Decimal resta numerico)."""
+        if isinstance(valore, (bytes, bytearray, memoryview)):
+            return bytes(valore).hex()
+        if isinstance(valore, (dict, list, tuple, set)):
+            return str(valore)
+        return valore
+
+    def scrivi_foglio(self, nome_foglio: str, righe: Iterable[Dict[str, Any]],
+                      colonne: Optional[List[str]] = None) -> int:
+        """
+        Scrive un foglio consumando l'iterabile di righe.
+        Se le colonne non sono specificate si usa l'unione delle chiavi di tutte
+        le righe (in ordine di prima comparsa, come faceva pandas): le righe
+        passano prima da un file temporaneo, per conoscere l'intestazione
+        senza tenerle in memoria.
+        Un foglio senza righe non viene creato.
+
+        Returns:
+            Numero di righe scritte.
+        """
+        self._check_cancel()
+        nome_foglio = nome_foglio[:31]  # Limite Excel sui nomi dei fogli
+        if colonne is not None:
+            return self._scrivi_righe(nome_foglio, righe, list(colonne))
+
+        with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES, mode='w+b') as appoggio:
+            unione: Dict[str, None] = {}
+            totale = 0
+            for riga in righe:
+                if totale % _PROGRESS_EVERY == 0:
+                    self._check_cancel()
+                riga = dict(riga)
+                unione.update(dict.fromkeys(riga))
+                pickle.dump(riga, appoggio, protocol=pickle.HIGHEST_PROTOCOL)
+                totale += 1
+            appoggio.seek(0)
+            return self._scrivi_righe(nome_foglio, (pickle.load(appoggio) for _ in range(totale)), list(unione))
+
+    def _scrivi_righe(self, nome_foglio: str, righe: Iterable[Dict[str, Any]], colonne: List[str]) -> int:
+        count = 0
+        foglio = None
+        csv_stream = None
+        csv_writer = None
+
+        try:
+            for riga in righe:
+                if count % _PROGRESS_EVERY == 0:
+                    self._check_cancel()
+                if foglio is None and csv_writer is None:
+                    if self._workbook is not None:
+                        foglio = self._workbook.create_sheet(title=nome_foglio)
+                        foglio.append(colonne)
+                    else:
+                        csv_stream = io.TextIOWrapper(
+                            self._zip.open(f"{nome_foglio}.csv", mode='w'),
+                            encoding='utf-8-sig', newline=''
+                        )
+                        csv_writer = csv.writer(csv_stream, delimiter=';')
+                        csv_writer.writerow(colonne)
+
+                valori = [self._cella(riga.get(c)) for c in colonne]
+                if foglio is not None:
+                    foglio.append(valori)
+                else:
+                    csv_writer.writerow(valori)
+                count += 1
+                if count % _PROGRESS_EVERY == 0:
+                    self._notify(nome_foglio, count)
+        finally:
+            if csv_stream is not None:
+                csv_stream.close()
+
+        if count:
+            self.righe_per_foglio[nome_foglio] = count
+            self._notify(nome_foglio, count)
+        return count
+
+    def chiudi(self) -> Tuple[Any, int]:
+        """
+        Finalizza il file e lo riposiziona all'inizio.
+
+        Returns:
+            (file_temporaneo, totale_righe). Il chiamante è responsabile della chiusura.
+        """
+        if self._workbook is not None:
+            self._workbook.save(self._file)
+        else:
+            self._zip.close()
+        self._file.seek(0)
+        return self._file, sum(self.righe_per_foglio.values())
+
+    def scarta(self):
+        """Chiude e scarta il file temporaneo (es. dopo annullamento o errore)."""
+        if self._workbook is not None:
+            # I fogli write-only tengono aperto uno stream XML su un file
+            # temporaneo: vanno chiusi anche senza save(). openpyxl non ha API
+            # pubblica per rimuovere quel file senza scrivere lo zip: il writer
+            # interno (openpyxl 3.1.x, vedi requirements.txt) è usato solo se c'è
+            for foglio in self._workbook.worksheets:
+                try:
+                    if not foglio.closed:
+                        foglio.close()
+                    pulizia = getattr(getattr(foglio, "_writer", None), "cleanup", None)
+                    if pulizia is not None:
+                        pulizia()
+                except Exception as e:
+                    logger.debug(f"Chiusura foglio scartato: {e}")
+        try:
+            if self._zip is not None:
+                self._zip.close()
+        except Exception:
+            pass
+        self._file.close()
@@ -0,0 +1,173 @@
+"""
+Server SMTP finto per test e sviluppo locale.
+
+Accetta qualsiasi login (AUTH PLAIN/LOGIN), non fa STARTTLS e conserva i
+messaggi ricevuti in memoria in `messaggi`. Tiene il conto delle connessioni
+aperte, così i test possono verificare il riuso del pool.
+
+    with FakeSMTPServer() as server:
+        cfg = {'server': server.host, 'port': server.port, 'user': 'u',
+               'password': 'p', 'tls': False}
+        send_email("a@b.it", "Oggetto", "Corpo", smtp_config=cfg)
+        server.messaggi[0]['destinatari']  # ['a@b.it']
+
+Da riga di comando (python -m utils.fake_smtp [porta]) stampa i messaggi in
+arrivo: basta puntare SMTP_SERVER/SMTP_PORT su localhost e SMTP_STARTTLS=0.
+
+Con `rifiuta` (insieme di indirizzi) il server risponde 550 a RCPT TO per
+quei destinatari; con `guasti_temporanei` = n le prime n DATA ricevono 451.
+"""
+import socketserver
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class _GestoreSMTP(socketserver.StreamRequestHandler):
+    def _rispondi(self, riga: str):
+        self.wfile.write((riga + "\r\n").encode("utf-8"))
+
+    def _leggi(self) -> Optional[str]:
+        riga = self.rfile.readline()
+        if not riga:
+            return None
+        return riga.decode("utf-8", errors="replace").rstrip("\r\n")
+
+    def handle(self):
+        server: "FakeSMTPServer" = self.server.proprietario
+        server._connessione_aperta()
+        mittente, destinatari = None, []
+        self._rispondi("220 fake-smtp pronto")
+        while True:
+            riga = self._leggi()
+            if riga is None:
+                return
+            comando = riga[:4].upper()
+            if comando in ("EHLO", "HELO"):
+                if comando == "EHLO":
+                    self._rispondi("250-fake-smtp")
+                    self._rispondi("250 AUTH PLAIN LOGIN")
+                else:
+                    self._rispondi("250 fake-smtp")
+            elif comando == "AUTH":
+                parti = riga.split()
+                if len(parti) >= 2 and parti[1].upper() == "LOGIN":
+                    passi = 2 if len(parti) == 2 else 1
+                    for _ in range(passi):
+                        self._rispondi("334 ")
+                        if self._leggi() is None:
+                            return
+                elif len(parti) == 2:
+                    self._rispondi("334 ")
+                    if self._leggi() is None:
+                        return
+                self._rispondi("235 autenticato")
+            elif comando == "MAIL":
+                mittente = riga.split(":", 1)[1].strip().strip("<>").split(">")[0]
+                destinatari = []
+                self._rispondi("250 OK")
+            elif comando == "RCPT":
+                indirizzo = riga.split(":", 1)[1].strip().strip("<>").split(">")[0]
+                if indirizzo in server.rifiuta:
+                    self._rispondi("550 destinatario inesistente")
+                else:
+                    destinatari.append(indirizzo)
+                    self._rispondi("250 OK")
+            elif comando == "DATA":
+                self._rispondi("354 fine con <CRLF>.<CRLF>")
+                righe = []
+                while True:
+                    r = self._leggi()
+                    if r is None:
+                        return
+                    if r == ".":
+                        break
+                    righe.append(r[1:] if r.startswith("..") else r)
+                if server._guasto_temporaneo():
+                    self._rispondi("451 riprova più tardi")
+                else:
+                    server._ricevuto(mittente, destinatari, "\r\n".join(righe))
+                    self._rispondi("250 messaggio accettato")
+                mittente, destinatari = None, []
+            elif comando == "RSET":
+                mittente, destinatari = None, []
+                self._rispondi("250 OK")
+            elif comando == "NOOP":
+                self._rispondi("250 OK")
+            elif comando == "QUIT":
+                self._rispondi("221 ciao")
+                return
+            else:
+                self._rispondi("502 comando non supportato")
+
+
+class _ServerTCP(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeSMTPServer:
+    """Server SMTP in memoria su un thread; porta 0 = porta libera scelta dal sistema."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, rifiuta=(), guasti_temporanei: int = 0,
+                 stampa: bool = False):
+        self.rifiuta = set(rifiuta)
+        self.guasti_temporanei = guasti_temporanei
+        self.stampa = stampa
+        self.messaggi: List[Dict[str, Any]] = []
+        self.connessioni = 0
+        self._lock = threading.Lock()
+        self._server = _ServerTCP((host, port), _GestoreSMTP)
+        self._server.proprietario = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    def _connessione_aperta(self):
+        with self._lock:
+            self.connessioni += 1
+
+    def _guasto_temporaneo(self) -> bool:
+        with self._lock:
+            if self.guasti_temporanei > 0:
+                self.guasti_temporanei -= 1
+                return True
+            return False
+
+    def _ricevuto(self, mittente, destinatari, dati):
+        messaggio = {"mittente": mittente, "destinatari": list(destinatari), "dati": dati}
+        with self._lock:
+            self.messaggi.append(messaggio)
+        if self.stampa:
+            print(f"--- da {mittente} a {', '.join(destinatari)} ---\n{dati}\n")
+
+    def config(self, **extra) -> Dict[str, Any]:
+        """smtp_config per send_email che punta a questo server."""
+        cfg = {'server': self.host, 'port': self.port, 'user': 'test', 'password': 'test', 'tls': False}
+        cfg.update(extra)
+        return cfg
+
+    def avvia(self) -> "FakeSMTPServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="FakeSMTP", daemon=True)
+        self._thread.start()
+        return self
+
+    def ferma(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.avvia()
+
+    def __exit__(self, *exc):
+        self.ferma()
+        return False
+
+
+if __name__ == "__main__":
+    porta = int(sys.argv[1]) if len(sys.argv) > 1 else 1025
+    server = FakeSMTPServer(port=porta, stampa=True)
+    print(f"Fake SMTP in ascolto su {server.host}:{server.port} (Ctrl+C per uscire)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.ferma()
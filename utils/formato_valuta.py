@@ -0,0 +1,93 @@
+"""
+Formattazione degli importi in valuta (separatori europei: 1.234,56).
+
+Il formato storico era "{:,.2f}" seguito da tre replace per scambiare punto e
+virgola, e poi il format del modello della valuta: cinque stringhe
+intermedie per importo. Qui, per ogni valuta, il modello è risolto una volta
+in prefisso e suffisso fissi, le migliaia sono raggruppate con "_" (due
+replace invece di tre, senza il passaggio per "X") e gli importi ripetuti
+(zeri, budget tondi, saldi che compaiono in più tabelle) escono da una
+piccola LRU senza allocare nulla. L'output è identico carattere per carattere.
+(str.translate farebbe lo scambio in un passaggio, ma su stringhe così corte
+costa dieci volte due replace.)
+"""
+import math
+from decimal import Decimal
+from functools import lru_cache
+from typing import Iterable, List
+
+# 1234.56 -> "1_234.56" -> "1.234,56"
+_SPEC = "_.2f"
+_SEGNAPOSTO = "\x00"
+
+DIMENSIONE_CACHE = 1024
+
+
+def _zero_negativo(importo) -> bool:
+    """-0.0 == 0 ma si formatta "-0,00": va distinto prima di usare la cache."""
+    if isinstance(importo, float):
+        return math.copysign(1.0, importo) < 0
+    if isinstance(importo, Decimal):
+        return importo.is_signed()
+    return False
+
+
+def _cifre_decimal(importo) -> str:
+    # Decimal non accetta "_" come separatore delle migliaia: formato storico
+    return format(importo, ",.2f").replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _crea_componi(simbolo: str, modello: str):
+    """Funzione importo -> stringa con prefisso e suffisso della valuta già risolti."""
+    parti = modello.format(amount=_SEGNAPOSTO, symbol=simbolo).split(_SEGNAPOSTO)
+    if len(parti) != 2:
+        # Modello senza (o con più di un) {amount}: si formatta come prima
+        def componi(importo):
+            if isinstance(importo, Decimal):
+                cifre = _cifre_decimal(importo)
+            else:
+                cifre = format(importo, _SPEC).replace(".", ",").replace("_", ".")
+            return modello.format(amount=cifre, symbol=simbolo)
+        return componi
+
+    prefisso, suffisso = parti
+
+    def componi(importo):
+        if isinstance(importo, Decimal):
+            return f"{prefisso}{_cifre_decimal(importo)}{suffisso}"
+        return f"{prefisso}{format(importo, _SPEC).replace('.', ',').replace('_', '.')}{suffisso}"
+    return componi
+
+
+class FormatoValuta:
+    """Formattatore di una valuta, con il modello già risolto in prefisso e suffisso."""
+
+    def __init__(self, simbolo: str, modello: str, dimensione_cache: int = DIMENSIONE_CACHE):
+        self.simbolo = simbolo
+        self.modello = modello
+        self._componi = _crea_componi(simbolo, modello)
+        self._zero = self._componi(0.0)
+        self._meno_zero = self._componi(-0.0)
+        # typed=True: 1 e True (o 1 e 1.0) restano voci distinte
+        self._in_cache = lru_cache(maxsize=dimensione_cache, typed=True)(self._componi)
+
+    def formatta(self, importo) -> str:
+        if importo == 0:
+            return self._meno_zero if _zero_negativo(importo) else self._zero
+        return self._in_cache(importo)
+
+    def format_many(self, importi: Iterable) -> List[str]:
+        """Formatta una sequenza di importi (righe di una tabella) in una lista."""
+        in_cache = self._in_cache
+        zero = self._zero
+        return [
+            in_cache(importo) if importo != 0
+            else (self._meno_zero if _zero_negativo(importo) else zero)
+            for importo in importi
+        ]
+
+    def info_cache(self):
+        return self._in_cache.cache_info()
+
+    def svuota_cache(self) -> None:
+        self._in_cache.cache_clear()
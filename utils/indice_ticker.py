@@ -0,0 +1,260 @@
+"""
+Indice locale dei simboli ticker per la ricerca con autocomplete.
+
+cerca_ticker interroga Yahoo Finance ad ogni ricerca. Qui i simboli già visti
+vengono indicizzati in un array ordinato di chiavi normalizzate (ticker e
+parole del nome), interrogato per prefisso con bisect: le ricerche locali
+rispondono in frazioni di millisecondo. La rete viene usata solo se l'indice
+non trova nulla, e le ultime ricerche remote restano in una LRU.
+
+L'indice condiviso (ottieni_indice_ticker) contiene solo risultati pubblici di
+Yahoo Finance ed è salvato su disco (ticker_index.json nella cartella dati
+dell'app). Gli asset posseduti da un utente sono dati cifrati per utente: vanno
+in un IndiceTicker(None) della sessione, solo in memoria, mai in quello condiviso.
+"""
+import json
+import os
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from utils.logger import setup_logger
+
+logger = setup_logger("IndiceTicker")
+
+APP_DATA_DIR = os.path.join(os.getenv('APPDATA', '.'), 'BudgetAmico')
+INDEX_FILE = os.path.join(APP_DATA_DIR, 'ticker_index.json')
+
+# v2: i file v1 potevano contenere asset posseduti dagli utenti e vengono ignorati
+_VERSIONE_FILE = 2
+MAX_QUERY_REMOTE = 200
+
+
+def normalizza(testo: Optional[str]) -> str:
+    """Minuscolo, senza accenti, solo lettere/cifre/punto separati da uno spazio."""
+    if not testo:
+        return ""
+    testo = unicodedata.normalize('NFKD', str(testo))
+    testo = "".join(ch for ch in testo if not unicodedata.combining(ch)).lower()
+    testo = "".join(ch if ch.isalnum() or ch == '.' else ' ' for ch in testo)
+    return " ".join(testo.split())
+
+
+class IndiceTicker:
+    """
+    Indice per prefisso dei simboli noti + LRU delle ricerche remote.
+    Thread-safe: le ricerche arrivano dal thread UI, gli aggiornamenti dai thread di background.
+    """
+
+    def __init__(self, percorso: Optional[str] = INDEX_FILE, max_query_remote: int = MAX_QUERY_REMOTE):
+        self._percorso = percorso
+        self._max_query_remote = max_query_remote
+        self._lock = threading.RLock()
+        self._simboli: Dict[str, Dict] = {}   # {TICKER: {ticker, nome, borsa, tipo}}
+        self._chiavi: List[tuple] = []        # [(chiave normalizzata, TICKER)] ordinato
+        self._query_remote: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._salvataggio_pendente = False
+        self._carica()
+
+    # --- Indice ---
+
+    @staticmethod
+    def _chiavi_simbolo(simbolo: Dict) -> set:
+        ticker = normalizza(simbolo['ticker'])
+        chiavi = {ticker}
+        # "eni.mi" è trovabile anche come "eni"
+        chiavi.update(p for p in ticker.split('.') if p)
+        chiavi.update(normalizza(simbolo.get('nome')).split())
+        return chiavi
+
+    def _aggiungi(self, simbolo: Dict) -> bool:
+        ticker = str(simbolo.get('ticker') or "").strip().upper()
+        if not ticker:
+            return False
+        nuovo = {
+            'ticker': ticker,
+            'nome': simbolo.get('nome') or ticker,
+            'borsa': simbolo.get('borsa') or "",
+            'tipo': simbolo.get('tipo') or "",
+        }
+        esistente = self._simboli.get(ticker)
+        if esistente is not None:
+            # Non perdere borsa/tipo noti se la nuova fonte (es. asset posseduto) non li ha
+            nuovo = {k: nuovo[k] or esistente[k] for k in nuovo}
+            if nuovo == esistente:
+                return False
+            for chiave in self._chiavi_simbolo(esistente):
+                i = bisect_left(self._chiavi, (chiave, ticker))
+                if i < len(self._chiavi) and self._chiavi[i] == (chiave, ticker):
+                    del self._chiavi[i]
+        self._simboli[ticker] = nuovo
+        for chiave in self._chiavi_simbolo(nuovo):
+            insort(self._chiavi, (chiave, ticker))
+        return True
+
+    def _per_prefisso(self, prefisso: str) -> set:
+        trovati = set()
+        i = bisect_left(self._chiavi, (prefisso,))
+        while i < len(self._chiavi) and self._chiavi[i][0].startswith(prefisso):
+            trovati.add(self._chiavi[i][1])
+            i += 1
+        return trovati
+
+    def aggiungi_simboli(self, simboli: Iterable[Dict]) -> int:
+        """Aggiunge/aggiorna simboli ({ticker, nome, borsa, tipo}). Ritorna quanti sono cambiati."""
+        with self._lock:
+            cambiati = sum(1 for s in simboli if self._aggiungi(s))
+        if cambiati:
+            self._salva_in_background()
+        return cambiati
+
+    def cerca_locale(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Ricerca per prefisso: ogni parola della query deve essere prefisso del
+        ticker o di una parola del nome. Supporta il filtro borsa ("Apple Milano").
+        """
+        from utils.yfinance_manager import separa_filtro_borsa, BORSE_MAP
+
+        query_pulita, filtro_borsa = separa_filtro_borsa(query.strip())
+        parole = normalizza(query_pulita).split()
+        if not parole:
+            return []
+        borsa_richiesta = BORSE_MAP.get(filtro_borsa, filtro_borsa) if filtro_borsa else None
+
+        with self._lock:
+            candidati = None
+            for parola in sorted(parole, key=len, reverse=True):
+                trovati = self._per_prefisso(parola)
+                candidati = trovati if candidati is None else candidati & trovati
+                if not candidati:
+                    return []
+            risultati = [self._simboli[t] for t in candidati]
+
+        if borsa_richiesta:
+            risultati = [r for r in risultati if r['borsa'] == borsa_richiesta]
+
+        # Prima il ticker esatto, poi i ticker che iniziano con la query, poi i nomi
+        q_ticker = query_pulita.strip().upper()
+        def rilevanza(r):
+            if r['ticker'] == q_ticker or r['ticker'].split('.')[0] == q_ticker:
+                return (0, r['ticker'])
+            if r['ticker'].startswith(q_ticker):
+                return (1, r['ticker'])
+            return (2, r['nome'].lower())
+        risultati.sort(key=rilevanza)
+        return [dict(r) for r in risultati[:limit]]
+
+    # --- LRU ricerche remote ---
+
+    @staticmethod
+    def _chiave_query(query: str, limit: int) -> str:
+        return f"{normalizza(query)}|{limit}"
+
+    def query_remota_in_cache(self, query: str, limit: int = 10) -> Optional[List[Dict]]:
+        chiave = self._chiave_query(query, limit)
+        with self._lock:
+            risultati = self._query_remote.get(chiave)
+            if risultati is None:
+                return None
+            self._query_remote.move_to_end(chiave)
+            return [dict(r) for r in risultati]
+
+    def registra_query_remota(self, query: str, limit: int, risultati: List[Dict]) -> None:
+        chiave = self._chiave_query(query, limit)
+        with self._lock:
+            self._query_remote[chiave] = [dict(r) for r in risultati]
+            self._query_remote.move_to_end(chiave)
+            while len(self._query_remote) > self._max_query_remote:
+                self._query_remote.popitem(last=False)
+            for r in risultati:
+                self._aggiungi(r)
+        self._salva_in_background()
+
+    def cerca(self, query: str, limit: int = 10, forza_remoto: bool = False) -> List[Dict]:
+        """
+        Ricerca completa: indice locale, poi LRU delle ricerche remote, poi rete
+        (solo se le prime due non trovano nulla o se forza_remoto).
+        """
+        if not query or len(query.strip()) < 2:
+            return []
+        if not forza_remoto:
+            risultati = self.cerca_locale(query, limit)
+            if risultati:
+                return risultati
+            in_cache = self.query_remota_in_cache(query, limit)
+            if in_cache is not None:
+                return in_cache
+
+        from utils.yfinance_manager import cerca_ticker
+        risultati = cerca_ticker(query, limit=limit)
+        if risultati:
+            # Le ricerche vuote (errori di rete compresi) non vengono memorizzate
+            self.registra_query_remota(query, limit, risultati)
+        return risultati
+
+    # --- Persistenza ---
+
+    def _carica(self) -> None:
+        if not self._percorso or not os.path.exists(self._percorso):
+            return
+        try:
+            with open(self._percorso, 'r', encoding='utf-8') as f:
+                dati = json.load(f)
+            if dati.get('versione') != _VERSIONE_FILE:
+                return
+            for simbolo in dati.get('simboli', []):
+                self._aggiungi(simbolo)
+            for chiave, risultati in dati.get('query_remote', [])[-self._max_query_remote:]:
+                self._query_remote[chiave] = risultati
+            logger.info(f"Indice ticker caricato: {len(self._simboli)} simboli, {len(self._query_remote)} ricerche")
+        except Exception as e:
+            logger.warning(f"Impossibile caricare l'indice ticker: {e}")
+
+    def salva(self) -> None:
+        """Scrive indice e LRU su disco (file temporaneo + rename atomico)."""
+        if not self._percorso:
+            return
+        with self._lock:
+            self._salvataggio_pendente = False
+            dati = {
+                'versione': _VERSIONE_FILE,
+                'simboli': sorted(self._simboli.values(), key=lambda s: s['ticker']),
+                'query_remote': [[k, v] for k, v in self._query_remote.items()],
+            }
+        try:
+            os.makedirs(os.path.dirname(self._percorso) or '.', exist_ok=True)
+            tmp = self._percorso + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(dati, f, ensure_ascii=False)
+            os.replace(tmp, self._percorso)
+        except Exception as e:
+            logger.warning(f"Impossibile salvare l'indice ticker: {e}")
+
+    def _salva_in_background(self) -> None:
+        # Più aggiornamenti ravvicinati producono un solo salvataggio
+        with self._lock:
+            if self._salvataggio_pendente or not self._percorso:
+                return
+            self._salvataggio_pendente = True
+        timer = threading.Timer(2.0, self.salva)
+        timer.daemon = True
+        timer.start()
+
+    def __len__(self) -> int:
+        return len(self._simboli)
+
+
+_indice = None
+_indice_lock = threading.Lock()
+
+
+def ottieni_indice_ticker() -> IndiceTicker:
+    """Istanza condivisa dell'indice (caricata da disco al primo utilizzo)."""
+    global _indice
+    if _indice is None:
+        with _indice_lock:
+            if _indice is None:
+                _indice = IndiceTicker()
+    return _indice
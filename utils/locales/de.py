@@ -0,0 +1,512 @@
+# Stringhe in tedesco: caricate e compilate da utils.localization al primo uso della lingua
+STRINGS = {
+    # Generali
+    "app_title": "Budget Amico",
+    "edit": "Bearbeiten",
+    "delete": "Löschen",
+    "save": "Speichern",
+    "cancel": "Abbrechen",
+    "close": "Schließen",
+    "add": "Hinzufügen",
+    "new_transaction": "Neue Transaktion",
+    "new_transfer": "Neue Überweisung",
+    "no_category": "Keine Kategorie",
+    "confirm_delete_title": "Löschen bestätigen",
+    "confirm_delete_content": "Möchten Sie dieses Element wirklich löschen? Diese Aktion ist unumkehrbar.",
+    "yes_delete": "Ja, löschen",
+    "fill_all_fields": "Bitte füllen Sie alle Pflichtfelder aus.",
+    "invalid_amount": "Ungültiger Betrag.",
+    "amount_not_zero": "Der Betrag darf nicht null sein.",
+    "description_required": "Beschreibung ist erforderlich.",
+    "error_dialog_title": "Fehler",
+    "select_an_account": "Wählen Sie ein Konto aus.",
+
+    # Schede Principali
+    "my_data": "Meine Daten",
+    "budget": "Budget",
+    "personal_accounts": "Persönliche Konten",
+    "shared_accounts": "Geteilte Konten",
+    "fixed_expenses": "Fixkosten",
+    "loans": "Kredite",
+    "properties": "Immobilien",
+    "family": "Familie",
+
+    # Azioni AppBar
+    "settings": "Einstellungen",
+    "admin_panel_title": "Admin-Panel",
+    "export_data": "Daten exportieren",
+    "logout": "Abmelden",
+    "info": "Informationen",
+
+    # Recupero Password
+    "forgot_password": "Passwort vergessen?",
+    "password_recovery_title": "Passwort-Wiederherstellung",
+    "password_recovery_desc": "Geben Sie Ihre E-Mail-Adresse ein, um ein temporäres Passwort zu erhalten.",
+    "send_reset_link": "Temporäres Passwort senden",
+    "back_to_login": "Zurück zum Login",
+    "email_is_required": "E-Mail ist erforderlich.",
+    "set_new_password_title": "Neues Passwort erstellen",
+    "new_password": "Neues Passwort",
+    "confirm_new_password": "Neues Passwort bestätigen",
+    "save_new_password": "Neues Passwort speichern",
+    "passwords_do_not_match": "Die Passwörter stimmen nicht überein oder sind leer.",
+    "password_updated_success": "Passwort erfolgreich aktualizzato! Sie können sich jetzt anmelden.",
+    "invalid_or_expired_token": "Ungültiger oder abgelaufener Token. Bitte fordern Sie einen neuen Reset an.",
+    "reset_link_sent_confirmation": "Wenn ein Konto mit dieser E-Mail-Adresse verknüpft ist, wurde ein temporäres Passwort gesendet.",
+    "no_account_question": "Haben Sie noch kein Konto?",
+    "register_now": "Jetzt registrieren",
+
+    # Pannello Admin
+    "categories_management": "Kategorienverwaltung",
+    "members_management": "Mitgliederverwaltung",
+    "admin_google_settings": "Google",
+    "add_category": "Kategorie hinzufügen",
+    "category_name": "Kategoriename",
+    "no_categories_found": "Keine Kategorien gefunden.",
+    "invite_member": "Mitglied einladen",
+    "username_or_email": "Benutzername oder E-Mail",
+    "role": "Rolle",
+    "username": "Benutzername",
+    "email": "E-Mail",
+    "invite": "Einladen",
+    "remove_from_family": "Aus der Familie entfernen",
+    "no_members_found": "Keine anderen Mitglieder in der Familie.",
+
+    # Dialogo Transazioni
+    "expense": "Ausgabe",
+    "income": "Einnahme",
+    "category_optional": "Kategorie (optional)",
+    "shared_suffix": "(Geteilt)",
+    "personal_suffix": "(Persönlich)",
+
+    # Dialogo Conti
+    "manage_account": "Konto verwalten",
+    "add_account": "Konto hinzufügen",
+    "edit_account": "Konto bearbeiten",
+    "account_name_placeholder": "Kontoname (z.B. Hauptkonto)",
+    "account_type": "Kontotyp",
+    "iban_optional": "IBAN (Optional)",
+    "initial_balance_optional": "Anfangssaldo (Optional)",
+    "set_initial_balance": "Anfangssaldo festlegen",
+    "add_initial_asset": "Anfangsvermögen hinzufügen",
+    "initial_assets": "Anfangsvermögen:",
+    "initial_assets_desc": "Geben Sie den aktuellen Wert und den gesamten bereits vorhandenen G/V ein (optional).",
+    "ticker": "Ticker",
+    "asset_name": "Anlagename",
+    "quantity": "Menge",
+    "current_unit_price": "Aktueller Stk.-Preis",
+    "past_gain_loss": "Früherer Gesamt-G/V",
+    "remove_asset": "Anlage entfernen",
+    "set_as_default_account": "Als Standardkonto für Ausgaben festlegen",
+    "iban_in_use_or_invalid": "IBAN wird bereits verwendet oder ist ungültig",
+
+    # Dialogo Conti Condivisi
+    "manage_shared_account_dialog": "Geteiltes Konto verwalten",
+    "create_shared_account": "Geteiltes Konto erstellen",
+    "edit_shared_account": "Geteiltes Konto bearbeiten",
+    "shared_account_name": "Name des geteilten Kontos",
+    "sharing_type": "Art der Freigabe",
+    "sharing_type_family": "Ganze Familie (verwaltet von Admin)",
+    "sharing_type_users": "Bestimmte Benutzer",
+    "select_participants": "Teilnehmer auswählen (nur für 'Bestimmte Benutzer'):",
+    "select_at_least_one_participant": "Wählen Sie mindestens einen Teilnehmer für 'Bestimmte Benutzer'-Konten aus.",
+
+    # Dialogo Giroconto
+    "new_transfer_dialog": "Neue Überweisung",
+    "from_account": "Von Konto (Quelle)",
+    "to_account": "Auf Konto (Ziel)",
+    "transfer_description_placeholder": "Beschreibung (z.B. Gemeinsame Ausgaben)",
+    "accounts_must_be_different": "Die Konten müssen unterschiedlich sein",
+    "select_source_account": "Wählen Sie ein Quellkonto",
+    "select_destination_account": "Wählen Sie ein Zielkonto",
+    "execute_transfer": "Überweisung ausführen",
+
+    # Dialogo Spese Fisse
+    "manage_fixed_expense": "Fixkosten verwalten",
+    "add_fixed_expense": "Fixkosten hinzufügen",
+    "edit_fixed_expense": "Fixkosten bearbeiten",
+    "expense_name_placeholder": "Ausgabenname (z.B. Netflix-Abo)",
+    "debit_account": "Belastungskonto",
+    "debit_day": "Tag des Monats für die Belastung",
+
+    # Dialogo Fondo Pensione
+    "manage_pension_fund_dialog": "Pensionsfondsverwaltung",
+    "manage_pension_fund_for": "Verwaltung: {0}",
+    "update_total_value": "Aktualisieren Sie den Gesamtwert des Fonds:",
+    "current_total_value": "Aktueller Gesamtwert",
+    "update_value": "Wert aktualisieren",
+    "perform_operation": "Eine Operation durchführen:",
+    "operation_amount": "Betrag der Operation",
+    "linked_account": "Konto für Einzahlung/Auszahlung",
+    "deposit_from_account": "Vom Konto einzahlen",
+    "deposit_from_external": "Von extern einzahlen",
+    "deposit_from_external_tooltip": "Z.B. vom Arbeitgeber",
+    "withdraw_to_account": "Auf Konto abheben",
+    "pension_fund_value_updated": "Pensionsfondswert aktualisiert!",
+    "error_updating_value": "Fehler beim Aktualisieren.",
+    "pension_fund_op_success": "Pensionsfondsoperation erfasst!",
+    "pension_fund_op_error": "Fehler beim Erfassen der Operation.",
+
+    # Dialogo Immobili
+    "manage_property_dialog": "Immobilienverwaltung",
+    "add_property": "Immobilie hinzufügen",
+    "edit_property": "Immobilie bearbeiten",
+    "property_name": "Immobilienname",
+    "address": "Adresse",
+    "city": "Stadt",
+    "bare_ownership": "Nacktes Eigentum",
+    "linked_mortgage": "Verbundene Hypothek",
+
+    # Dialogo Portafoglio
+    "manage_portfolio_dialog": "Portfolioverwaltung",
+    "total_portfolio_value": "Gesamter Portfoliowert",
+    "total_gain_loss": "Gesamtgewinn/-verlust",
+    "add_operation": "Operation hinzufügen",
+    "unit_price": "Stückpreis",
+    "buy": "Kaufen",
+    "sell": "Verkaufen",
+    "update_price": "Preis aktualisieren",
+    "new_price": "Neuer Preis",
+    "edit_asset_details": "Anlagedetails bearbeiten",
+
+    # Dialogo Prestiti
+    "manage_loan_dialog": "Kreditverwaltung",
+    "edit_loan": "Kredit bearbeiten",
+    "loan_name": "Kreditname",
+    "loan_type": "Typ",
+    "interest_amount": "Zinsbetrag",
+    "installment_due_day": "Fälligkeitstag der Rate",
+    "default_payment_account": "Standard-Zahlungskonto",
+    "default_payment_category": "Standard-Zahlungskategorie",
+    "pay_installment_dialog_title": "Rate zahlen",
+    "payment_amount": "Zahlungsbetrag",
+    "payment_date": "Zahlungsdatum",
+    "payment_account": "Zahlungskonto",
+    "payment_category": "Zahlungskategorie",
+    "execute_payment": "Zahlung ausführen",
+
+    # Scheda Conti Personali
+    "net_worth": "Nettovermögen",
+    "liquidity": "Liquidität",
+    "investments": "Anlagen",
+    "my_personal_accounts": "Meine Persönlichen Konten",
+    "add_personal_account": "Neues persönliches Konto hinzufügen",
+    "no_personal_accounts": "Sie haben noch keine persönlichen Konten hinzugefügt.",
+    "current_balance": "Aktueller Saldo",
+    "value": "Wert",
+    "manage_portfolio": "Portfolio Verwalten",
+    "manage_pension_fund": "Pensionsfonds Verwalten",
+
+    # Scheda Conti Condivisi
+    "no_shared_accounts": "Sie sind noch keinem geteilten Konto beigetreten.",
+    "shared_type_family": "Ganze Familie",
+    "shared_type_users": "Bestimmte Benutzer",
+
+    # Scheda Personale (I Miei Dati)
+    "welcome_back": "Willkommen zurück, {0}!",
+    "total_wealth": "Gesamtvermögen",
+    "liquidity_details": "({0} an Liquidität zum {1})",
+    "latest_transactions": "Letzte Transaktionen (Liquidität)",
+    "filter_by_month": "Nach Monat filtern",
+
+    # Scheda Famiglia
+    "wealth_by_member": "Vermögen pro Mitglied",
+    "total_family_wealth": "Gesamtvermögen der Familie",
+    "total_liquidity": "Gesamtliquidität",
+    "total_investments": "Gesamtanlagen",
+    "all_family_transactions": "Alle Familientransaktionen",
+    "user": "Benutzer",
+    "date": "Datum",
+    "description": "Beschreibung",
+    "account": "Konto",
+    "amount": "Betrag",
+    "no_transactions_found_family": "Keine Transaktionen für die Familie gefunden.",
+    "shared": "Geteilt",
+    "no_family_access_permission": "Sie haben keine Berechtigung, diesen Bereich anzuzeigen.",
+    "not_in_family": "Sie wurden noch keiner Familie hinzugefügt.",
+
+    # Scheda Budget
+    "budget_management": "Budgetverwaltung",
+    "budget_description": "Legen Sie monatliche Ausgabenlimits pro Kategorie fest und überwachen Sie sie.",
+    "set_budget": "Budget festlegen",
+    "no_budget_set": "Kein Budget festgelegt. Klicken Sie auf '+', um zu beginnen.",
+    "spent": "Ausgegeben",
+    "of": "von",
+    "remaining": "Verbleibend",
+    "set_monthly_budget": "Monatliches Budget festlegen",
+    "limit_amount": "Limitbetrag",
+    "budget_saved": "Budget erfolgreich gespeichert!",
+
+    # Scheda Spese Fisse
+    "fixed_expenses_management": "Verwaltung der Fixkosten",
+    "fixed_expenses_description": "Richten Sie hier Ihre wiederkehrenden Ausgaben ein (z. B. Miete, Abonnements). Sie werden jeden Monat automatisch abgebucht.",
+    "name": "Name",
+    "active": "Aktiv",
+    "actions": "Aktionen",
+    "no_fixed_expenses": "Keine Fixkosten konfiguriert.",
+
+    # Scheda Prestiti
+    "loans_management": "Kreditverwaltung",
+    "loans_description": "Verfolgen Sie Hypotheken, Finanzierungen und Kredite.",
+    "add_loan": "Kredit hinzufügen",
+    "pay_installment": "Rate zahlen",
+    "financed_amount": "Finanzierter Betrag",
+    "remaining_amount": "Restbetrag",
+    "monthly_installment": "Monatliche Rate",
+    "total_months": "Gesamtmonate",
+    "no_loans": "Keine Kredite eingegeben.",
+
+    # Scheda Immobili
+    "properties_management": "Immobilienverwaltung",
+    "properties_description": "Verwalten Sie den Wert und die zugehörigen Hypotheken Ihrer Immobilien.",
+    "add_property": "Immobilie hinzufügen",
+    "purchase_value": "Kaufwert",
+    "current_value": "Aktueller Wert",
+    "residual_mortgage": "Restschuld",
+    "no_properties": "Keine Immobilien eingegeben.",
+
+    # Scheda Impostazioni - Profilo Utente
+    "user_profile": "Benutzerprofil",
+    "user_profile_desc": "Bearbeiten Sie Ihre persönlichen Informationen und Ihr Passwort.",
+    "date_of_birth": "Geburtsdatum",
+    "tax_code": "Steuernummer",
+    "address": "Adresse",
+    "change_password": "Passwort ändern",
+    "save_profile": "Profil speichern",
+    "profile_saved_success": "Profil erfolgreich gespeichert!",
+
+    # Scheda Impostazioni
+    "google_settings": "Google-Einstellungen",
+    "google_settings_desc": "Verbinden Sie Ihr Google-Konto, um die Datenbank mit Google Drive zu synchronisieren.",
+    "status_connected": "Status: Verbunden",
+    "status_disconnected": "Status: Nicht verbunden",
+    "connect_google_account": "Google-Konto verbinden",
+    "disconnect_google_account": "Google-Konto trennen",
+    "sync_db_drive": "Datenbank synchronisieren",
+    "sync_db_drive_tooltip": "Lokale DB auf Google Drive hochladen (überschreibt)",
+    "language_and_currency": "Sprache und Währung",
+    "language_and_currency_desc": "Wählen Sie die Sprache und Währung für die Anwendung.",
+    "language": "Sprache",
+    "currency": "Währung",
+    "default_account": "Standardkonto",
+    "default_account_desc": "Wählen Sie ein Standardkonto für neue Transaktionen.",
+    "save_default_account": "Standardkonto speichern",
+    "backup_and_restore": "Sicherung und Wiederherstellung",
+    "backup_and_restore_desc": "Speichern Sie eine Sicherungskopie Ihrer Daten oder stellen Sie sie aus einer früheren Sicherung wieder her.",
+    "create_backup": "Datensicherung erstellen",
+    "restore_from_backup": "Aus Sicherung wiederherstellen",
+
+    #dati da sistemare e riorganizzare de
+    "subcategory": "Unterkategorie",
+    "category": "Kategorie",
+    "edit_role_for": "Rolle bearbeiten für",
+    "avg_purchase_price": "Durchschnittlicher Kaufpreis",
+    "avg_purchase_price_tooltip": "Gewichteter durchschnittlicher Kaufpreis der Vermögenswerte",
+    "past_gain_loss_tooltip": "Gesamter vergangener Gewinn/Verlust (vor Eingabe ins System)",
+    "manage_shared_account": "Gemeinsames Konto verwalten",
+    "debit_day_of_month": "Tag des Monats",
+    "select_existing_asset_optional": "Vorhandenen Vermögenswert auswählen (optional)",
+    "invalid_amount_or_quantity": "Ungültiger Betrag oder Menge",
+    "create_new_mortgage": "Neue Hypothek erstellen",
+    "default_payment_subcategory": "Standard-Zahlungsunterkategorie",
+    "start_date": "Startdatum",
+    "required_field": "Pflichtfeld",
+    "delete_account": "Konto löschen",
+    "select_source_account": "Wählen Sie ein Quellkonto",
+    "select_destination_account": "Wählen Sie ein Zielkonto",
+    "execute_transfer": "Überweisung ausführen",
+
+    # Dialogo Spese Fisse
+    "manage_fixed_expense": "Fixkosten verwalten",
+    "add_fixed_expense": "Fixkosten hinzufügen",
+    "edit_fixed_expense": "Fixkosten bearbeiten",
+    "expense_name_placeholder": "Ausgabenname (z.B. Netflix-Abo)",
+    "debit_account": "Belastungskonto",
+    "debit_day": "Tag des Monats für die Belastung",
+
+    # Dialogo Fondo Pensione
+    "manage_pension_fund_dialog": "Pensionsfondsverwaltung",
+    "manage_pension_fund_for": "Verwaltung: {0}",
+    "update_total_value": "Aktualisieren Sie den Gesamtwert des Fonds:",
+    "current_total_value": "Aktueller Gesamtwert",
+    "update_value": "Wert aktualisieren",
+    "perform_operation": "Eine Operation durchführen:",
+    "operation_amount": "Betrag der Operation",
+    "linked_account": "Konto für Einzahlung/Auszahlung",
+    "deposit_from_account": "Vom Konto einzahlen",
+    "deposit_from_external": "Von extern einzahlen",
+    "deposit_from_external_tooltip": "Z.B. vom Arbeitgeber",
+    "withdraw_to_account": "Auf Konto abheben",
+    "pension_fund_value_updated": "Pensionsfondswert aktualisiert!",
+    "error_updating_value": "Fehler beim Aktualisieren.",
+    "pension_fund_op_success": "Pensionsfondsoperation erfasst!",
+    "pension_fund_op_error": "Fehler beim Erfassen der Operation.",
+
+    # Dialogo Immobili
+    "manage_property_dialog": "Immobilienverwaltung",
+    "add_property": "Immobilie hinzufügen",
+    "edit_property": "Immobilie bearbeiten",
+    "property_name": "Immobilienname",
+    "address": "Adresse",
+    "city": "Stadt",
+    "bare_ownership": "Nacktes Eigentum",
+    "linked_mortgage": "Verbundene Hypothek",
+
+    # Dialogo Portafoglio
+    "manage_portfolio_dialog": "Portfolioverwaltung",
+    "total_portfolio_value": "Gesamter Portfoliowert",
+    "total_gain_loss": "Gesamtgewinn/-verlust",
+    "add_operation": "Operation hinzufügen",
+    "unit_price": "Stückpreis",
+    "buy": "Kaufen",
+    "sell": "Verkaufen",
+    "update_price": "Preis aktualisieren",
+    "new_price": "Neuer Preis",
+    "edit_asset_details": "Anlagedetails bearbeiten",
+
+    # Dialogo Prestiti
+    "manage_loan_dialog": "Kreditverwaltung",
+    "edit_loan": "Kredit bearbeiten",
+    "loan_name": "Kreditname",
+    "loan_type": "Typ",
+    "interest_amount": "Zinsbetrag",
+    "installment_due_day": "Fälligkeitstag der Rate",
+    "default_payment_account": "Standard-Zahlungskonto",
+    "default_payment_category": "Standard-Zahlungskategorie",
+    "pay_installment_dialog_title": "Rate zahlen",
+    "payment_amount": "Zahlungsbetrag",
+    "payment_date": "Zahlungsdatum",
+    "payment_account": "Zahlungskonto",
+    "payment_category": "Zahlungskategorie",
+    "execute_payment": "Zahlung ausführen",
+
+    # Scheda Conti Personali
+    "net_worth": "Nettovermögen",
+    "liquidity": "Liquidität",
+    "investments": "Anlagen",
+    "my_personal_accounts": "Meine Persönlichen Konten",
+    "add_personal_account": "Neues persönliches Konto hinzufügen",
+    "no_personal_accounts": "Sie haben noch keine persönlichen Konten hinzugefügt.",
+    "current_balance": "Aktueller Saldo",
+    "value": "Wert",
+    "manage_portfolio": "Portfolio Verwalten",
+    "manage_pension_fund": "Pensionsfonds Verwalten",
+
+    # Scheda Conti Condivisi
+    "no_shared_accounts": "Sie sind noch keinem geteilten Konto beigetreten.",
+    "shared_type_family": "Ganze Familie",
+    "shared_type_users": "Bestimmte Benutzer",
+
+    # Scheda Personale (I Miei Dati)
+    "welcome_back": "Willkommen zurück, {0}!",
+    "total_wealth": "Gesamtvermögen",
+    "liquidity_details": "({0} an Liquidität zum {1})",
+    "latest_transactions": "Letzte Transaktionen (Liquidität)",
+    "filter_by_month": "Nach Monat filtern",
+
+    # Scheda Famiglia
+    "wealth_by_member": "Vermögen pro Mitglied",
+    "total_family_wealth": "Gesamtvermögen der Familie",
+    "total_liquidity": "Gesamtliquidität",
+    "total_investments": "Gesamtanlagen",
+    "all_family_transactions": "Alle Familientransaktionen",
+    "user": "Benutzer",
+    "date": "Datum",
+    "description": "Beschreibung",
+    "account": "Konto",
+    "amount": "Betrag",
+    "no_transactions_found_family": "Keine Transaktionen für die Familie gefunden.",
+    "shared": "Geteilt",
+    "no_family_access_permission": "Sie haben keine Berechtigung, diesen Bereich anzuzeigen.",
+    "not_in_family": "Sie wurden noch keiner Familie hinzugefügt.",
+
+    # Scheda Budget
+    "budget_management": "Budgetverwaltung",
+    "budget_description": "Legen Sie monatliche Ausgabenlimits pro Kategorie fest und überwachen Sie sie.",
+    "set_budget": "Budget festlegen",
+    "no_budget_set": "Kein Budget festgelegt. Klicken Sie auf '+', um zu beginnen.",
+    "spent": "Ausgegeben",
+    "of": "von",
+    "remaining": "Verbleibend",
+    "set_monthly_budget": "Monatliches Budget festlegen",
+    "limit_amount": "Limitbetrag",
+    "budget_saved": "Budget erfolgreich gespeichert!",
+
+    # Scheda Spese Fisse
+    "fixed_expenses_management": "Verwaltung der Fixkosten",
+    "fixed_expenses_description": "Richten Sie hier Ihre wiederkehrenden Ausgaben ein (z. B. Miete, Abonnements). Sie werden jeden Monat automatisch abgebucht.",
+    "name": "Name",
+    "active": "Aktiv",
+    "actions": "Aktionen",
+    "no_fixed_expenses": "Keine Fixkosten konfiguriert.",
+
+    # Scheda Prestiti
+    "loans_management": "Kreditverwaltung",
+    "loans_description": "Verfolgen Sie Hypotheken, Finanzierungen und Kredite.",
+    "add_loan": "Kredit hinzufügen",
+    "pay_installment": "Rate zahlen",
+    "financed_amount": "Finanzierter Betrag",
+    "remaining_amount": "Restbetrag",
+    "monthly_installment": "Monatliche Rate",
+    "total_months": "Gesamtmonate",
+    "no_loans": "Keine Kredite eingegeben.",
+
+    # Scheda Immobili
+    "properties_management": "Immobilienverwaltung",
+    "properties_description": "Verwalten Sie den Wert und die zugehörigen Hypotheken Ihrer Immobilien.",
+    "add_property": "Immobilie hinzufügen",
+    "purchase_value": "Kaufwert",
+    "current_value": "Aktueller Wert",
+    "residual_mortgage": "Restschuld",
+    "no_properties": "Keine Immobilien eingegeben.",
+
+    # Scheda Impostazioni - Profilo Utente
+    "user_profile": "Benutzerprofil",
+    "user_profile_desc": "Bearbeiten Sie Ihre persönlichen Informationen und Ihr Passwort.",
+    "date_of_birth": "Geburtsdatum",
+    "tax_code": "Steuernummer",
+    "address": "Adresse",
+    "change_password": "Passwort ändern",
+    "save_profile": "Profil speichern",
+    "profile_saved_success": "Profil erfolgreich gespeichert!",
+
+    # Scheda Impostazioni
+    "google_settings": "Google-Einstellungen",
+    "google_settings_desc": "Verbinden Sie Ihr Google-Konto, um die Datenbank mit Google Drive zu synchronisieren.",
+    "status_connected": "Status: Verbunden",
+    "status_disconnected": "Status: Nicht verbunden",
+    "connect_google_account": "Google-Konto verbinden",
+    "disconnect_google_account": "Google-Konto trennen",
+    "sync_db_drive": "Datenbank synchronisieren",
+    "sync_db_drive_tooltip": "Lokale DB auf Google Drive hochladen (überschreibt)",
+    "language_and_currency": "Sprache und Währung",
+    "language_and_currency_desc": "Wählen Sie die Sprache und Währung für die Anwendung.",
+    "language": "Sprache",
+    "currency": "Währung",
+    "default_account": "Standardkonto",
+    "default_account_desc": "Wählen Sie ein Standardkonto für neue Transaktionen.",
+    "save_default_account": "Standardkonto speichern",
+    "backup_and_restore": "Sicherung und Wiederherstellung",
+    "backup_and_restore_desc": "Speichern Sie eine Sicherungskopie Ihrer Daten oder stellen Sie sie aus einer früheren Sicherung wieder her.",
+    "create_backup": "Datensicherung erstellen",
+    "restore_from_backup": "Aus Sicherung wiederherstellen",
+
+    #dati da sistemare e riorganizzare de
+    "subcategory": "Unterkategorie",
+    "category": "Kategorie",
+    "edit_role_for": "Rolle bearbeiten für",
+    "avg_purchase_price": "Durchschnittlicher Kaufpreis",
+    "avg_purchase_price_tooltip": "Gewichteter durchschnittlicher Kaufpreis der Vermögenswerte",
+    "past_gain_loss_tooltip": "Gesamter vergangener Gewinn/Verlust (vor Eingabe ins System)",
+    "manage_shared_account": "Gemeinsames Konto verwalten",
+    "debit_day_of_month": "Tag des Monats",
+    "select_existing_asset_optional": "Vorhandenen Vermögenswert auswählen (optional)",
+    "invalid_amount_or_quantity": "Ungültiger Betrag oder Menge",
+    "create_new_mortgage": "Neue Hypothek erstellen",
+    "default_payment_subcategory": "Standard-Zahlungsunterkategorie",
+    "start_date": "Startdatum",
+    "required_field": "Pflichtfeld",
+    "delete_account": "Konto löschen",
+    "auto_debit": "Automatische Abbuchung",
+    "auto_debit_desc": "Wählen Sie aus, ob die Abbuchung automatisch jeden Monat ausgeführt werden soll.",
+}
@@ -0,0 +1,351 @@
+# Stringhe in inglese: caricate e compilate da utils.localization al primo uso della lingua
+STRINGS = {
+    # Generali
+    "app_title": "Budget Amico",
+    "edit": "Edit",
+    "delete": "Delete",
+    "save": "Save",
+    "cancel": "Cancel",
+    "close": "Close",
+    "add": "Add",
+    "back": "Back",
+    "all_transactions": "All Transactions",
+    "new_transaction": "New Transaction",
+    "new_transfer": "New Transfer",
+    "no_category": "No Category",
+    "confirm_delete_title": "Confirm Deletion",
+    "confirm_delete_content": "Are you sure you want to delete this item? This action is irreversible.",
+    "yes_delete": "Yes, Delete",
+    "fill_all_fields": "Please fill all required fields.",
+    "invalid_amount": "Invalid amount.",
+    "amount_not_zero": "Amount cannot be zero.",
+    "description_required": "Description is required.",
+    "error_dialog_title": "Error",
+    "select_an_account": "Select an account.",
+
+    # Schede Principali
+    "my_data": "My Data",
+    "budget": "Budget",
+    "personal_accounts": "Personal Accounts",
+    "shared_accounts": "Shared Accounts",
+    "fixed_expenses": "Fixed Expenses",
+    "loans": "Loans",
+    "properties": "Properties",
+    "family": "Family",
+
+    # Azioni AppBar
+    "settings": "Settings",
+    "admin_panel_title": "Admin Panel",
+    "export_data": "Export Data",
+    "logout": "Logout",
+    "info": "Information",
+
+    # Recupero Password
+    "forgot_password": "Forgot password?",
+    "password_recovery_title": "Password Recovery",
+    "password_recovery_desc": "Enter your email to receive a temporary password.",
+    "send_reset_link": "Send Temporary Password",
+    "back_to_login": "Back to Login",
+    "email_is_required": "Email is required.",
+    "set_new_password_title": "Create a New Password",
+    "new_password": "New Password",
+    "confirm_new_password": "Confirm New Password",
+    "save_new_password": "Save New Password",
+    "passwords_do_not_match": "Passwords do not match or are empty.",
+    "password_updated_success": "Password updated successfully! You can now log in.",
+    "invalid_or_expired_token": "Invalid or expired token. Please request a new reset.",
+    "reset_link_sent_confirmation": "If an account is associated with this email, a temporary password has been sent.",
+    "no_account_question": "Don't have an account?",
+    "register_now": "Register now",
+
+    # Pannello Admin
+    "categories_management": "Categories Management",
+    "members_management": "Members Management",
+    "admin_google_settings": "Google",
+    "add_category": "Add Category",
+    "category_name": "Category Name",
+    "subcategory_name": "Subcategory Name",
+    "no_categories_found": "No categories found.",
+    "invite_member": "Invite Member",
+    "username_or_email": "Username or Email",
+    "role": "Role",
+    "username": "Username",
+    "email": "Email",
+    "invite": "Invite",
+    "remove_from_family": "Remove from family",
+    "no_members_found": "No other members in the family.",
+
+    # Dialogo Transazioni
+    "expense": "Expense",
+    "income": "Income",
+    "category_optional": "Category (optional)",
+    "shared_suffix": "(Shared)",
+    "personal_suffix": "(Personal)",
+
+    # Dialogo Conti
+    "manage_account": "Manage Account",
+    "add_account": "Add Account",
+    "edit_account": "Edit Account",
+    "account_name_placeholder": "Account Name (e.g., Main Account)",
+    "account_type": "Account Type",
+    "iban_optional": "IBAN (Optional)",
+    "initial_balance_optional": "Initial Balance (Optional)",
+    "set_initial_balance": "Set Initial Balance",
+    "add_initial_asset": "Add Initial Asset",
+    "initial_assets": "Initial Assets:",
+    "initial_assets_desc": "Enter the current value and the total pre-existing G/L (optional).",
+    "ticker": "Ticker",
+    "asset_name": "Asset Name",
+    "quantity": "Quantity",
+    "current_unit_price": "Current Unit Px.",
+    "past_gain_loss": "Past Total G/L",
+    "remove_asset": "Remove Asset",
+    "set_as_default_account": "Set as default account for expenses",
+    "iban_in_use_or_invalid": "IBAN already in use or invalid",
+
+    # Dialogo Conti Condivisi
+    "manage_shared_account_dialog": "Manage Shared Account",
+    "create_shared_account": "Create Shared Account",
+    "edit_shared_account": "Edit Shared Account",
+    "shared_account_name": "Shared Account Name",
+    "sharing_type": "Sharing Type",
+    "sharing_type_family": "Whole Family (managed by Admin)",
+    "sharing_type_users": "Specific Users",
+    "select_participants": "Select Participants (for 'Specific Users' only):",
+    "select_at_least_one_participant": "Select at least one participant for 'Specific Users' accounts.",
+
+    # Dialogo Giroconto
+    "new_transfer_dialog": "New Transfer",
+    "from_account": "From Account (Source)",
+    "to_account": "To Account (Destination)",
+    "transfer_description_placeholder": "Description (e.g., Common expenses)",
+    "accounts_must_be_different": "Accounts must be different",
+    "select_source_account": "Select a source account",
+    "select_destination_account": "Select a destination account",
+    "execute_transfer": "Execute Transfer",
+
+    # Dialogo Spese Fisse
+    "manage_fixed_expense": "Manage Fixed Expense",
+    "add_fixed_expense": "Add Fixed Expense",
+    "edit_fixed_expense": "Edit Fixed Expense",
+    "expense_name_placeholder": "Expense Name (e.g., Netflix Subscription)",
+    "debit_account": "Debit Account",
+    "debit_day": "Day of the Month for Debit",
+
+    # Dialogo Fondo Pensione
+    "manage_pension_fund_dialog": "Pension Fund Management",
+    "manage_pension_fund_for": "Management: {0}",
+    "update_total_value": "Update the total value of the fund:",
+    "current_total_value": "Current Total Value",
+    "update_value": "Update Value",
+    "perform_operation": "Perform an operation:",
+    "operation_amount": "Operation Amount",
+    "linked_account": "Account for Deposit/Withdrawal",
+    "deposit_from_account": "Deposit from Account",
+    "deposit_from_external": "Deposit from External",
+    "deposit_from_external_tooltip": "E.g., from employer",
+    "withdraw_to_account": "Withdraw to Account",
+    "pension_fund_value_updated": "Pension fund value updated!",
+    "error_updating_value": "Error during update.",
+    "pension_fund_op_success": "Pension fund operation recorded!",
+    "pension_fund_op_error": "Error recording the operation.",
+
+    # Dialogo Immobili
+    "manage_property_dialog": "Property Management",
+    "add_property": "Add Property",
+    "edit_property": "Edit Property",
+    "property_name": "Property Name",
+    "address": "Address",
+    "city": "City",
+    "bare_ownership": "Bare Ownership",
+    "linked_mortgage": "Linked Mortgage",
+
+    # Dialogo Portafoglio
+    "manage_portfolio_dialog": "Portfolio Management",
+    "total_portfolio_value": "Total Portfolio Value",
+    "total_gain_loss": "Total Gain/Loss",
+    "add_operation": "Add Operation",
+    "unit_price": "Unit Price",
+    "buy": "Buy",
+    "sell": "Sell",
+    "update_price": "Update Price",
+    "new_price": "New Price",
+    "edit_asset_details": "Edit Asset Details",
+
+    # Dialogo Prestiti
+    "manage_loan_dialog": "Loan Management",
+    "edit_loan": "Edit Loan",
+    "loan_name": "Loan Name",
+    "loan_type": "Type",
+    "interest_amount": "Interest Amount",
+    "installment_due_day": "Installment Due Day",
+    "default_payment_account": "Default Payment Account",
+    "default_payment_category": "Default Payment Category",
+    "pay_installment_dialog_title": "Pay Installment",
+    "payment_amount": "Payment Amount",
+    "payment_date": "Payment Date",
+    "payment_account": "Payment Account",
+    "payment_category": "Payment Category",
+    "execute_payment": "Execute Payment",
+
+    # Scheda Conti Personali
+    "net_worth": "Net Worth",
+    "liquidity": "Liquidity",
+    "investments": "Investments",
+    "pension_funds": "Pension Funds",
+    "savings": "Savings",
+    "real_estate_equity": "Real Estate Equity",
+    "real_estate_assets": "Real Estate Assets",
+    "family_net_worth": "Family Net Worth",
+    "hide_amount_in_family": "Hide amount in Family",
+    "amount_reserved": "Reserved",
+    "my_personal_accounts": "My Personal Accounts",
+    "add_personal_account": "Add new personal account",
+    "no_personal_accounts": "You haven't added any personal accounts yet.",
+    "current_balance": "Current Balance",
+    "value": "Value",
+    "manage_portfolio": "Manage Portfolio",
+    "manage_pension_fund": "Manage Pension Fund",
+
+    # Scheda Investimenti
+    "sync_prices": "Sync Prices",
+    "update_all_prices": "Update All Prices",
+    "price_updated_successfully": "prices updated successfully",
+    "error_fetching_price": "Error fetching price",
+    "no_investment_accounts": "You haven't added any investment accounts yet.",
+    "no_assets_in_portfolio": "No assets in portfolio.",
+    "select_investment_account": "Select Investment Account",
+    "add_investment_account": "Add Investment Account",
+    "edit_investment_account": "Edit Investment Account",
+    "new_investment_account": "New Investment Account",
+    "broker_name": "Broker",
+    "default_exchange": "Default Exchange",
+    "exchange_milano": "Milan (.MI)",
+    "exchange_londra": "London (.L)",
+    "exchange_xetra": "Xetra (.DE)",
+    "exchange_parigi": "Paris (.PA)",
+    "exchange_svizzera": "Switzerland (.SW)",
+    "exchange_amsterdam": "Amsterdam (.AS)",
+
+    # Scheda Conti Condivisi
+    "no_shared_accounts": "You are not part of any shared accounts yet.",
+    "shared_type_family": "Whole Family",
+    "shared_type_users": "Specific Users",
+
+    # Scheda Personale (I Miei Dati)
+    "welcome_back": "Welcome back, {0}!",
+    "total_wealth": "Total Wealth",
+    "liquidity_details": "({0} in liquidity as of {1})",
+    "latest_transactions": "Latest Transactions (Liquidity)",
+    "filter_by_month": "Filter by Month",
+
+    # Scheda Famiglia
+    "wealth_by_member": "Wealth by Member",
+    "total_family_wealth": "Total Family Wealth",
+    "total_liquidity": "Total Liquidity",
+    "total_investments": "Total Investments",
+    "all_family_transactions": "All Family Transactions",
+    "family_transactions": "Family Transactions",
+    "user": "User",
+    "date": "Date",
+    "description": "Description",
+    "account": "Account",
+    "amount": "Amount",
+    "no_transactions_found_family": "No transactions found for the family.",
+    "shared": "Shared",
+    "no_family_access_permission": "You do not have permission to view this section.",
+    "not_in_family": "You have not been added to a family yet.",
+
+    # Scheda Budget
+    "budget_management": "Budget Management",
+    "budget_description": "Set and monitor monthly spending limits by category.",
+    "set_budget": "Set Budget",
+    "no_budget_set": "No budget set. Click '+' to start.",
+    "spent": "Spent",
+    "of": "of",
+    "remaining": "Remaining",
+    "set_monthly_budget": "Set Monthly Budget",
+    "limit_amount": "Limit Amount",
+    "budget_saved": "Budget saved successfully!",
+
+    # Scheda Spese Fisse
+    "fixed_expenses_management": "Fixed Expenses Management",
+    "fixed_expenses_description": "Set up your recurring expenses here (e.g., rent, subscriptions). They will be charged automatically each month.",
+    "name": "Name",
+    "active": "Active",
+    "actions": "Actions",
+    "no_fixed_expenses": "No fixed expenses configured.",
+
+    # Scheda Prestiti
+    "loans_management": "Loan Management",
+    "loans_description": "Track mortgages, financing, and loans.",
+    "add_loan": "Add Loan",
+    "pay_installment": "Pay Installment",
+    "financed_amount": "Financed Amount",
+    "remaining_amount": "Remaining Amount",
+    "monthly_installment": "Monthly Installment",
+    "total_months": "Total Months",
+    "no_loans": "No loans entered.",
+
+    # Scheda Immobili
+    "properties_management": "Property Management",
+    "properties_description": "Manage the value and associated mortgages of your properties.",
+    "add_property": "Add Property",
+    "purchase_value": "Purchase Value",
+    "current_value": "Current Value",
+    "residual_mortgage": "Residual Mortgage",
+    "no_properties": "No properties entered.",
+
+    # Scheda Impostazioni - Profilo Utente
+    "user_profile": "User Profile",
+    "user_profile_desc": "Edit your personal information and password.",
+    "date_of_birth": "Date of Birth",
+    "tax_code": "Tax Code",
+    "address": "Address",
+    "change_password": "Change Password",
+    "save_profile": "Save Profile",
+    "profile_saved_success": "Profile saved successfully!",
+
+    # Scheda Impostazioni
+    "google_settings": "Google Settings",
+    "google_settings_desc": "Connect your Google account to sync the database to Google Drive.",
+    "status_connected": "Status: Connected",
+    "status_disconnected": "Status: Not Connected",
+    "connect_google_account": "Connect Google Account",
+    "disconnect_google_account": "Disconnect Google Account",
+    "sync_db_drive": "Sync Database to Drive",
+    "sync_db_drive_tooltip": "Upload local DB to Google Drive (overwrites)",
+    "language_and_currency": "Language and Currency",
+    "language_and_currency_desc": "Choose the language and currency for the application.",
+    "language": "Language",
+    "currency": "Currency",
+    "default_account": "Default Account",
+    "default_account_desc": "Select a default account to use for new transactions.",
+    "save_default_account": "Save Default Account",
+    "backup_and_restore": "Backup and Restore",
+    "backup_and_restore_desc": "Save a backup of your data or restore from a previous backup.",
+    "create_backup": "Create Data Backup",
+    "restore_from_backup": "Restore from Backup",
+
+    #nuovi dati inseriti e da riorganizzare en
+    "subcategory": "Subcategory",
+    "category": "Category",
+    "edit_role_for": "Edit role for",
+    "avg_purchase_price": "Average Purchase Price",
+    "avg_purchase_price_tooltip": "Weighted average purchase price of assets",
+    "past_gain_loss_tooltip": "Total past Gain/Loss (before entering the system)",
+    "manage_shared_account": "Manage Shared Account",
+    "debit_day_of_month": "Day of the Month",
+    "select_existing_asset_optional": "Select Existing Asset (optional)",
+    "invalid_amount_or_quantity": "Invalid amount or quantity",
+    "create_new_mortgage": "Create New Mortgage",
+    "default_payment_subcategory": "Default Payment Subcategory",
+    "start_date": "Start Date",
+    "required_field": "Required field",
+    "delete_account": "Delete Account",
+    "personal_account": "Personal Account",
+    "shared_account": "Shared Account",
+    "my_accounts": "My Accounts",
+    "auto_debit": "Auto Debit",
+    "auto_debit_desc": "Select if the debit should be executed automatically every month.",
+}
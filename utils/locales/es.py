@@ -0,0 +1,317 @@
+# Stringhe in spagnolo: caricate e compilate da utils.localization al primo uso della lingua
+STRINGS = {
+    # Generali
+    "app_title": "Budget Amico",
+    "edit": "Editar",
+    "delete": "Eliminar",
+    "save": "Guardar",
+    "cancel": "Cancelar",
+    "close": "Cerrar",
+    "add": "Añadir",
+    "new_transaction": "Nueva Transacción",
+    "new_transfer": "Nueva Transferencia",
+    "no_category": "Sin Categoría",
+    "confirm_delete_title": "Confirmar Eliminación",
+    "confirm_delete_content": "¿Estás seguro de que quieres eliminar este elemento? La acción es irreversible.",
+    "yes_delete": "Sí, Eliminar",
+    "fill_all_fields": "Por favor, rellena todos los campos obligatorios.",
+    "invalid_amount": "Importe no válido.",
+    "amount_not_zero": "El importe no puede ser cero.",
+    "description_required": "La descripción es obligatoria.",
+    "error_dialog_title": "Error",
+    "select_an_account": "Selecciona una cuenta.",
+
+    # Schede Principali
+    "my_data": "Mis Datos",
+    "budget": "Presupuesto",
+    "personal_accounts": "Cuentas Personales",
+    "shared_accounts": "Cuentas Compartidas",
+    "fixed_expenses": "Gastos Fijos",
+    "loans": "Préstamos",
+    "properties": "Inmuebles",
+    "family": "Familia",
+
+    # Azioni AppBar
+    "settings": "Configuración",
+    "admin_panel_title": "Panel de Admin",
+    "export_data": "Exportar Datos",
+    "logout": "Cerrar Sesión",
+    "info": "Información",
+
+    # Recupero Password
+    "forgot_password": "¿Olvidaste tu contraseña?",
+    "password_recovery_title": "Recuperar Contraseña",
+    "password_recovery_desc": "Introduce tu email para recibir una contraseña temporal.",
+    "send_reset_link": "Enviar Contraseña Temporal",
+    "back_to_login": "Volver al Inicio de Sesión",
+    "email_is_required": "El email es obligatorio.",
+    "set_new_password_title": "Crear una Nueva Contraseña",
+    "new_password": "Nueva Contraseña",
+    "confirm_new_password": "Confirmar Nueva Contraseña",
+    "save_new_password": "Guardar Nueva Contraseña",
+    "passwords_do_not_match": "Las contraseñas no coinciden o están vacías.",
+    "password_updated_success": "¡Contraseña actualizada con éxito! Ahora puedes iniciar sesión.",
+    "invalid_or_expired_token": "Token no válido o caducado. Por favor, solicita un nuevo restablecimiento.",
+    "reset_link_sent_confirmation": "Si existe una cuenta asociada a este email, se ha enviado una contraseña temporal.",
+    "no_account_question": "¿No tienes una cuenta?",
+    "register_now": "Regístrate ahora",
+
+    # Pannello Admin
+    "categories_management": "Gestión de Categorías",
+    "members_management": "Gestión de Miembros",
+    "admin_google_settings": "Google",
+    "add_category": "Añadir Categoría",
+    "category_name": "Nombre de la Categoría",
+    "no_categories_found": "No se encontraron categorías.",
+    "invite_member": "Invitar Miembro",
+    "username_or_email": "Usuario o Email",
+    "role": "Rol",
+    "username": "Usuario",
+    "email": "Email",
+    "invite": "Invitar",
+    "remove_from_family": "Eliminar de la familia",
+    "no_members_found": "No hay otros miembros en la familia.",
+
+    # Dialogo Transazioni
+    "expense": "Gasto",
+    "income": "Ingreso",
+    "category_optional": "Categoría (opcional)",
+    "shared_suffix": "(Compartida)",
+    "personal_suffix": "(Personal)",
+
+    # Dialogo Conti
+    "manage_account": "Gestionar Cuenta",
+    "add_account": "Añadir Cuenta",
+    "edit_account": "Editar Cuenta",
+    "account_name_placeholder": "Nombre de la Cuenta (ej. Cuenta Principal)",
+    "account_type": "Tipo de Cuenta",
+    "iban_optional": "IBAN (Opcional)",
+    "initial_balance_optional": "Saldo Inicial (Opcional)",
+    "set_initial_balance": "Establecer Saldo Inicial",
+    "add_initial_asset": "Añadir Activo Inicial",
+    "initial_assets": "Activos Iniciales:",
+    "initial_assets_desc": "Introduce el valor actual y la G/P total preexistente (opcional).",
+    "ticker": "Ticker",
+    "asset_name": "Nombre del Activo",
+    "quantity": "Cantidad",
+    "current_unit_price": "Px Actual Unit.",
+    "past_gain_loss": "G/P Tot. Anterior",
+    "remove_asset": "Eliminar Activo",
+    "set_as_default_account": "Establecer como cuenta predeterminada para gastos",
+    "iban_in_use_or_invalid": "IBAN ya en uso o no válido",
+
+    # Dialogo Conti Condivisi
+    "manage_shared_account_dialog": "Gestionar Cuenta Compartida",
+    "create_shared_account": "Crear Cuenta Compartida",
+    "edit_shared_account": "Editar Cuenta Compartida",
+    "shared_account_name": "Nombre de la Cuenta Compartida",
+    "sharing_type": "Tipo de Compartición",
+    "sharing_type_family": "Toda la Familia (gestionado por Admin)",
+    "sharing_type_users": "Usuarios Específicos",
+    "select_participants": "Seleccionar Participantes (solo para 'Usuarios Específicos'):",
+    "select_at_least_one_participant": "Selecciona al menos un participante para las cuentas de 'Usuarios Específicos'.",
+
+    # Dialogo Giroconto
+    "new_transfer_dialog": "Nueva Transferencia",
+    "from_account": "De la Cuenta (Origen)",
+    "to_account": "A la Cuenta (Destino)",
+    "transfer_description_placeholder": "Descripción (ej. Gastos comunes)",
+    "accounts_must_be_different": "Las cuentas deben ser diferentes",
+    "select_source_account": "Selecciona una cuenta de origen",
+    "select_destination_account": "Selecciona una cuenta de destino",
+    "execute_transfer": "Ejecutar Transferencia",
+
+    # Dialogo Spese Fisse
+    "manage_fixed_expense": "Gestionar Gasto Fijo",
+    "add_fixed_expense": "Añadir Gasto Fijo",
+    "edit_fixed_expense": "Editar Gasto Fijo",
+    "expense_name_placeholder": "Nombre del Gasto (ej. Suscripción a Netflix)",
+    "debit_account": "Cuenta de Débito",
+    "debit_day": "Día del Mes para el Débito",
+
+    # Dialogo Fondo Pensione
+    "manage_pension_fund_dialog": "Gestión de Fondo de Pensiones",
+    "manage_pension_fund_for": "Gestión: {0}",
+    "update_total_value": "Actualizar el valor total del fondo:",
+    "current_total_value": "Valor Total Actual",
+    "update_value": "Actualizar Valor",
+    "perform_operation": "Realizar una operación:",
+    "operation_amount": "Importe de la Operación",
+    "linked_account": "Cuenta para Depósito/Retiro",
+    "deposit_from_account": "Depositar desde Cuenta",
+    "deposit_from_external": "Depositar desde Externo",
+    "deposit_from_external_tooltip": "Ej. del empleador",
+    "withdraw_to_account": "Retirar a Cuenta",
+    "pension_fund_value_updated": "¡Valor del fondo de pensiones actualizado!",
+    "error_updating_value": "Error al actualizar.",
+    "pension_fund_op_success": "¡Operación en el fondo de pensiones registrada!",
+    "pension_fund_op_error": "Error al registrar la operación.",
+
+    # Dialogo Immobili
+    "manage_property_dialog": "Gestión de Inmuebles",
+    "add_property": "Añadir Inmueble",
+    "edit_property": "Editar Inmueble",
+    "property_name": "Nombre del Inmueble",
+    "address": "Dirección",
+    "city": "Ciudad",
+    "bare_ownership": "Nuda Propiedad",
+    "linked_mortgage": "Hipoteca Vinculada",
+
+    # Dialogo Portafoglio
+    "manage_portfolio_dialog": "Gestión de Cartera",
+    "total_portfolio_value": "Valor Total de la Cartera",
+    "total_gain_loss": "Ganancia/Pérdida Total",
+    "add_operation": "Añadir Operación",
+    "unit_price": "Precio Unitario",
+    "buy": "Comprar",
+    "sell": "Vender",
+    "update_price": "Actualizar Precio",
+    "new_price": "Nuevo Precio",
+    "edit_asset_details": "Editar Detalles del Activo",
+
+    # Dialogo Prestiti
+    "manage_loan_dialog": "Gestión de Préstamos",
+    "edit_loan": "Editar Préstamo",
+    "loan_name": "Nombre del Préstamo",
+    "loan_type": "Tipo",
+    "interest_amount": "Importe de Intereses",
+    "installment_due_day": "Día de Vencimiento de la Cuota",
+    "default_payment_account": "Cuenta de Pago Predeterminada",
+    "default_payment_category": "Categoría de Pago Predeterminada",
+    "pay_installment_dialog_title": "Pagar Cuota",
+    "payment_amount": "Importe del Pago",
+    "payment_date": "Fecha de Pago",
+    "payment_account": "Cuenta de Pago",
+    "payment_category": "Categoría de Pago",
+    "execute_payment": "Ejecutar Pago",
+
+    # Scheda Conti Personali
+    "net_worth": "Patrimonio Neto",
+    "liquidity": "Liquidez",
+    "investments": "Inversiones",
+    "my_personal_accounts": "Mis Cuentas Personales",
+    "add_personal_account": "Añadir nueva cuenta personal",
+    "no_personal_accounts": "Aún no has añadido ninguna cuenta personal.",
+    "current_balance": "Saldo Actual",
+    "value": "Valor",
+    "manage_portfolio": "Gestionar Cartera",
+    "manage_pension_fund": "Gestionar Fondo de Pensiones",
+
+    # Scheda Conti Condivisi
+    "no_shared_accounts": "Aún no participas en ninguna cuenta compartida.",
+    "shared_type_family": "Toda la Familia",
+    "shared_type_users": "Usuarios Específicos",
+
+    # Scheda Personale (I Miei Dati)
+    "welcome_back": "¡Bienvenido de nuevo, {0}!",
+    "total_wealth": "Patrimonio Total",
+    "liquidity_details": "({0} en liquidez a fecha de {1})",
+    "latest_transactions": "Últimas Transacciones (Liquidez)",
+    "filter_by_month": "Filtrar por Mes",
+
+    # Scheda Famiglia
+    "wealth_by_member": "Patrimonio por Miembro",
+    "total_family_wealth": "Patrimonio Total Familiar",
+    "total_liquidity": "Liquidez Total",
+    "total_investments": "Inversiones Totales",
+    "all_family_transactions": "Todas las Transacciones Familiares",
+    "user": "Usuario",
+    "date": "Fecha",
+    "description": "Descripción",
+    "account": "Cuenta",
+    "amount": "Importe",
+    "no_transactions_found_family": "No se encontraron transacciones para la familia.",
+    "shared": "Compartido",
+    "no_family_access_permission": "No tienes permisos para ver esta sección.",
+    "not_in_family": "Aún no has sido añadido a una familia.",
+
+    # Scheda Budget
+    "budget_management": "Gestión de Presupuesto",
+    "budget_description": "Establece y supervisa los límites de gasto mensuales por categoría.",
+    "set_budget": "Establecer Presupuesto",
+    "no_budget_set": "No hay presupuesto establecido. Haz clic en '+' para empezar.",
+    "spent": "Gastado",
+    "of": "de",
+    "remaining": "Restante",
+    "set_monthly_budget": "Establecer Presupuesto Mensual",
+    "limit_amount": "Importe Límite",
+    "budget_saved": "¡Presupuesto guardado con éxito!",
+
+    # Scheda Spese Fisse
+    "fixed_expenses_management": "Gestión de Gastos Fijos",
+    "fixed_expenses_description": "Configura aquí tus gastos recurrentes (ej. alquiler, suscripciones). Se cargarán automáticamente cada mes.",
+    "name": "Nombre",
+    "active": "Activo",
+    "actions": "Acciones",
+    "no_fixed_expenses": "No hay gastos fijos configurados.",
+
+    # Scheda Prestiti
+    "loans_management": "Gestión de Préstamos",
+    "loans_description": "Realiza un seguimiento de hipotecas, financiaciones y préstamos.",
+    "add_loan": "Añadir Préstamo",
+    "pay_installment": "Pagar Cuota",
+    "financed_amount": "Importe Financiado",
+    "remaining_amount": "Importe Restante",
+    "monthly_installment": "Cuota Mensual",
+    "total_months": "Meses Totales",
+    "no_loans": "No se han introducido préstamos.",
+
+    # Scheda Immobili
+    "properties_management": "Gestión de Inmuebles",
+    "properties_description": "Gestiona el valor y las hipotecas asociadas a tus inmuebles.",
+    "add_property": "Añadir Inmueble",
+    "purchase_value": "Valor de Compra",
+    "current_value": "Valor Actual",
+    "residual_mortgage": "Hipoteca Residual",
+    "no_properties": "No se han introducido inmuebles.",
+
+    # Scheda Impostazioni - Profilo Utente
+    "user_profile": "Perfil de Usuario",
+    "user_profile_desc": "Edita tu información personal y contraseña.",
+    "date_of_birth": "Fecha de Nacimiento",
+    "tax_code": "Código Fiscal",
+    "address": "Dirección",
+    "change_password": "Cambiar Contraseña",
+    "save_profile": "Guardar Perfil",
+    "profile_saved_success": "¡Perfil guardado con éxito!",
+
+    # Scheda Impostazioni
+    "google_settings": "Configuración de Google",
+    "google_settings_desc": "Conecta tu cuenta de Google para sincronizar la base de datos con Google Drive.",
+    "status_connected": "Estado: Conectado",
+    "status_disconnected": "Estado: No Conectado",
+    "connect_google_account": "Conectar Cuenta de Google",
+    "disconnect_google_account": "Desconectar Cuenta de Google",
+    "sync_db_drive": "Sincronizar Base de Datos",
+    "sync_db_drive_tooltip": "Subir BD local a Google Drive (sobrescribe)",
+    "language_and_currency": "Idioma y Moneda",
+    "language_and_currency_desc": "Elige el idioma y la moneda para la aplicación.",
+    "language": "Idioma",
+    "currency": "Moneda",
+    "default_account": "Cuenta Predeterminada",
+    "default_account_desc": "Selecciona una cuenta predeterminada para usar en nuevas transacciones.",
+    "save_default_account": "Guardar Cuenta Predeterminada",
+    "backup_and_restore": "Copia de Seguridad y Restauración",
+    "backup_and_restore_desc": "Guarda una copia de seguridad de tus datos o restaura desde una copia anterior.",
+    "create_backup": "Crear Copia de Seguridad",
+    "restore_from_backup": "Restaurar desde Copia",
+
+    #dati aggiornato da sistemare e rorganizzare es
+    "subcategory": "Subcategoría",
+    "category": "Categoría",
+    "edit_role_for": "Editar rol para",
+    "avg_purchase_price": "Precio Medio de Compra",
+    "avg_purchase_price_tooltip": "Precio medio ponderado de compra de activos",
+    "past_gain_loss_tooltip": "Ganancia/Pérdida total pasada (antes de ingresar al sistema)",
+    "manage_shared_account": "Gestionar Cuenta Compartida",
+    "debit_day_of_month": "Día del Mes",
+    "select_existing_asset_optional": "Seleccionar Activo Existente (opcional)",
+    "invalid_amount_or_quantity": "Importe o cantidad no válidos",
+    "create_new_mortgage": "Crear Nueva Hipoteca",
+    "default_payment_subcategory": "Subcategoría de Pago Predeterminada",
+    "start_date": "Fecha de Inicio",
+    "required_field": "Campo obligatorio",
+    "delete_account": "Eliminar Cuenta",
+    "auto_debit": "Débito Automático",
+    "auto_debit_desc": "Selecciona si el débito debe ser ejecutado automáticamente cada mes.",
+}
@@ -0,0 +1,579 @@
+# Stringhe in italiano: caricate e compilate da utils.localization al primo uso della lingua
+STRINGS = {
+    # Generali
+    "app_title": "Budget Amico",
+    "edit": "Modifica",
+    "delete": "Elimina",
+    "save": "Salva",
+    "cancel": "Annulla",
+    "close": "Chiudi",
+    "add": "Aggiungi",
+    "back": "Indietro",
+    "all_transactions": "Tutte le transazioni",
+    "new_transaction": "Nuova Transazione",
+    "transfer": "Giroconto",
+    "new_transfer": "Nuovo Giroconto",
+    "new_account": "Nuovo Conto",
+    "new_card": "Nuova Carta",
+    "new_savings": "Nuovo Piano di Risparmio",
+    "new_fixed_expense": "Nuova Spesa Fissa",
+    "new_loan": "Nuovo Prestito",
+    "new_property": "Nuovo Immobile",
+    "new_contact": "Nuovo Contatto",
+    "no_category": "Nessuna Categoria",
+    "confirm_delete_title": "Conferma Eliminazione",
+    "confirm_delete_content": "Sei sicuro di voler eliminare questo elemento? L'azione è irreversibile.",
+    "yes_delete": "Sì, Elimina",
+    "fill_all_fields": "Compila tutti i campi obbligatori.",
+    "invalid_amount": "Importo non valido.",
+    "amount_not_zero": "L'importo non può essere zero.",
+    "description_required": "Descrizione obbligatoria.",
+    "error_dialog_title": "Errore",
+    "select_an_account": "Seleziona un conto.",
+
+    # Schede Principali
+    "my_data": "I Miei Dati",
+    "budget": "Budget",
+    "personal_accounts": "Conti Personali",
+    "shared_accounts": "Conti Condivisi",
+    "fixed_expenses": "Spese Fisse",
+    "loans": "Prestiti",
+    "properties": "Immobili",
+    "family": "Famiglia",
+
+    # Azioni AppBar
+    "settings": "Impostazioni",
+    "admin_panel_title": "Pannello Admin",
+    "export_data": "Esporta Dati",
+    "logout": "Logout",
+    "info": "Informazioni",
+
+    # Recupero Password
+    "forgot_password": "Password dimenticata?",
+    "password_recovery_title": "Recupero Password",
+    "password_recovery_desc": "Inserisci la tua email per ricevere una password temporanea.",
+    "send_reset_link": "Invia Password Temporanea",
+    "back_to_login": "Torna al Login",
+    "email_is_required": "L'email è obbligatoria.",
+    "set_new_password_title": "Crea una Nuova Password",
+    "new_password": "Nuova Password",
+    "confirm_new_password": "Conferma Nuova Password",
+    "save_new_password": "Salva Nuova Password",
+    "passwords_do_not_match": "Le password non coincidono o sono vuote.",
+    "password_updated_success": "Password aggiornata con successo! Ora puoi effettuare il login.",
+    "invalid_or_expired_token": "Token non valido o scaduto. Richiedi un nuovo reset.",
+    "reset_link_sent_confirmation": "Se esiste un account associato a questa email, è stata inviata una password temporanea.",
+    "no_account_question": "Non hai un account?",
+    "register_now": "Registrati",
+
+    # Pannello Admin
+    "categories_management": "Gestione Categorie",
+    "subcategory": "Sottocategoria",
+    "members_management": "Gestione Membri",
+    "admin_google_settings": "Google",
+    "add_category": "Aggiungi Categoria",
+    "add_subcategory": "Aggiungi Sottocategoria",
+    "category_name": "Nome Categoria",
+    "subcategory_name": "Nome Sottocategoria",
+    "no_categories_found": "Nessuna categoria trovata.",
+    "invite_member": "Invita Membro",
+    "username_or_email": "Username o Email",
+    "role": "Ruolo",
+    "edit_role_for": "Modifica ruolo per",
+    "username": "Username",
+    "email": "Email",
+    "invite": "Invita",
+    "remove_from_family": "Rimuovi dalla famiglia",
+    "no_members_found": "Nessun altro membro nella famiglia.",
+
+    # Dialogo Transazioni
+    "expense": "Spesa",
+    "income": "Incasso",
+    "category_optional": "Categoria (opzionale)",
+    "shared_suffix": "(Condiviso)",
+    "personal_suffix": "(Personale)",
+
+    # Dialogo Conti
+    "manage_account": "Gestisci Conto",
+    "add_account": "Aggiungi Conto",
+    "edit_account": "Modifica Conto",
+    "account_name_placeholder": "Nome Conto (es. Conto Principale)",
+    "account_type": "Tipo di Conto",
+    "iban_optional": "IBAN (Opzionale)",
+    "initial_balance_optional": "Saldo Iniziale (Opzionale)",
+    "set_initial_balance": "Imposta Saldo Iniziale",
+    "add_initial_asset": "Aggiungi Asset Iniziale",
+    "initial_assets": "Asset Iniziali:",
+    "initial_assets_desc": "Inserisci il valore attuale e il G/L totale pre-esistente (opzionale).",
+    "ticker": "Ticker",
+    "asset_name": "Nome Asset",
+    "quantity": "Quantità",
+    "current_unit_price": "Px Attuale Unit.",
+    "past_gain_loss": "G/L Tot. Pregresso",
+    "remove_asset": "Rimuovi Asset",
+    "set_as_default_account": "Imposta come conto predefinito per le spese",
+    "iban_in_use_or_invalid": "IBAN già in uso o non valido",
+    "avg_purchase_price": "Prezzo Medio di Acquisto",
+    "avg_purchase_price_tooltip": "Prezzo medio ponderato di acquisto degli asset",
+    "past_gain_loss_tooltip": "Gain/Loss totale pregresso (prima dell'inserimento nel sistema)",
+
+    # Dialogo Conti Condivisi
+    "manage_shared_account_dialog": "Gestisci Conto Condiviso",
+    "create_shared_account": "Crea Conto Condiviso",
+    "edit_shared_account": "Modifica Conto Condiviso",
+    "shared_account_name": "Nome Conto Condiviso",
+    "sharing_type": "Tipo di Condivisione",
+    "sharing_type_family": "Tutta la Famiglia (gestito da Admin)",
+    "sharing_type_users": "Utenti Specifici",
+    "select_participants": "Seleziona Partecipanti (solo per 'Utenti Specifici'):",
+    "select_at_least_one_participant": "Seleziona almeno un partecipante per i conti 'Utenti Specifici'.",
+
+    # Dialogo Giroconto
+    "new_transfer_dialog": "Nuovo Giroconto",
+    "from_account": "Da Conto (Sorgente)",
+    "to_account": "A Conto (Destinazione)",
+    "transfer_description_placeholder": "Descrizione (es. Spese comuni)",
+    "accounts_must_be_different": "I conti devono essere diversi",
+    "select_source_account": "Seleziona un conto di origine",
+    "select_destination_account": "Seleziona un conto di destinazione",
+    "execute_transfer": "Esegui Giroconto",
+
+    # Dialogo Spese Fisse
+    "manage_fixed_expense": "Gestisci Spesa Fissa",
+    "add_fixed_expense": "Aggiungi Spesa Fissa",
+    "edit_fixed_expense": "Modifica Spesa Fissa",
+    "expense_name_placeholder": "Nome Spesa (es. Abbonamento Netflix)",
+    "debit_account": "Conto di Addebito",
+    "debit_day": "Giorno del Mese per l'Addebito",
+
+    # Dialogo Fondo Pensione
+    "manage_pension_fund_dialog": "Gestione Fondo Pensione",
+    "manage_pension_fund_for": "Gestione: {0}",
+    "update_total_value": "Aggiorna il valore totale del fondo:",
+    "current_total_value": "Valore Totale Attuale",
+    "update_value": "Aggiorna Valore",
+    "perform_operation": "Esegui un'operazione:",
+    "operation_amount": "Importo Operazione",
+    "linked_account": "Conto per Versamento/Prelievo",
+    "deposit_from_account": "Versa da Conto",
+    "deposit_from_external": "Versa da Esterno",
+    "deposit_from_external_tooltip": "Es. da datore di lavoro",
+    "withdraw_to_account": "Preleva su Conto",
+    "pension_fund_value_updated": "Valore del fondo pensione aggiornato!",
+    "error_updating_value": "Errore durante l'aggiornamento.",
+    "pension_fund_op_success": "Operazione sul fondo pensione registrata!",
+    "pension_fund_op_error": "Errore durante la registrazione dell'operazione.",
+
+    # Dialogo Immobili
+    "manage_property_dialog": "Gestione Immobile",
+    "add_property": "Aggiungi Immobile",
+    "edit_property": "Modifica Immobile",
+    "property_name": "Nome Immobile",
+    "address": "Via",
+    "city": "Città",
+    "bare_ownership": "Nuda Proprietà",
+    "linked_mortgage": "Mutuo Collegato",
+    "create_new_mortgage": "Nuovo Mutuo",
+
+    # Dialogo Portafoglio
+    "manage_portfolio_dialog": "Gestione Portafoglio",
+    "total_portfolio_value": "Valore Totale Portafoglio",
+    "total_gain_loss": "Gain/Loss Totale",
+    "add_operation": "Aggiungi Operazione",
+    "unit_price": "Prezzo Unitario",
+    "buy": "Compra",
+    "sell": "Vendi",
+    "update_price": "Aggiorna Prezzo",
+    "new_price": "Nuovo Prezzo",
+    "edit_asset_details": "Modifica Dettagli Asset",
+    "add_existing_asset": "Aggiungi Asset Esistente",
+    "select_existing_asset_optional": "Seleziona Asset Esistente (Opzionale)",
+    "invalid_amount_or_quantity": "Importo o quantità non validi.",
+
+    # Dialogo Prestiti
+    "manage_loan_dialog": "Gestione Prestito",
+    "edit_loan": "Modifica Prestito",
+    "loan_name": "Nome Prestito",
+    "loan_type": "Tipo",
+    "interest_amount": "Importo Interessi",
+    "installment_due_day": "Giorno Scadenza Rata",
+    "default_payment_account": "Conto Pagamento Predefinito",
+    "default_payment_category": "Categoria Pagamento Predefinita",
+    "pay_installment_dialog_title": "Paga Rata",
+    "payment_amount": "Importo Pagamento",
+    "payment_date": "Data Pagamento",
+    "payment_account": "Conto di Pagamento",
+    "payment_category": "Categoria di Pagamento",
+    "execute_payment": "Esegui Pagamento",
+    "total_installments": "Totale Rate",
+    "paid_installments": "Rate Pagate",
+    "remaining_installments_label": "Rate Rimanenti",
+
+    # Scheda Conti Personali
+    "net_worth": "Patrimonio Netto",
+    "liquidity": "Liquidità",
+    "investments": "Investimenti",
+    "pension_funds": "Fondi Pensione",
+    "savings": "Risparmio",
+    "real_estate_equity": "Patrimonio Immobile",
+    "real_estate_assets": "Patrimonio Immobiliare",
+    "family_net_worth": "Patrimonio Netto Famiglia",
+    "hide_amount_in_family": "Nascondi importo in Famiglia",
+    "amount_reserved": "Riservato",
+    "my_personal_accounts": "I Miei Conti Personali",
+    "add_personal_account": "Aggiungi nuovo conto personale",
+    "no_personal_accounts": "Non hai ancora aggiunto nessun conto personale.",
+    "current_balance": "Saldo Attuale",
+    "value": "Valore",
+    "manage_portfolio": "Gestisci Portafoglio",
+    "manage_pension_fund": "Gestisci Fondo Pensione",
+
+    # Scheda Investimenti
+    "sync_prices": "Sincronizza Prezzi",
+    "update_all_prices": "Aggiorna Tutti i Prezzi",
+    "price_updated_successfully": "prezzi aggiornati con successo",
+    "error_fetching_price": "Errore nel recupero del prezzo",
+    "no_investment_accounts": "Non hai ancora aggiunto nessun conto di investimento.",
+    "no_assets_in_portfolio": "Nessun asset nel portafoglio.",
+    "select_investment_account": "Seleziona Conto di Investimento",
+    "add_investment_account": "Aggiungi Conto di Investimento",
+    "edit_investment_account": "Modifica Conto Investimento",
+    "new_investment_account": "Nuovo Conto Investimento",
+    "broker_name": "Broker",
+    "default_exchange": "Borsa Predefinita",
+    "exchange_milano": "Milano (.MI)",
+    "exchange_londra": "Londra (.L)",
+    "exchange_xetra": "Xetra (.DE)",
+    "exchange_parigi": "Parigi (.PA)",
+    "exchange_svizzera": "Svizzera (.SW)",
+    "exchange_amsterdam": "Amsterdam (.AS)",
+
+    # Scheda Conti Condivisi
+    "no_shared_accounts": "Non partecipi ancora a nessun conto condiviso.",
+    "shared_type_family": "Tutta la Famiglia",
+    "shared_type_users": "Utenti Specifici",
+
+    # Scheda Personale (I Miei Dati)
+    "welcome_back": "Bentornato, {0}!",
+    "total_wealth": "Patrimonio Totale",
+    "liquidity_details": "(di cui {0} in liquidità al {1})",
+    "latest_transactions": "Ultime Transazioni (Liquidità)",
+    "filter_by_month": "Filtra per Mese",
+
+    # Scheda Famiglia
+    "wealth_by_member": "Patrimonio per Membro",
+    "total_family_wealth": "Patrimonio Totale Famiglia",
+    "total_liquidity": "Liquidità Totale",
+    "total_investments": "Investimenti Totali",
+    "all_family_transactions": "Tutte le Transazioni della Famiglia",
+    "family_transactions": "Transazioni Famiglia",
+    "user": "Utente",
+    "date": "Data",
+    "description": "Descrizione",
+    "account": "Conto",
+    "amount": "Importo",
+    "no_transactions_found_family": "Nessuna transazione trovata per la famiglia.",
+    "shared": "Condiviso",
+    "no_family_access_permission": "Non hai i permessi per visualizzare questa sezione.",
+    "not_in_family": "Non sei ancora stato aggiunto a una famiglia.",
+
+    # Scheda Budget
+    "budget_management": "Gestione Budget",
+    "budget_description": "Imposta e monitora i limiti di spesa mensili per categoria.",
+    "set_budget": "Imposta Budget",
+    "no_budget_set": "Nessun budget impostato. Clicca su '+' per iniziare.",
+    "spent": "Spesi",
+    "of": "di",
+    "remaining": "Rimanenti",
+    "set_monthly_budget": "Imposta Budget Mensile",
+    "limit_amount": "Importo Limite",
+    "budget_saved": "Budget salvato con successo!",
+    "budget_amount": "Totale Budget",
+    "subcategory": "Sottocategoria",
+    "category": "Categoria",
+
+    # Scheda Spese Fisse
+    "fixed_expenses_management": "Gestione Spese Fisse",
+    "fixed_expenses_description": "Configura qui le tue spese ricorrenti (es. affitto, abbonamenti). Verranno addebitate automaticamente ogni mese.",
+    "name": "Nome",
+    "surname": "Cognome",
+    "password_updated_success": "Password aggiornata con successo! Ora puoi effettuare il login.",
+    "invalid_or_expired_token": "Token non valido o scaduto. Richiedi un nuovo reset.",
+    "reset_link_sent_confirmation": "Se esiste un account associato a questa email, è stata inviata una password temporanea.",
+    "no_account_question": "Non hai un account?",
+    "register_now": "Registrati",
+
+    # Pannello Admin
+    "categories_management": "Gestione Categorie",
+    "subcategory": "Sottocategoria",
+    "members_management": "Gestione Membri",
+    "admin_google_settings": "Google",
+    "add_category": "Aggiungi Categoria",
+    "add_subcategory": "Aggiungi Sottocategoria",
+    "category_name": "Nome Categoria",
+    "subcategory_name": "Nome Sottocategoria",
+    "no_categories_found": "Nessuna categoria trovata.",
+    "invite_member": "Invita Membro",
+    "username_or_email": "Username o Email",
+    "role": "Ruolo",
+    "edit_role_for": "Modifica ruolo per",
+    "username": "Username",
+    "email": "Email",
+    "invite": "Invita",
+    "remove_from_family": "Rimuovi dalla famiglia",
+    "no_members_found": "Nessun altro membro nella famiglia.",
+
+    # Dialogo Transazioni
+    "expense": "Spesa",
+    "income": "Incasso",
+    "category_optional": "Categoria (opzionale)",
+    "shared_suffix": "(Condiviso)",
+    "personal_suffix": "(Personale)",
+
+    # Dialogo Conti
+    "manage_account": "Gestisci Conto",
+    "add_account": "Aggiungi Conto",
+    "edit_account": "Modifica Conto",
+    "account_name_placeholder": "Nome Conto (es. Conto Principale)",
+    "account_type": "Tipo di Conto",
+    "iban_optional": "IBAN (Opzionale)",
+    "initial_balance_optional": "Saldo Iniziale (Opzionale)",
+    "set_initial_balance": "Imposta Saldo Iniziale",
+    "add_initial_asset": "Aggiungi Asset Iniziale",
+    "initial_assets": "Asset Iniziali:",
+    "initial_assets_desc": "Inserisci il valore attuale e il G/L totale pre-esistente (opzionale).",
+    "ticker": "Ticker",
+    "asset_name": "Nome Asset",
+    "quantity": "Quantità",
+    "current_unit_price": "Px Attuale Unit.",
+    "past_gain_loss": "G/L Tot. Pregresso",
+    "remove_asset": "Rimuovi Asset",
+    "set_as_default_account": "Imposta come conto predefinito per le spese",
+    "iban_in_use_or_invalid": "IBAN già in uso o non valido",
+
+    # Dialogo Conti Condivisi
+    "manage_shared_account_dialog": "Gestisci Conto Condiviso",
+    "create_shared_account": "Crea Conto Condiviso",
+    "edit_shared_account": "Modifica Conto Condiviso",
+    "shared_account_name": "Nome Conto Condiviso",
+    "sharing_type": "Tipo di Condivisione",
+    "sharing_type_family": "Tutta la Famiglia (gestito da Admin)",
+    "sharing_type_users": "Utenti Specifici",
+    "select_participants": "Seleziona Partecipanti (solo per 'Utenti Specifici'):",
+    "select_at_least_one_participant": "Seleziona almeno un partecipante per i conti 'Utenti Specifici'.",
+
+    # Dialogo Giroconto
+    "new_transfer_dialog": "Nuovo Giroconto",
+    "from_account": "Da Conto (Sorgente)",
+    "to_account": "A Conto (Destinazione)",
+    "transfer_description_placeholder": "Descrizione (es. Spese comuni)",
+    "accounts_must_be_different": "I conti devono essere diversi",
+    "select_source_account": "Seleziona un conto di origine",
+    "select_destination_account": "Seleziona un conto di destinazione",
+    "execute_transfer": "Esegui Giroconto",
+
+    # Dialogo Spese Fisse
+    "manage_fixed_expense": "Gestisci Spesa Fissa",
+    "add_fixed_expense": "Aggiungi Spesa Fissa",
+    "edit_fixed_expense": "Modifica Spesa Fissa",
+    "expense_name_placeholder": "Nome Spesa (es. Abbonamento Netflix)",
+    "debit_account": "Conto di Addebito",
+    "debit_day": "Giorno del Mese per l'Addebito",
+
+    # Dialogo Fondo Pensione
+    "manage_pension_fund_dialog": "Gestione Fondo Pensione",
+    "manage_pension_fund_for": "Gestione: {0}",
+    "update_total_value": "Aggiorna il valore totale del fondo:",
+    "current_total_value": "Valore Totale Attuale",
+    "update_value": "Aggiorna Valore",
+    "perform_operation": "Esegui un'operazione:",
+    "operation_amount": "Importo Operazione",
+    "linked_account": "Conto per Versamento/Prelievo",
+    "deposit_from_account": "Versa da Conto",
+    "deposit_from_external": "Versa da Esterno",
+    "deposit_from_external_tooltip": "Es. da datore di lavoro",
+    "withdraw_to_account": "Preleva su Conto",
+    "pension_fund_value_updated": "Valore del fondo pensione aggiornato!",
+    "error_updating_value": "Errore durante l'aggiornamento.",
+    "pension_fund_op_success": "Operazione sul fondo pensione registrata!",
+    "pension_fund_op_error": "Errore durante la registrazione dell'operazione.",
+
+    # Dialogo Immobili
+    "manage_property_dialog": "Gestione Immobile",
+    "add_property": "Aggiungi Immobile",
+    "edit_property": "Modifica Immobile",
+    "property_name": "Nome Immobile",
+    "address": "Via",
+    "city": "Città",
+    "bare_ownership": "Nuda Proprietà",
+    "linked_mortgage": "Mutuo Collegato",
+    "create_new_mortgage": "Nuovo Mutuo",
+
+    # Dialogo Portafoglio
+    "manage_portfolio_dialog": "Gestione Portafoglio",
+    "total_portfolio_value": "Valore Totale Portafoglio",
+    "total_gain_loss": "Gain/Loss Totale",
+    "add_operation": "Aggiungi Operazione",
+    "unit_price": "Prezzo Unitario",
+    "buy": "Compra",
+    "sell": "Vendi",
+    "update_price": "Aggiorna Prezzo",
+    "new_price": "Nuovo Prezzo",
+    "edit_asset_details": "Modifica Dettagli Asset",
+
+    # Dialogo Prestiti
+    "manage_loan_dialog": "Gestione Prestito",
+    "edit_loan": "Modifica Prestito",
+    "loan_name": "Nome Prestito",
+    "loan_type": "Tipo",
+    "interest_amount": "Importo Interessi",
+    "installment_due_day": "Giorno Scadenza Rata",
+    "default_payment_account": "Conto Pagamento Predefinito",
+    "default_payment_category": "Categoria Pagamento Predefinita",
+    "pay_installment_dialog_title": "Paga Rata",
+    "payment_amount": "Importo Pagamento",
+    "payment_date": "Data Pagamento",
+    "payment_account": "Conto di Pagamento",
+    "payment_category": "Categoria di Pagamento",
+    "execute_payment": "Esegui Pagamento",
+    "total_installments": "Totale Rate",
+    "paid_installments": "Rate Pagate",
+    "remaining_installments": "Rate Rimanenti",
+
+    # Scheda Conti Personali
+    "net_worth": "Patrimonio Netto",
+    "liquidity": "Liquidità",
+    "investments": "Investimenti",
+    "my_personal_accounts": "I Miei Conti Personali",
+    "add_personal_account": "Aggiungi nuovo conto personale",
+    "no_personal_accounts": "Non hai ancora aggiunto nessun conto personale.",
+    "current_balance": "Saldo Attuale",
+    "value": "Valore",
+    "manage_portfolio": "Gestisci Portafoglio",
+    "manage_pension_fund": "Gestisci Fondo Pensione",
+
+    # Scheda Conti Condivisi
+    "no_shared_accounts": "Non partecipi ancora a nessun conto condiviso.",
+    "shared_type_family": "Tutta la Famiglia",
+    "shared_type_users": "Utenti Specifici",
+
+    # Scheda Personale (I Miei Dati)
+    "welcome_back": "Bentornato, {0}!",
+    "total_wealth": "Patrimonio Totale",
+    "liquidity_details": "(di cui {0} in liquidità al {1})",
+    "latest_transactions": "Ultime Transazioni (Liquidità)",
+    "filter_by_month": "Filtra per Mese",
+
+    # Scheda Famiglia
+    "wealth_by_member": "Patrimonio per Membro",
+    "total_family_wealth": "Patrimonio Totale Famiglia",
+    "total_liquidity": "Liquidità Totale",
+    "total_investments": "Investimenti Totali",
+    "all_family_transactions": "Tutte le Transazioni della Famiglia",
+    "user": "Utente",
+    "date": "Data",
+    "description": "Descrizione",
+    "account": "Conto",
+    "amount": "Importo",
+    "no_transactions_found_family": "Nessuna transazione trovata per la famiglia.",
+    "shared": "Condiviso",
+    "no_family_access_permission": "Non hai i permessi per visualizzare questa sezione.",
+    "not_in_family": "Non sei ancora stato aggiunto a una famiglia.",
+
+    # Scheda Budget
+    "budget_management": "Gestione Budget",
+    "budget_description": "Imposta e monitora i limiti di spesa mensili per categoria.",
+    "set_budget": "Imposta Budget",
+    "no_budget_set": "Nessun budget impostato. Clicca su '+' per iniziare.",
+    "spent": "Spesi",
+    "of": "di",
+    "remaining": "Rimanenti",
+    "set_monthly_budget": "Imposta Budget Mensile",
+    "limit_amount": "Importo Limite",
+    "budget_saved": "Budget salvato con successo!",
+    "budget_amount": "Totale Budget",
+
+    # Scheda Spese Fisse
+    "fixed_expenses_management": "Gestione Spese Fisse",
+    "fixed_expenses_description": "Configura qui le tue spese ricorrenti (es. affitto, abbonamenti). Verranno addebitate automaticamente ogni mese.",
+    "name": "Nome",
+    "surname": "Cognome",
+    "active": "Attiva",
+    "actions": "Azioni",
+    "no_fixed_expenses": "Nessuna spesa fissa configurata.",
+
+    # Scheda Prestiti
+    "loans_management": "Gestione Prestiti",
+    "loans_description": "Tieni traccia di mutui, finanziamenti e prestiti.",
+    "add_loan": "Aggiungi Prestito",
+    "pay_installment": "Paga Rata",
+    "financed_amount": "Importo Finanziato",
+    "remaining_amount": "Importo Residuo",
+    "monthly_installment": "Rata Mensile",
+    "total_months": "Mesi Totali",
+    "no_loans": "Nessun prestito inserito.",
+
+    # Scheda Immobili
+    "properties_management": "Gestione Immobili",
+    "properties_description": "Gestisci il valore e i mutui associati ai tuoi immobili.",
+    "purchase_value": "Valore d'Acquisto",
+    "current_value": "Valore Attuale",
+    "residual_mortgage": "Mutuo Residuo",
+    "no_properties": "Nessun immobile inserito.",
+
+    # Scheda Impostazioni - Profilo Utente
+    "user_profile": "Profilo Utente",
+    "user_profile_desc": "Modifica le tue informazioni personali e la password.",
+    "date_of_birth": "Data di Nascita",
+    "tax_code": "Codice Fiscale",
+    "address": "Indirizzo",
+    "change_password": "Cambia Password",
+    "save_profile": "Salva Profilo",
+    "profile_saved_success": "Profilo salvato con successo!",
+
+    # Scheda Impostazioni
+    "google_settings": "Impostazioni Google",
+    "google_settings_desc": "Connetti il tuo account Google per sincronizzare il database su Google Drive.",
+    "status_connected": "Stato: Connesso",
+    "status_disconnected": "Stato: Non connesso",
+    "connect_google_account": "Connetti Account Google",
+    "disconnect_google_account": "Disconnetti Account Google",
+    "sync_db_drive": "Sincronizza Database su Drive",
+    "sync_db_drive_tooltip": "Carica il DB locale su Google Drive (sovrascrive)",
+    "language_and_currency": "Lingua e Valuta",
+    "language_and_currency_desc": "Scegli la lingua e la valuta per l'applicazione.",
+    "language": "Lingua",
+    "currency": "Valuta",
+    "default_account": "Conto Predefinito",
+    "default_account_desc": "Seleziona un conto da usare come predefinito per le nuove transazioni.",
+    "save_default_account": "Salva Conto Predefinito",
+    "backup_and_restore": "Backup e Ripristino",
+    "backup_and_restore_desc": "Salva una copia di sicurezza dei tuoi dati o ripristina da un backup precedente.",
+    "create_backup": "Crea Backup Dati",
+    "restore_from_backup": "Ripristina da Backup",
+
+    #nuovi campi inseriti da sistemare IT
+    "manage_shared_account": "Gestisci Conto Condiviso",
+    "debit_day_of_month": "Giorno del Mese",
+    "select_existing_asset_optional": "Seleziona Asset Esistente (opzionale)",
+    "invalid_amount_or_quantity": "Importo o quantità non validi",
+    "create_new_mortgage": "Crea Nuovo Mutuo",
+    "default_payment_subcategory": "Sottocategoria Pagamento Predefinita",
+    "start_date": "Data Inizio",
+    "required_field": "Campo obbligatorio",
+    "delete_account": "Elimina Conto",
+    "auto_debit": "Addebito Automatico",
+    "auto_debit_desc": "Seleziona se l'addebito deve essere eseguito automaticamente ogni mese.",
+    "manage_shared_account": "Gestisci Conto Condiviso",
+    "debit_day_of_month": "Giorno del Mese",
+    "select_existing_asset_optional": "Seleziona Asset Esistente (opzionale)",
+    "invalid_amount_or_quantity": "Importo o quantità non validi",
+    "create_new_mortgage": "Crea Nuovo Mutuo",
+    "default_payment_subcategory": "Sottocategoria Pagamento Predefinita",
+    "start_date": "Data Inizio",
+    "required_field": "Campo obbligatorio",
+    "delete_account": "Elimina Conto",
+    "personal_account": "Conto Personale",
+    "shared_account": "Conto Condiviso",
+    "my_accounts": "I Miei Conti",
+}
@@ -1,5 +1,5 @@
 # Missing translation keys for the BudgetAmico application
-# This file lists keys that need to be added to utils/localization.py
+# This file lists keys that need to be added to utils/locales/<lang>.py
 # Each language dictionary contains the proper translations for all supported languages.
 
 MISSING_STRINGS = {
@@ -0,0 +1,136 @@
+"""
+Motore di calcolo dei piani di ammortamento.
+
+Genera piani alla francese (rata costante), all'italiana (quota capitale
+costante) e personalizzati (quote capitale fornite dall'utente) calcolando
+tutte le rate in un colpo solo con NumPy, e riassume un piano nei valori che
+la tabella Prestiti tiene aggiornati (rate pagate, residuo, prossima rata...).
+Le rate prodotte hanno la stessa forma delle righe di PianoAmmortamento e si
+scrivono con db.gestione_patrimonio.salva_piano_ammortamento.
+"""
+import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+METODI = ("francese", "italiano", "personalizzato")
+
+
+def _date_scadenza(data_prima_rata: datetime.date, numero_rate: int, mesi_tra_rate: int) -> List[str]:
+    """Scadenze a intervalli di mesi dal giorno della prima rata (troncato a fine mese)."""
+    mesi = np.datetime64(data_prima_rata.strftime('%Y-%m'), 'M') + np.arange(numero_rate) * mesi_tra_rate
+    inizio_mese = mesi.astype('datetime64[D]')
+    giorni_nel_mese = ((mesi + np.timedelta64(1, 'M')).astype('datetime64[D]') - inizio_mese).astype(int)
+    giorni = np.minimum(data_prima_rata.day, giorni_nel_mese) - 1
+    return np.datetime_as_string(inizio_mese + giorni, unit='D').tolist()
+
+
+def _quote_capitale(metodo: str, capitale: float, numero_rate: int, tasso_periodo: float,
+                    quote_capitale: Optional[Sequence[float]]) -> np.ndarray:
+    if metodo == "italiano":
+        return np.full(numero_rate, capitale / numero_rate)
+    if metodo == "personalizzato":
+        quote = np.asarray(quote_capitale, dtype=float)
+        if not np.isclose(quote.sum(), capitale, atol=0.01 * numero_rate):
+            raise ValueError(f"Le quote capitale sommano a {quote.sum():.2f} invece di {capitale:.2f}")
+        return quote
+    # Francese: rata costante R = C*i / (1 - (1+i)^-n), quota capitale k-esima = (R - C*i) * (1+i)^(k-1)
+    if tasso_periodo == 0:
+        return np.full(numero_rate, capitale / numero_rate)
+    rata = capitale * tasso_periodo / (1 - (1 + tasso_periodo) ** -numero_rate)
+    return (rata - capitale * tasso_periodo) * (1 + tasso_periodo) ** np.arange(numero_rate)
+
+
+def genera_piano(capitale: float, tasso_annuo: float, numero_rate: int, data_prima_rata: datetime.date,
+                 metodo: str = "francese", rate_per_anno: int = 12, spese_fisse: float = 0.0,
+                 quote_capitale: Optional[Sequence[float]] = None,
+                 pagate_fino_a: Optional[datetime.date] = None) -> List[Dict]:
+    """
+    Calcola un piano di ammortamento completo.
+
+    Args:
+        capitale: Importo finanziato.
+        tasso_annuo: Tasso nominale annuo in percentuale (es. 3.5).
+        numero_rate: Numero di rate (per 'personalizzato' può essere omesso: vale len(quote_capitale)).
+        data_prima_rata: Scadenza della prima rata; le successive cadono nello stesso giorno del mese.
+        metodo: 'francese', 'italiano' o 'personalizzato'.
+        rate_per_anno: 12 mensile, 4 trimestrale, 2 semestrale, 1 annuale.
+        spese_fisse: Spese aggiunte ad ogni rata (incasso rata, assicurazione...).
+        quote_capitale: Quote capitale di ogni rata, solo per il metodo 'personalizzato'.
+        pagate_fino_a: Le rate con scadenza precedente a questa data sono segnate come pagate.
+
+    Returns:
+        Lista di rate {numero_rata, data_scadenza, importo_rata, quota_capitale, quota_interessi, spese_fisse, stato}.
+        Gli importi sono arrotondati al centesimo e l'ultima quota capitale assorbe gli arrotondamenti.
+    """
+    if metodo not in METODI:
+        raise ValueError(f"Metodo di ammortamento non supportato: {metodo}")
+    if metodo == "personalizzato":
+        if quote_capitale is None:
+            raise ValueError("Il metodo personalizzato richiede le quote capitale")
+        numero_rate = len(quote_capitale)
+    if numero_rate <= 0 or capitale <= 0:
+        return []
+    if 12 % rate_per_anno:
+        raise ValueError(f"Periodicità non supportata: {rate_per_anno} rate l'anno")
+
+    tasso_periodo = tasso_annuo / 100.0 / rate_per_anno
+    quote = np.round(_quote_capitale(metodo, capitale, numero_rate, tasso_periodo, quote_capitale), 2)
+    quote[-1] = round(capitale - quote[:-1].sum(), 2)
+
+    # Debito residuo all'inizio di ogni periodo: gli interessi maturano su questo
+    residuo_iniziale = capitale - np.concatenate(([0.0], np.cumsum(quote)[:-1]))
+    interessi = np.round(residuo_iniziale * tasso_periodo, 2)
+    importi = np.round(quote + interessi + spese_fisse, 2)
+
+    date = _date_scadenza(data_prima_rata, numero_rate, 12 // rate_per_anno)
+    limite = pagate_fino_a.isoformat() if pagate_fino_a else None
+
+    return [
+        {
+            'numero_rata': n,
+            'data_scadenza': d,
+            'importo_rata': imp,
+            'quota_capitale': cap,
+            'quota_interessi': int_,
+            'spese_fisse': float(spese_fisse),
+            'stato': 'pagata' if limite and d < limite else 'da_pagare',
+        }
+        for n, d, imp, cap, int_ in zip(range(1, numero_rate + 1), date, importi.tolist(),
+                                        quote.tolist(), interessi.tolist())
+    ]
+
+
+def riepiloga_piano(rate: Sequence[Dict]) -> Dict:
+    """
+    Valori di riepilogo di un piano, con le stesse chiavi delle colonne piano_* di Prestiti.
+    La prossima rata è la prima 'da_pagare' per data di scadenza.
+    """
+    if not rate:
+        return {
+            'piano_rate_totali': 0, 'piano_rate_pagate': 0, 'piano_residuo': 0.0,
+            'piano_capitale_residuo': 0.0, 'piano_interessi_residui': 0.0,
+            'piano_prossima_rata': None, 'piano_prossima_scadenza': None,
+        }
+    importi = np.array([float(r['importo_rata']) for r in rate])
+    capitale = np.array([float(r['quota_capitale']) for r in rate])
+    interessi = np.array([float(r['quota_interessi']) for r in rate])
+    stati = np.array([r.get('stato', 'da_pagare') for r in rate])
+    da_pagare = stati == 'da_pagare'
+
+    prossima_rata = prossima_scadenza = None
+    if da_pagare.any():
+        indici = np.flatnonzero(da_pagare)
+        ordine = sorted(indici, key=lambda i: (str(rate[i]['data_scadenza']), rate[i]['numero_rata']))
+        prossima_rata = float(importi[ordine[0]])
+        prossima_scadenza = str(rate[ordine[0]]['data_scadenza'])
+
+    return {
+        'piano_rate_totali': len(rate),
+        'piano_rate_pagate': int((stati == 'pagata').sum()),
+        'piano_residuo': round(float(importi[da_pagare].sum()), 2),
+        'piano_capitale_residuo': round(float(capitale[da_pagare].sum()), 2),
+        'piano_interessi_residui': round(float(interessi[da_pagare].sum()), 2),
+        'piano_prossima_rata': prossima_rata,
+        'piano_prossima_scadenza': prossima_scadenza,
+    }
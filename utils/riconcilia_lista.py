@@ -0,0 +1,133 @@
+"""
+Riconciliazione per chiave delle liste di controlli Flet.
+
+Le tab ricostruivano a ogni refresh tutte le righe (controls.clear() e nuovi
+controlli): Flet confronta i figli per identità, quindi ogni riga nuova viene
+rimossa e reinviata per intero al client anche se i dati sono gli stessi.
+RiconciliatoreLista tiene i controlli per chiave stabile (id transazione, id
+asset, id categoria) con la "firma" dei dati da cui sono stati costruiti:
+- firma uguale: il controllo viene riusato così com'è (nessun traffico);
+- firma diversa: il controllo viene aggiornato sul posto con `aggiorna`, se
+  fornito (Flet invia solo le proprietà cambiate), altrimenti ricostruito;
+- chiavi nuove o sparite: solo quei controlli vengono inseriti o rimossi.
+Al contenitore viene assegnata la nuova lista solo se cambia qualcosa;
+l'update resta uno solo per lotto (del chiamante, o `invia=True`).
+
+Il modulo non importa flet: basta un contenitore con `controls`.
+"""
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def firma_predefinita(elemento) -> Any:
+    """Istantanea (superficiale) dei dati della riga, confrontata con ==."""
+    if isinstance(elemento, dict):
+        return tuple(elemento.items())
+    return elemento
+
+
+def _stessi_controlli(attuali, nuovi) -> bool:
+    return len(attuali) == len(nuovi) and all(a is b for a, b in zip(attuali, nuovi))
+
+
+class RiconciliatoreLista:
+    """
+    Mantiene i figli di `contenitore` allineati a una sequenza di elementi.
+
+    chiave(elemento) -> chiave stabile della riga
+    crea(elemento) -> controllo della riga
+    firma(elemento) -> dati da cui dipende il controllo (default: gli item del dict)
+    aggiorna(controllo, elemento) -> aggiorna il controllo sul posto (opzionale)
+    vuoto() -> controllo da mostrare quando non ci sono elementi (opzionale)
+    """
+
+    def __init__(self, contenitore, chiave: Callable[[Any], Hashable], crea: Callable[[Any], Any],
+                 firma: Optional[Callable[[Any], Any]] = None,
+                 aggiorna: Optional[Callable[[Any, Any], None]] = None,
+                 vuoto: Optional[Callable[[], Any]] = None):
+        self.contenitore = contenitore
+        self.chiave = chiave
+        self.crea = crea
+        self.firma = firma or firma_predefinita
+        self.aggiorna = aggiorna
+        self.vuoto = vuoto
+        self._righe: Dict[Hashable, tuple] = {}
+        self._contesto = None
+        self._controllo_vuoto = None
+
+    def riconcilia(self, elementi: Iterable, contesto: Any = None, intestazione=(), coda=(),
+                   invia: bool = False) -> Dict[str, int]:
+        """
+        Allinea il contenitore agli elementi, nell'ordine dato. `contesto`
+        (lingua, valuta, tema...) vale per tutte le righe: se cambia, ogni
+        riga è considerata modificata e ricostruita. `intestazione` e `coda` sono controlli
+        fissi messi prima e dopo le righe. Restituisce il conteggio di righe
+        riusate, aggiornate, create e rimosse.
+        """
+        esito = {"riusate": 0, "aggiornate": 0, "create": 0, "rimosse": 0}
+        contesto_cambiato = contesto != self._contesto
+        self._contesto = contesto
+        if contesto_cambiato:
+            self._controllo_vuoto = None
+
+        nuove: Dict[Hashable, tuple] = {}
+        controlli = []
+        for elemento in elementi:
+            chiave = self.chiave(elemento)
+            firma = self.firma(elemento)
+            if chiave in nuove:
+                # Chiave ripetuta: la riga viene mostrata ma non memorizzata
+                logger.warning(f"Chiave duplicata nella lista: {chiave!r}")
+                controlli.append(self.crea(elemento))
+                esito["create"] += 1
+                continue
+
+            precedente = self._righe.get(chiave)
+            if precedente is None:
+                controllo = self.crea(elemento)
+                esito["create"] += 1
+            elif precedente[0] == firma and not contesto_cambiato:
+                controllo = precedente[1]
+                esito["riusate"] += 1
+            elif self.aggiorna is not None and not contesto_cambiato:
+                controllo = precedente[1]
+                self.aggiorna(controllo, elemento)
+                esito["aggiornate"] += 1
+            else:
+                controllo = self.crea(elemento)
+                esito["create"] += 1
+            nuove[chiave] = (firma, controllo)
+            controlli.append(controllo)
+
+        esito["rimosse"] = sum(1 for chiave in self._righe if chiave not in nuove)
+        self._righe = nuove
+
+        if not controlli and self.vuoto is not None:
+            if self._controllo_vuoto is None:
+                self._controllo_vuoto = self.vuoto()
+            controlli = [self._controllo_vuoto]
+
+        nuovi = [*intestazione, *controlli, *coda]
+        lista_cambiata = not _stessi_controlli(self.contenitore.controls, nuovi)
+        if lista_cambiata:
+            self.contenitore.controls = nuovi
+        if invia and (lista_cambiata or esito["aggiornate"]):
+            try:
+                self.contenitore.update()
+            except Exception as e:
+                # Contenitore non ancora sulla pagina: lo invierà l'update della pagina
+                logger.debug(f"Update lista rimandato: {e}")
+        return esito
+
+    def __len__(self) -> int:
+        """Righe attualmente memorizzate (0 prima della prima riconciliazione)."""
+        return len(self._righe)
+
+    def svuota(self) -> None:
+        """Dimentica i controlli memorizzati (la prossima riconciliazione li ricrea)."""
+        self._righe.clear()
+        self._contesto = None
+        self._controllo_vuoto = None
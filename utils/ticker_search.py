@@ -1,12 +1,19 @@
 """
 Componente UI riutilizzabile per la ricerca ticker con autocomplete.
-Usa un Dropdown che si popola con i risultati della ricerca.
+Usa un Dropdown che si popola con i risultati della ricerca: prima dall'indice
+locale dei simboli (utils/indice_ticker.py), poi da Yahoo Finance se serve.
 """
 import flet as ft
 from typing import Callable, Optional
 import threading
+import time
 
 from utils.styles import AppStyles, AppColors
+from utils.indice_ticker import ottieni_indice_ticker
+
+# Il worker della ricerca remota termina dopo questo tempo senza richieste
+# (viene ricreato alla prima ricerca successiva)
+_INATTIVITA_WORKER_S = 60.0
 
 
 class TickerSearchField(ft.Column):
@@ -29,8 +36,14 @@ class TickerSearchField(ft.Column):
         
         self.on_select_callback = on_select
         self.show_borsa = show_borsa
-        self._search_timer = None
-        self._last_query = ""
+        # Ricerca remota: un worker per campo, la query più recente e la sua scadenza (debounce).
+        # Il worker termina allo smontaggio del campo (o dopo un periodo di inattività).
+        self._cond_remota = threading.Condition()
+        self._worker_remoto = None
+        self._fermato = threading.Event()
+        self._query_remota = None
+        self._forza_remota = False
+        self._scadenza_remota = 0.0
         self._risultati_cache = {}  # {ticker: risultato dict}
         self._controller = controller  # Riferimento stabile
         
@@ -58,72 +71,145 @@ class TickerSearchField(ft.Column):
         ]
     
     def _on_search_change(self, e):
-        """Gestisce cambio testo con debounce."""
+        """Ricerca sull'indice locale ad ogni tasto; la rete solo se l'indice non trova nulla."""
         query = e.control.value.strip()
         
         # Nascondi dropdown se query vuota
         if len(query) < 2:
+            self._annulla_ricerca_remota()
             self.dd_risultati.visible = False
             self._safe_update()
             return
         
-        # Debounce: aspetta 500ms prima di cercare
-        if self._search_timer:
-            self._search_timer.cancel()
+        try:
+            risultati = self._cerca_locale(query)
+        except Exception as ex:
+            print(f"Errore ricerca ticker locale: {ex}")
+            risultati = []
         
-        self._search_timer = threading.Timer(0.5, self._esegui_ricerca, [query])
-        self._search_timer.start()
+        if risultati:
+            self._annulla_ricerca_remota()
+            self._mostra_risultati(risultati)
+        else:
+            # Debounce: la ricerca remota parte 500ms dopo l'ultimo tasto
+            self._richiedi_ricerca_remota(query, ritardo=0.5)
     
     def _on_search_submit(self, e):
-        """Quando l'utente preme invio, cerca subito."""
+        """Quando l'utente preme invio, cerca subito anche in rete."""
         query = e.control.value.strip()
         if len(query) >= 2:
-            self._esegui_ricerca(query)
+            self._richiedi_ricerca_remota(query, ritardo=0, forza=True)
+    
+    def _cerca_locale(self, query: str, limit: int = 10):
+        """Asset posseduti (indice della sessione, solo in memoria) e poi indice condiviso."""
+        indici = [getattr(self._controller, 'indice_ticker_sessione', None), ottieni_indice_ticker()]
+        risultati = []
+        visti = set()
+        for indice in indici:
+            if indice is None:
+                continue
+            for r in indice.cerca_locale(query, limit=limit):
+                if r['ticker'] not in visti:
+                    visti.add(r['ticker'])
+                    risultati.append(r)
+        return risultati[:limit]
+    
+    def _richiedi_ricerca_remota(self, query: str, ritardo: float, forza: bool = False):
+        """Affida la query al worker della ricerca remota (un solo thread per campo, riusato)."""
+        with self._cond_remota:
+            self._fermato.clear()
+            self._query_remota = query
+            self._forza_remota = forza
+            self._scadenza_remota = time.monotonic() + ritardo
+            if self._worker_remoto is None:
+                self._worker_remoto = threading.Thread(target=self._ciclo_ricerca_remota, daemon=True)
+                self._worker_remoto.start()
+            self._cond_remota.notify()
+    
+    def _annulla_ricerca_remota(self):
+        with self._cond_remota:
+            self._query_remota = None
+    
+    def ferma_ricerca(self):
+        """Annulla la ricerca in corso e fa terminare il worker (chiamata allo smontaggio)."""
+        with self._cond_remota:
+            self._query_remota = None
+            self._fermato.set()
+            self._cond_remota.notify_all()
+    
+    def will_unmount(self):
+        self.ferma_ricerca()
+        super().will_unmount()
     
-    def _esegui_ricerca(self, query: str):
-        """Esegue la ricerca in background."""
+    def _ciclo_ricerca_remota(self):
+        while True:
+            with self._cond_remota:
+                inattivo_da = time.monotonic()
+                while self._query_remota is None and not self._fermato.is_set():
+                    residuo = _INATTIVITA_WORKER_S - (time.monotonic() - inattivo_da)
+                    if residuo <= 0:
+                        break
+                    self._cond_remota.wait(residuo)
+                if self._query_remota is None or self._fermato.is_set():
+                    # Campo smontato o inattivo: il prossimo _richiedi_ricerca_remota ne avvia un altro
+                    self._worker_remoto = None
+                    return
+                attesa = self._scadenza_remota - time.monotonic()
+                if attesa > 0:
+                    # Nuovi tasti spostano la scadenza: si riverifica al risveglio
+                    self._cond_remota.wait(attesa)
+                    continue
+                query, forza = self._query_remota, self._forza_remota
+                self._query_remota = None
+            self._esegui_ricerca(query, forza)
+    
+    def _esegui_ricerca(self, query: str, forza: bool = False):
+        """Esegue la ricerca (indice, LRU, rete) nel thread del worker."""
         try:
-            from utils.yfinance_manager import cerca_ticker
-            risultati = cerca_ticker(query, limit=10)
-            
-            # Aggiorna dropdown
-            self._risultati_cache.clear()
-            self.dd_risultati.options.clear()
-            
-            if risultati:
-                for r in risultati:
-                    ticker = r['ticker']
-                    nome = r['nome']
-                    borsa = r.get('borsa', '')
-                    
-                    # Salva in cache per recupero successivo
-                    self._risultati_cache[ticker] = r
-                    
-                    # Crea opzione dropdown
-                    if self.show_borsa and borsa:
-                        label = f"{ticker} ({borsa}) - {nome[:30]}"
-                    else:
-                        label = f"{ticker} - {nome[:35]}"
-                    
-                    self.dd_risultati.options.append(
-                        ft.dropdown.Option(key=ticker, text=label)
-                    )
-                
-                self.dd_risultati.visible = True
-                self.dd_risultati.value = None
-            else:
-                self.dd_risultati.options.append(
-                    ft.dropdown.Option(key="", text="Nessun risultato")
-                )
-                self.dd_risultati.visible = True
-            
-            self._safe_update()
-            
+            risultati = ottieni_indice_ticker().cerca(query, limit=10, forza_remoto=forza)
+            # Scarta risultati di una query superata dalla digitazione
+            if (self.txt_search.value or "").strip() != query:
+                return
+            self._mostra_risultati(risultati)
         except Exception as e:
             print(f"Errore ricerca ticker: {e}")
             import traceback
             traceback.print_exc()
     
+    def _mostra_risultati(self, risultati):
+        """Popola il dropdown con i risultati."""
+        self._risultati_cache.clear()
+        self.dd_risultati.options.clear()
+        
+        if risultati:
+            for r in risultati:
+                ticker = r['ticker']
+                nome = r['nome']
+                borsa = r.get('borsa', '')
+                
+                # Salva in cache per recupero successivo
+                self._risultati_cache[ticker] = r
+                
+                # Crea opzione dropdown
+                if self.show_borsa and borsa:
+                    label = f"{ticker} ({borsa}) - {nome[:30]}"
+                else:
+                    label = f"{ticker} - {nome[:35]}"
+                
+                self.dd_risultati.options.append(
+                    ft.dropdown.Option(key=ticker, text=label)
+                )
+            
+            self.dd_risultati.visible = True
+            self.dd_risultati.value = None
+        else:
+            self.dd_risultati.options.append(
+                ft.dropdown.Option(key="", text="Nessun risultato")
+            )
+            self.dd_risultati.visible = True
+        
+        self._safe_update()
+    
     def _on_dropdown_change(self, e):
         """Quando l'utente seleziona un ticker dal dropdown."""
         ticker = e.control.value
@@ -159,6 +245,7 @@ class TickerSearchField(ft.Column):
     
     def reset(self):
         """Resetta il campo di ricerca."""
+        self._annulla_ricerca_remota()
         self.txt_search.value = ""
         self.dd_risultati.visible = False
         self.dd_risultati.options.clear()
@@ -3,6 +3,8 @@ Modulo per recuperare i prezzi degli asset finanziari usando chiamate HTTP diret
 Usa solo 'requests' per massima compatibilità con PyInstaller.
 """
 from typing import Optional, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+import re
 import requests
 import json
 from utils.logger import setup_logger
@@ -62,9 +64,15 @@ def ottieni_prezzo_asset(ticker: str) -> Optional[float]:
         return None
 
 
+# Richieste parallele verso Yahoo: abbastanza da non serializzare i timeout,
+# poche abbastanza da non farsi limitare
+MAX_RICHIESTE_PARALLELE = 8
+
+
 def ottieni_prezzi_multipli(tickers: List[str]) -> Dict[str, Optional[float]]:
     """
     Recupera i prezzi correnti di più asset contemporaneamente.
+    I ticker duplicati vengono richiesti una sola volta.
     
     Args:
         tickers: Lista di simboli ticker
@@ -72,12 +80,12 @@ def ottieni_prezzi_multipli(tickers: List[str]) -> Dict[str, Optional[float]]:
     Returns:
         Dizionario con ticker come chiave e prezzo come valore
     """
-    risultati = {}
-    
-    for ticker in tickers:
-        risultati[ticker] = ottieni_prezzo_asset(ticker)
-    
-    return risultati
+    unici = list(dict.fromkeys(t for t in tickers if t))
+    if len(unici) <= 1:
+        return {ticker: ottieni_prezzo_asset(ticker) for ticker in unici}
+
+    with ThreadPoolExecutor(max_workers=min(MAX_RICHIESTE_PARALLELE, len(unici))) as pool:
+        return dict(zip(unici, pool.map(ottieni_prezzo_asset, unici)))
 
 
 def ottieni_info_asset(ticker: str) -> Optional[Dict]:
@@ -246,6 +254,53 @@ def ottieni_storico_asset(ticker: str, anni: int = 5) -> List[Dict]:
         return []
 
 
+# Mappa nomi borsa (usabili nella query) a codici e suffissi ticker
+BORSE_KEYWORDS = {
+    'milano': ('MIL', '.MI'),
+    'xetra': ('GER', '.DE'),
+    'frankfurt': ('FRA', '.F'),
+    'parigi': ('PAR', '.PA'),
+    'londra': ('LON', '.L'),
+    'amsterdam': ('AMS', '.AS'),
+    'bruxelles': ('BRU', '.BR'),
+    'madrid': ('MCE', '.MC'),
+    'nasdaq': ('NMS', ''),
+    'nyse': ('NYQ', ''),
+    'usa': ('NMS', ''),
+    'america': ('NMS', ''),
+    'mot': ('MIL', '.MI'), # Aggiunto per obbligazioni
+}
+
+# Mappa codici borsa a nomi leggibili
+BORSE_MAP = {
+    'NMS': 'NASDAQ',
+    'NYQ': 'NYSE',
+    'GER': 'XETRA',
+    'FRA': 'Frankfurt',
+    'MIL': 'Milano',
+    'PAR': 'Parigi',
+    'LON': 'Londra',
+    'AMS': 'Amsterdam',
+    'ETR': 'XETRA',
+    'BRU': 'Bruxelles',
+    'MCE': 'Madrid',
+}
+
+
+def separa_filtro_borsa(query: str):
+    """
+    Estrae l'eventuale nome borsa dalla query: "Apple Milano" -> ("apple", "MIL").
+    Senza borsa ritorna (query, None).
+    """
+    query_lower = query.lower()
+    for borsa_nome, (codice, suffisso) in BORSE_KEYWORDS.items():
+        if borsa_nome in query_lower:
+            # Rimuovi il nome borsa dalla query
+            query_pulita = re.sub(rf'\b{borsa_nome}\b', '', query_lower, flags=re.IGNORECASE).strip()
+            return query_pulita, codice
+    return query, None
+
+
 def cerca_ticker(query: str, limit: int = 10) -> List[Dict]:
     """
     Cerca ticker su Yahoo Finance per nome o simbolo.
@@ -264,36 +319,8 @@ def cerca_ticker(query: str, limit: int = 10) -> List[Dict]:
         
     query = query.strip()
 
-    
-    # Mappa nomi borsa a codici e suffissi ticker
-    borse_keywords = {
-        'milano': ('MIL', '.MI'),
-        'xetra': ('GER', '.DE'),
-        'frankfurt': ('FRA', '.F'),
-        'parigi': ('PAR', '.PA'),
-        'londra': ('LON', '.L'),
-        'amsterdam': ('AMS', '.AS'),
-        'bruxelles': ('BRU', '.BR'),
-        'madrid': ('MCE', '.MC'),
-        'nasdaq': ('NMS', ''),
-        'nyse': ('NYQ', ''),
-        'usa': ('NMS', ''),
-        'america': ('NMS', ''),
-        'mot': ('MIL', '.MI'), # Aggiunto per obbligazioni
-    }
-    
     # Cerca se c'è un filtro borsa nella query
-    filtro_borsa = None
-    query_pulita = query
-    query_lower = query.lower()
-    
-    for borsa_nome, (codice, suffisso) in borse_keywords.items():
-        if borsa_nome in query_lower:
-            filtro_borsa = codice
-            # Rimuovi il nome borsa dalla query
-            import re
-            query_pulita = re.sub(rf'\b{borsa_nome}\b', '', query_lower, flags=re.IGNORECASE).strip()
-            break
+    query_pulita, filtro_borsa = separa_filtro_borsa(query)
     
     try:
         url = "https://query2.finance.yahoo.com/v1/finance/search"
@@ -316,21 +343,6 @@ def cerca_ticker(query: str, limit: int = 10) -> List[Dict]:
         
         data = response.json()
         
-        # Mappa codici borsa a nomi leggibili
-        borse_map = {
-            'NMS': 'NASDAQ',
-            'NYQ': 'NYSE',
-            'GER': 'XETRA',
-            'FRA': 'Frankfurt',
-            'MIL': 'Milano',
-            'PAR': 'Parigi',
-            'LON': 'Londra',
-            'AMS': 'Amsterdam',
-            'ETR': 'XETRA',
-            'BRU': 'Bruxelles',
-            'MCE': 'Madrid',
-        }
-        
         risultati = []
         if 'quotes' in data:
             for quote in data['quotes']:
@@ -344,7 +356,7 @@ def cerca_ticker(query: str, limit: int = 10) -> List[Dict]:
                 if filtro_borsa and borsa != filtro_borsa:
                     continue
                 
-                borsa_nome = borse_map.get(borsa, borsa)
+                borsa_nome = BORSE_MAP.get(borsa, borsa)
                 
                 risultati.append({
                     'ticker': ticker,
@@ -364,7 +376,6 @@ def cerca_ticker(query: str, limit: int = 10) -> List[Dict]:
             candidates = []
             
             query_upper = query.upper()
-            import re
             
             # 1. Caso ISIN con suffisso (es. IT0005467482.MI)
             # Regex: 2 lettere + 9-10 alfanumerici + punto + suffix
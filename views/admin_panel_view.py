@@ -9,7 +9,7 @@ import flet as ft
 import os
 from datetime import datetime, timedelta
 from typing import Optional
-from utils.db_logger import get_logs, get_log_stats, get_distinct_components, cleanup_old_logs
+from utils.db_logger import get_logs, get_log_stats, get_distinct_components, cleanup_old_logs, cursore_log
 from utils.db_log_handler import get_all_components, update_logger_config, invalidate_config_cache
 from utils.styles import AppColors
 from db.gestione_db import ottieni_versione_db
@@ -57,6 +57,8 @@ class AdminPanelView:
         self.current_filter_component = None
         self.current_page = 0
         self.logs_per_page = 50
+        # Cursori keyset (timestamp, id_log) di inizio pagina: indice = numero pagina
+        self._log_cursors = [None]
         
         # --- TAB CONTROLLER ---
         self.tabs = ft.Tabs(
@@ -341,9 +343,14 @@ class AdminPanelView:
         
         logs = get_logs(
             livello=level, componente=component,
-            limit=self.logs_per_page, offset=self.current_page * self.logs_per_page
+            limit=self.logs_per_page, prima_di=self._log_cursors[self.current_page]
         )
         
+        # Memorizza il cursore della pagina successiva (solo se la pagina è piena)
+        del self._log_cursors[self.current_page + 1:]
+        if len(logs) == self.logs_per_page:
+            self._log_cursors.append(cursore_log(logs[-1]))
+        
         new_rows = []
         for log in logs:
             timestamp = log.get("timestamp")
@@ -386,6 +393,7 @@ class AdminPanelView:
 
     def _on_filter_change(self, e):
         self.current_page = 0
+        self._log_cursors = [None]
         self._load_logs()
         self.page.update()
 
@@ -396,6 +404,8 @@ class AdminPanelView:
             self.page.update()
 
     def _on_next_page(self, e):
+        if len(self._log_cursors) <= self.current_page + 1:
+            return  # Nessuna pagina successiva
         self.current_page += 1
         self._load_logs()
         self.page.update()
@@ -472,6 +482,8 @@ class AdminPanelView:
                 ft.DataColumn(ft.Text("Cod. Famiglia", weight=ft.FontWeight.BOLD)),
                 ft.DataColumn(ft.Text("Email", weight=ft.FontWeight.BOLD), on_sort=self._on_users_sort),
                 ft.DataColumn(ft.Text("Nome", weight=ft.FontWeight.BOLD), on_sort=self._on_users_sort),
+                ft.DataColumn(ft.Text("Ultimo Accesso", weight=ft.FontWeight.BOLD), on_sort=self._on_users_sort),
+                ft.DataColumn(ft.Text("Accessi 30gg", weight=ft.FontWeight.BOLD), numeric=True, on_sort=self._on_users_sort),
                 ft.DataColumn(ft.Text("Azioni", weight=ft.FontWeight.BOLD)),
             ],
             rows=[],
@@ -481,7 +493,22 @@ class AdminPanelView:
             sort_column_index=0,
             sort_ascending=True,
         )
+        # Filtro attività (applicato lato SQL su Utenti.ultimo_accesso)
+        self.users_activity_filter = ft.Dropdown(
+            label="Attività",
+            width=200,
+            value="tutti",
+            options=[
+                ft.dropdown.Option("tutti", "Tutti"),
+                ft.dropdown.Option("attivi_7", "Attivi ultimi 7gg"),
+                ft.dropdown.Option("attivi_30", "Attivi ultimi 30gg"),
+                ft.dropdown.Option("inattivi_30", "Inattivi da 30gg"),
+                ft.dropdown.Option("inattivi_90", "Inattivi da 90gg"),
+            ],
+            on_change=lambda e: self._load_users(use_cache=False)
+        )
         self._cached_users = []
+        self._richiesta_utenti = None
 
     def _init_access_stats_ui(self):
         self.stats_attivi_ora = ft.Text("0", size=24, weight=ft.FontWeight.BOLD, color=ft.Colors.GREEN)
@@ -538,7 +565,7 @@ class AdminPanelView:
                 ]),
                 self._build_access_stats_row(),
                 ft.Divider(height=20, color=ft.Colors.TRANSPARENT),
-                ft.Row([self.users_search]),
+                ft.Row([self.users_search, self.users_activity_filter]),
                 ft.Container(content=self.users_table, expand=True, border=ft.border.all(1, ft.Colors.GREY_200), border_radius=8)
             ]),
             padding=20, expand=True
@@ -548,9 +575,26 @@ class AdminPanelView:
         # Lazy import to avoid circular dependency
         from db.gestione_db import get_all_users, ottieni_statistiche_accessi
         
-        if not use_cache or not self._cached_users:
-            self._cached_users = get_all_users()
-            
+        # Ordinamento richiesto dalla tabella: eseguito da get_all_users (SQL o, per i
+        # campi cifrati, dopo la decrittazione); la ricerca filtra mantenendo l'ordine
+        # 0:Sospeso, 1:Algo, 2:Username, 3:Cod.Utente, 4:Cod.Famiglia (not sortable), 5:Email, 6:Nome,
+        # 7:Ultimo Accesso, 8:Accessi 30gg
+        sort_keys = {0: 'sospeso', 2: 'username', 3: 'codice_utente', 5: 'email', 6: 'nome',
+                     7: 'ultimo_accesso', 8: 'accessi_30d'}
+        sort_key = sort_keys.get(self.users_table.sort_column_index, 'username')
+        discendente = not self.users_table.sort_ascending
+        filtro = self.users_activity_filter.value or "tutti"
+        richiesta = (filtro, sort_key, discendente)
+
+        ricarica_statistiche = not use_cache or not self._cached_users
+        if ricarica_statistiche or richiesta != self._richiesta_utenti:
+            attivi_giorni = int(filtro.split("_")[1]) if filtro.startswith("attivi_") else None
+            inattivi_giorni = int(filtro.split("_")[1]) if filtro.startswith("inattivi_") else None
+            self._cached_users = get_all_users(ordina_per=sort_key, discendente=discendente,
+                                               attivi_ultimi_giorni=attivi_giorni, inattivi_da_giorni=inattivi_giorni)
+            self._richiesta_utenti = richiesta
+
+        if ricarica_statistiche:
             # Carica anche le statistiche degli accessi
             stats = ottieni_statistiche_accessi()
             self.stats_attivi_ora.value = str(stats.get('attivi_ora', 0))
@@ -593,20 +637,7 @@ class AdminPanelView:
             if search_query in full_text:
                 filtered_users.append(u)
 
-        # 2. Sorting
-        col_index = self.users_table.sort_column_index
-        ascending = self.users_table.sort_ascending
-        
-        # 0:Sospeso, 1:Algo, 2:Username, 3:Cod.Utente, 4:Cod.Famiglia (not sortable), 5:Email, 6:Nome
-        sort_keys = {0: 'sospeso', 2: 'username', 3: 'codice_utente', 5: 'email', 6: 'nome'}
-        sort_key = sort_keys.get(col_index, 'username')
-        
-        filtered_users.sort(
-            key=lambda x: (x.get(sort_key) if x.get(sort_key) is not None else "") if isinstance(x.get(sort_key), str) else (x.get(sort_key) or 0), 
-            reverse=not ascending
-        )
-
-        # 3. Build Rows
+        # 2. Build Rows
         self.users_table.rows = []
         for u in filtered_users:
             self.users_table.rows.append(
@@ -624,6 +655,8 @@ class AdminPanelView:
                     ft.DataCell(ft.Text(u.get('famiglie', '-'), size=11, weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_900)),
                     ft.DataCell(ft.Text(u['email'], weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_900)),
                     ft.DataCell(ft.Text(f"{(u.get('nome') or '')} {(u.get('cognome') or '')}", weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_900)),
+                    ft.DataCell(ft.Text(u['ultimo_accesso'].strftime("%d/%m/%Y %H:%M") if u.get('ultimo_accesso') else "-", size=11)),
+                    ft.DataCell(ft.Text(str(u.get('accessi_30d', 0)), size=11)),
                     ft.DataCell(ft.Row([
                         ft.IconButton(
                             icon=ft.Icons.LOCK_RESET, tooltip="Invia Credenziali / Reset Password",
@@ -778,74 +811,69 @@ class AdminPanelView:
     # =========================================================================
     def _init_families_tab_ui(self):
         self.families_search = ft.TextField(
-            label="Cerca Famiglia...", 
+            label="Cerca per ID o codice famiglia...", 
             prefix_icon=ft.Icons.SEARCH,
             width=300,
-            on_change=lambda e: self._load_families(use_cache=True)
+            on_submit=lambda e: self._on_families_filter_change()
         )
 
         self.families_table = ft.DataTable(
             columns=[
-                ft.DataColumn(ft.Text("Nome Famiglia", weight=ft.FontWeight.BOLD), on_sort=self._on_families_sort),
-                ft.DataColumn(ft.Text("Codice Famiglia", weight=ft.FontWeight.BOLD), on_sort=self._on_families_sort),
+                ft.DataColumn(ft.Text("Nome Famiglia", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Codice Famiglia", weight=ft.FontWeight.BOLD)),
                 ft.DataColumn(ft.Text("Cloud", weight=ft.FontWeight.BOLD)),
                 ft.DataColumn(ft.Text("Utenti", weight=ft.FontWeight.BOLD), numeric=True, on_sort=self._on_families_sort),
+                ft.DataColumn(ft.Text("Ultima Attività", weight=ft.FontWeight.BOLD), on_sort=self._on_families_sort),
+                ft.DataColumn(ft.Text("Spazio", weight=ft.FontWeight.BOLD), numeric=True, on_sort=self._on_families_sort),
                 ft.DataColumn(ft.Text("Azioni", weight=ft.FontWeight.BOLD)),
             ],
             rows=[],
             border=ft.border.all(1, ft.Colors.GREY_300),
             border_radius=8,
             heading_row_color=ft.Colors.BLUE_GREY_50,
-            sort_column_index=0,
+            sort_column_index=None,
             sort_ascending=True,
         )
-        self._cached_families = []
+        # Ordinamento e paginazione lato server (Directory_Famiglie)
+        self.families_page = 0
+        self.families_per_page = 50
+        self.families_total = 0
+        self.families_pagination_text = ft.Text("Pagina 1")
 
     def _build_families_tab_content(self):
         return ft.Container(
             content=ft.Column([
                 ft.Row([
                     ft.Text("Gestione Famiglie", size=20, weight=ft.FontWeight.BOLD),
-                    ft.IconButton(icon=ft.Icons.REFRESH, tooltip="Ricarica Lista", on_click=lambda e: self._load_families_refresh())
+                    ft.IconButton(icon=ft.Icons.REFRESH, tooltip="Ricalcola statistiche e ricarica", on_click=lambda e: self._load_families_refresh())
                 ]),
                 ft.Row([self.families_search]),
-                ft.Container(content=self.families_table, expand=True, border=ft.border.all(1, ft.Colors.GREY_200), border_radius=8)
+                ft.Container(content=self.families_table, expand=True, border=ft.border.all(1, ft.Colors.GREY_200), border_radius=8),
+                ft.Row([
+                    ft.IconButton(icon=ft.Icons.CHEVRON_LEFT, on_click=self._on_families_prev_page),
+                    self.families_pagination_text,
+                    ft.IconButton(icon=ft.Icons.CHEVRON_RIGHT, on_click=self._on_families_next_page),
+                ], alignment=ft.MainAxisAlignment.CENTER),
             ]),
             padding=20, expand=True
         )
 
     def _load_families(self, use_cache=False):
-        from db.gestione_db import get_all_families
-        
-        if not use_cache or not self._cached_families:
-            self._cached_families = get_all_families()
+        from db.gestione_db import ottieni_pagina_famiglie
 
-        # 1. Search Filter
-        search_query = self.families_search.value.lower() if self.families_search.value else ""
-        filtered_families = []
-        
-        for f in self._cached_families:
-             # Combine fields for search
-            full_text = f"{f['id_famiglia']} {f['nome_famiglia']}".lower()
-            if search_query in full_text:
-                filtered_families.append(f)
-
-        # 2. Sorting
+        # 3:Utenti, 4:Ultima attività, 5:Spazio (nome e codice sono cifrati: non ordinabili lato server)
+        sort_keys = {3: 'num_membri', 4: 'ultima_attivita', 5: 'dimensione_byte'}
         col_index = self.families_table.sort_column_index
-        ascending = self.families_table.sort_ascending
-        
-        # 0:Nome, 1:Codice, 2:Cloud (not sortable), 3:Utenti
-        sort_keys = {0: 'nome_famiglia', 1: 'codice_famiglia', 3: 'num_membri'}
-        sort_key = sort_keys.get(col_index, 'nome_famiglia')
-        
-        filtered_families.sort(
-            key=lambda x: (x.get(sort_key) if x.get(sort_key) is not None else "") if isinstance(x.get(sort_key), str) else (x.get(sort_key) or 0), 
-            reverse=not ascending
+        families, self.families_total = ottieni_pagina_famiglie(
+            pagina=self.families_page + 1,
+            per_pagina=self.families_per_page,
+            ordina_per=sort_keys.get(col_index, 'id_famiglia'),
+            discendente=col_index in sort_keys and not self.families_table.sort_ascending,
+            cerca=self.families_search.value,
         )
 
-        # 3. Build Rows
         self.families_table.rows = []
-        for f in filtered_families:
+        for f in families:
             self.families_table.rows.append(
                 ft.DataRow(cells=[
                     ft.DataCell(ft.Text(f['nome_famiglia'], weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_900)),
@@ -853,6 +881,8 @@ class AdminPanelView:
                     ft.DataCell(ft.Icon(ft.Icons.CLOUD_QUEUE if f.get('cloud_enabled') else ft.Icons.CLOUD_OFF, 
                                        color=ft.Colors.BLUE if f.get('cloud_enabled') else ft.Colors.GREY_400, size=20)),
                     ft.DataCell(ft.Text(str(f.get('num_membri', 0)), weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_900)),
+                    ft.DataCell(ft.Text(f['ultima_attivita'].strftime("%d/%m/%Y %H:%M") if f.get('ultima_attivita') else "-", size=11)),
+                    ft.DataCell(ft.Text(self._format_bytes(f.get('dimensione_byte', 0)), size=11)),
                     ft.DataCell(
                         ft.Row([
                             ft.IconButton(
@@ -869,14 +899,34 @@ class AdminPanelView:
                     )
                 ])
             )
-            
+
+        pagine = max(1, -(-self.families_total // self.families_per_page))
+        self.families_pagination_text.value = f"Pagina {self.families_page + 1} di {pagine} ({self.families_total} famiglie)"
         self.page.update()
 
     def _on_families_sort(self, e):
-         self._sort_datatable(e, self.families_table, [], lambda: self._load_families(use_cache=True))
+        self.families_page = 0
+        self._sort_datatable(e, self.families_table, [], self._load_families)
+
+    def _on_families_filter_change(self):
+        self.families_page = 0
+        self._load_families()
+
+    def _on_families_prev_page(self, e):
+        if self.families_page > 0:
+            self.families_page -= 1
+            self._load_families()
+
+    def _on_families_next_page(self, e):
+        if (self.families_page + 1) * self.families_per_page >= self.families_total:
+            return  # Nessuna pagina successiva
+        self.families_page += 1
+        self._load_families()
 
     def _load_families_refresh(self):
-        self._load_families(use_cache=False)
+        from db.gestione_db import aggiorna_statistiche_famiglie
+        aggiorna_statistiche_famiglie()
+        self._load_families()
         self.page.update()
 
     def _confirm_delete_family(self, family_id, family_name):
@@ -885,7 +935,7 @@ class AdminPanelView:
             success, msg = delete_family(family_id)
             if success:
                 self.page.snack_bar = ft.SnackBar(ft.Text(f"Famiglia {family_name} eliminata."), bgcolor=ft.Colors.GREEN)
-                self._load_families_refresh()
+                self._load_families()
             else:
                 self.page.snack_bar = ft.SnackBar(ft.Text(f"Errore: {msg}"), bgcolor=ft.Colors.RED)
             self.page.snack_bar.open = True
@@ -1387,6 +1437,23 @@ class AdminPanelView:
         )
         self.total_db_size_text = ft.Text("Dimensione Totale DB: -", size=16, weight=ft.FontWeight.BOLD)
         self.pool_metrics_text = ft.Text("Pool Connessioni: -", size=14, color=ft.Colors.BLUE_GREY_600)
+
+        # Strumentazione query (db.strumentazione_query)
+        self.query_stats_text = ft.Text("Strumentazione query: -", size=14, color=ft.Colors.BLUE_GREY_600)
+        self.query_stats_table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Query", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Esecuzioni", weight=ft.FontWeight.BOLD), numeric=True),
+                ft.DataColumn(ft.Text("Tempo Tot. (ms)", weight=ft.FontWeight.BOLD), numeric=True),
+                ft.DataColumn(ft.Text("Medio (ms)", weight=ft.FontWeight.BOLD), numeric=True),
+                ft.DataColumn(ft.Text("Righe", weight=ft.FontWeight.BOLD), numeric=True),
+                ft.DataColumn(ft.Text("Chiamante", weight=ft.FontWeight.BOLD)),
+            ],
+            rows=[],
+            border=ft.border.all(1, ft.Colors.GREY_300),
+            border_radius=8,
+            heading_row_color=ft.Colors.BLUE_GREY_50,
+        )
         
         # Cache locale per i dati grezzi (per evitare query continue su search/sort)
         self._cached_db_stats_tables = []
@@ -1412,8 +1479,20 @@ class AdminPanelView:
                     content=self.db_stats_table,
                     expand=True, border=ft.border.all(1, ft.Colors.GREY_200), border_radius=8,
                     padding=5
+                ),
+                ft.Container(height=20),
+                ft.Row([
+                    ft.Text("Query più costose", size=18, weight=ft.FontWeight.BOLD),
+                    ft.IconButton(icon=ft.Icons.SAVE_ALT, tooltip="Esporta su file (JSON)", on_click=self._export_query_stats),
+                    ft.IconButton(icon=ft.Icons.DELETE_SWEEP, tooltip="Azzera statistiche", on_click=self._reset_query_stats),
+                ]),
+                self.query_stats_text,
+                ft.Container(
+                    content=self.query_stats_table,
+                    border=ft.border.all(1, ft.Colors.GREY_200), border_radius=8,
+                    padding=5
                 )
-            ]),
+            ], scroll=ft.ScrollMode.AUTO),
             padding=20, expand=True
         )
 
@@ -1445,6 +1524,7 @@ class AdminPanelView:
                 f"Connessioni Pool: {m['pool_idle']} idle, {m['active_now']} attive | "
                 f"Totale: {m['created']} create, {m['expired']} scadute/chiuse"
             )
+            self._load_query_stats()
         
         # 1. Filtro Search
         search_query = self.db_stats_search.value.lower() if self.db_stats_search.value else ""
@@ -1483,6 +1563,51 @@ class AdminPanelView:
             
         self.page.update()
 
+    def _load_query_stats(self):
+        from db.strumentazione_query import ottieni_statistiche_query
+
+        stats = ottieni_statistiche_query(limite=15)
+        totali = stats["totali"]
+        if not stats["attiva"] and not totali["query"]:
+            self.query_stats_text.value = "Strumentazione query disattivata (BUDGETAMICO_QUERY_STATS=1 per attivarla)"
+        else:
+            self.query_stats_text.value = (
+                f"Query: {totali['query']:,} in {totali['tempo_ms']:,.0f} ms | "
+                f"Errori: {totali['errori']} | Allarmi N+1: {totali['allarmi_n_piu_1']}"
+            )
+
+        self.query_stats_table.rows = []
+        for q in stats["impronte"]:
+            chiamante = next(iter(q["funzioni"]), "-")
+            self.query_stats_table.rows.append(
+                ft.DataRow(cells=[
+                    ft.DataCell(ft.Text(q["impronta"][:90], tooltip=q["impronta"], size=12)),
+                    ft.DataCell(ft.Text(f"{q['esecuzioni']:,}")),
+                    ft.DataCell(ft.Text(f"{q['tempo_totale_ms']:,.1f}")),
+                    ft.DataCell(ft.Text(f"{q['tempo_medio_ms']:,.2f}")),
+                    ft.DataCell(ft.Text(f"{q['righe']:,}")),
+                    ft.DataCell(ft.Text(chiamante, size=12)),
+                ])
+            )
+
+    def _export_query_stats(self, e):
+        from db.strumentazione_query import esporta_statistiche_query
+
+        percorso = esporta_statistiche_query()
+        if percorso:
+            self.page.snack_bar = ft.SnackBar(ft.Text(f"Statistiche query esportate in {percorso}"), bgcolor=ft.Colors.GREEN)
+        else:
+            self.page.snack_bar = ft.SnackBar(ft.Text("Errore durante l'esportazione delle statistiche query"), bgcolor=ft.Colors.RED)
+        self.page.snack_bar.open = True
+        self.page.update()
+
+    def _reset_query_stats(self, e):
+        from db.strumentazione_query import azzera_statistiche_query
+
+        azzera_statistiche_query()
+        self._load_query_stats()
+        self.page.update()
+
     def _on_db_stats_sort(self, e):
         self._sort_datatable(e, self.db_stats_table, [], lambda: self._load_db_stats(use_cache=True))
 
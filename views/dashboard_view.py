@@ -17,6 +17,8 @@ from tabs.tab_calcolatrice import CalcolatriceTab
 from tabs.tab_accantonamenti import AccantonamentiTab
 from tabs.tab_contatti import ContattiTab
 from utils.logger import setup_logger
+from db.strumentazione_query import richiesta_query
+from db.supabase_manager import unita_di_lavoro
 from utils.cache_manager import cache_manager
 
 logger = setup_logger("DashboardView")
@@ -154,12 +156,13 @@ class DashboardView:
         self.content_area.content = view_instance
         
         # Aggiorna i dati della vista selezionata
-        if hasattr(view_instance, 'update_view_data'):
-            view_instance.update_view_data()
-        elif hasattr(view_instance, 'update_all_admin_tabs_data'):
-            view_instance.update_all_admin_tabs_data()
-        elif hasattr(view_instance, 'load_cards'): # For TabCarte
-            view_instance.load_cards()
+        with richiesta_query(f"nav:{label}"), unita_di_lavoro():
+            if hasattr(view_instance, 'update_view_data'):
+                view_instance.update_view_data()
+            elif hasattr(view_instance, 'update_all_admin_tabs_data'):
+                view_instance.update_all_admin_tabs_data()
+            elif hasattr(view_instance, 'load_cards'): # For TabCarte
+                view_instance.load_cards()
         
         # Ricostruisci la sidebar per aggiornare la selezione
         self.update_sidebar()
@@ -1,16 +1,17 @@
 import flet as ft
 import datetime
+import threading
 import traceback
-import pandas as pd
-import io
 from utils.logger import setup_logger
+from utils.async_task import AsyncTask
+from utils.export_writer import StreamingExportWriter, ExportAnnullato
 
 logger = setup_logger("ExportView")
 
 # Importa le funzioni DB necessarie
 from db.gestione_db import (
     ottieni_anni_mesi_storicizzati,
-    ottieni_transazioni_famiglia_per_export,
+    itera_transazioni_famiglia_per_export,
     ottieni_storico_budget_per_export,
     ottieni_riepilogo_conti_famiglia,
     ottieni_dettaglio_portafogli_famiglia,
@@ -45,6 +46,28 @@ class ExportView:
         self.chk_export_prestiti = ft.Checkbox(label="Esporta Prestiti e Mutui", value=True)
         self.chk_export_spese_fisse = ft.Checkbox(label="Esporta Spese Fisse", value=True)
 
+        # Formato, avanzamento e annullamento
+        self.dd_formato = ft.Dropdown(
+            label="Formato",
+            width=200,
+            value="xlsx",
+            options=[
+                ft.dropdown.Option("xlsx", "Excel (.xlsx)"),
+                ft.dropdown.Option("csv", "CSV (.zip)"),
+            ]
+        )
+        self.btn_esporta = ft.ElevatedButton(
+            "Genera e Scarica Excel",
+            icon=ft.Icons.DOWNLOAD,
+            on_click=self._clicca_esporta_excel,
+            height=50,
+            style=ft.ButtonStyle(bgcolor=ft.Colors.GREEN_700, color=ft.Colors.WHITE)
+        )
+        self.progress_export = ft.ProgressRing(width=20, height=20, visible=False)
+        self.txt_progresso = ft.Text("", visible=False)
+        self.btn_annulla = ft.TextButton("Annulla", icon=ft.Icons.CANCEL, visible=False, on_click=self._annulla_export)
+        self._cancel_event = None
+
     def build_view(self) -> ft.View:
         """ Costruisce e restituisce la vista di Esportazione """
         return ft.View(
@@ -91,13 +114,9 @@ class ExportView:
                 ),
 
                 # Pulsante Esporta
-                ft.ElevatedButton(
-                    "Genera e Scarica Excel",
-                    icon=ft.Icons.DOWNLOAD,
-                    on_click=self._clicca_esporta_excel,
-                    height=50,
-                    style=ft.ButtonStyle(bgcolor=ft.Colors.GREEN_700, color=ft.Colors.WHITE)
-                )
+                self.dd_formato,
+                ft.Row([self.btn_esporta, self.progress_export, self.txt_progresso, self.btn_annulla],
+                       vertical_alignment=ft.CrossAxisAlignment.CENTER)
             ],
             appbar=ft.AppBar(
                 title=ft.Text("Pagina di Esportazione"),
@@ -166,6 +185,39 @@ class ExportView:
         """ Callback gestito dall'AppController """
         pass
 
+    @staticmethod
+    def _totali_conti_per_tipo(conti_liquidi):
+        """Totali dei conti liquidi raggruppati per (tipo, intestatario), ordinati."""
+        totali = {}
+        for c in conti_liquidi:
+            chiave = (c.get('tipo') or '', c.get('membro') or '')
+            totali[chiave] = totali.get(chiave, 0) + (c.get('saldo_calcolato') or 0)
+        return [
+            {'Tipo Conto': tipo, 'Intestatario': membro, 'Saldo Totale': saldo}
+            for (tipo, membro), saldo in sorted(totali.items())
+        ]
+
+    def _imposta_stato_export(self, in_corso, messaggio=""):
+        self.btn_esporta.disabled = in_corso
+        self.progress_export.visible = in_corso
+        self.btn_annulla.visible = in_corso
+        self.txt_progresso.visible = bool(messaggio)
+        self.txt_progresso.value = messaggio
+        if self.btn_esporta.page:
+            self.page.update()
+
+    def _on_progresso_export(self, nome_foglio, righe):
+        self.txt_progresso.value = f"{nome_foglio}: {righe} righe"
+        self.txt_progresso.visible = True
+        if self.txt_progresso.page:
+            self.txt_progresso.update()
+
+    def _annulla_export(self, _):
+        if self._cancel_event:
+            self._cancel_event.set()
+            self.txt_progresso.value = "Annullamento in corso..."
+            self.txt_progresso.update()
+
     def _clicca_esporta_excel(self, _):
         famiglia_id = self.controller.get_family_id()
         if not famiglia_id:
@@ -175,125 +227,130 @@ class ExportView:
         # Retrieve keys from session
         master_key_b64 = self.page.session.get("master_key")
         user_id = self.controller.get_user_id()
-
-        try:
-            dati_transazioni = []
-            dati_budget = []
-            dati_conti = []
-            dati_portafogli = []
-            dati_immobili = []
-            dati_prestiti = []
-            dati_spese_fisse = []
-
-            # 1. Prepara Dati Transazioni
-            if self.chk_export_transazioni.value:
-                data_inizio = self.txt_export_data_inizio.value
-                data_fine = self.txt_export_data_fine.value
-                if not (data_inizio and data_fine):
-                    self.txt_export_data_inizio.error_text = "Obbligatorio" if not data_inizio else None
-                    self.txt_export_data_fine.error_text = "Obbligatorio" if not data_fine else None
-                    self.txt_export_data_inizio.update()
-                    self.txt_export_data_fine.update()
-                    return
-                self.txt_export_data_inizio.error_text = None
-                self.txt_export_data_fine.error_text = None
+        ruolo = self.controller.get_user_role()
+        formato = self.dd_formato.value or "xlsx"
+
+        # 1. Validazione parametri transazioni (sul thread UI)
+        esporta_transazioni = self.chk_export_transazioni.value
+        data_inizio = self.txt_export_data_inizio.value
+        data_fine = self.txt_export_data_fine.value
+        if esporta_transazioni:
+            if not (data_inizio and data_fine):
+                self.txt_export_data_inizio.error_text = "Obbligatorio" if not data_inizio else None
+                self.txt_export_data_fine.error_text = "Obbligatorio" if not data_fine else None
                 self.txt_export_data_inizio.update()
                 self.txt_export_data_fine.update()
-                
-                # Setup filtro utente per Livello 2
-                ruolo = self.controller.get_user_role()
-                filtra_utente_id = user_id if ruolo == 'livello2' else None
-                
-                dati_transazioni = ottieni_transazioni_famiglia_per_export(
-                    famiglia_id, data_inizio, data_fine, master_key_b64, user_id, 
-                    filtra_utente_id=filtra_utente_id
-                )
-
-            # 2. Prepara Dati Budget
-            if self.chk_export_budget.value:
-                periodi_selezionati = []
-                for chk in self.lv_export_periodi.controls:
-                    if isinstance(chk, ft.Checkbox) and chk.value:
-                        periodi_selezionati.append(chk.data)
+                return
+            self.txt_export_data_inizio.error_text = None
+            self.txt_export_data_fine.error_text = None
+            self.txt_export_data_inizio.update()
+            self.txt_export_data_fine.update()
+
+        # Setup filtro utente per Livello 2
+        filtra_utente_id = user_id if ruolo == 'livello2' else None
+
+        periodi_selezionati = []
+        if self.chk_export_budget.value:
+            for chk in self.lv_export_periodi.controls:
+                if isinstance(chk, ft.Checkbox) and chk.value:
+                    periodi_selezionati.append(chk.data)
+
+        opzioni = {
+            'conti': self.chk_export_conti.value,
+            'portafogli': self.chk_export_portafogli.value,
+            'immobili': self.chk_export_immobili.value,
+            'prestiti': self.chk_export_prestiti.value,
+            'spese_fisse': self.chk_export_spese_fisse.value,
+        }
+
+        self._cancel_event = threading.Event()
+        cancel_event = self._cancel_event
+
+        def task_export():
+            # I fogli vengono scritti uno alla volta: le transazioni (il dataset più grande)
+            # arrivano in streaming dal DB e non vengono mai materializzate.
+            writer = StreamingExportWriter(formato, on_progress=self._on_progresso_export, cancel_event=cancel_event)
+            try:
+                # 2. Transazioni
+                if esporta_transazioni:
+                    writer.scrivi_foglio('Transazioni_Famiglia', itera_transazioni_famiglia_per_export(
+                        famiglia_id, data_inizio, data_fine, master_key_b64, user_id,
+                        filtra_utente_id=filtra_utente_id
+                    ))
+
+                # 3. Storico Budget
                 if periodi_selezionati:
-                    dati_budget = ottieni_storico_budget_per_export(
+                    writer.scrivi_foglio('Storico_Budget', ottieni_storico_budget_per_export(
                         famiglia_id, periodi_selezionati, master_key_b64, user_id
-                    )
-
-            # 3. Prepara Dati Conti
-            if self.chk_export_conti.value:
-                dati_conti = ottieni_riepilogo_conti_famiglia(famiglia_id, master_key_b64, user_id)
-
-            # 4. Prepara Dati Portafogli
-            if self.chk_export_portafogli.value:
-                dati_portafogli = ottieni_dettaglio_portafogli_famiglia(famiglia_id, master_key_b64, user_id)
-
-            # 5. Prepara Dati Immobili
-            if self.chk_export_immobili.value:
-                # Import here to avoid circular dependencies if not already imported
-                from db.gestione_db import ottieni_dati_immobili_famiglia_per_export
-                dati_immobili = ottieni_dati_immobili_famiglia_per_export(famiglia_id, master_key_b64, user_id)
-
-            # 6. Prepara Dati Prestiti
-            if self.chk_export_prestiti.value:
-                from db.gestione_db import ottieni_dati_prestiti_famiglia_per_export
-                dati_prestiti = ottieni_dati_prestiti_famiglia_per_export(famiglia_id, master_key_b64, user_id)
-            
-            # 7. Prepara Dati Spese Fisse
-            if self.chk_export_spese_fisse.value:
-                from db.gestione_db import ottieni_dati_spese_fisse_famiglia_per_export
-                dati_spese_fisse = ottieni_dati_spese_fisse_famiglia_per_export(famiglia_id, master_key_b64, user_id)
-
-            if not any([dati_transazioni, dati_budget, dati_conti, dati_portafogli, 
-                        dati_immobili, dati_prestiti, dati_spese_fisse]):
+                    ))
+
+                # 4. Conti
+                if opzioni['conti']:
+                    dati_conti = ottieni_riepilogo_conti_famiglia(famiglia_id, master_key_b64, user_id)
+                    liquidi = [c for c in dati_conti if c.get('tipo') != 'Investimento']
+                    if liquidi:
+                        writer.scrivi_foglio('Totali_Conti_Liquidi', self._totali_conti_per_tipo(liquidi))
+                        writer.scrivi_foglio('Dettaglio_Conti_Liquidi', liquidi)
+                    writer.scrivi_foglio('Riepilogo_Investimenti', (c for c in dati_conti if c.get('tipo') == 'Investimento'))
+
+                # 5. Portafogli
+                if opzioni['portafogli']:
+                    writer.scrivi_foglio('Dettaglio_Portafogli', ottieni_dettaglio_portafogli_famiglia(famiglia_id, master_key_b64, user_id))
+
+                # 6. Immobili
+                if opzioni['immobili']:
+                    # Import here to avoid circular dependencies if not already imported
+                    from db.gestione_db import ottieni_dati_immobili_famiglia_per_export
+                    writer.scrivi_foglio('Patrimonio_Immobiliare', ottieni_dati_immobili_famiglia_per_export(famiglia_id, master_key_b64, user_id))
+
+                # 7. Prestiti
+                if opzioni['prestiti']:
+                    from db.gestione_db import ottieni_dati_prestiti_famiglia_per_export
+                    writer.scrivi_foglio('Prestiti_Mutui', ottieni_dati_prestiti_famiglia_per_export(famiglia_id, master_key_b64, user_id))
+
+                # 8. Spese Fisse
+                if opzioni['spese_fisse']:
+                    from db.gestione_db import ottieni_dati_spese_fisse_famiglia_per_export
+                    writer.scrivi_foglio('Spese_Fisse', ottieni_dati_spese_fisse_famiglia_per_export(famiglia_id, master_key_b64, user_id))
+
+                if not writer.righe_per_foglio:
+                    writer.scarta()
+                    return None
+
+                file_export, _ = writer.chiudi()
+                with file_export:
+                    return file_export.read()
+            except ExportAnnullato:
+                writer.scarta()
+                return False
+            except Exception:
+                writer.scarta()
+                raise
+
+        def on_done(file_data_bytes):
+            self._cancel_event = None
+            self._imposta_stato_export(False)
+            if file_data_bytes is False:
+                self.controller.show_snack_bar("Esportazione annullata.", success=False)
+                return
+            if not file_data_bytes:
                 self.controller.show_snack_bar("Nessun dato selezionato o trovato.", success=False)
                 return
 
-            # 8. Crea l'Excel in memoria
-            output_bytes = io.BytesIO()
-            with pd.ExcelWriter(output_bytes, engine='openpyxl') as writer:
-                if dati_transazioni:
-                    pd.DataFrame(dati_transazioni).to_excel(writer, sheet_name='Transazioni_Famiglia', index=False)
-                if dati_budget:
-                    pd.DataFrame(dati_budget).to_excel(writer, sheet_name='Storico_Budget', index=False)
-
-                if dati_conti:
-                    df_conti_completo = pd.DataFrame(dati_conti)
-                    df_liquidi = df_conti_completo[df_conti_completo['tipo'] != 'Investimento']
-                    if not df_liquidi.empty:
-                        df_totali_tipo = df_liquidi.groupby(['tipo', 'membro'])['saldo_calcolato'].sum().reset_index()
-                        df_totali_tipo.columns = ['Tipo Conto', 'Intestatario', 'Saldo Totale']
-                        df_totali_tipo = df_totali_tipo.sort_values(by=['Tipo Conto', 'Intestatario'])
-                        df_totali_tipo.to_excel(writer, sheet_name='Totali_Conti_Liquidi', index=False)
-                        df_liquidi.to_excel(writer, sheet_name='Dettaglio_Conti_Liquidi', index=False)
-
-                    df_investimenti = df_conti_completo[df_conti_completo['tipo'] == 'Investimento']
-                    if not df_investimenti.empty:
-                        df_investimenti.to_excel(writer, sheet_name='Riepilogo_Investimenti', index=False)
-
-                if dati_portafogli:
-                    pd.DataFrame(dati_portafogli).to_excel(writer, sheet_name='Dettaglio_Portafogli', index=False)
-                
-                if dati_immobili:
-                    pd.DataFrame(dati_immobili).to_excel(writer, sheet_name='Patrimonio_Immobiliare', index=False)
-                    
-                if dati_prestiti:
-                    pd.DataFrame(dati_prestiti).to_excel(writer, sheet_name='Prestiti_Mutui', index=False)
-                    
-                if dati_spese_fisse:
-                     pd.DataFrame(dati_spese_fisse).to_excel(writer, sheet_name='Spese_Fisse', index=False)
-
-            output_bytes.seek(0)
-            file_data_bytes = output_bytes.getvalue()
-
             # 9. Salva i byte nella sessione
             self.page.session.set("excel_export_data", file_data_bytes)
 
             # 10. Apri il dialogo "Salva con nome"
+            estensione = "xlsx" if formato == "xlsx" else "zip"
             self.controller.file_picker_salva_excel.save_file(
-                file_name=f"Report_Budget_Famiglia_{datetime.date.today()}.xlsx"
+                file_name=f"Report_Budget_Famiglia_{datetime.date.today()}.{estensione}"
             )
 
-        except Exception as ex:
+        def on_error(ex):
+            self._cancel_event = None
+            self._imposta_stato_export(False)
             logger.error(f"Errore durante l'esportazione Excel: {ex}", exc_info=True)
-            self.controller.show_snack_bar(f"❌ Errore imprevisto durante l'esportazione: {ex}", success=False)
\ No newline at end of file
+            self.controller.show_snack_bar(f"❌ Errore imprevisto durante l'esportazione: {ex}", success=False)
+
+        self._imposta_stato_export(True, "Preparazione export...")
+        AsyncTask(target=task_export, callback=on_done, error_callback=on_error).start()